@@ -1,9 +1,23 @@
+from __future__ import annotations
+import os
 import tkinter as tk
+from bisect import bisect_left
 from tkinter import ttk, messagebox
-
-from patterns.factory import FactoryRegistry, BikeFactory, TreadmillFactory, RowingMachineFactory,GyriFactory
-from patterns.decorator import OnlineSoftwareDecorator, AnalyticsDecorator
-from patterns.proxy import SoftwareProxy
+from typing import TYPE_CHECKING
+
+from patterns.factory import FactoryRegistry, RecipeFactory
+from patterns.builder import default_recipes
+# индексы, версии, SyncCatalog, отчёт и шина событий импортируются при первом
+# использовании (в основном — в App.__init__): import app их не грузит
+from patterns.composite import (
+    Catalog,
+    LazyModel,
+    build_software,
+    apply_config_refs,
+    model_to_memento,
+    model_from_memento,
+    software_label,
+)
 from patterns.memento import EquipmentMemento, ModelMemento, Caretaker
 
 from patterns.state import SystemState, EditState, ViewState
@@ -12,16 +26,39 @@ from patterns.command import (
     Invoker,
     ApplyDecoratorsCommand,
     ApplyProxyCommand,
+    BulkApplyConfigCommand,
     SaveSnapshotCommand,
     UndoCommand,
     RedoCommand,
+    SwitchBranchCommand,
+    JumpToSnapshotCommand,
+    RunOperationCommand,
 )
 
-from domain.equipment import EquipmentModel, BaseSoftware
+from domain.equipment import EquipmentModel, EquipmentType, ISoftware
+from ui.action_log import ActionLog
+from ui.render_cache import RenderCache
+
+if TYPE_CHECKING:
+    from patterns.composite import CatalogView
+    from patterns.observer import EventBatch
 
 
 class App(tk.Tk):
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        log_capacity: int = 2000,
+        log_spill_path: str | None = None,
+        history_compress_after: int | None = 8,
+        history_codec: str = "zlib",
+        history_level: int = 6,
+        history_branching: bool = False,
+        eager_restore: bool = False,
+        parallel_workers: int | None = None,
+        batch_concurrency: int = 8,
+        journal_window_ms: float = 20.0,
+        journal_checkpoint_every: int = 5000,
+    ) -> None:
         super().__init__()
         self.title("Mega-Patterns — Trainer Software Control Panel")
         self.geometry("1200x740")
@@ -54,26 +91,94 @@ class App(tk.Tk):
         }
 
         self.current_equipment: EquipmentModel | None = None
+        self._current_ref: tuple[str, int] | None = None
+
+        from patterns.composite import CatalogSearchIndex, CatalogVersions, SpecRangeIndex, SyncCatalog
+        from patterns.observer import CatalogEventSource, CurrentChanged, EventBus, HistoryChanged
+
+        # Observer: правки каталога, текущей модели и истории уходят подписчикам
+        # (дерево, панели, Memento, статус) одной пачкой раз в idle-тик или по транзакции
+        self.events = EventBus(self.after_idle, on_error=lambda name, e: self.log(f"[ERROR] {name}: {e}", "ERROR"))
 
         # Composite catalog (тип -> список моделей)
-        self._catalog: dict[str, list[EquipmentModel]] = {}
+        # индексы поиска и диапазонов по specs; Catalog обновляет их сам, он же шлёт события add/remove
+        self._search_index = CatalogSearchIndex()
+        self._range_index = SpecRangeIndex()
+        self._indexes = [self._search_index, self._range_index, CatalogEventSource(self.events)]
+        self._search_after: str | None = None
+        self._search_limit = 500  # сколько найденных моделей показывать в дереве
+        # все изменения каталога идут через SyncCatalog: фоновые читатели берут его блокировки
+        self._sync = SyncCatalog(Catalog(indexes=self._indexes))
+        # неизменяемые версии каталога для VIEW и фоновых читателей (экспорт, snapshot'ы)
+        self._versions = CatalogVersions(lambda m: model_to_memento(m, self.selected_key.get()))
+        self._pinned_view: CatalogView | None = None
         self._tree_type_nodes: dict[str, str] = {}
-        self._tree_model_nodes: dict[int, str] = {}
+        self._tree_ref_nodes: dict[tuple[str, int], str] = {}  # (type, index) -> tree item
+        self._tree_node_refs: dict[str, tuple[str, int]] = {}  # tree item -> (type, index)
+        self._report_window: tk.Toplevel | None = None
+        self._report_page = 50  # моделей на страницу отчёта по типу
 
-        self._snapshot_list: list[EquipmentMemento] = []
+        # Action Log: кольцевой буфер + пакетная вставка в виджет раз в idle-тик
+        self._action_log = ActionLog(capacity=log_capacity, spill_path=log_spill_path)
 
-        self.registry = FactoryRegistry()
-        self.registry.register("bike", BikeFactory())
-        self.registry.register("treadmill", TreadmillFactory())
-        self.registry.register("rowing", RowingMachineFactory())
-        self.registry.register("gyri", GyriFactory())
+        # кеш текстов панелей по (модель, version) + последний показанный текст виджета
+        self._summary_cache = RenderCache(lambda eq: eq.summary())
+        self._chain_cache = RenderCache(self._render_software_chain)
+        self._shown_texts: dict[str, str] = {}
 
-        self.caretaker = Caretaker()
+        self.registry = FactoryRegistry()
+        # фабрика на каждый рецепт: новые типы из recipes.json появляются без изменения кода;
+        # лог сборки нужен кнопке "Show builder log"
+        for key in default_recipes().keys():
+            self.registry.register(key, RecipeFactory(key, with_log=True))
+
+        # eager_restore: при восстановлении сразу собрать все модели (большие snapshot'ы —
+        # в пуле процессов, см. patterns.composite.parallel); по умолчанию — лениво
+        self._eager_restore = eager_restore
+        self._parallel_workers = parallel_workers
+
+        # пакетный operation() по области каталога: не больше batch_concurrency вызовов сразу
+        self._batch_concurrency = batch_concurrency
+        self._batch_runner = None  # BatchOperationRunner, создаётся при первом запуске
+        self._batch_window: tk.Toplevel | None = None
+
+        # snapshot'ы дальше history_compress_after шагов от курсора хранятся сжатыми (None — без сжатия);
+        # history_branching — дерево: snapshot после undo открывает новую ветку, старая остаётся
+        self.caretaker = Caretaker(
+            compress_after=history_compress_after,
+            codec=history_codec,
+            level=history_level,
+            branching=history_branching,
+        )
+        self._snapshot_rows: list[int] = []  # строка списка snapshot'ов -> номер в Caretaker
+
+        # опциональная SQLite-копия каталога: MEGA_PATTERNS_DB=path/to/catalog.db
+        # (загружается при старте, каждый snapshot дописывает в неё изменённые строки)
+        db_path = os.environ.get("MEGA_PATTERNS_DB")
+        self.store = None
+        if db_path:
+            from patterns.composite import SqliteCatalogStore
+
+            self.store = SqliteCatalogStore(db_path)
+
+        # опциональный журнал команд (WAL): MEGA_PATTERNS_JOURNAL=path/to/dir
+        # при старте каталог и история восстанавливаются из последнего checkpoint'а + хвоста журнала;
+        # journal_window_ms — окно группового fsync (при сбое теряется не больше него)
+        self._journal_dir = os.environ.get("MEGA_PATTERNS_JOURNAL")
+        self._journal_window_ms = journal_window_ms
+        self._journal_checkpoint_every = journal_checkpoint_every
+        self.journal = None  # CommandJournal
+        self._history_move: tuple[int, EquipmentMemento] | None = None  # узел последнего undo/redo/jump
 
         self.invoker = Invoker()
         self.invoker.register("save_snapshot", SaveSnapshotCommand(self))
         self.invoker.register("undo", UndoCommand(self))
         self.invoker.register("redo", RedoCommand(self))
+        self.invoker.register("branch_prev", SwitchBranchCommand(self, -1))
+        self.invoker.register("branch_next", SwitchBranchCommand(self, 1))
+        # очередь: долгие команды не морозят UI, результат возвращается через after()
+        self.invoker.start_queue(self.after)
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
 
         self._editing_enabled: bool = True
         self.system_state: SystemState = EditState(self)
@@ -82,8 +187,11 @@ class App(tk.Tk):
 
         self._apply_ttk_theme()
         self._build_ui()
+        self._subscribe_ui()
         self.system_state.show_funcs()
-        self.refresh_all()
+        # первая отрисовка панелей и истории — обычной пачкой событий
+        self.events.emit(CurrentChanged(None))
+        self.events.emit(HistoryChanged())
 
     # -----------------------------
     # Theme / styles
@@ -178,7 +286,11 @@ class App(tk.Tk):
 
         self._build_left_controls(body)
         self._build_center_info(body)
-        self._build_right_panel(body)
+
+        # каталог и лог достраиваются после первого кадра
+        self.tree: ttk.Treeview | None = None
+        self.txt_log: tk.Text | None = None
+        self.after_idle(lambda: self._build_deferred(body))
 
         self.bottom_bar = tk.Label(
             self,
@@ -191,6 +303,19 @@ class App(tk.Tk):
         )
         self.bottom_bar.pack(fill="x")
 
+    def _build_deferred(self, body: ttk.Frame) -> None:
+        self._build_right_panel(body)
+        if self.store is not None and self.store.count():
+            # CatalogReset из restore перестроит уже созданное дерево
+            self.restore_from_memento(self.store.to_memento())
+            self.log(f"[MEMENTO] catalog loaded from SQLite: models={self.store.count()}", "MEMENTO")
+        else:
+            self._rebuild_tree()
+        if self._journal_dir:
+            self._open_journal(self._journal_dir)
+        # строки, накопленные до появления виджета
+        self._flush_log()
+
     def _card(self, parent: ttk.Frame, title: str) -> ttk.Labelframe:
         lf = ttk.Labelframe(parent, text=title, padding=10)
         lf.pack(fill="x", pady=8)
@@ -268,9 +393,9 @@ class App(tk.Tk):
 
         # 5) MEMENTO
         c5 = self._card(left, "5) Memento (Tree)")
-        btn_save = ttk.Button(c5, text="Save Snapshot", command=lambda: self.invoker.execute("save_snapshot"))
-        btn_undo = ttk.Button(c5, text="Undo", command=lambda: self.invoker.execute("undo"))
-        btn_redo = ttk.Button(c5, text="Redo", command=lambda: self.invoker.execute("redo"))
+        btn_save = ttk.Button(c5, text="Save Snapshot", command=lambda: self.invoker.submit("save_snapshot"))
+        btn_undo = ttk.Button(c5, text="Undo", command=lambda: self.invoker.submit("undo"))
+        btn_redo = ttk.Button(c5, text="Redo", command=lambda: self.invoker.submit("redo"))
 
         btn_save.pack(fill="x")
         btn_undo.pack(fill="x", pady=(6, 0))
@@ -278,6 +403,37 @@ class App(tk.Tk):
 
         self._editable_widgets.extend([btn_save, btn_undo, btn_redo])
 
+        ttk.Button(c5, text="Save catalog to file…", command=self.save_catalog_to_file).pack(fill="x", pady=(10, 0))
+        btn_load = ttk.Button(c5, text="Load catalog from file…", command=self.load_catalog_from_file)
+        btn_load.pack(fill="x", pady=(6, 0))
+        self._editable_widgets.append(btn_load)
+        ttk.Button(c5, text="Export report…", command=self.export_catalog_report).pack(fill="x", pady=(6, 0))
+
+        # 6) BULK
+        c6 = self._card(left, "6) Bulk apply (Decorator + Proxy)")
+        ttk.Label(c6, text="Область (флаги берутся из 3) и 4)):").pack(anchor="w")
+        self._bulk_scopes = {
+            "type of current": lambda m: self.current_equipment is not None
+            and m.equipment_type == self.current_equipment.equipment_type,
+            "factory key": lambda m: getattr(m, "factory_key", None) == self.selected_key.get(),
+            "clones only": lambda m: m.is_clone,
+            "whole catalog": lambda m: True,
+        }
+        self.bulk_scope = tk.StringVar(value="type of current")
+        combo_scope = ttk.Combobox(
+            c6, textvariable=self.bulk_scope, values=list(self._bulk_scopes), state="readonly", width=18
+        )
+        combo_scope.pack(anchor="w", pady=(4, 6))
+        btn_bulk = ttk.Button(c6, text="Apply to scope (Command)", command=self.on_bulk_apply_click)
+        btn_bulk.pack(fill="x")
+        self._editable_widgets.extend([combo_scope, btn_bulk])
+
+        # operation() по той же области: только чтение, доступно и в VIEW
+        self.btn_batch = ttk.Button(c6, text="Run operation() for scope", command=self.on_batch_operation_click)
+        self.btn_batch.pack(fill="x", pady=(10, 0))
+        self.lbl_batch = ttk.Label(c6, text="")
+        self.lbl_batch.pack(anchor="w", pady=(4, 0))
+
     def _build_center_info(self, parent: ttk.Frame) -> None:
         center = ttk.Frame(parent)
         center.grid(row=0, column=1, sticky="nsew", padx=(0, 10))
@@ -352,6 +508,21 @@ class App(tk.Tk):
         btn_restore = ttk.Button(left_box, text="Restore selected", command=self.restore_selected_snapshot)
         btn_restore.grid(row=2, column=0, sticky="ew", pady=(6, 0))
         self._editable_widgets.append(btn_restore)
+        # только чтение — доступно и в VIEW
+        ttk.Button(left_box, text="Compare selected → current", command=self.compare_selected_snapshot).grid(
+            row=3, column=0, sticky="ew", pady=(6, 0)
+        )
+        if self.caretaker.branching:
+            nav = ttk.Frame(left_box)
+            nav.grid(row=4, column=0, sticky="ew", pady=(6, 0))
+            nav.columnconfigure((0, 1), weight=1)
+            btn_prev = ttk.Button(nav, text="◀ branch", command=lambda: self.invoker.submit("branch_prev"))
+            btn_next = ttk.Button(nav, text="branch ▶", command=lambda: self.invoker.submit("branch_next"))
+            btn_jump = ttk.Button(nav, text="Jump to selected", command=self.jump_to_selected_snapshot)
+            btn_prev.grid(row=0, column=0, sticky="ew")
+            btn_next.grid(row=0, column=1, sticky="ew", padx=(6, 0))
+            btn_jump.grid(row=1, column=0, columnspan=2, sticky="ew", pady=(6, 0))
+            self._editable_widgets.extend([btn_prev, btn_next, btn_jump])
 
         right_box = ttk.Frame(top)
         right_box.grid(row=0, column=1, sticky="nsew")
@@ -384,14 +555,23 @@ class App(tk.Tk):
 
         comp_card = ttk.Labelframe(right, text="Composite Catalog (Type → Models)", padding=10)
         comp_card.grid(row=0, column=0, sticky="nsew", pady=(0, 10))
-        comp_card.rowconfigure(0, weight=1)
+        comp_card.rowconfigure(1, weight=1)
         comp_card.columnconfigure(0, weight=1)
 
+        search_row = ttk.Frame(comp_card)
+        search_row.grid(row=0, column=0, sticky="ew", pady=(0, 6))
+        ttk.Label(search_row, text="Поиск (specs: max_speed_kmh>=16, max_power_watts=400..600):").pack(side="left")
+        self.var_search = tk.StringVar()
+        self.var_search.trace_add("write", lambda *_: self._on_search_changed())
+        ttk.Entry(search_row, textvariable=self.var_search).pack(side="left", fill="x", expand=True, padx=(6, 6))
+        self.lbl_search = ttk.Label(search_row, text="")
+        self.lbl_search.pack(side="left")
+
         self.tree = ttk.Treeview(comp_card, columns=("kind",), show="tree headings")
         self.tree.heading("#0", text="Hierarchy")
         self.tree.heading("kind", text="Node type")
         self.tree.column("kind", width=90, anchor="center")
-        self.tree.grid(row=0, column=0, sticky="nsew")
+        self.tree.grid(row=1, column=0, sticky="nsew")
         self.tree.bind("<Double-1>", self._on_tree_double_click)
 
         # ✅ Цвета в компоновщике: папки TYPE и модели MODEL
@@ -425,12 +605,31 @@ class App(tk.Tk):
         self.txt_log.tag_config("ERROR", foreground=self.COL["error"])
         self.txt_log.tag_config("OK", foreground=self.COL["success"])
         self.txt_log.tag_config("PROTOTYPE", foreground=self.COL["builder"])
+        self.txt_log.tag_config("COMPOSITE", foreground=self.COL["factory"])  # как узлы типов в дереве
 
     # -----------------------------
     # Helpers / state
     # -----------------------------
     def log(self, text: str, tag: str = "STATE") -> None:
-        self.txt_log.insert("end", text + "\n", (tag,))
+        if self._action_log.append(text, tag):
+            self.after_idle(self._flush_log)
+
+    def _flush_log(self) -> None:
+        if self.txt_log is None:
+            return
+        lines = self._action_log.drain()
+        if not lines:
+            return
+        # одна вставка на всю пачку: insert(index, text1, tags1, text2, tags2, ...)
+        args: list = []
+        for text, tag in lines:
+            args.extend((text + "\n", (tag,)))
+        self.txt_log.insert("end", *args)
+
+        shown = int(self.txt_log.index("end-1c").split(".")[0]) - 1
+        excess = shown - self._action_log.capacity
+        if excess > 0:
+            self.txt_log.delete("1.0", f"{excess + 1}.0")
         self.txt_log.see("end")
 
     def set_state(self, state_cls: type[SystemState]) -> None:
@@ -441,6 +640,12 @@ class App(tk.Tk):
 
     def enable_editing(self, enabled: bool) -> None:
         self._editing_enabled = enabled
+        # VIEW читает зафиксированную версию каталога; EDIT снова публикует новые
+        if enabled:
+            self._pinned_view = None
+        else:
+            self._pinned_view = self.publish_view()
+            self.log(f"[MVCC] VIEW pinned to catalog version {self._pinned_view.version}", "STATE")
         state = "normal" if enabled else "disabled"
         for w in self._editable_widgets:
             try:
@@ -453,6 +658,76 @@ class App(tk.Tk):
         fg = self.COL["success"] if mode.upper() == "EDIT" else self.COL["warn"]
         self.status_label.configure(text=text, fg=fg)
 
+    def _on_close(self) -> None:
+        self.invoker.stop_queue()
+        if self._batch_runner is not None:
+            self._batch_runner.cancel()
+        if self.journal is not None:
+            self.journal.close()
+        self._action_log.close()
+        if self.store is not None:
+            self.store.close()
+        self.destroy()
+
+    # -----------------------------
+    # Command journal (WAL)
+    # -----------------------------
+    def _open_journal(self, directory: str) -> None:
+        from patterns.observer import HistoryChanged
+        from patterns.command import CommandJournal, recover
+
+        try:
+            rec = recover(directory, self.caretaker, self._materialize_model)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Journal", str(e))
+            self.log(f"[ERROR] journal recovery failed: {e}", "ERROR")
+            return
+        if not rec.empty:
+            # каталог из журнала собирается без индексов — подключаем и перестраиваем их одним reindex
+            catalog = rec.state.build_catalog()
+            catalog.indexes = self._indexes
+            with self.events.transaction():
+                self._sync.replace(catalog)
+                self._restore_current(rec.state.current_ref)
+                self.events.emit(HistoryChanged())
+            self.log(f"[JOURNAL] recovered: {rec.summary()}", "MEMENTO")
+        try:
+            self.journal = CommandJournal(
+                directory,
+                last_lsn=rec.last_lsn,
+                window_ms=self._journal_window_ms,
+                checkpoint_every=self._journal_checkpoint_every,
+            )
+        except OSError as e:
+            self.log(f"[ERROR] journal disabled: {e}", "ERROR")
+            return
+        # пустой журнал начинается с checkpoint'а стартового каталога (SQLite/пустого);
+        # длинный хвост — сразу в checkpoint, чтобы следующий старт не повторял его снова
+        if rec.empty or rec.replayed >= self._journal_checkpoint_every:
+            self._checkpoint()
+
+    def _journal(self, op: str, **args) -> None:
+        """Записать результат команды в журнал (из UI-потока — он единственный писатель)."""
+        if self.journal is None:
+            return
+        try:
+            self.journal.append(op, **args)
+            if self.journal.checkpoint_due():
+                self._checkpoint()
+        except (OSError, ValueError) as e:
+            self.log(f"[ERROR] journal disabled: {e}", "ERROR")
+            self.journal = None
+
+    def _checkpoint(self) -> None:
+        # версия каталога и срез истории снимаются здесь, запись .mpcat — в фоне
+        if self.journal is None:
+            return
+        try:
+            self.journal.checkpoint(self.publish_view().to_memento(), self.caretaker.export_state())
+        except (OSError, ValueError) as e:
+            self.log(f"[ERROR] journal disabled: {e}", "ERROR")
+            self.journal = None
+
     # -----------------------------
     # Software reconstruction
     # -----------------------------
@@ -461,26 +736,15 @@ class App(tk.Tk):
         eq = self.current_equipment
         if not eq:
             return
-
-        software = BaseSoftware(eq.base_software_title)
-
-        if eq.use_online:
-            software = OnlineSoftwareDecorator(software)
-        if eq.use_analytics:
-            software = AnalyticsDecorator(software)
-
-        if eq.use_proxy:
-            proxy = SoftwareProxy(title=software.name(), required_license="VALID-KEY")
-            proxy.set_license(eq.license_key)
-            software = proxy
-
-        eq.software = software
+        eq.software = build_software(eq)
 
     def software_chain_text(self) -> str:
         eq = self.current_equipment
         if not eq:
             return "Нет созданного тренажёра."
+        return self._chain_cache.get(eq)
 
+    def _render_software_chain(self, eq: EquipmentModel) -> str:
         chain = [f"BaseSoftware('{eq.base_software_title}')"]
         if eq.use_online:
             chain.append("OnlineDecorator")
@@ -500,55 +764,242 @@ class App(tk.Tk):
     # -----------------------------
     # Composite catalog
     # -----------------------------
-    def _add_to_catalog(self, model: EquipmentModel) -> None:
-        eq_type = getattr(model, "equipment_type", "") or "UnknownType"
-        self._catalog.setdefault(eq_type, [])
-        # добавляем именно объект (копии не сливаем)
-        self._catalog[eq_type].append(model)
-        self._rebuild_tree()
+    @property
+    def _catalog(self) -> Catalog:
+        # чтение из UI-потока (он же единственный писатель) — без блокировок
+        return self._sync.catalog
+
+    def _add_to_catalog(self, model: EquipmentModel) -> tuple[str, int]:
+        # добавляем именно объект (копии не сливаем); узел в дереве добавит подписчик ModelAdded
+        ref = self._sync.add(model)
+        if self.journal is not None:
+            from patterns.command import model_fields
+
+            self._journal("add", m=model_fields(model_to_memento(model, self.selected_key.get())))
+        return ref
+
+    def _set_current(self, model: EquipmentModel | None, ref: tuple[str, int] | None) -> None:
+        from patterns.observer import CurrentChanged
+
+        self.current_equipment = model
+        self._current_ref = ref
+        self.events.emit(CurrentChanged(ref))
+
+    # -----------------------------
+    # Подписчики шины событий
+    # -----------------------------
+    def _subscribe_ui(self) -> None:
+        from patterns.observer import ModelAdded, ModelRemoved, ModelChanged, CatalogReset, CurrentChanged, HistoryChanged
+
+        self.events.subscribe(
+            self._on_tree_events, (ModelAdded, ModelRemoved, ModelChanged, CatalogReset), name="tree"
+        )
+        self.events.subscribe(self._on_panel_events, (ModelChanged, CatalogReset, CurrentChanged), name="panels")
+        self.events.subscribe(self._on_history_events, (HistoryChanged,), name="memento")
+        self.events.subscribe(self._on_status_events, name="status")
+
+    def _on_tree_events(self, batch: EventBatch) -> None:
+        from patterns.observer import ModelAdded, ModelRemoved, ModelChanged, CatalogReset
+
+        if self.tree is None:
+            return  # дерево строится целиком в _build_deferred
+        filtered = bool(self.var_search.get().strip())
+        if CatalogReset in batch or (filtered and (ModelAdded in batch or ModelRemoved in batch)):
+            # при активном поиске мог поменяться сам набор найденного (он не больше _search_limit)
+            self._rebuild_tree()
+            return
+        # удаление сдвигает позиции внутри типа — такой тип перестраивается целиком,
+        # если только не убран хвост (undo после create/clone): тогда удаляются его узлы
+        removed: dict[str, set[int]] = {}
+        for eq_type, idx in batch.refs(ModelRemoved):
+            removed.setdefault(eq_type, set()).add(idx)
+        added_types = {eq_type for eq_type, _ in batch.refs(ModelAdded)}
+        shifted = set()
+        for eq_type in sorted(removed):
+            if eq_type in added_types or not self._drop_tree_tail(eq_type, removed[eq_type]):
+                self._rebuild_tree_type(eq_type)
+                shifted.add(eq_type)
+        for ref in batch.refs(ModelAdded):
+            if ref[0] not in shifted:
+                self._upsert_tree_model(ref)
+        for ref in batch.refs(ModelChanged):
+            if ref[0] not in shifted and ref in self._tree_ref_nodes:
+                self._upsert_tree_model(ref)
+
+    def _on_panel_events(self, batch: EventBatch) -> None:
+        from patterns.observer import ModelChanged, CatalogReset, CurrentChanged
+
+        ref = self._current_ref
+        if CurrentChanged in batch or CatalogReset in batch or (ref is not None and batch.has(ModelChanged, ref)):
+            self._refresh_panels()
+
+    def _on_history_events(self, batch: EventBatch) -> None:
+        self._sync_snapshot_list_from_caretaker()
+
+    def _on_status_events(self, batch: EventBatch) -> None:
+        self.refresh_bottom_bar()
+
+    # -----------------------------
+    # Дерево каталога
+    # -----------------------------
+    def _tree_node_content(self, m) -> tuple[str, str]:
+        # software_label не материализует LazyModel
+        label = f"{getattr(m, 'name', 'Model')}  (software: {software_label(m)})"
+        tag = "CLONE" if getattr(m, "is_clone", False) else "MODEL"
+        return label, tag
+
+    def _tree_type_node(self, eq_type: str) -> str:
+        type_id = self._tree_type_nodes.get(eq_type)
+        if type_id is None:
+            # типы в дереве по алфавиту
+            pos = bisect_left(sorted(self._tree_type_nodes), eq_type)
+            type_id = self.tree.insert("", pos, text=eq_type, values=("TYPE",), tags=("TYPE",), open=True)
+            self._tree_type_nodes[eq_type] = type_id
+        return type_id
+
+    def _insert_tree_model(self, type_id: str, ref: tuple[str, int], m) -> None:
+        label, tag = self._tree_node_content(m)
+        mid = self.tree.insert(type_id, "end", text=label, values=("MODEL",), tags=(tag,))
+        self._tree_ref_nodes[ref] = mid
+        self._tree_node_refs[mid] = ref
+
+    def _upsert_tree_model(self, ref: tuple[str, int]) -> None:
+        eq_type, idx = ref
+        models = self._catalog.get(eq_type, ())
+        if idx >= len(models):
+            return
+        mid = self._tree_ref_nodes.get(ref)
+        if mid is None:
+            # новые модели всегда в конце своего типа
+            self._insert_tree_model(self._tree_type_node(eq_type), ref, models[idx])
+            return
+        label, tag = self._tree_node_content(models[idx])
+        self.tree.item(mid, text=label, tags=(tag,))
+
+    def _drop_tree_tail(self, eq_type: str, removed: set[int]) -> bool:
+        """
+        Убрать узлы удалённого хвоста типа. Годится, только если удалены ровно
+        последние позиции (первые len(models) моделей при этом не сдвигались).
+        """
+        n = len(self._catalog.get(eq_type, ()))
+        tail = range(n, n + len(removed))
+        nodes = self._tree_ref_nodes
+        if set(tail) != removed or (eq_type, tail.stop) in nodes or any((eq_type, i) not in nodes for i in tail):
+            return False
+        mids = [nodes.pop((eq_type, i)) for i in tail]
+        for mid in mids:
+            del self._tree_node_refs[mid]
+        self.tree.delete(*mids)
+        if not n:
+            type_id = self._tree_type_nodes.pop(eq_type, None)
+            if type_id is not None:
+                self.tree.delete(type_id)
+        return True
+
+    def _rebuild_tree_type(self, eq_type: str) -> None:
+        type_id = self._tree_type_nodes.get(eq_type)
+        if type_id is not None:
+            children = self.tree.get_children(type_id)
+            for mid in children:
+                self._tree_ref_nodes.pop(self._tree_node_refs.pop(mid, None), None)
+            if children:
+                self.tree.delete(*children)
+        models = self._catalog.get(eq_type)
+        if not models:
+            if type_id is not None:
+                self.tree.delete(type_id)
+                del self._tree_type_nodes[eq_type]
+            return
+        type_id = self._tree_type_node(eq_type)
+        for idx, m in enumerate(models):
+            self._insert_tree_model(type_id, (eq_type, idx), m)
 
     def _rebuild_tree(self) -> None:
+        if self.tree is None:
+            return
         for item in self.tree.get_children():
             self.tree.delete(item)
 
         self._tree_type_nodes.clear()
-        self._tree_model_nodes.clear()
+        self._tree_ref_nodes.clear()
+        self._tree_node_refs.clear()
+
+        # строка поиска: в дереве только найденные модели (в порядке каталога)
+        query = self.var_search.get().strip()
+        matches: dict[str, list[int]] | None = None
+        if query:
+            matches = {}
+            refs = self._search_refs(query)
+            for eq_type, idx in refs:
+                matches.setdefault(eq_type, []).append(idx)
+            more = "+" if len(refs) >= self._search_limit else ""
+            self.lbl_search.configure(text=f"найдено: {len(refs)}{more}")
+        else:
+            self.lbl_search.configure(text="")
 
-        for eq_type in sorted(self._catalog.keys()):
+        for eq_type in sorted(self._catalog.keys() if matches is None else matches.keys()):
             type_id = self.tree.insert("", "end", text=eq_type, values=("TYPE",), tags=("TYPE",))
             self._tree_type_nodes[eq_type] = type_id
 
-            for m in self._catalog[eq_type]:
-                label = f"{getattr(m, 'name', 'Model')}  (software: {m.software.name()})"
-                tag = "CLONE" if "(Копия" in getattr(m, "name", "") or "(Copy" in getattr(m, "name", "") else "MODEL"
-                mid = self.tree.insert(type_id, "end", text=label, values=("MODEL",), tags=(tag,))
-                self._tree_model_nodes[id(m)] = mid
+            models = self._catalog[eq_type]
+            indices = range(len(models)) if matches is None else matches[eq_type]
+            for idx in indices:
+                self._insert_tree_model(type_id, (eq_type, idx), models[idx])
 
         for t in self._tree_type_nodes.values():
             self.tree.item(t, open=True)
 
+    def _search_refs(self, query: str) -> list[tuple[str, int]]:
+        """Текст — через инвертированный индекс, фильтры вида max_speed_kmh>=16 — через SpecRangeIndex."""
+        from patterns.composite import parse_spec_ranges
+
+        text, ranges = parse_spec_ranges(query)
+        if not ranges:
+            return self._sync.search(text, limit=self._search_limit)
+        found: set[tuple[str, int]] | None = None
+        for key, lo, hi in ranges:
+            refs = set(self._sync.spec_range(key, lo, hi))
+            found = refs if found is None else found & refs
+        if text:
+            found &= set(self._sync.search(text))
+        return sorted(found)[: self._search_limit]
+
+    def _on_search_changed(self) -> None:
+        # search-as-you-type: дерево перестраиваем после паузы в наборе
+        if self._search_after is not None:
+            self.after_cancel(self._search_after)
+        self._search_after = self.after(150, self._apply_search)
+
+    def _apply_search(self) -> None:
+        self._search_after = None
+        self._rebuild_tree()
+
     def _on_tree_double_click(self, _event) -> None:
         item_id = self.tree.focus()
         if not item_id:
             return
         values = self.tree.item(item_id, "values")
+        if values and values[0] == "TYPE":
+            self._show_type_report(self.tree.item(item_id, "text"))
+            return
         if not values or values[0] != "MODEL":
             return
 
-        for eq_type, models in self._catalog.items():
-            for m in models:
-                if self._tree_model_nodes.get(id(m)) == item_id:
-                    self.current_equipment = m
-
-                    self.var_online.set(bool(getattr(m, "use_online", False)))
-                    self.var_analytics.set(bool(getattr(m, "use_analytics", False)))
-                    self.var_use_proxy.set(bool(getattr(m, "use_proxy", False)))
-                    self.license_entry.delete(0, "end")
-                    self.license_entry.insert(0, getattr(m, "license_key", "") or "VALID-KEY")
+        ref = self._tree_node_refs.get(item_id)
+        if ref is None:
+            return
+        eq_type, idx = ref
+        m = self._sync.materialize(eq_type, idx)
+        self._set_current(m, ref)
+        self._journal("select", ref=list(ref))
+
+        self.var_online.set(bool(getattr(m, "use_online", False)))
+        self.var_analytics.set(bool(getattr(m, "use_analytics", False)))
+        self.var_use_proxy.set(bool(getattr(m, "use_proxy", False)))
+        self.license_entry.delete(0, "end")
+        self.license_entry.insert(0, getattr(m, "license_key", "") or "VALID-KEY")
 
-                    self.log(f"[COMPOSITE] selected model: {eq_type} / {m.name}", "FACTORY")
-                    self.refresh_all()
-                    return
+        self.log(f"[COMPOSITE] selected model: {eq_type} / {m.name}", "FACTORY")
 
     # -----------------------------
     # Prototype (clone)
@@ -567,8 +1018,7 @@ class App(tk.Tk):
         # если используешь factory_key для memento restore — сохраняем
         setattr(cloned, "factory_key", getattr(self.current_equipment, "factory_key", self.selected_key.get()))
 
-        self._add_to_catalog(cloned)
-        self.current_equipment = cloned
+        self._set_current(cloned, self._add_to_catalog(cloned))
 
         self.var_online.set(bool(getattr(cloned, "use_online", False)))
         self.var_analytics.set(bool(getattr(cloned, "use_analytics", False)))
@@ -577,59 +1027,41 @@ class App(tk.Tk):
         self.license_entry.insert(0, getattr(cloned, "license_key", "") or "VALID-KEY")
 
         self.log(f"[PROTOTYPE] cloned: {cloned.equipment_type} / {cloned.name}", "PROTOTYPE")
-        self.refresh_all()
 
     # -----------------------------
     # Memento plumbing (your caretaker helpers)
     # -----------------------------
-    def _caretaker_history(self) -> list[EquipmentMemento]:
-        for name in ("_history", "history", "snapshots", "_snapshots"):
-            if hasattr(self.caretaker, name):
-                val = getattr(self.caretaker, name)
-                if isinstance(val, list):
-                    return val
-        for m in ("get_history", "history_list", "all"):
-            if hasattr(self.caretaker, m) and callable(getattr(self.caretaker, m)):
-                try:
-                    val = getattr(self.caretaker, m)()
-                    if isinstance(val, list):
-                        return val
-                except Exception:
-                    pass
-        return []
-
-    def _caretaker_index(self) -> int:
-        for name in ("_index", "index", "pos", "_pos"):
-            if hasattr(self.caretaker, name):
-                try:
-                    return int(getattr(self.caretaker, name))
-                except Exception:
-                    pass
-        if hasattr(self.caretaker, "current_index") and callable(getattr(self.caretaker, "current_index")):
-            try:
-                return int(self.caretaker.current_index())
-            except Exception:
-                pass
-        return -1
-
     def _sync_snapshot_list_from_caretaker(self) -> None:
-        history = list(self._caretaker_history())
-        idx = self._caretaker_index()
-
-        self._snapshot_list = history
+        idx = self.caretaker.current_index()
 
+        # сводка берётся из Caretaker.describe(): сжатые snapshot'ы не распаковываются;
+        # в дереве ветка сдвигается вправо на дорожку, ⑂b/n — номер ветки среди соседних
+        rows = self.caretaker.tree_rows()
+        self._snapshot_rows = [node for node, _ in rows]
+        lines = []
+        current_row = -1
+        for row, (node, lane) in enumerate(rows):
+            d = self.caretaker.describe(node)
+            cur = f"{d.current_ref[0]}[{d.current_ref[1]}]" if d.current_ref else "—"
+            packed = " | zip" if d.compressed else ""
+            fork = f" ⑂{d.branch + 1}/{d.branches}" if d.branches > 1 else ""
+            mark = "▶" if node == idx else " "
+            if node == idx:
+                current_row = row
+            lines.append(
+                f"{mark}{'  ' * lane}{node:02d}{fork} | types={d.types_count} models={d.models_count} "
+                f"| current={cur}{packed}"
+            )
+        # одним вызовом: на длинной истории построчный insert заметно медленнее
         self.lst_snapshots.delete(0, "end")
-        for i, m in enumerate(history):
-            types_count = len(m.catalog)
-            models_count = sum(len(v) for v in m.catalog.values())
-            cur = f"{m.current_ref[0]}[{m.current_ref[1]}]" if m.current_ref else "—"
-            self.lst_snapshots.insert("end", f"{i:02d} | types={types_count} models={models_count} | current={cur}")
+        if lines:
+            self.lst_snapshots.insert("end", *lines)
 
-        if 0 <= idx < len(history):
+        if current_row >= 0:
             self.lst_snapshots.selection_clear(0, "end")
-            self.lst_snapshots.selection_set(idx)
-            self.lst_snapshots.see(idx)
-            self._show_snapshot_details(history[idx])
+            self.lst_snapshots.selection_set(current_row)
+            self.lst_snapshots.see(current_row)
+            self._show_snapshot_details(self.caretaker.get(idx))
         else:
             self.txt_memento.delete("1.0", "end")
             self.txt_memento.insert("1.0", "Нет активного snapshot.")
@@ -637,15 +1069,22 @@ class App(tk.Tk):
         info = self.caretaker.info() if hasattr(self.caretaker, "info") else ""
         self.lbl_memento_info.config(text=info)
 
-    def _on_snapshot_select(self, _event) -> None:
+    def _selected_snapshot(self) -> int | None:
+        """Номер snapshot'а в Caretaker для выбранной строки списка."""
         sel = self.lst_snapshots.curselection()
         if not sel:
-            return
-        i = int(sel[0])
-        if 0 <= i < len(self._snapshot_list):
-            self._show_snapshot_details(self._snapshot_list[i])
+            return None
+        row = int(sel[0])
+        if not (0 <= row < len(self._snapshot_rows)):
+            return None
+        return self._snapshot_rows[row]
 
-    def _show_snapshot_details(self, m: EquipmentMemento) -> None:
+    def _on_snapshot_select(self, _event) -> None:
+        i = self._selected_snapshot()
+        if i is not None:
+            self._show_snapshot_details(self.caretaker.get(i))
+
+    def _show_snapshot_details(self, m: EquipmentMemento, per_type: int = 50) -> None:
         self.txt_memento.delete("1.0", "end")
         lines = []
         lines.append(f"types: {len(m.catalog)}")
@@ -653,29 +1092,196 @@ class App(tk.Tk):
         lines.append(f"current_ref: {m.current_ref}")
         lines.append("")
         for t in sorted(m.catalog.keys()):
-            lines.append(f"[{t}] ({len(m.catalog[t])})")
-            for i, s in enumerate(m.catalog[t]):
+            snaps = m.catalog[t]
+            lines.append(f"[{t}] ({len(snaps)})")
+            # на больших каталогах панель показывает начало типа, а не сотни тысяч строк
+            for i, s in enumerate(snaps[:per_type]):
                 lines.append(
                     f"  - {i}: {s.name} | online={s.use_online} analytics={s.use_analytics} proxy={s.use_proxy} "
                     f"| state={s.software_state_name}"
                 )
+            if len(snaps) > per_type:
+                lines.append(f"  … ещё {len(snaps) - per_type}")
         self.txt_memento.insert("1.0", "\n".join(lines))
 
+    def compare_selected_snapshot(self) -> None:
+        """Разница между выбранным snapshot'ом и текущим состоянием каталога (в VIEW — зафиксированным)."""
+        from patterns.memento import diff_snapshots
+
+        i = self._selected_snapshot()
+        if i is None:
+            messagebox.showinfo("Memento", "Выбери snapshot в списке.")
+            return
+        # версия каталога делит неизменённые кортежи типов с snapshot'ами — они пропускаются без обхода
+        diff = diff_snapshots(self.caretaker.get(i), self.read_view().to_memento())
+        self.txt_memento.delete("1.0", "end")
+        self.txt_memento.insert("1.0", f"snapshot {i:02d} → current\n" + diff.to_text())
+        self.log(f"[MEMENTO] diff {i:02d} -> current: {diff.summary()}", "MEMENTO")
+
     def restore_selected_snapshot(self) -> None:
         if not self._editing_enabled:
             messagebox.showinfo("VIEW режим", "В режиме VIEW изменения запрещены.")
             return
-        sel = self.lst_snapshots.curselection()
-        if not sel:
+        i = self._selected_snapshot()
+        if i is None:
             messagebox.showinfo("Memento", "Выбери snapshot в списке.")
             return
-        i = int(sel[0])
-        if not (0 <= i < len(self._snapshot_list)):
-            return
 
-        self.restore_snapshot(self._snapshot_list[i])
+        self.restore_snapshot(self.caretaker.get(i), node=i)
         self.log(f"[MEMENTO] restored selected snapshot index={i}", "MEMENTO")
-        self._sync_snapshot_list_from_caretaker()
+
+    def jump_to_selected_snapshot(self) -> None:
+        """Курсор истории на выбранный snapshot (в т.ч. на другой ветке) и восстановление."""
+        if not self._editing_enabled:
+            messagebox.showinfo("VIEW режим", "В режиме VIEW изменения запрещены.")
+            return
+        i = self._selected_snapshot()
+        if i is None:
+            messagebox.showinfo("Memento", "Выбери snapshot в списке.")
+            return
+        self.invoker.submit(JumpToSnapshotCommand(self, i))
+
+    def save_catalog_to_file(self) -> None:
+        from tkinter import filedialog
+        from patterns.memento import save_catalog
+
+        path = filedialog.asksaveasfilename(
+            title="Save catalog",
+            defaultextension=".mpcat",
+            filetypes=[("Mega-Patterns catalog", "*.mpcat"), ("All files", "*.*")],
+        )
+        if not path:
+            return
+        try:
+            # .mpcat хранит историю списком: из дерева сохраняется текущая ветка
+            history, index = self.caretaker.linear_history()
+            save_catalog(path, self.read_view().to_memento(), history, index)
+        except OSError as e:
+            messagebox.showerror("Save catalog", str(e))
+            self.log(f"[ERROR] catalog save failed: {e}", "ERROR")
+            return
+        self.log(f"[MEMENTO] catalog saved to {path}", "MEMENTO")
+
+    def export_catalog_report(self) -> None:
+        from patterns.composite import write_catalog_report
+        from tkinter import filedialog
+
+        path = filedialog.asksaveasfilename(
+            title="Export report",
+            defaultextension=".txt",
+            filetypes=[("Text report", "*.txt"), ("All files", "*.*")],
+        )
+        if not path:
+            return
+
+        # экспорт идёт в фоне по неизменяемой версии: правки в EDIT его не задевают
+        import queue
+        import threading
+
+        view = self.read_view()
+        catalog = view.lazy_catalog(self._materialize_model)
+        result: queue.SimpleQueue = queue.SimpleQueue()
+
+        def work() -> None:
+            try:
+                # отчёт пишется по моделям, целиком в памяти не собирается
+                with open(path, "w", encoding="utf-8") as fp:
+                    result.put((write_catalog_report(catalog, fp), None))
+            except Exception as e:
+                # любая ошибка (файл, фабрика, загрузка ПО) — в очередь, иначе poll() ждал бы вечно
+                result.put((0, e))
+
+        def poll() -> None:
+            try:
+                written, error = result.get_nowait()
+            except queue.Empty:
+                self.after(50, poll)
+                return
+            if error is not None:
+                messagebox.showerror("Export report", str(error))
+                self.log(f"[ERROR] report export failed: {error}", "ERROR")
+                return
+            self.log(
+                f"[COMPOSITE] report exported to {path} ({written} chars, catalog version {view.version})",
+                "COMPOSITE",
+            )
+
+        self.log(f"[COMPOSITE] exporting report of catalog version {view.version}…", "COMPOSITE")
+        threading.Thread(target=work, name="report-export", daemon=True).start()
+        self.after(50, poll)
+
+    def _show_type_report(self, eq_type: str, offset: int = 0) -> None:
+        """Постраничный отчёт по типу (EquipmentType.iter_summary с offset/limit)."""
+        models = self._catalog.get(eq_type, [])
+        total = len(models)
+        offset = max(0, min(offset, max(total - 1, 0)))
+        page = self._report_page
+
+        win = self._report_window
+        if win is None or not win.winfo_exists():
+            win = self._report_window = tk.Toplevel(self)
+            win.geometry("640x520")
+            win.rowconfigure(1, weight=1)
+            win.columnconfigure(0, weight=1)
+            nav = ttk.Frame(win, padding=6)
+            nav.grid(row=0, column=0, sticky="ew")
+            win.btn_prev = ttk.Button(nav, text="◀ Prev")
+            win.btn_prev.pack(side="left")
+            win.btn_next = ttk.Button(nav, text="Next ▶")
+            win.btn_next.pack(side="left", padx=(6, 0))
+            win.lbl_page = ttk.Label(nav, text="")
+            win.lbl_page.pack(side="left", padx=(10, 0))
+            win.txt = tk.Text(win, wrap="word", bg=self.COL["panel"], fg=self.COL["text"], relief="flat")
+            win.txt.grid(row=1, column=0, sticky="nsew")
+
+        win.title(f"Report: {eq_type}")
+        win.btn_prev.configure(command=lambda: self._show_type_report(eq_type, offset - page))
+        win.btn_next.configure(command=lambda: self._show_type_report(eq_type, offset + page))
+        win.btn_prev.state(["!disabled"] if offset > 0 else ["disabled"])
+        win.btn_next.state(["!disabled"] if offset + page < total else ["disabled"])
+        shown = min(offset + page, total)
+        win.lbl_page.configure(text=f"models {offset + 1 if total else 0}–{shown} of {total}")
+
+        win.txt.configure(state="normal")
+        win.txt.delete("1.0", "end")
+        for chunk in EquipmentType(name=eq_type, models=models).iter_summary(offset, page):
+            win.txt.insert("end", chunk)
+        win.txt.configure(state="disabled")
+        win.lift()
+
+    def load_catalog_from_file(self) -> None:
+        from patterns.observer import HistoryChanged
+
+        if not self._editing_enabled:
+            messagebox.showinfo("VIEW режим", "В режиме VIEW изменения запрещены.")
+            return
+        from tkinter import filedialog
+        from patterns.memento import load_catalog
+
+        path = filedialog.askopenfilename(
+            title="Load catalog",
+            filetypes=[("Mega-Patterns catalog", "*.mpcat"), ("All files", "*.*")],
+        )
+        if not path:
+            return
+        try:
+            stored = load_catalog(path)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Load catalog", str(e))
+            self.log(f"[ERROR] catalog load failed: {e}", "ERROR")
+            return
+
+        with self.events.transaction():
+            self.caretaker.replace_history(stored.history, stored.index)
+            self.events.emit(HistoryChanged())
+            self.restore_from_memento(stored.current)
+        # загруженный каталог не выводится из журнала — новая точка отсчёта
+        self._checkpoint()
+        models_count = sum(len(v) for v in stored.current.catalog.values())
+        self.log(
+            f"[MEMENTO] catalog loaded from {path}: models={models_count} snapshots={len(stored.history)}",
+            "MEMENTO",
+        )
 
     # -----------------------------
     # Actions
@@ -693,8 +1299,7 @@ class App(tk.Tk):
             self.log(f"[ERROR] unknown factory key: {key}", "ERROR")
             return
 
-        self.current_equipment = factory.create()
-        eq = self.current_equipment
+        eq = factory.create()
 
         # чтобы memento мог пересоздавать объект фабрикой
         setattr(eq, "factory_key", key)
@@ -711,23 +1316,20 @@ class App(tk.Tk):
         eq.license_key = ""
 
         eq.base_software_title = eq.software.name()
-        self.rebuild_software_from_flags()
+        eq.software = build_software(eq)
 
-        self._add_to_catalog(eq)
+        self._set_current(eq, self._add_to_catalog(eq))
 
         # ✅ ВАЖНО: не пересоздаём caretaker, иначе теряешь историю снимков
         # self.caretaker.backup(self.create_memento_from_current())  # если хочешь автоснапшот при create — раскомментируй
 
         self.log(f"[FACTORY] created: {eq.equipment_type} / {eq.name}", "FACTORY")
-        self.refresh_all()
 
     def on_clear(self) -> None:
-        self.current_equipment = None
-        self.txt_equipment.delete("1.0", "end")
-        self.txt_software.delete("1.0", "end")
+        self._set_current(None, None)
+        self._journal("select", ref=None)
         self.txt_memento.delete("1.0", "end")
         self.log("[SYSTEM] cleared current equipment", "STATE")
-        self.refresh_bottom_bar()
 
     def show_builder_log(self) -> None:
         if not self.current_equipment:
@@ -747,13 +1349,18 @@ class App(tk.Tk):
             self.log("[DECORATOR] apply failed (no equipment)", "WARN")
             return
 
-        cmd = ApplyDecoratorsCommand(self, online=bool(self.var_online.get()), analytics=bool(self.var_analytics.get()))
-        cmd.execute()
-        self.log(
-            f"[DECORATOR] applied: online={self.var_online.get()} analytics={self.var_analytics.get()}",
-            "DECORATOR",
-        )
-        self.refresh_all()
+        online = bool(self.var_online.get())
+        analytics = bool(self.var_analytics.get())
+        cmd = ApplyDecoratorsCommand(self, online=online, analytics=analytics)
+
+        def done(error) -> None:
+            if error is not None:
+                self.log(f"[ERROR] apply decorators failed: {error}", "ERROR")
+                return
+            self.log(f"[DECORATOR] applied: online={online} analytics={analytics}", "DECORATOR")
+
+        # повторные клики по той же модели отменяют ещё не выполненные
+        self.invoker.submit(cmd, key=("decorators", id(self.current_equipment)), on_done=done)
 
     def on_apply_proxy_click(self) -> None:
         if not self._editing_enabled:
@@ -768,9 +1375,41 @@ class App(tk.Tk):
         key = self.license_entry.get().strip()
 
         cmd = ApplyProxyCommand(self, enabled=enabled, license_key=key)
-        cmd.execute()
-        self.log(f"[PROXY] applied: enabled={enabled}, key='{key}'", "PROXY")
-        self.refresh_all()
+
+        def done(error) -> None:
+            if error is not None:
+                self.log(f"[ERROR] apply proxy failed: {error}", "ERROR")
+                return
+            self.log(f"[PROXY] applied: enabled={enabled}, key='{key}'", "PROXY")
+
+        self.invoker.submit(cmd, key=("proxy", id(self.current_equipment)), on_done=done)
+
+    def on_bulk_apply_click(self) -> None:
+        if not self._editing_enabled:
+            messagebox.showinfo("VIEW режим", "В режиме VIEW изменения запрещены.")
+            return
+        scope = self.bulk_scope.get()
+        predicate = self._bulk_scopes[scope]
+        online = bool(self.var_online.get())
+        analytics = bool(self.var_analytics.get())
+        use_proxy = bool(self.var_use_proxy.get())
+        key = self.license_entry.get().strip()
+
+        cmd = BulkApplyConfigCommand(
+            self, predicate, online=online, analytics=analytics, use_proxy=use_proxy, license_key=key
+        )
+
+        def done(error) -> None:
+            if error is not None:
+                self.log(f"[ERROR] bulk apply failed: {error}", "ERROR")
+                return
+            self.log(
+                f"[BULK] scope='{scope}': online={online} analytics={analytics} proxy={use_proxy} "
+                f"-> changed {cmd.changed} model(s)",
+                "DECORATOR",
+            )
+
+        self.invoker.submit(cmd, key=("bulk", scope), on_done=done)
 
     def reset_software(self) -> None:
         if not self._editing_enabled:
@@ -781,8 +1420,7 @@ class App(tk.Tk):
 
         key = self.selected_key.get()
         factory = self.registry.get(key)
-        self.current_equipment = factory.create()
-        eq = self.current_equipment
+        eq = factory.create()
 
         setattr(eq, "factory_key", key)
 
@@ -798,11 +1436,10 @@ class App(tk.Tk):
         self.license_entry.delete(0, "end")
         self.license_entry.insert(0, "VALID-KEY")
 
-        self.rebuild_software_from_flags()
-        self._add_to_catalog(eq)
+        eq.software = build_software(eq)
+        self._set_current(eq, self._add_to_catalog(eq))
 
         self.log("[SYSTEM] reset to base (Factory+Builder)", "FACTORY")
-        self.refresh_all()
 
     def run_software_operation(self) -> None:
         if not self.current_equipment:
@@ -811,13 +1448,112 @@ class App(tk.Tk):
             return
 
         software = self.current_equipment.software
-        try:
-            result = software.operation()
-        except Exception as e:
-            self.log(f"[ERROR] operation failed: {e}", "ERROR")
-            messagebox.showerror("operation()", str(e))
+        self.log(f"[OPERATION] queued, name={software.name()} (queue depth={self.invoker.queue_depth() + 1})", "STATE")
+        self.invoker.submit(RunOperationCommand(self, software), key=("operation", id(software)))
+
+    def on_batch_operation_click(self) -> None:
+        from patterns.command import BatchOperationRunner
+
+        if self._batch_runner is None:
+            self._batch_runner = BatchOperationRunner(self.after)
+        runner = self._batch_runner
+        if runner.running:
+            runner.cancel()
+            self.lbl_batch.configure(text="cancelling… (started calls finish)")
+            self.log("[BATCH] cancel requested", "WARN")
+            return
+
+        scope = self.bulk_scope.get()
+        refs = self._catalog.select_refs(self._bulk_scopes[scope])
+        if not refs:
+            messagebox.showinfo("operation()", f"В области '{scope}' нет моделей.")
+            return
+
+        # цепочка ПО есть только у собранных моделей: ленивые записи собираются в фоновом
+        # потоке пакета (mainloop не ждёт), а в каталог встают по его окончании
+        entries = [(eq_type, idx, self._catalog[eq_type][idx]) for eq_type, idx in refs]
+        built: list = []
+
+        concurrency = self._batch_concurrency
+        self.log(f"[BATCH] scope='{scope}': {len(entries)} model(s), concurrency={concurrency}", "STATE")
+        self.btn_batch.configure(text="Cancel batch")
+        self.lbl_batch.configure(text=f"0/{len(entries)}")
+
+        def progress(done: int, total: int, r) -> None:
+            self.lbl_batch.configure(text=f"{done}/{total} · last {r.label}: {r.seconds * 1000:.0f} ms")
+            if not r.ok:
+                self.log(f"[BATCH] {r.label}: {r.error}", "ERROR")
+
+        def finished(report) -> None:
+            self._install_built(built)
+            self.btn_batch.configure(text="Run operation() for scope")
+            self.lbl_batch.configure(
+                text=f"{len(report.results)}/{report.total} in {report.wall_seconds:.2f} s, failed {report.failed}"
+            )
+            self.log(
+                f"[BATCH] done {len(report.results)}/{report.total} in {report.wall_seconds:.2f} s "
+                f"(p95={report.latency_ms(0.95):.0f} ms, failed={report.failed}"
+                f"{', cancelled' if report.cancelled else ''})",
+                "STATE",
+            )
+            self._show_batch_report(report)
+
+        from patterns.proxy import SoftwareProxy, preload
+
+        def load() -> list:
+            # фоновый поток: LazyModel.materialize() только строит модель, каталог не трогает
+            items = []
+            for eq_type, idx, entry in entries:
+                m = entry
+                if not isinstance(entry, EquipmentModel):
+                    m = entry.materialize()
+                    built.append((eq_type, idx, entry, m))
+                items.append((f"{eq_type} #{idx + 1} {m.name}", m.software))
+            # при настроенном сервере модулей proxy грузятся пакетными запросами, а не по одному
+            proxies = [sw for _, sw in items if isinstance(sw, SoftwareProxy)]
+            if proxies:
+                try:
+                    preload(proxies)
+                except Exception:
+                    # не вышло пакетом — каждый proxy загрузится сам в operation()
+                    pass
+            return items
+
+        runner.start(load, concurrency, on_progress=progress, on_done=finished)
+
+    def _install_built(self, built: list) -> None:
+        """Собранные пакетом модели — на место своих LazyModel, если каталог их ещё держит."""
+        for eq_type, idx, entry, model in built:
+            models = self._catalog.get(eq_type)
+            if models is None or idx >= len(models) or models[idx] is not entry:
+                continue  # каталог с тех пор заменён или сдвинут
+            with self._sync.writing(eq_type) as models:
+                models[idx] = model
+
+    def _show_batch_report(self, report) -> None:
+        win = self._batch_window
+        if win is None or not win.winfo_exists():
+            win = self._batch_window = tk.Toplevel(self)
+            win.title("Batch operation() report")
+            win.geometry("720x520")
+            win.rowconfigure(0, weight=1)
+            win.columnconfigure(0, weight=1)
+            win.txt = tk.Text(win, wrap="none", bg=self.COL["panel"], fg=self.COL["text"], relief="flat")
+            win.txt.grid(row=0, column=0, sticky="nsew")
+        win.txt.configure(state="normal")
+        win.txt.delete("1.0", "end")
+        win.txt.insert("end", report.to_text())
+        win.txt.configure(state="disabled")
+        win.lift()
+
+    def show_operation_result(self, software: ISoftware, result: str, error) -> None:
+        if error is not None:
+            self.log(f"[ERROR] operation failed: {error}", "ERROR")
+            messagebox.showerror("operation()", str(error))
             return
 
+        from patterns.proxy import SoftwareProxy
+
         proxy_log = ""
         if isinstance(software, SoftwareProxy):
             log_text = "\n".join(f"- {x}" for x in getattr(software, "log", [])) or "(лог пуст)"
@@ -827,39 +1563,110 @@ class App(tk.Tk):
             self.log(f"[STATE] operation direct, name={software.name()}", "STATE")
 
         messagebox.showinfo("operation()", f"{result}{proxy_log}")
-        self.refresh_all()
 
     # -----------------------------
     # Command API expected by patterns.command
     # -----------------------------
-    def set_decorators_state(self, online: bool, analytics: bool) -> None:
-        if not self.current_equipment:
-            return
-        eq = self.current_equipment
+    def set_decorators_state(self, online: bool, analytics: bool, target=None) -> bool:
+        ref, eq = self._resolve_target(target)
+        if eq is None:
+            return False
         eq.use_online = bool(online)
         eq.use_analytics = bool(analytics)
 
-        self.var_online.set(eq.use_online)
-        self.var_analytics.set(eq.use_analytics)
+        if eq is self.current_equipment:
+            self.var_online.set(eq.use_online)
+            self.var_analytics.set(eq.use_analytics)
 
-        self.rebuild_software_from_flags()
-        self._rebuild_tree()
-        self.refresh_all()
+        eq.software = build_software(eq)
+        self._model_edited(ref, eq)
+        return True
 
-    def set_proxy_state(self, enabled: bool, license_key: str) -> None:
-        if not self.current_equipment:
-            return
-        eq = self.current_equipment
+    def set_proxy_state(self, enabled: bool, license_key: str, target=None) -> bool:
+        ref, eq = self._resolve_target(target)
+        if eq is None:
+            return False
         eq.use_proxy = bool(enabled)
         eq.license_key = (license_key or "").strip()
 
-        self.var_use_proxy.set(eq.use_proxy)
-        self.license_entry.delete(0, "end")
-        self.license_entry.insert(0, eq.license_key or "VALID-KEY")
+        if eq is self.current_equipment:
+            self.var_use_proxy.set(eq.use_proxy)
+            self.license_entry.delete(0, "end")
+            self.license_entry.insert(0, eq.license_key or "VALID-KEY")
 
-        self.rebuild_software_from_flags()
-        self._rebuild_tree()
-        self.refresh_all()
+        eq.software = build_software(eq)
+        self._model_edited(ref, eq)
+        return True
+
+    def current_target(self):
+        if self.current_equipment is None:
+            return None
+        return self._current_ref, self.current_equipment
+
+    def _resolve_target(self, target) -> tuple[tuple[str, int] | None, EquipmentModel | None]:
+        # команда из очереди правит ту модель, что была текущей при её создании;
+        # если каталог с тех пор заменён (undo/restore/load), модели на месте уже нет;
+        # VIEW-режим мог включиться, пока команда ждала в очереди
+        if not self._editing_enabled:
+            self.log("[COMMAND] VIEW mode, queued edit skipped", "WARN")
+            return None, None
+        if target is None:
+            return self._current_ref, self.current_equipment
+        ref, eq = target
+        if ref is not None:
+            t, idx = ref
+            models = self._catalog.get(t)
+            if models is None or idx >= len(models) or models[idx] is not eq:
+                self.log(f"[COMMAND] target model {ref} is gone, edit skipped", "WARN")
+                return None, None
+        return ref, eq
+
+    def _model_edited(self, ref: tuple[str, int] | None, eq: EquipmentModel) -> None:
+        # флаги/ПО модели: узел дерева и панели обновят подписчики
+        from patterns.observer import ModelChanged
+
+        if ref is None:
+            return
+        self.events.emit(ModelChanged(ref))
+        # Decorator/Proxy правят модель на месте — в журнал уходит её итоговое memento
+        if self.journal is not None:
+            from patterns.command import model_fields
+
+            m = model_to_memento(eq, self.selected_key.get())
+            self._journal("put", ref=list(ref), m=model_fields(m))
+
+    def apply_bulk_config(self, predicate, online, analytics, use_proxy, license_key) -> int:
+        from patterns.observer import ModelChanged
+
+        with self._sync.exclusive() as catalog:
+            changed = apply_config_refs(
+                catalog,
+                catalog.select_refs(predicate),
+                online=online,
+                analytics=analytics,
+                use_proxy=use_proxy,
+                license_key=license_key,
+            )
+        if not changed:
+            return 0
+        refs: dict[str, list[int]] = {}
+        for eq_type, idx in changed:
+            refs.setdefault(eq_type, []).append(idx)
+        self._journal(
+            "bulk", refs=refs, online=online, analytics=analytics, use_proxy=use_proxy, license_key=license_key
+        )
+
+        eq = self.current_equipment
+        if eq is not None:
+            self.var_online.set(eq.use_online)
+            self.var_analytics.set(eq.use_analytics)
+            self.var_use_proxy.set(eq.use_proxy)
+
+        # одна пачка событий: дерево обновит только изменённые узлы
+        with self.events.transaction():
+            for ref in changed:
+                self.events.emit(ModelChanged(ref))
+        return len(changed)
 
     def has_equipment(self) -> bool:
         return self.current_equipment is not None
@@ -868,14 +1675,23 @@ class App(tk.Tk):
         return self.create_memento_from_current()
 
     def push_snapshot(self, snapshot):
+        from patterns.observer import HistoryChanged
+
         if not self._editing_enabled:
             messagebox.showinfo("VIEW режим", "В режиме VIEW изменения запрещены.")
             return
-        self.caretaker.backup(snapshot)
+        if not self.caretaker.backup(snapshot):
+            self.log("[MEMENTO] snapshot skipped: identical to current head", "MEMENTO")
+            return
+        if self.store is not None:
+            self.store.sync(snapshot)
+        self._journal("snapshot")
+        self.events.emit(HistoryChanged())
         self.log("[MEMENTO] snapshot saved (tree)", "MEMENTO")
-        self.refresh_all()
 
     def undo_snapshot(self):
+        from patterns.observer import HistoryChanged
+
         if not self._editing_enabled:
             messagebox.showinfo("VIEW режим", "В режиме VIEW изменения запрещены.")
             return None
@@ -884,10 +1700,14 @@ class App(tk.Tk):
             messagebox.showinfo("Undo", "Больше некуда откатываться.")
             self.log("[MEMENTO] undo failed (no history)", "WARN")
         else:
+            self._journal_move("undo", m)
+            self.events.emit(HistoryChanged())
             self.log("[MEMENTO] undo (tree)", "MEMENTO")
         return m
 
     def redo_snapshot(self):
+        from patterns.observer import HistoryChanged
+
         if not self._editing_enabled:
             messagebox.showinfo("VIEW режим", "В режиме VIEW изменения запрещены.")
             return None
@@ -896,81 +1716,119 @@ class App(tk.Tk):
             messagebox.showinfo("Redo", "Больше некуда возвращаться.")
             self.log("[MEMENTO] redo failed (no future)", "WARN")
         else:
+            self._journal_move("redo", m)
+            self.events.emit(HistoryChanged())
             self.log("[MEMENTO] redo (tree)", "MEMENTO")
         return m
 
-    def restore_snapshot(self, snapshot):
-        self.restore_from_memento(snapshot)
-        self.log("[MEMENTO] snapshot restored (tree)", "MEMENTO")
-        self.refresh_all()
+    def switch_branch_snapshot(self, step: int):
+        from patterns.observer import HistoryChanged
+
+        if not self._editing_enabled:
+            messagebox.showinfo("VIEW режим", "В режиме VIEW изменения запрещены.")
+            return None
+        m = self.caretaker.switch_branch(step)
+        if m is None:
+            self.log("[MEMENTO] no sibling branch in that direction", "WARN")
+        else:
+            self._journal_move("branch", m, step=step)
+            self.events.emit(HistoryChanged())
+            self.log(f"[MEMENTO] switched branch -> {self.caretaker.current_index():02d}", "MEMENTO")
+        return m
+
+    def jump_snapshot(self, node: int):
+        from patterns.observer import HistoryChanged
+
+        if not self._editing_enabled:
+            messagebox.showinfo("VIEW режим", "В режиме VIEW изменения запрещены.")
+            return None
+        m = self.caretaker.jump(node)
+        self._journal_move("jump", m, node=node)
+        self.events.emit(HistoryChanged())
+        self.log(f"[MEMENTO] jump -> {node:02d}", "MEMENTO")
+        return m
+
+    def _journal_move(self, op: str, m: EquipmentMemento, **args) -> None:
+        # курсор истории сдвинут; следующий restore_snapshot(m) запишется как restore этого узла
+        self._journal(op, **args)
+        self._history_move = (self.caretaker.current_index(), m)
+
+    def restore_snapshot(self, snapshot, node: int | None = None):
+        # правка на месте: трогаются только позиции, которыми каталог отличается от snapshot'а,
+        # индексы и дерево обновляются точечно (ModelChanged/Added/Removed вместо CatalogReset)
+        if node is None and self._history_move is not None and self._history_move[1] is snapshot:
+            node = self._history_move[0]
+        self._history_move = None
+        with self.events.transaction():
+            touched = self._sync.patch(self.publish_view(), snapshot, self._materialize_model)
+            if self._eager_restore and touched:
+                with self._sync.exclusive() as catalog:
+                    catalog.materialize_all(self._materialize_many)
+            self._restore_current(snapshot.current_ref)
+        if node is not None:
+            self._journal("restore", node=node)
+        else:
+            # snapshot не из истории (undo команды Decorator/Proxy) — в журнал его не описать
+            # записью, поэтому сразу checkpoint
+            self._checkpoint()
+        self.log(f"[MEMENTO] snapshot restored (tree): {touched} model(s) patched", "MEMENTO")
 
     # -----------------------------
     # Memento (TREE) create/restore
     # -----------------------------
     def create_memento_from_current(self) -> EquipmentMemento:
-        cat: dict[str, list[ModelMemento]] = {}
-        current_ref = None
-
-        for eq_type, models in self._catalog.items():
-            cat[eq_type] = []
-            for idx, m in enumerate(models):
-                snap = ModelMemento(
-                    factory_key=getattr(m, "factory_key", self.selected_key.get()),
-                    equipment_type=m.equipment_type,
-                    name=getattr(m, "name", "Model"),
-                    specs=dict(m.specs),
-                    functions=list(m.functions),
-                    base_software_title=m.base_software_title,
-                    use_online=bool(getattr(m, "use_online", False)),
-                    use_analytics=bool(getattr(m, "use_analytics", False)),
-                    use_proxy=bool(getattr(m, "use_proxy", False)),
-                    license_key=str(getattr(m, "license_key", "")),
-                    software_state_name=str(getattr(m, "software_state_name", "IDLE")),
-                )
-                cat[eq_type].append(snap)
-
-                if self.current_equipment is m:
-                    current_ref = (eq_type, idx)
-
-        return EquipmentMemento(catalog=cat, current_ref=current_ref)
+        # memento пересобираются только для изменённых моделей, остальное — из прошлой версии
+        return self.publish_view().to_memento()
+
+    def publish_view(self) -> CatalogView:
+        """Опубликовать (или переиспользовать) неизменяемую версию живого каталога."""
+        return self._sync.publish(self._versions, self.current_equipment)
+
+    def read_view(self) -> CatalogView:
+        """Версия для читателей: в VIEW — зафиксированная при входе, в EDIT — свежая."""
+        return self._pinned_view or self.publish_view()
+
+    def _materialize_model(self, s: ModelMemento) -> EquipmentModel:
+        return model_from_memento(s, self.registry)
+
+    def _materialize_many(self, snaps: list[ModelMemento]) -> list[EquipmentModel]:
+        from functools import partial
+        from patterns.composite import materialize_many
+        from patterns.composite.parallel import default_registry
+
+        # worker-процессы собирают тем же реестром, что и self.registry: с логом сборки
+        return materialize_many(
+            snaps,
+            self.registry,
+            workers=self._parallel_workers,
+            make_registry=partial(default_registry, with_log=True),
+        )
 
     def restore_from_memento(self, mem: EquipmentMemento) -> None:
-        # 1) пересоздаём весь каталог
-        self._catalog = {}
-
+        # CatalogReset (из reindex) и CurrentChanged уходят подписчикам одной пачкой
+        with self.events.transaction():
+            self._restore_from_memento(mem)
+
+    def _restore_from_memento(self, mem: EquipmentMemento) -> None:
+        # 1) пересоздаём весь каталог: лениво, фабрика отработает только при выборе модели
+        # новый каталог собирается в стороне и подменяется одной эксклюзивной операцией
+        catalog = Catalog(indexes=self._indexes)
+        build = self._materialize_model
         for eq_type, snaps in mem.catalog.items():
-            self._catalog[eq_type] = []
-            for s in snaps:
-                factory = self.registry.get(s.factory_key)
-                eq = factory.create()
-
-                setattr(eq, "factory_key", s.factory_key)
-
-                eq.equipment_type = s.equipment_type
-                eq.name = s.name
-                eq.specs = dict(s.specs)
-                eq.functions = list(s.functions)
-
-                eq.base_software_title = s.base_software_title
-                eq.use_online = s.use_online
-                eq.use_analytics = s.use_analytics
-                eq.use_proxy = s.use_proxy
-                eq.license_key = s.license_key
-
-                setattr(eq, "software_state_name", s.software_state_name)
-
-                # собрать софт по флагам
-                self.current_equipment = eq
-                self.rebuild_software_from_flags()
-
-                self._catalog[eq_type].append(eq)
-
-        # 2) восстановить текущий выбранный объект
-        self.current_equipment = None
-        if mem.current_ref is not None:
-            t, idx = mem.current_ref
+            catalog[eq_type] = [LazyModel(s, build) for s in snaps]
+        if self._eager_restore:
+            catalog.materialize_all(self._materialize_many)
+        self._sync.replace(catalog)
+        self._restore_current(mem.current_ref)
+
+    def _restore_current(self, current_ref: tuple[str, int] | None) -> None:
+        # 2) восстановить текущий выбранный объект (его материализуем сразу)
+        current, ref = None, None
+        if current_ref is not None:
+            t, idx = current_ref
             if t in self._catalog and 0 <= idx < len(self._catalog[t]):
-                self.current_equipment = self._catalog[t][idx]
+                current, ref = self._sync.materialize(t, idx), (t, idx)
+        self._set_current(current, ref)
 
         # 3) синх UI + дерево
         if self.current_equipment:
@@ -982,42 +1840,56 @@ class App(tk.Tk):
             self.license_entry.insert(0, getattr(m, "license_key", "") or "VALID-KEY")
             self.rebuild_software_from_flags()
 
-        self._rebuild_tree()
-
     # -----------------------------
     # Refresh
     # -----------------------------
     def refresh_all(self) -> None:
-        if not self.current_equipment:
-            self.txt_equipment.delete("1.0", "end")
-            self.txt_equipment.insert("1.0", "Нет созданного тренажёра.\nСоздай его через Factory слева.")
+        """Команды зовут после своих правок: доставить накопленные события сейчас, не дожидаясь idle-тика."""
+        self.events.flush()
 
-            self.txt_software.delete("1.0", "end")
-            self.txt_software.insert("1.0", "Цепочка ПО будет показана после создания тренажёра.")
-
-            self.txt_memento.delete("1.0", "end")
-            self.txt_memento.insert("1.0", "Нет snapshot (создай тренажёр и нажми Save Snapshot).")
-
-            self._sync_snapshot_list_from_caretaker()
-            self.refresh_bottom_bar()
+    def _refresh_panels(self) -> None:
+        if not self.current_equipment:
+            self._set_text(self.txt_equipment, "Нет созданного тренажёра.\nСоздай его через Factory слева.")
+            self._set_text(self.txt_software, "Цепочка ПО будет показана после создания тренажёра.")
             return
 
         eq = self.current_equipment
 
-        self.txt_equipment.delete("1.0", "end")
-        self.txt_equipment.insert("1.0", eq.summary())
-
-        self.txt_software.delete("1.0", "end")
-        self.txt_software.insert("1.0", self.software_chain_text())
+        self._set_text(self.txt_equipment, self._summary_cache.get(eq))
+        self._set_text(self.txt_software, self.software_chain_text())
 
-        self._sync_snapshot_list_from_caretaker()
-        self.refresh_bottom_bar()
+    def _set_text(self, widget: tk.Text, text: str) -> None:
+        """delete+insert только если текст действительно изменился."""
+        key = str(widget)
+        if self._shown_texts.get(key) == text:
+            return
+        widget.delete("1.0", "end")
+        widget.insert("1.0", text)
+        self._shown_texts[key] = text
 
     def refresh_bottom_bar(self) -> None:
         state_name = self.system_state.name() if self.system_state else "?"
         eq_name = f"{self.current_equipment.equipment_type}/{self.current_equipment.name}" if self.current_equipment else "—"
         hist = self.caretaker.info() if hasattr(self.caretaker, "info") else ""
-        self.bottom_bar.configure(text=f"Mode: {state_name} | Current: {eq_name} | {hist}")
+        qm = self.invoker.queue_metrics()
+        queue_info = (
+            f" | Queue: depth={qm.depth} done={qm.completed} cancelled={qm.cancelled} "
+            f"avg={qm.avg_latency_ms:.0f}ms max={qm.max_latency_ms:.0f}ms"
+            if qm else ""
+        )
+        head = self._pinned_view or self._versions.current()
+        view_info = f" | View: v{head.version} live={len(self._versions.live_versions())}" if head else ""
+        em = self.events.metrics()
+        events_info = f" | Events: batches={em.batches} coalesced={em.coalesced}/{em.emitted} last={em.last_flush_ms:.0f}ms"
+        jm = self.journal.metrics() if self.journal is not None else None
+        journal_info = (
+            f" | WAL: lsn={jm.last_lsn} durable={jm.durable_lsn} fsyncs={jm.fsyncs} "
+            f"group={jm.avg_group:.1f} checkpoint={jm.checkpoint_lsn}" + (f" ERROR: {jm.error}" if jm.error else "")
+            if jm else ""
+        )
+        self.bottom_bar.configure(
+            text=f"Mode: {state_name} | Current: {eq_name} | {hist}{queue_info}{view_info}{events_info}{journal_info}"
+        )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,65 @@
+"""
+Action Log: 100k событий через ActionLog (кольцевой буфер + пакетный flush)
+против прямых insert+see в tk.Text. Виджетная часть — только при наличии дисплея.
+
+    python -m benchmarks.bench_action_log [n_events]
+"""
+from __future__ import annotations
+import os
+import sys
+import tempfile
+
+from ui.action_log import ActionLog
+from benchmarks.common import timed
+
+
+def main(n: int) -> None:
+    results: dict[str, float] = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log = ActionLog(capacity=2000, spill_path=os.path.join(tmp, "action.log"))
+        with timed("ActionLog append + spill", results):
+            for i in range(n):
+                log.append(f"[BENCH] event {i}", "STATE")
+            log.drain()
+        log.close()
+
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+    except Exception as e:  # нет tkinter или дисплея
+        print(f"(widget part skipped: {e})")
+        root = None
+
+    if root is not None:
+        naive = tk.Text(root)
+        with timed("tk.Text insert+see per line", results):
+            for i in range(n):
+                naive.insert("end", f"[BENCH] event {i}\n", ("STATE",))
+                naive.see("end")
+            root.update()
+
+        batched = tk.Text(root)
+        log = ActionLog(capacity=2000)
+        with timed("ActionLog batched flush", results):
+            for i in range(n):
+                log.append(f"[BENCH] event {i}", "STATE")
+                if i % 500 == 0:  # примерно так часто срабатывает idle-тик под нагрузкой
+                    args: list = []
+                    for text, tag in log.drain():
+                        args.extend((text + "\n", (tag,)))
+                    batched.insert("end", *args)
+                    shown = int(batched.index("end-1c").split(".")[0]) - 1
+                    if shown > log.capacity:
+                        batched.delete("1.0", f"{shown - log.capacity + 1}.0")
+                    batched.see("end")
+            root.update()
+        root.destroy()
+
+    print(f"events: {n}")
+    for label, sec in results.items():
+        print(f"  {label:<30} {sec * 1000:9.1f} ms  ({sec / n * 1e6:.2f} us/event)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
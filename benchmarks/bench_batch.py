@@ -0,0 +1,40 @@
+"""
+Пакетный operation() по каталогу через Proxy (каждый вызов грузит модуль ~1.2 s):
+последовательное время (сумма latency) против asyncio с разным лимитом параллельности.
+
+    python -m benchmarks.bench_batch [n_models]
+"""
+from __future__ import annotations
+import sys
+from dataclasses import replace
+
+from patterns.command import run_batch
+from patterns.composite.materialize import model_from_memento
+from patterns.factory import FactoryRegistry
+from benchmarks.common import FACTORIES, make_memento
+
+
+def _items(n: int) -> list:
+    registry = FactoryRegistry()
+    for key, factory in FACTORIES.items():
+        registry.register(key, factory)
+    snaps = [s for snaps in make_memento(n).catalog.values() for s in snaps]
+    # все через proxy с валидной лицензией — худший случай: каждая модель грузит реальный модуль
+    snaps = [replace(s, use_proxy=True, license_key="VALID-KEY") for s in snaps]
+    return [(s.name, model_from_memento(s, registry).software) for s in snaps]
+
+
+def main(n: int) -> None:
+    print(f"models: {n} (all via proxy)")
+    for concurrency in (4, 8, 32):
+        report = run_batch(_items(n), concurrency)
+        serial = sum(r.seconds for r in report.results)
+        print(
+            f"  concurrency={concurrency:<3} wall {report.wall_seconds:6.2f} s  "
+            f"serial {serial:6.2f} s  x{serial / report.wall_seconds:5.1f}  "
+            f"p95 {report.latency_ms(0.95):6.0f} ms  failed {report.failed}"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 32)
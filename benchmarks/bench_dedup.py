@@ -0,0 +1,67 @@
+"""
+История Caretaker с пулом memento: память и время backup, пропуск копий head.
+
+    python -m benchmarks.bench_dedup [n_models] [n_snapshots]
+"""
+from __future__ import annotations
+import sys
+import time
+import tracemalloc
+from dataclasses import replace
+
+from patterns.memento import Caretaker, EquipmentMemento
+from benchmarks.common import make_memento
+
+
+def _edit(mem: EquipmentMemento, step: int) -> EquipmentMemento:
+    """Новый snapshot, как его строит приложение: все memento — новые объекты, одна модель изменена."""
+    catalog = {t: [replace(s) for s in snaps] for t, snaps in mem.catalog.items()}
+    t = next(iter(catalog))
+    catalog[t][0] = replace(catalog[t][0], use_online=step % 2 == 1)
+    return EquipmentMemento(catalog=catalog, current_ref=mem.current_ref)
+
+
+def _store(edits: list, pooled: bool) -> Caretaker | list:
+    if not pooled:
+        return list(edits)
+    caretaker = Caretaker()
+    for mem in edits:
+        caretaker.backup(mem)
+    return caretaker
+
+
+def _history(n: int, snapshots: int, pooled: bool) -> tuple[float, int, Caretaker | list]:
+    base = make_memento(n)
+    edits = [_edit(base, i) for i in range(snapshots)]
+    t0 = time.perf_counter()
+    keep = _store(edits, pooled)
+    elapsed = time.perf_counter() - t0
+
+    # память отдельным прогоном: tracemalloc сильно замедляет сам backup
+    del keep, edits
+    tracemalloc.start()
+    keep = _store([_edit(base, i) for i in range(snapshots)], pooled)
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return elapsed, retained, keep
+
+
+def main(n: int, snapshots: int) -> None:
+    print(f"models: {n}, snapshots: {snapshots}")
+    plain_s, plain_mem, _ = _history(n, snapshots, pooled=False)
+    pool_s, pool_mem, caretaker = _history(n, snapshots, pooled=True)
+    print(f"  {'plain list':<28} {plain_s * 1000:9.1f} ms  retained {plain_mem / 2**20:8.1f} MiB")
+    print(f"  {'Caretaker + MementoPool':<28} {pool_s * 1000:9.1f} ms  retained {pool_mem / 2**20:8.1f} MiB")
+    print(f"  {caretaker.info()}")
+
+    head = caretaker.snapshots()[caretaker.current_index()]
+    t0 = time.perf_counter()
+    stored = caretaker.backup(EquipmentMemento(catalog=dict(head.catalog), current_ref=head.current_ref))
+    print(f"  backup of a copy of head: stored={stored} in {(time.perf_counter() - t0) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 20_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 10,
+    )
@@ -0,0 +1,73 @@
+"""
+Разница двух snapshot'ов: наивное сравнение всех моделей по полям против diff_snapshots()
+(общие кортежи типов пропускаются, префикс/суффикс — по identity/хешу).
+
+    python -m benchmarks.bench_diff [n_models] [edits]
+"""
+from __future__ import annotations
+import sys
+from dataclasses import replace
+
+from patterns.memento import Caretaker, EquipmentMemento, diff_snapshots, dump_snapshot, load_snapshot
+from benchmarks.common import make_memento, timed
+
+
+def _naive(old: EquipmentMemento, new: EquipmentMemento) -> int:
+    """Попарно по позициям, поле за полем — как сравнил бы человек без хешей."""
+    differ = 0
+    for eq_type in old.catalog.keys() | new.catalog.keys():
+        a = old.catalog.get(eq_type, ())
+        b = new.catalog.get(eq_type, ())
+        for x, y in zip(a, b):
+            if x._content() != y._content():
+                differ += 1
+        differ += abs(len(a) - len(b))
+    return differ
+
+
+def _edited(mem: EquipmentMemento, edits: int) -> EquipmentMemento:
+    # правки флагов в одном типе + одна новая модель в конце (как create/clone в UI)
+    catalog = dict(mem.catalog)
+    eq_type = sorted(catalog)[0]
+    models = list(catalog[eq_type])
+    step = max(1, len(models) // edits)
+    for i in range(0, min(len(models), step * edits), step):
+        models[i] = replace(models[i], use_analytics=not models[i].use_analytics)
+    models.append(replace(models[-1], name=models[-1].name + " (Копия)"))
+    catalog[eq_type] = tuple(models)
+    return EquipmentMemento(catalog=catalog, current_ref=(eq_type, len(models) - 1))
+
+
+def main(n: int, edits: int) -> None:
+    base = make_memento(n)
+    edited = _edited(base, edits)
+    # тот же snapshot, прочитанный из файла: общих объектов с base нет совсем
+    loaded = load_snapshot(dump_snapshot(edited))
+    pooled = Caretaker()
+    pooled.backup(base)
+    pooled.backup(loaded)
+    results: dict[str, float] = {}
+
+    with timed("naive, field by field", results):
+        _naive(base, edited)
+    with timed("diff, shared types", results):
+        diff = diff_snapshots(base, edited)
+    with timed("diff, loaded (cold hashes)", results):
+        diff_snapshots(base, loaded)
+    with timed("diff, loaded (warm hashes)", results):
+        diff_snapshots(base, loaded)
+    with timed("diff via Caretaker (pooled)", results):
+        pooled.diff(0, 1)
+
+    print(f"models: {n}, flag edits: {edits} + 1 added")
+    print(f"  {diff.summary()}")
+    for label, sec in results.items():
+        print(f"  {label:<28} {sec * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(
+        int(args[0]) if len(args) > 0 else 100_000,
+        int(args[1]) if len(args) > 1 else 20,
+    )
@@ -0,0 +1,105 @@
+"""
+Шина событий против ручных «перерисовать всё» после каждой правки.
+Дерево каталога моделируется словарём ref -> подпись (та же подпись, что в UI):
+вручную — полная перерисовка после каждой правки, через EventBus — одна пачка,
+в которой подписчик трогает только изменённые узлы.
+
+    python -m benchmarks.bench_events [n_models] [edits]
+"""
+from __future__ import annotations
+import sys
+
+from patterns.composite import Catalog, LazyModel, apply_config_refs, software_label
+from patterns.observer import CatalogEventSource, CatalogReset, EventBatch, EventBus, ModelAdded, ModelChanged
+from benchmarks.common import make_memento, timed
+
+
+class _Tree:
+    """Узлы дерева: подпись модели по ссылке; touched — сколько подписей пересчитано."""
+    def __init__(self, catalog: Catalog) -> None:
+        self.catalog = catalog
+        self.nodes: dict[tuple[str, int], str] = {}
+        self.touched = 0
+
+    def _label(self, ref: tuple[str, int]) -> str:
+        self.touched += 1
+        m = self.catalog[ref[0]][ref[1]]
+        return f"{m.name}  (software: {software_label(m)})"
+
+    def rebuild(self) -> None:
+        self.nodes = {(t, i): self._label((t, i)) for t, models in self.catalog.items() for i in range(len(models))}
+
+    def on_events(self, batch: EventBatch) -> None:
+        if CatalogReset in batch:
+            self.rebuild()
+            return
+        for ref in batch.refs(ModelAdded) + batch.refs(ModelChanged):
+            self.nodes[ref] = self._label(ref)
+
+
+def _catalog(n: int, indexes=()) -> Catalog:
+    catalog = Catalog(indexes=indexes)
+    for eq_type, snaps in make_memento(n).catalog.items():
+        catalog[eq_type] = [LazyModel(s, None) for s in snaps]
+    return catalog
+
+
+def _edits(catalog: Catalog, edits: int) -> list[tuple[str, int]]:
+    refs = catalog.select_refs()
+    step = max(1, len(refs) // edits)
+    return refs[::step][:edits]
+
+
+def main(n: int, edits: int) -> None:
+    results: dict[str, float] = {}
+    touched: dict[str, int] = {}
+
+    # вручную: каждая правка -> перерисовать дерево целиком
+    catalog = _catalog(n)
+    tree = _Tree(catalog)
+    tree.rebuild()
+    tree.touched = 0
+    with timed("manual refresh per edit", results):
+        for ref in _edits(catalog, edits):
+            apply_config_refs(catalog, [ref], analytics=not catalog[ref[0]][ref[1]].use_analytics)
+            tree.rebuild()
+    touched["manual refresh per edit"] = tree.touched
+
+    # шина, idle-тик: правки копятся, подписчик получает одну пачку
+    ticks: list = []
+    bus = EventBus(ticks.append)
+    catalog = _catalog(n, [CatalogEventSource(bus)])
+    tree = _Tree(catalog)
+    tree.rebuild()
+    tree.touched = 0
+    bus.subscribe(tree.on_events, (ModelAdded, ModelChanged, CatalogReset))
+    with timed("event bus, one idle tick", results):
+        for ref in _edits(catalog, edits):
+            apply_config_refs(catalog, [ref], analytics=not catalog[ref[0]][ref[1]].use_analytics)
+            bus.emit(ModelChanged(ref))
+            # повторная правка той же модели в том же тике сливается
+            bus.emit(ModelChanged(ref))
+        while ticks:
+            ticks.pop()()
+    touched["event bus, one idle tick"] = tree.touched
+
+    # шина: restore (reindex) внутри транзакции -> один CatalogReset, add() поглощаются
+    tree.touched = 0
+    with timed("event bus, restore", results):
+        with bus.transaction():
+            catalog.reindex()
+    touched["event bus, restore"] = tree.touched
+
+    m = bus.metrics()
+    print(f"models: {n}, edits: {edits}")
+    for label, sec in results.items():
+        print(f"  {label:<26} {sec * 1000:9.1f} ms  labels rendered {touched[label]:>9}")
+    print(f"  bus: emitted {m.emitted}, coalesced {m.coalesced}, batches {m.batches}")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(
+        int(args[0]) if len(args) > 0 else 20_000,
+        int(args[1]) if len(args) > 1 else 50,
+    )
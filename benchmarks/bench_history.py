@@ -0,0 +1,64 @@
+"""
+Сжатие холодных snapshot'ов Caretaker: коэффициент, время backup и добавка к undo.
+
+    python -m benchmarks.bench_history [n_models] [n_snapshots]
+"""
+from __future__ import annotations
+import sys
+import time
+from dataclasses import replace
+
+from patterns.memento import Caretaker, EquipmentMemento
+from benchmarks.common import make_memento
+
+# (codec, level); None — без сжатия
+VARIANTS = (None, ("zlib", 1), ("zlib", 6), ("lzma", 1))
+COMPRESS_AFTER = 4
+
+
+def _edits(n: int, snapshots: int) -> list[EquipmentMemento]:
+    """Snapshot'ы, в которых меняются имена всех моделей — худший случай для пула."""
+    base = make_memento(n)
+    return [
+        EquipmentMemento(catalog={t: [replace(s, name=f"{s.name}/{i}") for s in snaps] for t, snaps in base.catalog.items()})
+        for i in range(snapshots)
+    ]
+
+
+def main(n: int, snapshots: int) -> None:
+    edits = _edits(n, snapshots)
+    print(f"models: {n}, snapshots: {snapshots}, compress_after: {COMPRESS_AFTER}")
+    for variant in VARIANTS:
+        if variant is None:
+            caretaker = Caretaker()
+            label = "off"
+        else:
+            codec, level = variant
+            caretaker = Caretaker(compress_after=COMPRESS_AFTER, codec=codec, level=level)
+            label = f"{codec}:{level}"
+
+        t0 = time.perf_counter()
+        for mem in edits:
+            caretaker.backup(mem)
+        backup_s = time.perf_counter() - t0
+
+        undo_ms = []
+        while caretaker.can_undo():
+            t0 = time.perf_counter()
+            caretaker.undo()
+            undo_ms.append((time.perf_counter() - t0) * 1000)
+
+        st = caretaker.compression_stats()
+        worst = max(undo_ms) if undo_ms else 0.0
+        print(
+            f"  {label:<8} backup {backup_s * 1000:8.1f} ms  ratio x{st.ratio:5.1f}  "
+            f"stored {st.stored_bytes / 1024:8.1f} KiB of {st.raw_bytes / 1024:9.1f} KiB  "
+            f"undo worst {worst:7.1f} ms  decompress avg {st.avg_decompress_ms:6.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 20_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 12,
+    )
@@ -0,0 +1,114 @@
+"""
+Конкуренция за каталог: N потоков-читателей и M потоков-писателей.
+Один mutex на весь каталог против одной RW-блокировки и RW-блокировок по типам (SyncCatalog).
+
+    python -m benchmarks.bench_locks [n_readers] [n_writers] [seconds]
+"""
+from __future__ import annotations
+import random
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from patterns.composite import Catalog, LazyModel, SyncCatalog
+from benchmarks.common import make_memento
+
+
+MODELS = 20_000
+# время «внутри» блокировки: читатель пишет страницу отчёта, писатель сохраняет правку;
+# sleep отпускает GIL, как реальный ввод-вывод
+READ_IO = 0.002
+WRITE_IO = 0.001
+
+
+class _MutexCatalog:
+    """Наивный вариант: один threading.Lock на любые обращения."""
+    def __init__(self, catalog: Catalog) -> None:
+        self.catalog = catalog
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def reading(self, eq_type: str):
+        with self._lock:
+            yield self.catalog[eq_type]
+
+    @contextmanager
+    def writing(self, eq_type: str):
+        with self._lock:
+            yield self.catalog[eq_type]
+
+
+def _catalog() -> Catalog:
+    catalog = Catalog()
+    for eq_type, snaps in make_memento(MODELS).catalog.items():
+        catalog[eq_type] = [LazyModel(s, None) for s in snaps]
+    return catalog
+
+
+def _run(sync, n_readers: int, n_writers: int, seconds: float) -> dict:
+    types = list(sync.catalog)
+    stop = threading.Event()
+    reads = [0] * n_readers
+    writes = [0] * n_writers
+    waits: list[float] = []
+
+    def reader(k: int) -> None:
+        rnd = random.Random(k)
+        while not stop.is_set():
+            with sync.reading(rnd.choice(types)) as models:
+                start = rnd.randrange(max(1, len(models) - 100))
+                sum(len(m.name) for m in models[start:start + 100])
+                time.sleep(READ_IO)
+            reads[k] += 1
+
+    def writer(k: int) -> None:
+        rnd = random.Random(1000 + k)
+        while not stop.is_set():
+            t0 = time.perf_counter()
+            with sync.writing(rnd.choice(types)) as models:
+                waits.append(time.perf_counter() - t0)
+                m = models[rnd.randrange(len(models))]
+                m.use_online = not m.use_online
+                time.sleep(WRITE_IO)
+            writes[k] += 1
+
+    threads = [threading.Thread(target=reader, args=(k,)) for k in range(n_readers)]
+    threads += [threading.Thread(target=writer, args=(k,)) for k in range(n_writers)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+
+    waits.sort()
+    return {
+        "reads/s": sum(reads) / seconds,
+        "writes/s": sum(writes) / seconds,
+        "write wait p99 ms": (waits[int(0.99 * (len(waits) - 1))] * 1000) if waits else 0.0,
+    }
+
+
+def main(n_readers: int, n_writers: int, seconds: float) -> None:
+    variants = {
+        "one mutex": lambda: _MutexCatalog(_catalog()),
+        "one RW lock": lambda: SyncCatalog(_catalog(), per_type=False),
+        "RW lock per type": lambda: SyncCatalog(_catalog()),
+    }
+    print(f"readers: {n_readers}, writers: {n_writers}, {seconds:.1f} s each, {MODELS} models")
+    for label, make in variants.items():
+        r = _run(make(), n_readers, n_writers, seconds)
+        print(
+            f"  {label:<18} reads {r['reads/s']:8.0f}/s  writes {r['writes/s']:7.0f}/s  "
+            f"write wait p99 {r['write wait p99 ms']:6.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(
+        int(args[0]) if len(args) > 0 else 8,
+        int(args[1]) if len(args) > 1 else 2,
+        float(args[2]) if len(args) > 2 else 2.0,
+    )
@@ -0,0 +1,37 @@
+"""
+Материализация snapshot'а: последовательно против ProcessPoolExecutor с разным числом процессов.
+
+    python -m benchmarks.bench_parallel [n_models] [max_workers]
+"""
+from __future__ import annotations
+import os
+import sys
+
+from patterns.composite.parallel import PARALLEL_THRESHOLD, default_registry, materialize_many
+from benchmarks.common import make_memento, timed
+
+
+def main(n: int, max_workers: int) -> None:
+    snaps = [s for part in make_memento(n).catalog.values() for s in part]
+    registry = default_registry()
+    results: dict[str, float] = {}
+
+    with timed("serial", results):
+        materialize_many(snaps, registry, workers=1)
+    workers = 2
+    while workers <= max_workers:
+        with timed(f"{workers} processes", results):
+            materialize_many(snaps, registry, workers=workers, threshold=0)
+        workers *= 2
+
+    print(f"models: {n}, cpu_count: {os.cpu_count()}, threshold: {PARALLEL_THRESHOLD}")
+    base = results["serial"]
+    for label, sec in results.items():
+        print(f"  {label:<14} {sec * 1000:9.1f} ms  x{base / sec:4.2f}")
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 100_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else max(2, os.cpu_count() or 1),
+    )
@@ -0,0 +1,75 @@
+"""
+Диапазонные запросы по числовым specs: SpecRangeIndex против линейного прохода.
+
+    python -m benchmarks.bench_ranges [n_models]
+"""
+from __future__ import annotations
+import sys
+import time
+from dataclasses import replace
+
+from patterns.composite import Catalog, LazyModel, SpecRangeIndex
+from benchmarks.common import make_memento, timed
+
+# (описание, key, lo, hi, тип, флаги)
+QUERIES = (
+    ("treadmills max_speed_kmh >= 16", "max_speed_kmh", 16, None, None, {}),
+    ("rowers 400 <= max_power_watts <= 600", "max_power_watts", 400, 600, None, {}),
+    ("10 <= max_resistance <= 20, proxy only", "max_resistance", 10, 20, None, {"use_proxy": True}),
+    ("bikes max_resistance <= 5", "max_resistance", None, 5, "Велотренажёр", {}),
+)
+
+
+def _vary(s, i: int):
+    # у синтетических моделей specs одинаковые — разнесём значения, чтобы диапазоны были избирательны
+    specs = {
+        k: (v * (i % 50 + 1) / 25 if isinstance(v, (int, float)) and not isinstance(v, bool) else v)
+        for k, v in s.specs
+    }
+    return replace(s, specs=specs)
+
+
+def _linear(catalog: Catalog, key, lo, hi, eq_type, flags) -> list:
+    found = []
+    for t in sorted(catalog.keys()):
+        if eq_type is not None and t != eq_type:
+            continue
+        for idx, m in enumerate(catalog[t]):
+            v = m.specs.get(key)
+            if not isinstance(v, (int, float)) or isinstance(v, bool):
+                continue
+            if (lo is None or v >= lo) and (hi is None or v <= hi):
+                if all(bool(getattr(m, f)) == want for f, want in flags.items()):
+                    found.append((t, idx))
+    return found
+
+
+def main(n: int) -> None:
+    index = SpecRangeIndex()
+    catalog = Catalog(indexes=[index])
+    for eq_type, snaps in make_memento(n).catalog.items():
+        catalog[eq_type] = [LazyModel(_vary(s, i), None) for i, s in enumerate(snaps)]
+
+    results: dict[str, float] = {}
+    with timed("reindex + first query (sort)", results):
+        catalog.reindex()
+        index.keys()
+    print(f"models: {n}")
+    for label, sec in results.items():
+        print(f"  {label:<40} {sec * 1000:9.1f} ms")
+
+    for label, key, lo, hi, eq_type, flags in QUERIES:
+        reps = 50
+        t0 = time.perf_counter()
+        for _ in range(reps):
+            found = catalog.spec_range(key, lo, hi, equipment_type=eq_type, **flags)
+        indexed = (time.perf_counter() - t0) / reps
+        t0 = time.perf_counter()
+        expected = _linear(catalog, key, lo, hi, eq_type, flags)
+        linear = time.perf_counter() - t0
+        assert found == expected, label
+        print(f"  {label:<40} hits {len(found):>6}  index {indexed * 1000:8.3f} ms  linear {linear * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,41 @@
+"""
+Скомпилированные рецепты против пошагового Director + ConcreteEquipmentBuilder.
+
+    python -m benchmarks.bench_recipes [n_models]
+"""
+from __future__ import annotations
+import sys
+
+from patterns.builder import ConcreteEquipmentBuilder, Director, default_recipes, compile_recipe
+from benchmarks.common import timed
+
+
+def main(n: int) -> None:
+    recipes = default_recipes()
+    keys = recipes.keys()
+    results: dict[str, float] = {}
+
+    # прежний Director писал лог всегда
+    director = Director(ConcreteEquipmentBuilder(record_log=True), recipes)
+    with timed("Director (imperative)", results):
+        for i in range(n):
+            director.make(keys[i % len(keys)])
+
+    compiled = [recipes.constructor(k, with_log=True) for k in keys]
+    with timed("compiled recipe (with log)", results):
+        for i in range(n):
+            compiled[i % len(compiled)]()
+
+    no_log = [compile_recipe(recipes.get(k)) for k in keys]
+    with timed("compiled recipe (no log)", results):
+        for i in range(n):
+            no_log[i % len(no_log)]()
+
+    print(f"models: {n}")
+    base = results["Director (imperative)"]
+    for label, sec in results.items():
+        print(f"  {label:<28} {sec * 1000:9.1f} ms  {n / sec:12,.0f} models/s  x{base / sec:.1f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
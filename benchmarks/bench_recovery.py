@@ -0,0 +1,136 @@
+"""
+Журнал команд (CommandJournal): запись с fsync на каждую команду (window_ms=0) против
+группового коммита, и восстановление после сбоя — повтор всего журнала от стартового
+checkpoint'а против последнего периодического checkpoint'а + хвоста.
+
+    python -m benchmarks.bench_recovery [n_models] [records] [window_ms]
+"""
+from __future__ import annotations
+import os
+import random
+import shutil
+import sys
+import tempfile
+from dataclasses import replace
+
+from patterns.command import CommandJournal, JournalState, Recovery, model_fields, recover, scan_journal
+from patterns.command.journal import JournalRecord
+from patterns.memento import Caretaker
+from benchmarks.common import make_memento, timed
+
+
+def _ops(state: JournalState, rnd: random.Random):
+    """Поток записей как из UI: правки Decorator/Proxy, выбор, create/clone, snapshot'ы, undo/redo."""
+    k = 0
+    while True:
+        k += 1
+        t = rnd.choice(sorted(state.types()))
+        n = len(state.models(t))
+        r = rnd.random()
+        if r < 0.05:
+            m = state.models(t)[rnd.randrange(n)]
+            yield "add", {"m": model_fields(replace(m, name=f"{m.name} #{k}"))}
+        elif r < 0.55:
+            i = rnd.randrange(n)
+            m = state.models(t)[i]
+            yield "put", {"ref": [t, i], "m": model_fields(replace(m, use_online=not m.use_online))}
+        elif r < 0.57:
+            yield "bulk", {"refs": {t: list(range(0, n, 50))}, "online": None, "analytics": r < 0.56,
+                           "use_proxy": None, "license_key": None}
+        elif r < 0.9:
+            yield "select", {"ref": [t, rnd.randrange(n)]}
+        elif r < 0.97:
+            yield "snapshot", {}
+        elif state.caretaker.can_undo():
+            yield "undo", {}
+            yield "restore", {"node": state.caretaker.current_index() - 1}
+        else:
+            yield "snapshot", {}
+
+
+def _write(directory: str, n: int, records: int, window_ms: float, checkpoint_every: int) -> JournalState:
+    """Журнал из records записей; состояние применяется параллельно — как в App."""
+    rnd = random.Random(5)
+    state = JournalState(Caretaker())
+    state.load(make_memento(n), [], {})
+    journal = CommandJournal(directory, window_ms=window_ms, checkpoint_every=checkpoint_every)
+    journal.checkpoint(state.snapshot(), state.caretaker.export_state(), background=False)
+    ops = _ops(state, rnd)
+    for _ in range(records):
+        op, args = next(ops)
+        lsn = journal.append(op, **args)
+        state.apply(JournalRecord(lsn, op, args))
+        if journal.checkpoint_due():
+            journal.checkpoint(state.snapshot(), state.caretaker.export_state())
+    journal.close()
+    metrics = journal.metrics()
+    print(
+        f"    appended {metrics.appended}, fsyncs {metrics.fsyncs} (avg group {metrics.avg_group:.1f}, "
+        f"max {metrics.max_group}), {metrics.bytes_written / 1024:.0f} KiB, checkpoints {metrics.checkpoints}"
+    )
+    return state
+
+
+def _check(rec: Recovery, live: JournalState) -> None:
+    # каталог целиком, история — длина, курсор и head (полное сравнение всей истории дольше самого recover)
+    ours, theirs = rec.state.caretaker, live.caretaker
+    same = (
+        rec.state.snapshot() == live.snapshot()
+        and len(ours) == len(theirs)
+        and ours.current_index() == theirs.current_index()
+        and ours.get(len(ours) - 1) == theirs.get(len(theirs) - 1)
+    )
+    print(f"    {rec.summary()}; state matches: {same}")
+
+
+def main(n: int, records: int, window_ms: float) -> None:
+    results: dict[str, float] = {}
+    root = tempfile.mkdtemp(prefix="mp-journal-")
+    try:
+        # fsync на каждую запись: только часть потока, иначе бенчмарк идёт минутами
+        sync_records = min(records, 2000)
+        print(f"  fsync per record ({sync_records} records):")
+        with timed(f"append, window=0 ({sync_records})", results):
+            _write(os.path.join(root, "sync"), n, sync_records, 0, 1 << 30)
+        print(f"  group commit, window={window_ms:g} ms:")
+        with timed(f"append, group ({sync_records})", results):
+            _write(os.path.join(root, "group-short"), n, sync_records, window_ms, 1 << 30)
+
+        print(f"  {records} records, checkpoint only at start:")
+        full_dir = os.path.join(root, "full")
+        with timed("append, group, no checkpoints", results):
+            live = _write(full_dir, n, records, window_ms, 1 << 30)
+        with timed("recover: full replay", results):
+            rec = recover(full_dir, Caretaker())
+        _check(rec, live)
+
+        print(f"  {records} records, checkpoint every {max(1, records // 10)}:")
+        tail_dir = os.path.join(root, "tail")
+        with timed("append, group, periodic checkpoints", results):
+            live = _write(tail_dir, n, records, window_ms, max(1, records // 10))
+        with timed("recover: checkpoint + tail", results):
+            rec = recover(tail_dir, Caretaker())
+        _check(rec, live)
+
+        # сбой посреди write: последняя запись оборвана — отрезается, остальное цело
+        segment = max(name for name in os.listdir(full_dir) if name.startswith("wal-"))
+        path = os.path.join(full_dir, segment)
+        with open(path, "rb+") as fp:
+            fp.truncate(os.path.getsize(path) - 3)
+        scan = scan_journal(full_dir)
+        print(f"  torn tail: {scan.torn_bytes} B dropped, last lsn {scan.last_lsn} of {records}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    print(f"models: {n}, records: {records}, window: {window_ms:g} ms")
+    for label, sec in results.items():
+        print(f"  {label:<36} {sec * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(
+        int(args[0]) if len(args) > 0 else 20_000,
+        int(args[1]) if len(args) > 1 else 50_000,
+        float(args[2]) if len(args) > 2 else 20.0,
+    )
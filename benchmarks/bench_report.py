@@ -0,0 +1,86 @@
+"""
+Отчёт по каталогу: сборка строки через += против потоковой записи по моделям,
+и потоковый отчёт по ленивому каталогу (LazyModel, proxy-модели как есть — без загрузки).
+
+    python -m benchmarks.bench_report [n_models]
+"""
+from __future__ import annotations
+import os
+import sys
+import tempfile
+import tracemalloc
+from dataclasses import replace
+
+from patterns.composite import Catalog, LazyModel, model_from_memento, write_catalog_report
+from patterns.factory import FactoryRegistry
+from benchmarks.common import FACTORIES, make_memento, timed
+
+
+def _concat_report(catalog: Catalog) -> str:
+    # прежняя реализация EquipmentType.summary(), применённая ко всему каталогу
+    result = ""
+    for eq_type in sorted(catalog.keys()):
+        result += "-" * 8 + f"\nТип тренажера: {eq_type}\n"
+        for model in catalog[eq_type]:
+            result += model.summary() + "\n"
+        result += "-" * 8 + "\n"
+    return result
+
+
+def _peak(fn) -> int:
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main(n: int) -> None:
+    registry = FactoryRegistry()
+    for key, factory in FACTORIES.items():
+        registry.register(key, factory)
+    catalog = Catalog()
+    lazy = Catalog()
+    for snaps in make_memento(n).catalog.values():
+        for s in snaps:
+            lazy.add(LazyModel(s, lambda m: model_from_memento(m, registry)))
+            # proxy-модели каждый раз "загружают" удалённый сервис — здесь не нужны
+            catalog.add(model_from_memento(replace(s, use_proxy=False), registry))
+
+    results: dict[str, float] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "report.txt")
+
+        def concat() -> None:
+            with open(path, "w", encoding="utf-8") as fp:
+                fp.write(_concat_report(catalog))
+
+        def stream() -> None:
+            with open(path, "w", encoding="utf-8") as fp:
+                write_catalog_report(catalog, fp)
+
+        def stream_lazy() -> None:
+            with open(path, "w", encoding="utf-8") as fp:
+                write_catalog_report(lazy, fp)
+
+        with timed("concat + write", results):
+            concat()
+        with timed("stream (write_catalog_report)", results):
+            stream()
+        size = os.path.getsize(path)
+        with timed("stream, LazyModel catalog", results):
+            stream_lazy()
+        peaks = {
+            "concat + write": _peak(concat),
+            "stream (write_catalog_report)": _peak(stream),
+            "stream, LazyModel catalog": _peak(stream_lazy),
+        }
+
+    print(f"models: {n}, report: {size / 1024:,.1f} KiB")
+    for label, sec in results.items():
+        print(f"  {label:<32} {sec * 1000:9.1f} ms  peak {peaks[label] / 1024:9.1f} KiB")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
@@ -0,0 +1,44 @@
+"""
+Восстановление snapshot: eager (фабрика на каждую модель) против LazyModel.
+
+    python -m benchmarks.bench_restore [n_models]
+"""
+from __future__ import annotations
+import sys
+
+from patterns.composite import Catalog, LazyModel, model_from_memento, model_to_memento
+from benchmarks.common import FACTORIES, make_memento, timed
+from patterns.factory import FactoryRegistry
+
+
+def main(n: int) -> None:
+    registry = FactoryRegistry()
+    for key, factory in FACTORIES.items():
+        registry.register(key, factory)
+    mem = make_memento(n)
+    results: dict[str, float] = {}
+
+    with timed("eager restore", results):
+        eager = Catalog()
+        for eq_type, snaps in mem.catalog.items():
+            eager[eq_type] = [model_from_memento(s, registry) for s in snaps]
+
+    build = lambda s: model_from_memento(s, registry)  # noqa: E731
+    with timed("lazy restore", results):
+        lazy = Catalog()
+        for eq_type, snaps in mem.catalog.items():
+            lazy[eq_type] = [LazyModel(s, build) for s in snaps]
+
+    with timed("lazy snapshot (re-save)", results):
+        {t: [model_to_memento(m) for m in models] for t, models in lazy.items()}
+
+    with timed("eager snapshot (re-save)", results):
+        {t: [model_to_memento(m) for m in models] for t, models in eager.items()}
+
+    print(f"models: {n}")
+    for label, sec in results.items():
+        print(f"  {label:<26} {sec * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,56 @@
+"""
+Поиск по каталогу: инвертированный индекс против линейного прохода.
+
+    python -m benchmarks.bench_search [n_models]
+"""
+from __future__ import annotations
+import sys
+import time
+
+from patterns.composite import Catalog, CatalogSearchIndex, LazyModel
+from patterns.composite.search import model_terms, tokenize
+from benchmarks.common import make_memento, timed
+
+QUERIES = ("bike 1234", "12345", "treadmill 99", "pulse", "row")
+
+
+def _linear(catalog: Catalog, query: str) -> list:
+    tokens = tokenize(query)
+    found = []
+    for eq_type in sorted(catalog.keys()):
+        for idx, m in enumerate(catalog[eq_type]):
+            terms = model_terms(m)
+            if all(any(term.startswith(t) for term in terms) for t in tokens):
+                found.append((eq_type, idx))
+    return found
+
+
+def main(n: int) -> None:
+    index = CatalogSearchIndex()
+    catalog = Catalog(indexes=[index])
+    for eq_type, snaps in make_memento(n).catalog.items():
+        catalog[eq_type] = [LazyModel(s, None) for s in snaps]
+
+    results: dict[str, float] = {}
+    with timed("reindex (deferred)", results):
+        catalog.reindex()
+    with timed("first query (builds postings)", results):
+        index.search("x")
+
+    print(f"models: {n}")
+    for label, sec in results.items():
+        print(f"  {label:<32} {sec * 1000:9.1f} ms")
+    for q in QUERIES:
+        reps = 200
+        t0 = time.perf_counter()
+        for _ in range(reps):
+            found = index.search(q, limit=500)
+        indexed = (time.perf_counter() - t0) / reps
+        t0 = time.perf_counter()
+        _linear(catalog, q)
+        linear = time.perf_counter() - t0
+        print(f"  {q!r:<18} hits {len(found):>4}  index {indexed * 1000:8.3f} ms  linear {linear * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
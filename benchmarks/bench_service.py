@@ -0,0 +1,112 @@
+"""
+Нагрузочный тест HTTP-сервиса каталога: K клиентов с keep-alive соединениями,
+смесь чтений (страницы, модели, поиск) и записей (configure, create).
+Печатает пропускную способность и p50/p99 по каждому типу запроса, с кешем ответов и без.
+
+    python -m benchmarks.bench_service [n_models] [clients] [seconds]
+"""
+from __future__ import annotations
+import http.client
+import json
+import random
+import sys
+import threading
+import time
+from urllib.parse import quote
+
+from service import CatalogEngine, CatalogHTTPServer
+from benchmarks.common import make_memento
+
+
+PAGES = 50        # «горячие» страницы, которые листают киоски
+WRITE_SHARE = 0.01
+QUERIES = ("bike", "treadmill software", "rowing online", "gyri")
+
+
+def _percentile(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] * 1000 if values else 0.0
+
+
+def _client(address: tuple, types: list[str], seed: int, stop: threading.Event, out: dict) -> None:
+    rnd = random.Random(seed)
+    conn = http.client.HTTPConnection(*address, timeout=30)
+    while not stop.is_set():
+        roll = rnd.random()
+        body = None
+        if roll < WRITE_SHARE / 2:
+            kind, method, path = "configure", "POST", "/configure"
+            # киоск настраивает свой тренажёр, а не весь тип
+            ref = [rnd.choice(types), rnd.randrange(200)]
+            body = json.dumps({"refs": [ref], "analytics": rnd.random() < 0.5})
+        elif roll < WRITE_SHARE:
+            kind, method, path = "create", "POST", "/models"
+            body = json.dumps({"factory": rnd.choice(("bike", "treadmill", "rowing", "gyri"))})
+        elif roll < 0.6:
+            kind, method, path = "page", "GET", f"/models?offset={rnd.randrange(PAGES) * 50}&limit=50"
+        elif roll < 0.85:
+            kind, method = "model", "GET"
+            path = f"/models/{quote(rnd.choice(types))}/{rnd.randrange(200)}"
+        else:
+            kind, method, path = "search", "GET", "/search?q=" + quote(rnd.choice(QUERIES))
+        t0 = time.perf_counter()
+        conn.request(method, path, body=body, headers={"Content-Type": "application/json"} if body else {})
+        resp = conn.getresponse()
+        resp.read()
+        out.setdefault(kind, []).append(time.perf_counter() - t0)
+        if resp.status >= 500:
+            out.setdefault("errors", []).append(0.0)
+    conn.close()
+
+
+def _run(n: int, clients: int, seconds: float, cache_size: int) -> None:
+    engine = CatalogEngine(compress_after=None)
+    engine.load(make_memento(n))
+    types = sorted(engine.view())
+    with CatalogHTTPServer(engine, port=0, workers=clients, cache_size=cache_size) as srv:
+        stop = threading.Event()
+        results = [dict() for _ in range(clients)]
+        threads = [
+            threading.Thread(target=_client, args=(srv.server_address, types, k, stop, results[k]))
+            for k in range(clients)
+        ]
+        for t in threads:
+            t.start()
+        time.sleep(seconds)
+        stop.set()
+        for t in threads:
+            t.join()
+        hits, misses = srv.cache.hits, srv.cache.misses
+
+    merged: dict[str, list[float]] = {}
+    for r in results:
+        for kind, values in r.items():
+            merged.setdefault(kind, []).extend(values)
+    errors = len(merged.pop("errors", []))
+    everything = [v for values in merged.values() for v in values]
+    label = f"cache={cache_size}" if cache_size else "no cache"
+    print(
+        f"  {label:<11} {len(everything) / seconds:8.0f} req/s  p50 {_percentile(everything, 0.5):6.2f} ms  "
+        f"p99 {_percentile(everything, 0.99):7.2f} ms  cache hit {hits / max(1, hits + misses):4.0%}  errors {errors}"
+    )
+    for kind in sorted(merged):
+        values = merged[kind]
+        print(
+            f"    {kind:<10} {len(values):7d} req  p50 {_percentile(values, 0.5):6.2f} ms  "
+            f"p99 {_percentile(values, 0.99):7.2f} ms"
+        )
+
+
+def main(n: int, clients: int, seconds: float) -> None:
+    print(f"models: {n}, clients: {clients} (keep-alive), {seconds:.0f} s per run, writes {WRITE_SHARE:.0%}")
+    for cache_size in (0, 1024):
+        _run(n, clients, seconds, cache_size)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(
+        int(args[0]) if len(args) > 0 else 20_000,
+        int(args[1]) if len(args) > 1 else 8,
+        float(args[2]) if len(args) > 2 else 5.0,
+    )
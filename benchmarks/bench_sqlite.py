@@ -0,0 +1,69 @@
+"""
+SqliteCatalogStore против in-memory dict-of-lists.
+
+    python -m benchmarks.bench_sqlite [n_models] [db_path]
+"""
+from __future__ import annotations
+import os
+import sys
+import tempfile
+from dataclasses import replace
+
+from patterns.composite.sqlite_store import SqliteCatalogStore
+from benchmarks.common import make_memento, timed
+
+
+def main(n: int, db_path: str | None = None) -> None:
+    mem = make_memento(n)
+    catalog = {t: list(snaps) for t, snaps in mem.catalog.items()}
+    some_type = sorted(catalog)[0]
+    results: dict[str, float] = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SqliteCatalogStore(db_path or os.path.join(tmp, "catalog.db"))
+
+        with timed("sqlite batched insert", results):
+            store.replace_all(mem)
+
+        with timed("sqlite count(type, proxy)", results):
+            store.count(equipment_type=some_type, use_proxy=True)
+        with timed("dict scan count(type, proxy)", results):
+            sum(1 for s in catalog[some_type] if s.use_proxy)
+
+        with timed("sqlite page(offset=n/8)", results):
+            store.page(some_type, offset=n // 8, limit=100)
+        with timed("dict page(offset=n/8)", results):
+            catalog[some_type][n // 8:n // 8 + 100]
+
+        with timed("sqlite name prefix", results):
+            store.search_name("Bike Model X #1234", limit=100)
+        with timed("dict name prefix", results):
+            [s for snaps in catalog.values() for s in snaps if s.name.startswith("Bike Model X #1234")][:100]
+
+        # snapshot после правки одной модели: sync пишет одну строку вместо всего каталога
+        edited = dict(mem.catalog)
+        edited[some_type] = (replace(edited[some_type][0], use_proxy=True),) + edited[some_type][1:]
+        edited_mem = replace(mem, catalog=edited)
+        with timed("sqlite replace_all (1 edit)", results):
+            store.replace_all(edited_mem)
+        store.replace_all(mem)
+        with timed("sqlite sync (1 edit)", results):
+            store.sync(edited_mem)
+
+        with timed("sqlite bulk update(type)", results):
+            store.bulk_update(online=True, analytics=True, equipment_type=some_type)
+        with timed("dict bulk update(type)", results):
+            catalog[some_type] = [replace(s, use_online=True, use_analytics=True) for s in catalog[some_type]]
+
+        store.close()
+
+    print(f"models: {n}")
+    for label, sec in results.items():
+        print(f"  {label:<30} {sec * 1000:9.2f} ms")
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 100_000,
+        sys.argv[2] if len(sys.argv) > 2 else None,
+    )
@@ -0,0 +1,66 @@
+"""
+Startup: время импорта и время до первого idle-тика mainloop.
+Каждый замер — в отдельном процессе, печатается медиана по repeats прогонам.
+
+    python -m benchmarks.bench_startup [repeats]
+"""
+from __future__ import annotations
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# headless: пакеты импортируются при запрещённом tkinter
+_HEADLESS = """
+import sys, time
+sys.modules["tkinter"] = None
+t = time.perf_counter()
+import domain.equipment, patterns.factory, patterns.builder, patterns.decorator, patterns.proxy
+import patterns.memento, patterns.state, patterns.command, patterns.composite, ui.action_log
+print(time.perf_counter() - t)
+"""
+
+_IMPORT_APP = """
+import time
+t = time.perf_counter()
+import app
+print(time.perf_counter() - t)
+"""
+
+_FIRST_IDLE = """
+import time
+t = time.perf_counter()
+import app
+a = app.App()
+def done():
+    print(time.perf_counter() - t)
+    a.destroy()
+a.after_idle(lambda: a.after_idle(done))
+a.mainloop()
+"""
+
+
+def _run(code: str) -> float | None:
+    proc = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+    if proc.returncode != 0:
+        return None
+    return float(proc.stdout.strip().splitlines()[-1])
+
+
+def main(repeats: int) -> None:
+    for label, code in (
+        ("headless import (no tkinter)", _HEADLESS),
+        ("import app", _IMPORT_APP),
+        ("time to first idle", _FIRST_IDLE),
+    ):
+        samples = [_run(code) for _ in range(repeats)]
+        if any(s is None for s in samples):
+            print(f"  {label:<30} skipped (failed to run, no display?)")
+            continue
+        print(f"  {label:<30} {statistics.median(samples) * 1000:8.1f} ms (median of {repeats})")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
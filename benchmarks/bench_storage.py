@@ -0,0 +1,73 @@
+"""
+Сравнение .mpcat (колоночный бинарный формат) с наивными JSON и pickle.
+
+    python -m benchmarks.bench_storage [n_models]
+"""
+from __future__ import annotations
+import json
+import os
+import pickle
+import sys
+import tempfile
+from dataclasses import asdict
+
+from patterns.memento import EquipmentMemento, ModelMemento, save_catalog, load_catalog, iter_catalog_chunks
+from benchmarks.common import make_memento, timed
+
+
+def _json_save(path: str, mem: EquipmentMemento) -> None:
+    data = {t: [asdict(s) for s in snaps] for t, snaps in mem.catalog.items()}
+    with open(path, "w", encoding="utf-8") as fp:
+        json.dump({"catalog": data, "current_ref": mem.current_ref}, fp, ensure_ascii=False)
+
+
+def _json_load(path: str) -> EquipmentMemento:
+    with open(path, encoding="utf-8") as fp:
+        data = json.load(fp)
+    catalog = {t: [ModelMemento(**s) for s in snaps] for t, snaps in data["catalog"].items()}
+    ref = data["current_ref"]
+    return EquipmentMemento(catalog=catalog, current_ref=tuple(ref) if ref else None)
+
+
+def main(n: int) -> None:
+    mem = make_memento(n)
+    results: dict[str, float] = {}
+    sizes: dict[str, int] = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        p_bin = os.path.join(tmp, "catalog.mpcat")
+        p_json = os.path.join(tmp, "catalog.json")
+        p_pickle = os.path.join(tmp, "catalog.pickle")
+
+        with timed("mpcat save", results):
+            save_catalog(p_bin, mem, [], -1)
+        with timed("json save", results):
+            _json_save(p_json, mem)
+        with timed("pickle save", results):
+            with open(p_pickle, "wb") as fp:
+                pickle.dump(mem, fp, protocol=pickle.HIGHEST_PROTOCOL)
+
+        with timed("mpcat load", results):
+            load_catalog(p_bin)
+        with timed("mpcat stream (first chunk)", results):
+            next(iter_catalog_chunks(p_bin))
+        with timed("json load", results):
+            _json_load(p_json)
+        with timed("pickle load", results):
+            with open(p_pickle, "rb") as fp:
+                pickle.load(fp)
+
+        sizes["mpcat"] = os.path.getsize(p_bin)
+        sizes["json"] = os.path.getsize(p_json)
+        sizes["pickle"] = os.path.getsize(p_pickle)
+
+    print(f"models: {n}")
+    for label, sec in results.items():
+        rate = f"{n / sec:,.0f} models/s" if "first chunk" not in label else ""
+        print(f"  {label:<28} {sec * 1000:9.1f} ms  {rate}")
+    for label, size in sizes.items():
+        print(f"  size {label:<28} {size / 1024:9.1f} KiB")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,67 @@
+"""
+Загрузка proxied-модулей с локального стенда сервера: новое соединение на каждый
+запрос против пула keep-alive соединений и пакетного POST /modules/batch.
+
+    python -m benchmarks.bench_transport [n_modules]
+"""
+from __future__ import annotations
+import http.client
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+
+from patterns.proxy import HttpTransport, LicenseServer
+from benchmarks.common import timed
+
+
+THREADS = 8
+
+
+def _fetch_fresh(host: str, port: int, title: str) -> bytes:
+    # без пула: соединение (и его setup на сервере) на каждый модуль
+    conn = http.client.HTTPConnection(host, port, timeout=5)
+    try:
+        conn.request("GET", "/modules/" + quote(title, safe=""), headers={"Connection": "close"})
+        return conn.getresponse().read()
+    finally:
+        conn.close()
+
+
+def main(n: int) -> None:
+    titles = [f"Software #{i}" for i in range(n)]
+    results: dict[str, float] = {}
+    notes: dict[str, str] = {}
+
+    with LicenseServer(setup_seconds=0.02, work_seconds=0.002) as srv:
+        host, port = srv.server_address[:2]
+
+        before = srv.stats["connections"]
+        with timed(f"fresh connection x{THREADS} threads", results):
+            with ThreadPoolExecutor(THREADS) as ex:
+                list(ex.map(lambda t: _fetch_fresh(host, port, t), titles))
+        notes[f"fresh connection x{THREADS} threads"] = f"{srv.stats['connections'] - before} conn"
+
+        for pool_size in (1, 4):
+            label = f"keep-alive pool={pool_size} x{THREADS} threads"
+            transport = HttpTransport(host, port, pool_size=pool_size)
+            with timed(label, results):
+                with ThreadPoolExecutor(THREADS) as ex:
+                    list(ex.map(transport.fetch, titles))
+            m = transport.metrics()
+            notes[label] = f"{m.connections_opened} conn, p95 {m.p95_latency_ms:.1f} ms"
+            transport.close()
+
+        transport = HttpTransport(host, port, pool_size=1, batch_size=64)
+        with timed("batch (fetch_many, 64 per request)", results):
+            transport.fetch_many(titles)
+        m = transport.metrics()
+        notes["batch (fetch_many, 64 per request)"] = f"{m.connections_opened} conn, {m.requests} requests"
+        transport.close()
+
+    print(f"modules: {n} (server: 20 ms per new connection, 2 ms per request)")
+    for label, sec in results.items():
+        print(f"  {label:<38} {sec * 1000:9.1f} ms  {notes[label]}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100)
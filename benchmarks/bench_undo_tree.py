@@ -0,0 +1,119 @@
+"""
+Дерево истории (Caretaker(branching=True)): переходы по веткам и восстановление
+полной пересборкой каталога (как раньше restore_from_memento) против правки на месте
+(SyncCatalog.patch: трогаются только отличающиеся позиции, индексы — точечно).
+
+    python -m benchmarks.bench_undo_tree [n_models] [branches] [depth]
+"""
+from __future__ import annotations
+import random
+import sys
+from dataclasses import replace
+
+from patterns.composite import (
+    Catalog,
+    CatalogSearchIndex,
+    CatalogVersions,
+    LazyModel,
+    SpecRangeIndex,
+    SyncCatalog,
+    model_to_memento,
+)
+from patterns.memento import Caretaker, EquipmentMemento
+from patterns.observer import CatalogEventSource, EventBus
+from benchmarks.common import make_memento, timed
+
+
+def _edited(mem: EquipmentMemento, rnd: random.Random, edits: int = 3) -> EquipmentMemento:
+    # правка флагов в одном типе, иногда — новая модель в конце (create/clone)
+    catalog = dict(mem.catalog)
+    eq_type = rnd.choice(sorted(catalog))
+    models = list(catalog[eq_type])
+    for _ in range(edits):
+        i = rnd.randrange(len(models))
+        models[i] = replace(models[i], use_online=not models[i].use_online)
+    if rnd.random() < 0.3:
+        models.append(replace(models[-1], name=models[-1].name + " (Копия)"))
+    catalog[eq_type] = tuple(models)
+    return EquipmentMemento(catalog=catalog, current_ref=(eq_type, len(models) - 1))
+
+
+def _history(n: int, branches: int, depth: int) -> Caretaker:
+    """Ствол из depth snapshot'ов и branches веток по depth snapshot'ов от его середины."""
+    rnd = random.Random(7)
+    caretaker = Caretaker(branching=True)
+    mem = make_memento(n)
+    caretaker.backup(mem)
+    for _ in range(depth):
+        mem = _edited(mem, rnd)
+        caretaker.backup(mem)
+    for _ in range(branches):
+        caretaker.jump(depth // 2)
+        mem = caretaker.get(depth // 2)
+        for _ in range(depth):
+            mem = _edited(mem, rnd)
+            caretaker.backup(mem)
+    return caretaker
+
+
+def _catalog(bus: EventBus) -> SyncCatalog:
+    return SyncCatalog(Catalog(indexes=[CatalogSearchIndex(), SpecRangeIndex(), CatalogEventSource(bus)]))
+
+
+def _full_restore(sync: SyncCatalog, mem: EquipmentMemento) -> None:
+    catalog = Catalog(indexes=sync.catalog.indexes)
+    for eq_type, snaps in mem.catalog.items():
+        catalog[eq_type] = [LazyModel(s, None) for s in snaps]
+    sync.replace(catalog)
+    sync.search("дорожка")  # индекс строится лениво — первый запрос после restore
+
+
+def main(n: int, branches: int, depth: int) -> None:
+    results: dict[str, float] = {}
+    with timed("build tree history", results):
+        caretaker = _history(n, branches, depth)
+
+    # маршрут: по ветке вниз, переход к соседней ветке, прыжки в случайные узлы
+    rnd = random.Random(11)
+    route = [rnd.randrange(len(caretaker)) for _ in range(40)]
+
+    bus = EventBus(lambda callback: None)
+    sync = _catalog(bus)
+    _full_restore(sync, caretaker.get(0))
+    with timed("jump + full rebuild", results):
+        for node in route:
+            _full_restore(sync, caretaker.jump(node))
+
+    bus = EventBus(lambda callback: None)
+    sync = _catalog(bus)
+    _full_restore(sync, caretaker.get(0))
+    versions = CatalogVersions(model_to_memento)
+    touched = 0
+    with timed("jump + patch in place", results):
+        for node in route:
+            touched += sync.patch(sync.publish(versions), caretaker.jump(node), None)
+            sync.search("дорожка")
+    bus.flush()
+
+    caretaker.jump(depth // 2 + 1)
+    with timed("switch_branch x1000 (no restore)", results):
+        for i in range(1000):
+            caretaker.switch_branch(1 if i % 2 == 0 else -1)
+    with timed("tree_rows + describe (list)", results):
+        rows = [(node, lane, caretaker.describe(node)) for node, lane in caretaker.tree_rows()]
+
+    stored = sum(caretaker.describe(i).models_count for i in range(len(caretaker)))
+    print(f"models: {n}, snapshots: {len(caretaker)} ({branches} branches x {depth}), list rows: {len(rows)}")
+    print(f"  model slots in history: {stored}, distinct pooled memento: {caretaker.pool_size()}")
+    print(f"  jumps: {len(route)}, models patched: {touched}")
+    for label, sec in results.items():
+        print(f"  {label:<34} {sec * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(
+        int(args[0]) if len(args) > 0 else 50_000,
+        int(args[1]) if len(args) > 1 else 8,
+        int(args[2]) if len(args) > 2 else 20,
+    )
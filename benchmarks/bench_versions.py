@@ -0,0 +1,82 @@
+"""
+Версии каталога (CatalogVersions): публикация после правок против полной пересборки
+memento, и фоновый читатель, который держит версию, пока редактор меняет каталог.
+
+    python -m benchmarks.bench_versions [n_models]
+"""
+from __future__ import annotations
+import sys
+import threading
+
+from patterns.composite import Catalog, CatalogVersions, LazyModel, model_from_memento, model_to_memento
+from patterns.factory import FactoryRegistry
+from benchmarks.common import FACTORIES, make_memento, timed
+
+
+MATERIALIZED = 0.2  # доля собранных моделей (остальные — LazyModel)
+
+
+def _catalog(n: int):
+    registry = FactoryRegistry()
+    for key, factory in FACTORIES.items():
+        registry.register(key, factory)
+    build = lambda s: model_from_memento(s, registry)  # noqa: E731
+    catalog = Catalog()
+    for eq_type, snaps in make_memento(n).catalog.items():
+        catalog[eq_type] = [LazyModel(s, build) for s in snaps]
+        for i in range(int(len(snaps) * MATERIALIZED)):
+            catalog.materialize(eq_type, i)
+    return catalog, build
+
+
+def main(n: int) -> None:
+    catalog, build = _catalog(n)
+    versions = CatalogVersions(model_to_memento)
+    first_type = next(iter(catalog))
+    results: dict[str, float] = {}
+
+    with timed("full memento rebuild", results):
+        {t: tuple(model_to_memento(m) for m in models) for t, models in catalog.items()}
+    with timed("publish: first version", results):
+        versions.publish(catalog)
+    with timed("publish: nothing changed", results):
+        versions.publish(catalog)
+    catalog[first_type][0].name = "edited"
+    with timed("publish: one model edited", results):
+        versions.publish(catalog)
+    template = catalog[first_type][-1].memento
+    catalog.add(build(template))
+    with timed("publish: one model added", results):
+        versions.publish(catalog)
+
+    print(f"models: {n} ({MATERIALIZED:.0%} materialized)")
+    for label, sec in results.items():
+        print(f"  {label:<28} {sec * 1000:9.1f} ms")
+
+    # читатель в фоне держит версию, пока писатель правит и публикует новые
+    held = versions.current()
+    counts: list[int] = []
+    stop = threading.Event()
+
+    def reader() -> None:
+        while not stop.is_set():
+            counts.append(sum(1 for _ in held.models()))
+
+    t = threading.Thread(target=reader)
+    t.start()
+    try:
+        for i in range(20):
+            catalog[first_type][i].use_online = not catalog[first_type][i].use_online
+            catalog.add(build(template))
+            versions.publish(catalog)
+    finally:
+        stop.set()
+        t.join()
+    print(
+        f"  reader held v{held.version}: {len(counts)} passes, counts seen {sorted(set(counts))}; "
+        f"head v{versions.current().version}, live versions {versions.live_versions()}"
+    )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
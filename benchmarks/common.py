@@ -0,0 +1,63 @@
+from __future__ import annotations
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+from patterns.factory import BikeFactory, TreadmillFactory, RowingMachineFactory, GyriFactory
+from patterns.memento import EquipmentMemento, ModelMemento
+
+
+FACTORIES = {
+    "bike": BikeFactory(),
+    "treadmill": TreadmillFactory(),
+    "rowing": RowingMachineFactory(),
+    "gyri": GyriFactory(),
+}
+
+
+def make_model_memento(key: str, i: int) -> ModelMemento:
+    eq = FACTORIES[key].create()
+    return ModelMemento(
+        factory_key=key,
+        equipment_type=eq.equipment_type,
+        name=f"{eq.name} #{i}",
+        specs=dict(eq.specs),
+        functions=list(eq.functions),
+        base_software_title=eq.software.name(),
+        use_online=i % 2 == 0,
+        use_analytics=i % 3 == 0,
+        use_proxy=i % 5 == 0,
+        license_key="VALID-KEY" if i % 5 == 0 else "",
+    )
+
+
+def make_memento(n: int) -> EquipmentMemento:
+    """Синтетический snapshot из n моделей, равномерно по всем фабрикам."""
+    # один "шаблон" на ключ: фабрика вызывается 4 раза, а не n
+    templates = {key: make_model_memento(key, 0) for key in FACTORIES}
+    keys = list(FACTORIES)
+    catalog: dict[str, list[ModelMemento]] = {}
+    for i in range(n):
+        t = templates[keys[i % len(keys)]]
+        catalog.setdefault(t.equipment_type, []).append(
+            ModelMemento(
+                factory_key=t.factory_key,
+                equipment_type=t.equipment_type,
+                name=f"{t.name.split(' #')[0]} #{i}",
+                specs=t.specs,  # кортежи неизменяемые — общие для всех копий
+                functions=t.functions,
+                base_software_title=t.base_software_title,
+                use_online=i % 2 == 0,
+                use_analytics=i % 3 == 0,
+                use_proxy=i % 5 == 0,
+                license_key="VALID-KEY" if i % 5 == 0 else "",
+            )
+        )
+    return EquipmentMemento(catalog=catalog, current_ref=None)
+
+
+@contextmanager
+def timed(label: str, results: dict) -> Iterator[None]:
+    start = time.perf_counter()
+    yield
+    results[label] = time.perf_counter() - start
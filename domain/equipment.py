@@ -1,7 +1,8 @@
 from __future__ import annotations
 from dataclasses import dataclass, field
-from typing import List, Protocol
+from typing import Any, Dict, Iterator, List, Optional, Protocol, Sequence, Tuple
 from abc import ABC, abstractmethod
+from itertools import islice
 import copy
 
 class ISoftware(Protocol):
@@ -20,6 +21,36 @@ class BaseSoftware:
         return "Базовое ПО готово к работе."
 
 
+# Шаг сборки — компактный кортеж (операция, *аргументы); текст рендерится по требованию
+BuildStep = Tuple[Any, ...]
+
+_STEP_TEXT = {
+    "reset": lambda: "reset() -> создан пустой EquipmentModel",
+    "set_name": lambda name: f"set_name({name})",
+    "set_type": lambda t: f"set_type({t})",
+    "add_spec": lambda k, v: f"add_spec({k}={v})",
+    "add_function": lambda f: f"add_function({f})",
+    "set_software": lambda title: f"set_software({title})",
+    "build": lambda: "build() -> объект готов",
+    "text": lambda line: line,
+}
+
+
+# пул одинаковых логов сборки: модели одного рецепта делят один кортеж
+_STEPS_POOL: Dict[Tuple[BuildStep, ...], Tuple[BuildStep, ...]] = {}
+
+
+def intern_build_steps(steps: Tuple[BuildStep, ...]) -> Tuple[BuildStep, ...]:
+    try:
+        return _STEPS_POOL.setdefault(steps, steps)
+    except TypeError:  # нехешируемое значение spec — без интернирования
+        return steps
+
+
+def render_build_log(steps: Tuple[BuildStep, ...]) -> List[str]:
+    return [_STEP_TEXT[op](*args) for op, *args in steps]
+
+
 class Equipment(ABC):
     name: str = ""
 
@@ -34,14 +65,38 @@ class EquipmentType(Equipment):
     models: List["EquipmentModel"] = field(default_factory=list)  # ✅ в кавычках
 
     def summary(self) -> str:
-        result = "-" * 8 + f"\nТип тренажера: {self.name}\n"
+        return "".join(self.iter_summary())
+
+    def iter_summary(self, offset: int = 0, limit: Optional[int] = None) -> Iterator[str]:
+        """Отчёт по кускам (по модели на кусок); offset/limit — для постраничного вывода."""
+        yield "-" * 8 + f"\nТип тренажера: {self.name}\n"
         if not self.models:
-            result += "Модели отсутствуют\n"
+            yield "Модели отсутствуют\n"
         else:
-            for model in self.models:
-                result += model.summary() + "\n"
-        result += "-" * 8 + "\n"
-        return result
+            stop = None if limit is None else offset + limit
+            for model in islice(self.models, offset, stop):
+                yield model.summary() + "\n"
+        yield "-" * 8 + "\n"
+
+
+def format_summary(
+    equipment_type: str, name: str, software_name: str, specs: dict, functions: Sequence[str], operation: str
+) -> str:
+    """Текст EquipmentModel.summary() (его же собирает LazyModel без материализации)."""
+    funcs = ", ".join(functions) if functions else "—"
+    specs_lines = "\n".join([f"- {k}: {v}" for k, v in specs.items()]) if specs else "—"
+    return (
+        f"Тип: {equipment_type}\n"
+        f"Модель: {name}\n"
+        f"ПО: {software_name}\n\n"
+        f"Спецификации:\n{specs_lines}\n\n"
+        f"Функции:\n{funcs}\n\n"
+        f"ПО выполняет:\n{operation}"
+    )
+
+
+# атрибуты-свойства EquipmentModel: их присваивание должно идти через setter
+_PROPERTIES = frozenset({"build_log"})
 
 
 @dataclass
@@ -59,19 +114,39 @@ class EquipmentModel(Equipment):
     use_analytics: bool = False
     use_proxy: bool = False
     license_key: str = ""
+    # создана через clone() (Prototype): по флагу, а не по имени — имя можно поменять
+    is_clone: bool = False
+
+    # общий (интернированный) кортеж шагов: одинаковые рецепты делят один объект
+    build_steps: Tuple[BuildStep, ...] = ()
+
+    @property
+    def build_log(self) -> List[str]:
+        return render_build_log(self.build_steps)
+
+    @build_log.setter
+    def build_log(self, lines: List[str]) -> None:
+        self.build_steps = tuple(("text", line) for line in lines)
+
+    # счётчик изменений: растёт при любом присваивании атрибута (по нему сверяется кеш отрисовки)
+    version: int = field(default=0, compare=False, repr=False)
+
+    def __setattr__(self, name: str, value) -> None:
+        d = self.__dict__
+        if name in _PROPERTIES:
+            object.__setattr__(self, name, value)  # build_log: setter сам запишет build_steps
+            return
+        d[name] = value
+        if name != "version":
+            d["version"] = d.get("version", 0) + 1
 
-    build_log: List[str] = field(default_factory=list)
+    def touch(self) -> None:
+        """Отметить изменение "на месте" (например, specs[key] = ...)."""
+        self.version += 1
 
     def summary(self) -> str:
-        funcs = ", ".join(self.functions) if self.functions else "—"
-        specs_lines = "\n".join([f"- {k}: {v}" for k, v in self.specs.items()]) if self.specs else "—"
-        return (
-            f"Тип: {self.equipment_type}\n"
-            f"Модель: {self.name}\n"
-            f"ПО: {self.software.name()}\n\n"
-            f"Спецификации:\n{specs_lines}\n\n"
-            f"Функции:\n{funcs}\n\n"
-            f"ПО выполняет:\n{self.software.operation()}"
+        return format_summary(
+            self.equipment_type, self.name, self.software.name(), self.specs, self.functions, self.software.operation()
         )
     
     # При использовании нужно добавить эту модель в тип.models.append(экземпляр клонирования)
@@ -81,4 +156,5 @@ class EquipmentModel(Equipment):
         cloned = copy.deepcopy(self)
 
         cloned.name = f"{self.name} (Копия)"
+        cloned.is_clone = True
         return cloned
@@ -1,3 +1,12 @@
 from .equipment_builder import EquipmentBuilder, ConcreteEquipmentBuilder, Director
+from .recipes import EquipmentRecipe, RecipeRegistry, compile_recipe, default_recipes
 
-__all__ = ["EquipmentBuilder", "ConcreteEquipmentBuilder", "Director"]
+__all__ = [
+    "EquipmentBuilder",
+    "ConcreteEquipmentBuilder",
+    "Director",
+    "EquipmentRecipe",
+    "RecipeRegistry",
+    "compile_recipe",
+    "default_recipes",
+]
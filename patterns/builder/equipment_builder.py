@@ -1,6 +1,7 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
-from domain.equipment import EquipmentModel, BaseSoftware, EquipmentType
+from domain.equipment import EquipmentModel, BaseSoftware, EquipmentType, BuildStep, intern_build_steps
+from patterns.builder.recipes import NOT_SET, RecipeRegistry, default_recipes, spec_value
 
 
 class EquipmentBuilder(ABC):
@@ -21,13 +22,23 @@ class EquipmentBuilder(ABC):
 
 
 class ConcreteEquipmentBuilder(EquipmentBuilder):
-    def __init__(self) -> None:
+    """
+    Лог сборки пишется как структурированные шаги (кортежи), текст строится
+    только при чтении EquipmentModel.build_log; пишется только при record_log=True.
+    """
+    def __init__(self, record_log: bool = False) -> None:
         self._equipment: EquipmentModel | None = None
-        self._log: list[str] = []
+        self._record_log = record_log
+        self._log: list[BuildStep] = []
         self.reset()
 
+    def _step(self, *step) -> None:
+        if self._record_log:
+            self._log.append(step)
+
     def reset(self) -> None:
-        self._log = ["reset() -> создан пустой EquipmentModel"]
+        self._log = []
+        self._step("reset")
         self._equipment = EquipmentModel(
             name="(not set)",
             equipment_type="(not set)",
@@ -39,81 +50,69 @@ class ConcreteEquipmentBuilder(EquipmentBuilder):
     def set_name(self, name: str) -> None:
         assert self._equipment is not None
         self._equipment.name = name
-        self._log.append(f"set_name({name})")
+        self._step("set_name", name)
 
     def set_type(self, equipment_type: str) -> None:
         assert self._equipment is not None
         self._equipment.equipment_type = equipment_type
-        self._log.append(f"set_type({equipment_type})")
+        self._step("set_type", equipment_type)
 
     def add_spec(self, key: str, value) -> None:
         assert self._equipment is not None
         self._equipment.specs[key] = value
-        self._log.append(f"add_spec({key}={value})")
+        self._step("add_spec", key, value)
 
     def add_function(self, func: str) -> None:
         assert self._equipment is not None
         self._equipment.functions.append(func)
-        self._log.append(f"add_function({func})")
+        self._step("add_function", func)
 
     def set_software(self, title: str) -> None:
         assert self._equipment is not None
         self._equipment.software = BaseSoftware(title)
-        self._log.append(f"set_software({title})")
+        self._step("set_software", title)
 
     def build(self) -> EquipmentModel:
         assert self._equipment is not None
         result = self._equipment
-        result.build_log = list(self._log) + ["build() -> объект готов"]
+        self._step("build")
+        result.build_steps = intern_build_steps(tuple(self._log)) if self._record_log else ()
         self.reset()
         result.base_software = result.software
         return result
 
 
 class Director:
-    def __init__(self, builder: EquipmentBuilder) -> None:
+    """
+    Director выполняет рецепты (patterns/builder/recipes.json) шаг за шагом через Builder.
+    Для массового создания без пошагового лога есть скомпилированные рецепты
+    (RecipeRegistry.constructor).
+    """
+    def __init__(self, builder: EquipmentBuilder, recipes: RecipeRegistry | None = None) -> None:
         self._builder = builder
+        self._recipes = recipes
 
-    def make_bike(self) -> EquipmentModel:
+    def make(self, key: str) -> EquipmentModel:
+        recipe = (self._recipes or default_recipes()).get(key)
         self._builder.reset()
-        self._builder.set_type("Велотренажёр")  # это будет equipment_type
-        self._builder.set_name("Bike Model X")  # добавь метод set_name
-        self._builder.add_spec("max_resistance", 20)
-        self._builder.add_spec("has_pulse_sensor", True)
-        self._builder.add_function("Тренировка по пульсу")
-        self._builder.add_function("Интервалы")
-        self._builder.set_software("Bike Software")
+        self._builder.set_type(recipe.equipment_type)  # это будет equipment_type
+        if recipe.name != NOT_SET:
+            self._builder.set_name(recipe.name)
+        for spec_key, value in recipe.specs:
+            self._builder.add_spec(spec_key, spec_value(value))
+        for func in recipe.functions:
+            self._builder.add_function(func)
+        self._builder.set_software(recipe.software)
         return self._builder.build()
 
+    def make_bike(self) -> EquipmentModel:
+        return self.make("bike")
+
     def make_gyri(self) -> EquipmentModel:
-        self._builder.reset()
-        self._builder.set_type("Гиря")  # это будет equipment_type
-        self._builder.set_name("гиря 16кг")  # добавь метод set_name
-        self._builder.add_spec("max_resistance", 20)
-        self._builder.add_spec("has_pulse_sensor", True)
-        self._builder.add_function("Тренировка по пульсу")
-        self._builder.add_function("Интервалы")
-        self._builder.set_software("Gyri Software")
-        return self._builder.build()
+        return self.make("gyri")
 
     def make_treadmill(self) -> EquipmentModel:
-        self._builder.reset()
-        self._builder.set_type("Беговая дорожка")
-        self._builder.add_spec("max_speed_kmh", 18)
-        self._builder.add_spec("incline_levels", 12)
-        self._builder.add_function("Бег")
-        self._builder.add_function("Ходьба")
-        self._builder.add_function("Горка")
-        self._builder.set_software("Treadmill Software")
-        return self._builder.build()
+        return self.make("treadmill")
 
     def make_rowing(self) -> EquipmentModel:
-        self._builder.reset()
-        self._builder.set_type("Гребной тренажёр")
-        self._builder.add_spec("max_power_watts", 600)
-        self._builder.add_spec("resistance_system", "magnetic")
-        self._builder.add_function("Гребля")
-        self._builder.add_function("Кардио")
-        self._builder.add_function("Интервалы")
-        self._builder.set_software("Rowing Software")
-        return self._builder.build()
+        return self.make("rowing")
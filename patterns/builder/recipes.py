@@ -0,0 +1,142 @@
+from __future__ import annotations
+import json
+import os
+from copy import deepcopy
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from domain.equipment import EquipmentModel, BaseSoftware, BuildStep, intern_build_steps, render_build_log
+
+
+DEFAULT_RECIPES_PATH = os.path.join(os.path.dirname(__file__), "recipes.json")
+# дополнительный файл рецептов: новые типы тренажёров без изменения кода
+RECIPES_ENV = "MEGA_PATTERNS_RECIPES"
+
+NOT_SET = "(not set)"
+
+
+@dataclass(frozen=True)
+class EquipmentRecipe:
+    """Рецепт тренажёра: те же шаги, что Director выполнял вручную, но в виде данных."""
+    key: str
+    equipment_type: str
+    software: str
+    name: str = NOT_SET
+    specs: Tuple[Tuple[str, Any], ...] = ()
+    functions: Tuple[str, ...] = ()
+
+    @classmethod
+    def from_dict(cls, key: str, data: Dict[str, Any]) -> EquipmentRecipe:
+        try:
+            return cls(
+                key=key,
+                equipment_type=data["equipment_type"],
+                software=data["software"],
+                name=data.get("name", NOT_SET),
+                specs=tuple(data.get("specs", {}).items()),
+                functions=tuple(data.get("functions", ())),
+            )
+        except KeyError as e:
+            raise ValueError(f"Recipe '{key}' is missing field {e}") from None
+
+    def build_steps(self) -> Tuple[BuildStep, ...]:
+        """Те же шаги, что записывает ConcreteEquipmentBuilder при выполнении рецепта."""
+        steps: List[BuildStep] = [("reset",), ("set_type", self.equipment_type)]
+        if self.name != NOT_SET:
+            steps.append(("set_name", self.name))
+        steps.extend(("add_spec", k, v) for k, v in self.specs)
+        steps.extend(("add_function", f) for f in self.functions)
+        steps.append(("set_software", self.software))
+        steps.append(("build",))
+        return tuple(steps)
+
+    def build_log(self) -> List[str]:
+        return render_build_log(self.build_steps())
+
+
+def spec_value(value: Any) -> Any:
+    """Значение spec для новой модели: вложенные list/dict из JSON — своя копия у каждой модели."""
+    return deepcopy(value) if isinstance(value, (list, dict)) else value
+
+
+def compile_recipe(recipe: EquipmentRecipe, with_log: bool = False) -> Callable[[], EquipmentModel]:
+    """
+    Компилирует рецепт в конструктор, который заполняет EquipmentModel за один шаг.
+    Всё, что не зависит от конкретного экземпляра (specs, лог), считается один раз;
+    with_log=True — модели получают кортеж шагов сборки, общий для всех моделей рецепта.
+    """
+    name = recipe.name
+    equipment_type = recipe.equipment_type
+    title = recipe.software
+    specs = dict(recipe.specs)
+    # поверхностная копия делила бы вложенные list/dict между всеми моделями рецепта
+    nested = [k for k, v in specs.items() if isinstance(v, (list, dict))]
+    functions = list(recipe.functions)
+    steps = intern_build_steps(recipe.build_steps()) if with_log else ()
+
+    def construct() -> EquipmentModel:
+        software = BaseSoftware(title)
+        own_specs = specs.copy()
+        for k in nested:
+            own_specs[k] = deepcopy(specs[k])
+        eq = EquipmentModel(
+            name=name,
+            equipment_type=equipment_type,
+            specs=own_specs,
+            functions=functions.copy(),
+            software=software,
+            build_steps=steps,
+        )
+        eq.base_software = software
+        return eq
+
+    return construct
+
+
+class RecipeRegistry:
+    """Реестр рецептов; каждый рецепт компилируется один раз (на вариант с логом и без) при первом обращении."""
+    def __init__(self) -> None:
+        self._recipes: Dict[str, EquipmentRecipe] = {}
+        self._compiled: Dict[Tuple[str, bool], Callable[[], EquipmentModel]] = {}
+
+    def register(self, recipe: EquipmentRecipe) -> None:
+        self._recipes[recipe.key] = recipe
+        self._compiled.pop((recipe.key, False), None)
+        self._compiled.pop((recipe.key, True), None)
+
+    def load(self, path: str) -> None:
+        with open(path, encoding="utf-8") as fp:
+            data = json.load(fp)
+        for key, spec in data.items():
+            self.register(EquipmentRecipe.from_dict(key, spec))
+
+    def keys(self) -> List[str]:
+        return list(self._recipes.keys())
+
+    def get(self, key: str) -> EquipmentRecipe:
+        return self._recipes[key]
+
+    def constructor(self, key: str, with_log: bool = False) -> Callable[[], EquipmentModel]:
+        fn = self._compiled.get((key, with_log))
+        if fn is None:
+            fn = self._compiled[(key, with_log)] = compile_recipe(self._recipes[key], with_log)
+        return fn
+
+    def create(self, key: str, with_log: bool = False) -> EquipmentModel:
+        return self.constructor(key, with_log)()
+
+
+_default: Optional[RecipeRegistry] = None
+
+
+def default_recipes() -> RecipeRegistry:
+    """Рецепты из recipes.json пакета (+ файл из MEGA_PATTERNS_RECIPES, если задан)."""
+    global _default
+    if _default is None:
+        registry = RecipeRegistry()
+        registry.load(DEFAULT_RECIPES_PATH)
+        extra = os.environ.get(RECIPES_ENV)
+        if extra:
+            registry.load(extra)
+        _default = registry
+    return _default
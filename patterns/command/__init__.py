@@ -3,9 +3,13 @@ from .commands import (
     AppContext,
     ApplyDecoratorsCommand,
     ApplyProxyCommand,
+    BulkApplyConfigCommand,
     SaveSnapshotCommand,
     UndoCommand,
     RedoCommand,
+    SwitchBranchCommand,
+    JumpToSnapshotCommand,
+    RunOperationCommand,
 )
 from .invoker import Invoker
 
@@ -14,8 +18,48 @@ __all__ = [
     "AppContext",
     "ApplyDecoratorsCommand",
     "ApplyProxyCommand",
+    "BulkApplyConfigCommand",
     "SaveSnapshotCommand",
     "UndoCommand",
     "RedoCommand",
+    "SwitchBranchCommand",
+    "JumpToSnapshotCommand",
+    "RunOperationCommand",
     "Invoker",
+    "CommandQueue",
+    "QueueMetrics",
+    "BatchOperationRunner",
+    "BatchReport",
+    "OperationResult",
+    "run_batch",
+    "CommandJournal",
+    "JournalMetrics",
+    "JournalRecord",
+    "JournalScan",
+    "scan_journal",
+    "model_fields",
+    "model_from_fields",
+    "JournalState",
+    "Recovery",
+    "recover",
 ]
+
+
+def __getattr__(name: str):
+    # очередь (threading/queue) подгружается при первом использовании
+    if name in ("CommandQueue", "QueueMetrics"):
+        from . import command_queue
+        return getattr(command_queue, name)
+    # asyncio-пакетный запуск operation() — тоже по требованию
+    if name in ("BatchOperationRunner", "BatchReport", "OperationResult", "run_batch"):
+        from . import batch_runner
+        return getattr(batch_runner, name)
+    # журнал команд и восстановление после сбоя — только если журнал включён
+    if name in ("CommandJournal", "JournalMetrics", "JournalRecord", "JournalScan", "scan_journal",
+                "model_fields", "model_from_fields"):
+        from . import journal
+        return getattr(journal, name)
+    if name in ("JournalState", "Recovery", "recover"):
+        from . import recovery
+        return getattr(recovery, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,244 @@
+from __future__ import annotations
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional, Sequence, Tuple, Union
+
+from domain.equipment import ISoftware
+from patterns.command.command_queue import Scheduler
+
+
+# (подпись модели для отчёта, её цепочка ПО)
+BatchItem = Tuple[str, ISoftware]
+ProgressCallback = Callable[[int, int, "OperationResult"], None]
+ReportCallback = Callable[["BatchReport"], None]
+
+DEFAULT_CONCURRENCY = 8
+
+
+@dataclass(frozen=True)
+class OperationResult:
+    label: str
+    software_name: str
+    result: str
+    error: Optional[str]
+    seconds: float
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _percentile(sorted_values: Sequence[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, max(0, round(q * (len(sorted_values) - 1))))
+    return sorted_values[k]
+
+
+@dataclass(frozen=True)
+class BatchReport:
+    results: Tuple[OperationResult, ...]
+    total: int
+    concurrency: int
+    wall_seconds: float
+    cancelled: bool = False
+
+    @property
+    def failed(self) -> int:
+        return sum(1 for r in self.results if not r.ok)
+
+    def latency_ms(self, q: float) -> float:
+        return _percentile(sorted(r.seconds for r in self.results), q) * 1000
+
+    def to_text(self, slowest: int = 10) -> str:
+        done = len(self.results)
+        busy = sum(r.seconds for r in self.results)
+        lines = [
+            f"Batch operation(): {done}/{self.total} models"
+            + (" (cancelled)" if self.cancelled else ""),
+            f"concurrency={self.concurrency}  wall={self.wall_seconds:.2f} s  "
+            f"sum of latencies={busy:.2f} s  failed={self.failed}",
+            f"latency p50={self.latency_ms(0.5):.0f} ms  p95={self.latency_ms(0.95):.0f} ms  "
+            f"max={self.latency_ms(1.0):.0f} ms",
+        ]
+        errors = [r for r in self.results if not r.ok]
+        if errors:
+            lines.append("")
+            lines.append("Ошибки:")
+            lines.extend(f"- {r.label}: {r.error}" for r in errors)
+        if slowest and self.results:
+            lines.append("")
+            lines.append(f"Самые медленные ({min(slowest, done)}):")
+            for r in sorted(self.results, key=lambda r: r.seconds, reverse=True)[:slowest]:
+                lines.append(f"- {r.seconds * 1000:7.0f} ms  {r.label} [{r.software_name}]: {r.result or r.error}")
+        lines.append("")
+        lines.append("Все модели:")
+        lines.extend(
+            f"- {r.seconds * 1000:7.0f} ms  {r.label}: {r.result if r.ok else 'ERROR ' + str(r.error)}"
+            for r in self.results
+        )
+        return "\n".join(lines) + "\n"
+
+
+def _call(software: ISoftware) -> Tuple[str, Optional[str], float]:
+    # выполняется в потоке пула: operation() может блокировать (Proxy грузит реальный модуль)
+    t0 = time.perf_counter()
+    try:
+        return software.operation(), None, time.perf_counter() - t0
+    except Exception as e:
+        return "", f"{type(e).__name__}: {e}", time.perf_counter() - t0
+
+
+async def run_operations(
+    items: Sequence[BatchItem],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    on_result: Optional[ProgressCallback] = None,
+    should_stop: Optional[Callable[[], bool]] = None,
+) -> BatchReport:
+    """
+    Вызывает operation() для всех items, не больше concurrency одновременно.
+    Блокирующие вызовы уходят в потоки (asyncio.to_thread), сам цикл событий свободен.
+    Результаты в отчёте — в порядке items; latency считается от входа в operation().
+    should_stop() проверяется перед каждым запуском: уже начатые вызовы доводятся до конца.
+    """
+    concurrency = max(1, concurrency)
+    sem = asyncio.Semaphore(concurrency)
+    slots: List[Optional[OperationResult]] = [None] * len(items)
+    done = 0
+    stopped = False
+    t0 = time.perf_counter()
+
+    async def one(i: int, label: str, software: ISoftware) -> None:
+        nonlocal done, stopped
+        async with sem:
+            if should_stop is not None and should_stop():
+                stopped = True
+                return
+            try:
+                name = software.name()
+            except Exception:
+                name = type(software).__name__
+            result, error, seconds = await asyncio.to_thread(_call, software)
+        slots[i] = r = OperationResult(label=label, software_name=name, result=result, error=error, seconds=seconds)
+        done += 1
+        if on_result is not None:
+            on_result(done, len(items), r)
+
+    await asyncio.gather(*(one(i, label, sw) for i, (label, sw) in enumerate(items)))
+    return BatchReport(
+        results=tuple(r for r in slots if r is not None),
+        total=len(items),
+        concurrency=concurrency,
+        wall_seconds=time.perf_counter() - t0,
+        cancelled=stopped,
+    )
+
+
+def run_batch(items: Sequence[BatchItem], concurrency: int = DEFAULT_CONCURRENCY, **kwargs: Any) -> BatchReport:
+    """Синхронная обёртка: свой цикл событий и пул потоков размером concurrency."""
+    async def main() -> BatchReport:
+        # to_thread использует пул по умолчанию: подгоняем его под лимит семафора
+        loop = asyncio.get_running_loop()
+        loop.set_default_executor(
+            ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="batch-operation")
+        )
+        return await run_operations(items, concurrency, **kwargs)
+
+    return asyncio.run(main())
+
+
+class BatchOperationRunner:
+    """
+    Запускает run_operations в отдельном потоке со своим циклом событий,
+    а прогресс и итоговый отчёт отдаёт в UI-поток через after() — mainloop не блокируется.
+    Одновременно выполняется не больше одного пакета.
+    """
+    def __init__(self, after: Scheduler, poll_ms: int = 50) -> None:
+        self._after = after
+        self._poll_ms = poll_ms
+        self._events: "queue.SimpleQueue[tuple]" = queue.SimpleQueue()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._on_progress: Optional[ProgressCallback] = None
+        self._on_done: Optional[ReportCallback] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(
+        self,
+        items: Union[Sequence[BatchItem], Callable[[], Sequence[BatchItem]]],
+        concurrency: int = DEFAULT_CONCURRENCY,
+        on_progress: Optional[ProgressCallback] = None,
+        on_done: Optional[ReportCallback] = None,
+        prepare: Optional[Callable[[], Any]] = None,
+    ) -> None:
+        """
+        items — список или функция, которая строит его в фоновом потоке (например,
+        собирает ленивые модели). prepare() выполняется там же до первого operation()
+        (например, пакетная загрузка).
+        """
+        if self._thread is not None:
+            raise RuntimeError("Batch is already running")
+        self._stop.clear()
+        self._on_progress = on_progress
+        self._on_done = on_done
+        if not callable(items):
+            items = list(items)
+
+        def progress(done: int, total: int, r: OperationResult) -> None:
+            self._events.put(("progress", done, total, r))
+
+        def work() -> None:
+            try:
+                batch = items() if callable(items) else items
+                if prepare is not None:
+                    prepare()
+                report = run_batch(batch, concurrency, on_result=progress, should_stop=self._stop.is_set)
+                self._events.put(("done", report))
+            except BaseException as e:
+                self._events.put(("error", e))
+
+        self._thread = threading.Thread(target=work, name="batch-operation-loop", daemon=True)
+        self._thread.start()
+        self._after(self._poll_ms, self._poll)
+
+    def cancel(self) -> None:
+        self._stop.set()
+
+    # -----------------------------
+    # UI thread
+    # -----------------------------
+    def _poll(self) -> None:
+        # за один тик — только последний прогресс: при сотнях быстрых моделей
+        # UI не должен перерисовываться на каждую
+        last = None
+        final = None
+        while True:
+            try:
+                event = self._events.get_nowait()
+            except queue.Empty:
+                break
+            if event[0] == "progress":
+                last = event
+            else:
+                final = event
+                break
+
+        if last is not None and self._on_progress is not None:
+            self._on_progress(last[1], last[2], last[3])
+
+        if final is None:
+            self._after(self._poll_ms, self._poll)
+            return
+
+        self._thread = None
+        if final[0] == "error":
+            raise final[1]
+        if self._on_done is not None:
+            self._on_done(final[1])
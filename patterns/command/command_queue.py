@@ -0,0 +1,169 @@
+from __future__ import annotations
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable, Optional
+
+from patterns.command.commands import Command
+
+
+# after(ms, callback) — как у tk.Tk.after
+Scheduler = Callable[[int, Callable[[], None]], Any]
+DoneCallback = Callable[[Optional[BaseException]], None]
+
+
+@dataclass
+class _Job:
+    cmd: Command
+    key: Optional[Hashable]
+    on_done: Optional[DoneCallback]
+    submitted_at: float
+    cancelled: bool = False
+    error: Optional[BaseException] = None
+
+
+@dataclass(frozen=True)
+class QueueMetrics:
+    depth: int
+    submitted: int
+    completed: int
+    cancelled: int
+    failed: int
+    avg_latency_ms: float
+    max_latency_ms: float
+    last_latency_ms: float
+
+
+@dataclass
+class _Stats:
+    submitted: int = 0
+    completed: int = 0
+    cancelled: int = 0
+    failed: int = 0
+    total_latency: float = 0.0
+    max_latency: float = 0.0
+    last_latency: float = 0.0
+
+
+class CommandQueue:
+    """
+    Очередь команд с фоновым worker-потоком.
+
+    - prepare() команды выполняется в worker-потоке (без UI);
+    - execute() всегда вызывается в UI-потоке: результаты забираются через after();
+    - команды выполняются строго в порядке submit (один worker => порядок сохраняется);
+    - новая команда с тем же key отменяет ещё не завершённую предыдущую
+      (например, быстрые повторные переключения флагов).
+    """
+    def __init__(self, after: Scheduler, poll_ms: int = 30) -> None:
+        self._after = after
+        self._poll_ms = poll_ms
+        self._pending: "queue.Queue[Optional[_Job]]" = queue.Queue()
+        self._done: "queue.Queue[_Job]" = queue.Queue()
+        self._latest: dict[Hashable, _Job] = {}
+        self._lock = threading.Lock()
+        self._depth = 0
+        self._stats = _Stats()
+        self._closed = False
+
+        self._worker = threading.Thread(target=self._run, name="command-queue", daemon=True)
+        self._worker.start()
+        self._after(self._poll_ms, self._poll)
+
+    def submit(self, cmd: Command, key: Optional[Hashable] = None, on_done: Optional[DoneCallback] = None) -> None:
+        job = _Job(cmd=cmd, key=key, on_done=on_done, submitted_at=time.perf_counter())
+        with self._lock:
+            if key is not None:
+                prev = self._latest.get(key)
+                if prev is not None and not prev.cancelled:
+                    prev.cancelled = True
+                    self._stats.cancelled += 1
+                self._latest[key] = job
+            self._depth += 1
+            self._stats.submitted += 1
+        self._pending.put(job)
+
+    def depth(self) -> int:
+        with self._lock:
+            return self._depth
+
+    def metrics(self) -> QueueMetrics:
+        with self._lock:
+            s = self._stats
+            done = s.completed + s.failed
+            avg = (s.total_latency / done) if done else 0.0
+            return QueueMetrics(
+                depth=self._depth,
+                submitted=s.submitted,
+                completed=s.completed,
+                cancelled=s.cancelled,
+                failed=s.failed,
+                avg_latency_ms=avg * 1000,
+                max_latency_ms=s.max_latency * 1000,
+                last_latency_ms=s.last_latency * 1000,
+            )
+
+    def close(self) -> None:
+        self._closed = True
+        self._pending.put(None)
+
+    # -----------------------------
+    # worker thread
+    # -----------------------------
+    def _run(self) -> None:
+        while True:
+            job = self._pending.get()
+            if job is None:
+                return
+            if not job.cancelled:
+                try:
+                    job.cmd.prepare()
+                except Exception as e:
+                    job.error = e
+            self._done.put(job)
+
+    # -----------------------------
+    # UI thread
+    # -----------------------------
+    def _poll(self) -> None:
+        try:
+            while True:
+                try:
+                    job = self._done.get_nowait()
+                except queue.Empty:
+                    break
+                self._finish(job)
+        finally:
+            if not self._closed:
+                self._after(self._poll_ms, self._poll)
+
+    def _finish(self, job: _Job) -> None:
+        with self._lock:
+            self._depth -= 1
+            if job.key is not None and self._latest.get(job.key) is job:
+                del self._latest[job.key]
+        if job.cancelled:
+            return
+
+        if job.error is None:
+            try:
+                job.cmd.execute()
+            except Exception as e:
+                job.error = e
+
+        latency = time.perf_counter() - job.submitted_at
+        with self._lock:
+            s = self._stats
+            if job.error is None:
+                s.completed += 1
+            else:
+                s.failed += 1
+            s.total_latency += latency
+            s.last_latency = latency
+            s.max_latency = max(s.max_latency, latency)
+
+        if job.on_done is not None:
+            job.on_done(job.error)
+        elif job.error is not None:
+            raise job.error
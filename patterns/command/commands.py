@@ -1,11 +1,16 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import Any, Callable, Optional
 
+from domain.equipment import EquipmentModel, ISoftware
 from patterns.memento import EquipmentMemento
 
 
 class Command(ABC):
+    # необязательная подготовка без UI: в очереди Invoker выполняется в фоновом потоке
+    def prepare(self) -> None:
+        pass
+
     @abstractmethod
     def execute(self) -> None: ...
 
@@ -21,6 +26,10 @@ class AppContext(ABC):
     """
     @abstractmethod
     def has_equipment(self) -> bool: ...
+    # непрозрачная ссылка на текущую модель: команда запоминает её при создании,
+    # чтобы в очереди не применить правку к модели, выбранной позже
+    @abstractmethod
+    def current_target(self) -> Optional[Any]: ...
     @abstractmethod
     def get_snapshot(self) -> EquipmentMemento: ...
     @abstractmethod
@@ -32,13 +41,29 @@ class AppContext(ABC):
     @abstractmethod
     def redo_snapshot(self) -> Optional[EquipmentMemento]: ...
     @abstractmethod
+    def switch_branch_snapshot(self, step: int) -> Optional[EquipmentMemento]: ...
+    @abstractmethod
+    def jump_snapshot(self, node: int) -> Optional[EquipmentMemento]: ...
+    @abstractmethod
     def refresh_all(self) -> None: ...
 
-    # “действия” системы (что именно меняем)
+    # “действия” системы (что именно меняем); False — правка не применена
+    # (модели уже нет в каталоге или редактирование выключено, пока команда ждала в очереди)
     @abstractmethod
-    def set_decorators_state(self, online: bool, analytics: bool) -> None: ...
+    def set_decorators_state(self, online: bool, analytics: bool, target: Optional[Any] = None) -> bool: ...
     @abstractmethod
-    def set_proxy_state(self, enabled: bool, license_key: str) -> None: ...
+    def set_proxy_state(self, enabled: bool, license_key: str, target: Optional[Any] = None) -> bool: ...
+    @abstractmethod
+    def apply_bulk_config(
+        self,
+        predicate: Callable[[EquipmentModel], bool],
+        online: Optional[bool],
+        analytics: Optional[bool],
+        use_proxy: Optional[bool],
+        license_key: Optional[str],
+    ) -> int: ...
+    @abstractmethod
+    def show_operation_result(self, software: ISoftware, result: str, error: Optional[Exception]) -> None: ...
 
 
 class ApplyDecoratorsCommand(Command):
@@ -46,13 +71,16 @@ class ApplyDecoratorsCommand(Command):
         self._ctx = ctx
         self._online = online
         self._analytics = analytics
+        self._target = ctx.current_target()
         self._before: Optional[EquipmentMemento] = None
 
     def execute(self) -> None:
-        if not self._ctx.has_equipment():
+        if self._target is None:
             return
-        self._before = self._ctx.get_snapshot()
-        self._ctx.set_decorators_state(self._online, self._analytics)
+        before = self._ctx.get_snapshot()
+        if not self._ctx.set_decorators_state(self._online, self._analytics, self._target):
+            return
+        self._before = before
         self._ctx.push_snapshot(self._ctx.get_snapshot())
         self._ctx.refresh_all()
 
@@ -67,13 +95,16 @@ class ApplyProxyCommand(Command):
         self._ctx = ctx
         self._enabled = enabled
         self._license_key = license_key
+        self._target = ctx.current_target()
         self._before: Optional[EquipmentMemento] = None
 
     def execute(self) -> None:
-        if not self._ctx.has_equipment():
+        if self._target is None:
             return
-        self._before = self._ctx.get_snapshot()
-        self._ctx.set_proxy_state(self._enabled, self._license_key)
+        before = self._ctx.get_snapshot()
+        if not self._ctx.set_proxy_state(self._enabled, self._license_key, self._target):
+            return
+        self._before = before
         self._ctx.push_snapshot(self._ctx.get_snapshot())
         self._ctx.refresh_all()
 
@@ -83,6 +114,45 @@ class ApplyProxyCommand(Command):
             self._ctx.refresh_all()
 
 
+class BulkApplyConfigCommand(Command):
+    """
+    Применяет конфигурацию Decorator/Proxy ко всем моделям каталога,
+    прошедшим predicate, за один проход и с одной записью в истории.
+    None в параметре = флаг не меняется.
+    """
+    def __init__(
+        self,
+        ctx: AppContext,
+        predicate: Callable[[EquipmentModel], bool],
+        online: Optional[bool] = None,
+        analytics: Optional[bool] = None,
+        use_proxy: Optional[bool] = None,
+        license_key: Optional[str] = None,
+    ) -> None:
+        self._ctx = ctx
+        self._predicate = predicate
+        self._online = online
+        self._analytics = analytics
+        self._use_proxy = use_proxy
+        self._license_key = license_key
+        self._before: Optional[EquipmentMemento] = None
+        self.changed = 0
+
+    def execute(self) -> None:
+        self._before = self._ctx.get_snapshot()
+        self.changed = self._ctx.apply_bulk_config(
+            self._predicate, self._online, self._analytics, self._use_proxy, self._license_key
+        )
+        if self.changed:
+            self._ctx.push_snapshot(self._ctx.get_snapshot())
+        self._ctx.refresh_all()
+
+    def undo(self) -> None:
+        if self._before:
+            self._ctx.restore_snapshot(self._before)
+            self._ctx.refresh_all()
+
+
 class SaveSnapshotCommand(Command):
     def __init__(self, ctx: AppContext) -> None:
         self._ctx = ctx
@@ -114,3 +184,54 @@ class RedoCommand(Command):
         if m is not None:
             self._ctx.restore_snapshot(m)
             self._ctx.refresh_all()
+
+
+class SwitchBranchCommand(Command):
+    """Соседняя ветка дерева snapshot'ов: step=1 — следующая, -1 — предыдущая."""
+    def __init__(self, ctx: AppContext, step: int) -> None:
+        self._ctx = ctx
+        self._step = step
+
+    def execute(self) -> None:
+        m = self._ctx.switch_branch_snapshot(self._step)
+        if m is not None:
+            self._ctx.restore_snapshot(m)
+            self._ctx.refresh_all()
+
+
+class JumpToSnapshotCommand(Command):
+    """Перейти к любому snapshot'у истории (в дереве — и на другую ветку)."""
+    def __init__(self, ctx: AppContext, node: int) -> None:
+        self._ctx = ctx
+        self._node = node
+
+    def execute(self) -> None:
+        m = self._ctx.jump_snapshot(self._node)
+        if m is not None:
+            self._ctx.restore_snapshot(m)
+            self._ctx.refresh_all()
+
+
+class RunOperationCommand(Command):
+    """
+    software.operation() может быть долгим (Proxy лениво грузит реальный модуль),
+    поэтому сам вызов вынесен в prepare(), а показ результата — в execute().
+    """
+    def __init__(self, ctx: AppContext, software: ISoftware) -> None:
+        self._ctx = ctx
+        self._software = software
+        self._prepared = False
+        self._result = ""
+        self._error: Optional[Exception] = None
+
+    def prepare(self) -> None:
+        try:
+            self._result = self._software.operation()
+        except Exception as e:
+            self._error = e
+        self._prepared = True
+
+    def execute(self) -> None:
+        if not self._prepared:
+            self.prepare()
+        self._ctx.show_operation_result(self._software, self._result, self._error)
@@ -1,15 +1,21 @@
 from __future__ import annotations
-from typing import Optional
+from typing import TYPE_CHECKING, Hashable, Optional, Union
 from patterns.command.commands import Command
 
+if TYPE_CHECKING:
+    from patterns.command.command_queue import CommandQueue, DoneCallback, QueueMetrics, Scheduler
+
 
 class Invoker:
     """
     Invoker хранит команды и выполняет их по имени.
-    (Можно расширить: очереди, макросы, хоткеи.)
+    Синхронно (execute) или через очередь с фоновым worker-потоком (submit).
     """
     def __init__(self) -> None:
         self._commands: dict[str, Command] = {}
+        self._queue: Optional[CommandQueue] = None
+        self._scheduler: Optional[Scheduler] = None
+        self._poll_ms = 30
 
     def register(self, name: str, cmd: Command) -> None:
         self._commands[name] = cmd
@@ -17,7 +23,71 @@ class Invoker:
     def execute(self, name: str) -> None:
         cmd = self._commands.get(name)
         if cmd:
+            cmd.prepare()
             cmd.execute()
 
     def get(self, name: str) -> Optional[Command]:
         return self._commands.get(name)
+
+    # -----------------------------
+    # Queued mode
+    # -----------------------------
+    def start_queue(self, after: Scheduler, poll_ms: int = 30) -> None:
+        """
+        after — функция планирования UI-потока (tk.Tk.after).
+        Сам worker-поток стартует лениво, при первом submit().
+        """
+        self._scheduler = after
+        self._poll_ms = poll_ms
+
+    def stop_queue(self) -> None:
+        self._scheduler = None
+        if self._queue is not None:
+            self._queue.close()
+            self._queue = None
+
+    def _ensure_queue(self) -> Optional[CommandQueue]:
+        if self._queue is None and self._scheduler is not None:
+            from patterns.command.command_queue import CommandQueue
+
+            self._queue = CommandQueue(self._scheduler, poll_ms=self._poll_ms)
+        return self._queue
+
+    def submit(
+        self,
+        cmd: Union[str, Command],
+        key: Optional[Hashable] = None,
+        on_done: Optional[DoneCallback] = None,
+    ) -> None:
+        """
+        Ставит команду (или зарегистрированную по имени) в очередь.
+        key — цель команды: более новая команда с тем же key отменяет старую.
+        Без запущенной очереди выполняет синхронно.
+        """
+        if isinstance(cmd, str):
+            found = self._commands.get(cmd)
+            if found is None:
+                return
+            cmd = found
+
+        queue = self._ensure_queue()
+        if queue is None:
+            error: Optional[BaseException] = None
+            try:
+                cmd.prepare()
+                cmd.execute()
+            except Exception as e:
+                if on_done is None:
+                    raise
+                error = e
+            if on_done is not None:
+                on_done(error)
+            return
+
+        queue.submit(cmd, key=key, on_done=on_done)
+
+    def queue_depth(self) -> int:
+        return self._queue.depth() if self._queue else 0
+
+    def queue_metrics(self) -> Optional[QueueMetrics]:
+        return self._queue.metrics() if self._queue else None
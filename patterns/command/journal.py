@@ -0,0 +1,507 @@
+"""
+Журнал команд (write-ahead log) с групповым коммитом и checkpoint'ами.
+
+Каталог журнала:
+  wal-<первый lsn>.log          сегменты журнала: MAGIC, затем записи
+  checkpoint-<lsn>.mpcat/.json  полный каталог + история на момент записи lsn (.mpcat)
+                                и дерево истории/служебные поля (.json)
+
+Запись: заголовок <IIQ> (длина payload, crc32 от lsn+payload, lsn) и payload —
+JSON [op, {аргументы}]. Оборванный хвост (сбой посреди write) узнаётся по длине/crc
+и при восстановлении отрезается.
+
+Групповой коммит: append() только кладёт запись в буфер; поток-писатель сбрасывает
+накопленное одним write + одним fsync, как только буфер дорос до group_bytes, кто-то
+ждёт в sync() или истекло окно долговечности window_ms от первой записи группы.
+При сбое теряется не больше window_ms последних команд; window_ms=0 — каждый append
+ждёт своего fsync (но одновременные append'ы всё равно делят один fsync).
+"""
+from __future__ import annotations
+
+import json
+import os
+import struct
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from patterns.memento import EquipmentMemento, HistoryState, ModelMemento, freeze_specs, thaw_specs
+from patterns.memento.equipment_memento import _MODEL_FIELDS
+
+MAGIC = b"MPWAL\x01\n"
+
+_RECORD = struct.Struct("<IIQ")  # длина payload, crc32(lsn + payload), lsn
+_LSN = struct.Struct("<Q")
+_MAX_RECORD = 1 << 30
+
+_WAL = "wal-"
+_CHECKPOINT = "checkpoint-"
+
+_SPECS = _MODEL_FIELDS.index("specs")
+_FUNCTIONS = _MODEL_FIELDS.index("functions")
+
+
+@dataclass(frozen=True)
+class JournalRecord:
+    lsn: int
+    op: str
+    args: Dict[str, Any]
+
+
+@dataclass(frozen=True)
+class JournalMetrics:
+    last_lsn: int
+    durable_lsn: int
+    pending: int
+    appended: int
+    fsyncs: int
+    bytes_written: int
+    max_group: int
+    fsync_seconds: float
+    checkpoints: int
+    checkpoint_lsn: int
+    checkpoint_seconds: float
+    error: Optional[str] = None
+
+    @property
+    def avg_group(self) -> float:
+        """Сколько записей в среднем уходит одним fsync."""
+        written = self.appended - self.pending
+        return written / self.fsyncs if self.fsyncs else 0.0
+
+
+@dataclass(frozen=True)
+class JournalScan:
+    """Что лежит в каталоге журнала: последний checkpoint и записи после него."""
+    checkpoint: Optional[str]  # путь к .mpcat
+    checkpoint_lsn: int
+    meta: Dict[str, Any]
+    records: List[JournalRecord]
+    last_lsn: int
+    torn_bytes: int  # отрезанный оборванный хвост
+
+
+def model_fields(m: ModelMemento) -> list:
+    """Поля memento списком (в порядке полей) — компактно для JSON."""
+    d = m.__dict__
+    values = [d[f] for f in _MODEL_FIELDS]
+    # specs — словарём: кортежи пар JSON превратил бы в списки и вложенные dict бы потерялись
+    values[_SPECS] = thaw_specs(values[_SPECS])
+    return values
+
+
+def model_from_fields(values: Sequence[Any]) -> ModelMemento:
+    values = list(values)
+    # JSON превращает кортежи в списки — specs/functions замораживаются обратно
+    values[_SPECS] = freeze_specs(values[_SPECS])
+    values[_FUNCTIONS] = tuple(values[_FUNCTIONS])
+    return ModelMemento.from_fields(*values)
+
+
+def _segment_path(directory: str, first_lsn: int) -> str:
+    return os.path.join(directory, f"{_WAL}{first_lsn:012d}.log")
+
+
+def _checkpoint_base(directory: str, lsn: int) -> str:
+    return os.path.join(directory, f"{_CHECKPOINT}{lsn:012d}")
+
+
+def _numbered(directory: str, prefix: str, suffix: str) -> List[Tuple[int, str]]:
+    out = []
+    for name in os.listdir(directory):
+        if name.startswith(prefix) and name.endswith(suffix):
+            number = name[len(prefix):len(name) - len(suffix)]
+            if number.isdigit():
+                out.append((int(number), os.path.join(directory, name)))
+    out.sort()
+    return out
+
+
+def _fsync_dir(directory: str) -> None:
+    # новое имя файла (создание, rename) долговечно только после fsync каталога
+    if os.name == "nt":
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class CommandJournal:
+    """
+    Журнал выполненных команд. Писатель один — владелец состояния (UI-поток);
+    запись на диск и fsync — в отдельном потоке, checkpoint — в ещё одном.
+
+    last_lsn — номер последней уже существующей записи (из scan_journal()/recover()):
+    новые записи идут в свежий сегмент с last_lsn + 1.
+    """
+    def __init__(
+        self,
+        directory: str,
+        last_lsn: int = 0,
+        window_ms: float = 20.0,
+        group_bytes: int = 1 << 20,
+        checkpoint_every: int = 5000,
+        fsync: bool = True,
+    ) -> None:
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.checkpoint_every = checkpoint_every
+        self._window = window_ms / 1000.0
+        self._group_bytes = group_bytes
+        self._fsync = fsync
+
+        self._cond = threading.Condition()
+        self._pending: List[Tuple[int, Optional[bytes]]] = []  # (lsn, запись) или (lsn, None) — ротация
+        self._pending_bytes = 0
+        self._group_started = 0.0
+        self._waiters = 0
+        self._closed = False
+        self._error: Optional[BaseException] = None
+
+        self._last_lsn = last_lsn
+        self._durable_lsn = last_lsn
+        self._segment_first = last_lsn + 1
+        self._fp = self._open_segment(last_lsn + 1)
+        self._since_checkpoint = 0
+        self._checkpoint_thread: Optional[threading.Thread] = None
+        self._stats: Dict[str, float] = dict.fromkeys(
+            ("appended", "written", "fsyncs", "bytes", "max_group", "fsync_seconds",
+             "checkpoints", "checkpoint_lsn", "checkpoint_seconds"), 0
+        )
+
+        self._writer = threading.Thread(target=self._run, name="command-journal", daemon=True)
+        self._writer.start()
+
+    # -----------------------------
+    # Запись
+    # -----------------------------
+    def append(self, op: str, **args: Any) -> int:
+        """Добавить запись; возвращает её lsn. Долговечна через window_ms (или после sync(lsn))."""
+        payload = json.dumps([op, args], ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        with self._cond:
+            if self._error is not None:
+                raise self._error
+            if self._closed:
+                raise ValueError("journal is closed")
+            lsn = self._last_lsn + 1
+            crc = zlib.crc32(payload, zlib.crc32(_LSN.pack(lsn)))
+            data = _RECORD.pack(len(payload), crc, lsn) + payload
+            if not self._pending:
+                self._group_started = time.perf_counter()
+            self._pending.append((lsn, data))
+            self._pending_bytes += len(data)
+            self._last_lsn = lsn
+            self._since_checkpoint += 1
+            self._stats["appended"] += 1
+            self._cond.notify_all()
+        if self._window <= 0:
+            self.sync(lsn)
+        return lsn
+
+    def sync(self, lsn: Optional[int] = None, timeout: Optional[float] = None) -> bool:
+        """Дождаться fsync записи lsn (по умолчанию — последней). False — не дождались за timeout."""
+        with self._cond:
+            target = self._last_lsn if lsn is None else lsn
+            self._waiters += 1
+            self._cond.notify_all()
+            try:
+                done = self._cond.wait_for(
+                    lambda: self._durable_lsn >= target or self._error is not None or self._closed, timeout
+                )
+            finally:
+                self._waiters -= 1
+            if self._error is not None:
+                raise self._error
+            return done and self._durable_lsn >= target
+
+    @property
+    def last_lsn(self) -> int:
+        return self._last_lsn
+
+    def _open_segment(self, first_lsn: int):
+        fp = open(_segment_path(self.directory, first_lsn), "wb")
+        fp.write(MAGIC)
+        fp.flush()
+        if self._fsync:
+            os.fsync(fp.fileno())
+            _fsync_dir(self.directory)
+        return fp
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                # окно долговечности: ждём, пока наберётся группа, но не дольше window от её первой записи
+                while not self._closed and not self._waiters and self._pending_bytes < self._group_bytes:
+                    left = self._group_started + self._window - time.perf_counter()
+                    if left <= 0:
+                        break
+                    self._cond.wait(left)
+                batch, self._pending = self._pending, []
+                self._pending_bytes = 0
+            try:
+                self._write(batch)
+            except OSError as e:
+                with self._cond:
+                    self._error = e
+                    self._cond.notify_all()
+                return
+
+    def _write(self, batch: List[Tuple[int, Optional[bytes]]]) -> None:
+        chunk: List[bytes] = []
+        last = 0
+        for lsn, data in batch:
+            if data is None:
+                # ротация под checkpoint: записи <= lsn остаются в старых сегментах
+                self._commit(chunk, last)
+                chunk = []
+                self._fp.close()
+                self._fp = self._open_segment(lsn + 1)
+                with self._cond:
+                    self._segment_first = lsn + 1
+                    self._cond.notify_all()
+            else:
+                chunk.append(data)
+                last = lsn
+        self._commit(chunk, last)
+
+    def _commit(self, chunk: List[bytes], last: int) -> None:
+        if not chunk:
+            return
+        blob = b"".join(chunk)
+        self._fp.write(blob)
+        self._fp.flush()
+        t0 = time.perf_counter()
+        if self._fsync:
+            os.fsync(self._fp.fileno())
+        seconds = time.perf_counter() - t0
+        with self._cond:
+            self._durable_lsn = last
+            st = self._stats
+            st["written"] += len(chunk)
+            st["fsyncs"] += 1
+            st["bytes"] += len(blob)
+            st["max_group"] = max(st["max_group"], len(chunk))
+            st["fsync_seconds"] += seconds
+            self._cond.notify_all()
+
+    # -----------------------------
+    # Checkpoint
+    # -----------------------------
+    def checkpoint_due(self) -> bool:
+        """Пора ли снять checkpoint (и предыдущий уже дописан)."""
+        running = self._checkpoint_thread is not None and self._checkpoint_thread.is_alive()
+        return self._since_checkpoint >= self.checkpoint_every and not running
+
+    def checkpoint(self, current: EquipmentMemento, history: HistoryState, background: bool = True) -> int:
+        """
+        Снять checkpoint состояния, которое отражает ровно записи до последней добавленной
+        (вызывать из потока-владельца сразу после его правок). Состояние неизменяемое,
+        поэтому сам файл пишется в фоне; незавершённый прошлый checkpoint сначала дожидается.
+        Возвращает lsn checkpoint'а.
+        """
+        prev = self._checkpoint_thread
+        if prev is not None:
+            prev.join()
+        with self._cond:
+            if self._error is not None:
+                raise self._error
+            lsn = self._last_lsn
+            self._pending.append((lsn, None))
+            if len(self._pending) == 1:
+                self._group_started = time.perf_counter()
+            self._since_checkpoint = 0
+            self._cond.notify_all()
+        if not background:
+            self._write_checkpoint(lsn, current, history)
+            return lsn
+        self._checkpoint_thread = threading.Thread(
+            target=self._write_checkpoint, args=(lsn, current, history), name="journal-checkpoint", daemon=True
+        )
+        self._checkpoint_thread.start()
+        return lsn
+
+    def _write_checkpoint(self, lsn: int, current: EquipmentMemento, history: HistoryState) -> None:
+        from patterns.memento import save_catalog
+
+        t0 = time.perf_counter()
+        base = _checkpoint_base(self.directory, lsn)
+        try:
+            meta = {
+                "lsn": lsn,
+                "branching": history.branching,
+                "index": history.index,
+                "parents": list(history.parents),
+                "active": list(history.active),
+            }
+            self._write_atomic(base + ".json", lambda path: self._write_bytes(path, json.dumps(meta).encode("utf-8")))
+            # .mpcat переименовывается последним: его появление и есть «checkpoint записан»
+            self._write_atomic(
+                base + ".mpcat", lambda path: save_catalog(path, current, history.snapshots(), history.index)
+            )
+            # старые сегменты удаляются, только когда писатель уже перешёл на новый
+            with self._cond:
+                self._cond.wait_for(lambda: self._segment_first > lsn or self._error is not None or self._closed)
+            self._prune(lsn)
+        except OSError as e:
+            with self._cond:
+                self._error = e
+                self._cond.notify_all()
+            return
+        with self._cond:
+            self._stats["checkpoints"] += 1
+            self._stats["checkpoint_lsn"] = lsn
+            self._stats["checkpoint_seconds"] = time.perf_counter() - t0
+
+    @staticmethod
+    def _write_bytes(path: str, data: bytes) -> None:
+        with open(path, "wb") as fp:
+            fp.write(data)
+
+    def _write_atomic(self, path: str, write) -> None:
+        tmp = path + ".tmp"
+        write(tmp)
+        if self._fsync:
+            with open(tmp, "rb+") as fp:
+                os.fsync(fp.fileno())
+        os.replace(tmp, path)
+        if self._fsync:
+            _fsync_dir(self.directory)
+
+    def _prune(self, lsn: int) -> None:
+        for first, path in _numbered(self.directory, _WAL, ".log"):
+            if first <= lsn:
+                os.remove(path)
+        for number, path in _numbered(self.directory, _CHECKPOINT, ".mpcat"):
+            if number < lsn:
+                os.remove(path)
+        for number, path in _numbered(self.directory, _CHECKPOINT, ".json"):
+            if number < lsn:
+                os.remove(path)
+        for name in os.listdir(self.directory):
+            if name.endswith(".tmp"):
+                os.remove(os.path.join(self.directory, name))
+
+    # -----------------------------
+    # Состояние
+    # -----------------------------
+    def metrics(self) -> JournalMetrics:
+        with self._cond:
+            st = self._stats
+            return JournalMetrics(
+                last_lsn=self._last_lsn,
+                durable_lsn=self._durable_lsn,
+                pending=int(st["appended"] - st["written"]),
+                appended=int(st["appended"]),
+                fsyncs=int(st["fsyncs"]),
+                bytes_written=int(st["bytes"]),
+                max_group=int(st["max_group"]),
+                fsync_seconds=st["fsync_seconds"],
+                checkpoints=int(st["checkpoints"]),
+                checkpoint_lsn=int(st["checkpoint_lsn"]),
+                checkpoint_seconds=st["checkpoint_seconds"],
+                error=str(self._error) if self._error is not None else None,
+            )
+
+    def close(self) -> None:
+        """Дописать и fsync'нуть всё накопленное, дождаться checkpoint'а."""
+        if self._checkpoint_thread is not None:
+            self._checkpoint_thread.join()
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._writer.join()
+        self._fp.close()
+
+
+# -----------------------------
+# Чтение
+# -----------------------------
+def _read_segment(path: str) -> Tuple[List[JournalRecord], List[int], int]:
+    """
+    (записи, границы, длина файла): границы — конец MAGIC и конец каждой записи
+    (пусто, если MAGIC повреждён); чтение останавливается на первой битой записи.
+    """
+    with open(path, "rb") as fp:
+        data = fp.read()
+    records: List[JournalRecord] = []
+    ends: List[int] = []
+    if not data.startswith(MAGIC):
+        return records, ends, len(data)
+    pos = len(MAGIC)
+    ends.append(pos)
+    unpack = _RECORD.unpack_from
+    size = _RECORD.size
+    while pos + size <= len(data):
+        length, crc, lsn = unpack(data, pos)
+        end = pos + size + length
+        if length > _MAX_RECORD or end > len(data):
+            break
+        payload = data[pos + size:end]
+        if zlib.crc32(payload, zlib.crc32(_LSN.pack(lsn))) != crc:
+            break
+        op, args = json.loads(payload)
+        records.append(JournalRecord(lsn, op, args))
+        ends.append(end)
+        pos = end
+    return records, ends, len(data)
+
+
+def scan_journal(directory: str, truncate: bool = True) -> JournalScan:
+    """
+    Последний checkpoint и непрерывная цепочка записей после него.
+    Всё, что за цепочкой (оборванная запись, разрыв lsn, следующие сегменты), при
+    truncate=True отрезается — иначе дописанное после восстановления оказалось бы за «мусором».
+    """
+    if not os.path.isdir(directory):
+        return JournalScan(None, 0, {}, [], 0, 0)
+    checkpoint, checkpoint_lsn, meta = None, 0, {}
+    for lsn, path in reversed(_numbered(directory, _CHECKPOINT, ".mpcat")):
+        meta_path = _checkpoint_base(directory, lsn) + ".json"
+        if os.path.exists(meta_path):
+            with open(meta_path, "rb") as fp:
+                meta = json.loads(fp.read())
+            checkpoint, checkpoint_lsn = path, lsn
+            break
+
+    records: List[JournalRecord] = []
+    expected = checkpoint_lsn + 1
+    torn = 0
+    segments = _numbered(directory, _WAL, ".log")
+    for k, (first, path) in enumerate(segments):
+        found, ends, size = _read_segment(path)
+        cut = ends[-1] if ends else 0
+        kept = 0
+        broken = cut < size
+        for i, rec in enumerate(found):
+            if rec.lsn < expected:
+                continue  # уже в checkpoint'е
+            if rec.lsn != expected:
+                cut, broken = ends[i], True
+                break
+            records.append(rec)
+            expected += 1
+            kept += 1
+        if not broken:
+            continue
+        torn += size - cut + sum(os.path.getsize(p) for _, p in segments[k + 1:])
+        if truncate:
+            if kept or first == expected:
+                with open(path, "rb+") as fp:
+                    fp.truncate(cut)
+                    os.fsync(fp.fileno())
+            else:
+                os.remove(path)
+            for _, later in segments[k + 1:]:
+                os.remove(later)
+        break
+    return JournalScan(checkpoint, checkpoint_lsn, meta, records, expected - 1, torn)
@@ -0,0 +1,247 @@
+"""
+Восстановление после сбоя: последний checkpoint журнала + повтор записей после него.
+
+Записи журнала — результаты команд на уровне модели данных, а не UI:
+  add       {m}                       новая модель (create/clone), она же становится текущей
+  select    {ref}                     выбор текущей модели (ref = null — сброс)
+  put       {ref, m}                  модель на позиции после правки (Decorator/Proxy текущей)
+  bulk      {refs, online, analytics, use_proxy, license_key}
+                                      массовая правка флагов: refs — {тип: [позиции]}
+  snapshot  {}                        Caretaker.backup() текущего состояния
+  undo/redo {}, branch {step}, jump {node}
+                                      перемещения курсора истории
+  restore   {node}                    каталог приведён к snapshot'у node
+Повтор идёт без UI и без индексов; каталог из LazyModel собирается в конце,
+индексы строит тот, кто примет состояние (App — одним reindex()).
+"""
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from domain.equipment import EquipmentModel
+from patterns.composite import Catalog, LazyModel, ModelRef
+from patterns.composite.parallel import _gc_paused
+from patterns.memento import Caretaker, EquipmentMemento, ModelMemento
+from patterns.command.journal import JournalRecord, JournalScan, model_from_fields, scan_journal
+
+Build = Optional[Callable[[ModelMemento], EquipmentModel]]
+
+
+def configured(
+    m: ModelMemento,
+    online: Optional[bool] = None,
+    analytics: Optional[bool] = None,
+    use_proxy: Optional[bool] = None,
+    license_key: Optional[str] = None,
+) -> ModelMemento:
+    """Флаги как у apply_config (None — не трогать), но над memento."""
+    changes: Dict[str, Any] = {}
+    if online is not None:
+        changes["use_online"] = bool(online)
+    if analytics is not None:
+        changes["use_analytics"] = bool(analytics)
+    if use_proxy is not None:
+        changes["use_proxy"] = bool(use_proxy)
+    if license_key is not None:
+        changes["license_key"] = license_key.strip()
+    return replace(m, **changes) if changes else m
+
+
+def _linear_path(parents: Sequence[int], active: Sequence[int], index: int) -> List[int]:
+    # дерево из checkpoint'а в линейный Caretaker: текущая ветка
+    path: List[int] = []
+    node = index
+    while node >= 0:
+        path.append(node)
+        node = parents[node]
+    path.reverse()
+    node = active[index] if index >= 0 else -1
+    while node >= 0:
+        path.append(node)
+        node = active[node]
+    return path
+
+
+class JournalState:
+    """
+    Каталог, текущая модель и история — то, что восстанавливается из журнала.
+    apply() повторяет одну запись; неизвестные операции пропускаются (skipped).
+
+    Повтор идёт над списками ModelMemento по типам, без LazyModel и CatalogVersions:
+    snapshot замораживает в кортеж только типы, изменённые с прошлого snapshot'а,
+    поэтому соседние snapshot'ы делят и кортежи, и объекты моделей (пул Caretaker
+    интернирует их за O(изменений)). Каталог для UI собирается один раз — build_catalog().
+    """
+    def __init__(self, caretaker: Caretaker, build: Build = None) -> None:
+        self.caretaker = caretaker
+        self.current_ref: Optional[ModelRef] = None
+        self.skipped = 0
+        self._build = build
+        self._models: Dict[str, List[ModelMemento]] = {}
+        self._frozen: Dict[str, Tuple[ModelMemento, ...]] = {}
+
+    def load(self, current: EquipmentMemento, history: List[EquipmentMemento], meta: Dict[str, Any]) -> None:
+        """Состояние из checkpoint'а (load_catalog + .json с деревом)."""
+        self.load_history(history, meta.get("index", -1), meta.get("parents") or None, meta.get("active") or None)
+        self._set_catalog(current)
+        self.current_ref = self._valid(current.current_ref)
+
+    def load_history(
+        self,
+        history: List[EquipmentMemento],
+        index: int,
+        parents: Optional[Sequence[int]] = None,
+        active: Optional[Sequence[int]] = None,
+    ) -> None:
+        """История в caretaker; дерево в линейный Caretaker попадает текущей веткой."""
+        if parents is not None and not self.caretaker.branching:
+            path = _linear_path(parents, active, index)
+            history = [history[i] for i in path]
+            index = path.index(index) if index >= 0 else -1
+            parents = active = None
+        self.caretaker.replace_history(history, index, parents, active)
+
+    def _set_catalog(self, mem: EquipmentMemento) -> None:
+        # как patch_catalog: типы, которых нет в mem, остаются пустыми
+        for eq_type in self._models:
+            if eq_type not in mem.catalog:
+                self._models[eq_type] = []
+                self._frozen[eq_type] = ()
+        for eq_type, snaps in mem.catalog.items():
+            self._models[eq_type] = list(snaps)
+            self._frozen[eq_type] = snaps
+
+    def types(self) -> List[str]:
+        return list(self._models)
+
+    def models(self, eq_type: str) -> Sequence[ModelMemento]:
+        return self._models.get(eq_type, ())
+
+    def snapshot(self) -> EquipmentMemento:
+        frozen = self._frozen
+        catalog = {}
+        for eq_type, models in self._models.items():
+            snaps = frozen.get(eq_type)
+            if snaps is None:
+                snaps = frozen[eq_type] = tuple(models)
+            catalog[eq_type] = snaps
+        return EquipmentMemento(catalog=catalog, current_ref=self.current_ref)
+
+    def build_catalog(self) -> Catalog:
+        """Каталог из LazyModel без индексов (их подключает и перестраивает тот, кто его примет)."""
+        catalog = Catalog()
+        for eq_type, models in self._models.items():
+            catalog[eq_type] = [LazyModel(s, self._build) for s in models]
+        return catalog
+
+    def _valid(self, ref) -> Optional[ModelRef]:
+        if ref is None:
+            return None
+        t, idx = ref
+        return (t, idx) if 0 <= idx < len(self._models.get(t, ())) else None
+
+    def _put(self, eq_type: str, idx: int, m: ModelMemento) -> None:
+        self._models[eq_type][idx] = m
+        self._frozen.pop(eq_type, None)
+
+    def apply(self, rec: JournalRecord) -> None:
+        op, args = rec.op, rec.args
+        if op == "add":
+            m = model_from_fields(args["m"])
+            eq_type = m.equipment_type or "UnknownType"  # как Catalog.add
+            models = self._models.setdefault(eq_type, [])
+            models.append(m)
+            self._frozen.pop(eq_type, None)
+            self.current_ref = (eq_type, len(models) - 1)
+        elif op == "select":
+            self.current_ref = self._valid(args.get("ref"))
+        elif op == "put":
+            t, idx = args["ref"]
+            self._put(t, idx, model_from_fields(args["m"]))
+        elif op == "bulk":
+            flags = {k: args.get(k) for k in ("online", "analytics", "use_proxy", "license_key")}
+            for t, positions in args["refs"].items():
+                models = self._models[t]
+                for idx in positions:
+                    self._put(t, idx, configured(models[idx], **flags))
+        elif op == "snapshot":
+            self.caretaker.backup(self.snapshot())
+        elif op == "undo":
+            self.caretaker.undo()
+        elif op == "redo":
+            self.caretaker.redo()
+        elif op == "branch":
+            self.caretaker.switch_branch(args["step"])
+        elif op == "jump":
+            self.caretaker.jump(args["node"])
+        elif op == "restore":
+            target = self.caretaker.get(args["node"])
+            self._set_catalog(target)
+            self.current_ref = self._valid(target.current_ref)
+        else:
+            self.skipped += 1
+
+
+@dataclass(frozen=True)
+class Recovery:
+    state: JournalState
+    checkpoint: Optional[str]  # путь к загруженному .mpcat
+    checkpoint_lsn: int
+    last_lsn: int
+    replayed: int
+    torn_bytes: int
+    load_seconds: float
+    replay_seconds: float
+
+    @property
+    def empty(self) -> bool:
+        """Журнал пуст: восстанавливать нечего (checkpoint lsn=0 после Load catalog — не пустой)."""
+        return self.checkpoint is None and self.replayed == 0
+
+    def summary(self) -> str:
+        return (
+            f"checkpoint lsn={self.checkpoint_lsn}, replayed {self.replayed} record(s) up to lsn={self.last_lsn}, "
+            f"load {self.load_seconds * 1000:.0f} ms + replay {self.replay_seconds * 1000:.0f} ms"
+            + (f", torn tail dropped: {self.torn_bytes} B" if self.torn_bytes else "")
+        )
+
+
+def recover(directory: str, caretaker: Caretaker, build: Build = None, scan: Optional[JournalScan] = None) -> Recovery:
+    """
+    Загрузить последний checkpoint в caretaker и повторить хвост журнала.
+    Каталог результата — state.build_catalog(), без индексов.
+    """
+    from patterns.memento import load_catalog
+
+    t0 = time.perf_counter()
+    scan = scan if scan is not None else scan_journal(directory)
+    # номера узлов в jump/restore — номера той истории, что писала журнал: повтор идёт
+    # в Caretaker того же режима, в caretaker вызывающего история переносится в конце
+    branching = bool(scan.meta.get("branching", caretaker.branching))
+    replay = caretaker if branching == caretaker.branching else Caretaker(branching=branching)
+    state = JournalState(replay, build)
+    # история checkpoint'а — миллионы ссылок на модели: GC обходил бы их на каждой пачке аллокаций
+    with _gc_paused():
+        if scan.checkpoint is not None:
+            stored = load_catalog(scan.checkpoint)
+            state.load(stored.current, stored.history, scan.meta)
+        t1 = time.perf_counter()
+        for rec in scan.records:
+            state.apply(rec)
+        if replay is not caretaker:
+            exported = replay.export_state()
+            state.caretaker = caretaker
+            state.load_history(exported.snapshots(), exported.index, exported.parents or None, exported.active or None)
+    t2 = time.perf_counter()
+    return Recovery(
+        state=state,
+        checkpoint=scan.checkpoint,
+        checkpoint_lsn=scan.checkpoint_lsn,
+        last_lsn=scan.last_lsn,
+        replayed=len(scan.records),
+        torn_bytes=scan.torn_bytes,
+        load_seconds=t1 - t0,
+        replay_seconds=t2 - t1,
+    )
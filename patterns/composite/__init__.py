@@ -0,0 +1,63 @@
+from .catalog import Catalog, CatalogIndex, ModelPredicate, ModelRef, build_software, apply_config, apply_config_refs
+from .materialize import LazyModel, model_to_memento, model_from_memento, software_label, memento_software_label
+
+__all__ = [
+    "Catalog",
+    "CatalogIndex",
+    "ModelPredicate",
+    "ModelRef",
+    "build_software",
+    "apply_config",
+    "apply_config_refs",
+    "LazyModel",
+    "model_to_memento",
+    "model_from_memento",
+    "software_label",
+    "memento_software_label",
+    "iter_catalog_report",
+    "write_catalog_report",
+    "CatalogSearchIndex",
+    "SpecRangeIndex",
+    "parse_spec_ranges",
+    "CatalogView",
+    "CatalogVersions",
+    "patch_catalog",
+    "SyncCatalog",
+    "SqliteCatalogStore",
+    "materialize_many",
+    "PARALLEL_THRESHOLD",
+]
+
+
+_REPORT = {"iter_catalog_report", "write_catalog_report"}
+_SEARCH = {"CatalogSearchIndex"}
+_RANGES = {"SpecRangeIndex", "parse_spec_ranges"}
+_VERSIONS = {"CatalogView", "CatalogVersions", "patch_catalog"}
+
+
+def __getattr__(name: str):
+    # индексы, версии, блокировки и отчёт нужны окну и сервису, а не тем, кто только
+    # строит модели (фабрики, восстановление журнала, воркеры пула) — по требованию
+    if name in _REPORT:
+        from . import report
+        return getattr(report, name)
+    if name in _SEARCH:
+        from . import search
+        return getattr(search, name)
+    if name in _RANGES:
+        from . import ranges
+        return getattr(ranges, name)
+    if name in _VERSIONS:
+        from . import versions
+        return getattr(versions, name)
+    if name == "SyncCatalog":
+        from .sync import SyncCatalog
+        return SyncCatalog
+    # sqlite3 и пул процессов грузим только если они действительно нужны
+    if name == "SqliteCatalogStore":
+        from .sqlite_store import SqliteCatalogStore
+        return SqliteCatalogStore
+    if name in ("materialize_many", "PARALLEL_THRESHOLD"):
+        from . import parallel
+        return getattr(parallel, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,274 @@
+from __future__ import annotations
+from operator import attrgetter
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Protocol, Tuple
+
+from domain.equipment import EquipmentModel, BaseSoftware, ISoftware
+from patterns.decorator import OnlineSoftwareDecorator, AnalyticsDecorator
+
+
+ModelPredicate = Callable[[EquipmentModel], bool]
+ModelRef = Tuple[str, int]  # (тип, позиция в списке типа) — как в дереве и current_ref
+
+
+def shift_map(ref: ModelRef, count: int) -> Dict[ModelRef, ModelRef]:
+    """Удалена модель ref: старая ссылка -> новая для count следующих моделей типа."""
+    eq_type, idx = ref
+    refs = [(eq_type, i) for i in range(idx, idx + count + 1)]
+    return dict(zip(refs[1:], refs))
+
+
+def shifted_pending(pending: List[Tuple[ModelRef, object]], ref: ModelRef) -> List[Tuple[ModelRef, object]]:
+    """Отложенные add() индекса после удаления ref: сам ref выбывает, позиции после него в типе — на 1 ниже."""
+    eq_type, idx = ref
+    return [
+        ((t, i - 1) if t == eq_type and i > idx else (t, i), m)
+        for (t, i), m in pending
+        if t != eq_type or i != idx
+    ]
+
+
+class CatalogIndex(Protocol):
+    """
+    Вторичный индекс, который Catalog поддерживает при add/remove/reindex.
+    Необязательный replace(ref, old, new) — подмена модели на той же позиции;
+    без него Catalog.replace_at() делает remove + add.
+    Необязательный shift(ref, model, count) — модель на ref удалена, а следующие
+    count моделей типа сдвинулись на позицию ниже; без него Catalog.remove()
+    переносит каждую из них через remove + add.
+    """
+    def add(self, ref: ModelRef, model) -> None: ...
+    def remove(self, ref: ModelRef, model) -> None: ...
+    def clear(self) -> None: ...
+
+
+class Catalog(dict):
+    """
+    Composite-каталог: тип -> список моделей.
+    Остаётся обычным dict (UI и Memento работают с ним как раньше),
+    но умеет выбирать модели по предикату для массовых операций.
+    Элементом может быть и LazyModel — тогда полноценная модель
+    строится только в materialize().
+
+    Подключённые индексы обновляются в add()/remove(); после массовой
+    записи в dict напрямую (restore) нужен reindex().
+    """
+
+    def __init__(self, *args, indexes: Iterable[CatalogIndex] = (), **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.indexes: List[CatalogIndex] = list(indexes)
+
+    def add(self, model: EquipmentModel) -> ModelRef:
+        eq_type = getattr(model, "equipment_type", "") or "UnknownType"
+        models = self.setdefault(eq_type, [])
+        models.append(model)
+        ref = (eq_type, len(models) - 1)
+        for index in self.indexes:
+            index.add(ref, model)
+        return ref
+
+    def remove(self, eq_type: str, idx: int) -> EquipmentModel:
+        """Удаляет модель; позиции следующих моделей типа сдвигаются — их записи в индексах тоже."""
+        models = self[eq_type]
+        removed = models.pop(idx)
+        ref = (eq_type, idx)
+        count = len(models) - idx
+        for index in self.indexes:
+            shift = getattr(index, "shift", None)
+            if shift is not None:
+                # индекс сдвигает ссылки сам, не перестраивая записи моделей
+                shift(ref, removed, count)
+                continue
+            index.remove(ref, removed)
+            for i in range(idx, len(models)):
+                index.remove((eq_type, i + 1), models[i])
+                index.add((eq_type, i), models[i])
+        if not models:
+            del self[eq_type]
+        return removed
+
+    def replace_at(self, eq_type: str, idx: int, model) -> EquipmentModel:
+        """Кладёт model на место модели (eq_type, idx); позиции остальных не меняются."""
+        models = self[eq_type]
+        old = models[idx]
+        models[idx] = model
+        ref = (eq_type, idx)
+        for index in self.indexes:
+            replace = getattr(index, "replace", None)
+            if replace is not None:
+                replace(ref, old, model)
+            else:
+                index.remove(ref, old)
+                index.add(ref, model)
+        return old
+
+    def reindex(self) -> None:
+        for index in self.indexes:
+            index.clear()
+            for eq_type, models in self.items():
+                for i, m in enumerate(models):
+                    index.add((eq_type, i), m)
+
+    def models(self) -> Iterator[EquipmentModel]:
+        for models in self.values():
+            yield from models
+
+    def materialize(self, eq_type: str, idx: int) -> EquipmentModel:
+        """Гарантирует, что на позиции лежит настоящий EquipmentModel, и возвращает его."""
+        entry = self[eq_type][idx]
+        if not isinstance(entry, EquipmentModel):
+            entry = entry.materialize()
+            self[eq_type][idx] = entry
+        return entry
+
+    def materialize_all(self, build_many: Callable[[list], List[EquipmentModel]]) -> int:
+        """
+        Заменяет все LazyModel настоящими моделями. build_many получает список memento
+        и возвращает модели в том же порядке (например, parallel.materialize_many).
+        Возвращает число материализованных.
+        """
+        done = 0
+        for models in self.values():
+            positions = [i for i, m in enumerate(models) if not isinstance(m, EquipmentModel)]
+            if not positions:
+                continue
+            built = build_many([models[i].memento for i in positions])
+            for i, m in zip(positions, built):
+                models[i] = m
+            done += len(positions)
+        return done
+
+    def select(self, predicate: Optional[ModelPredicate] = None) -> List[EquipmentModel]:
+        if predicate is None:
+            return list(self.models())
+        return [m for m in self.models() if predicate(m)]
+
+    def select_refs(self, predicate: Optional[ModelPredicate] = None) -> List[ModelRef]:
+        """То же, что select(), но ссылками (тип, индекс) — например, чтобы материализовать на месте."""
+        return [
+            (eq_type, i)
+            for eq_type, models in self.items()
+            for i, m in enumerate(models)
+            if predicate is None or predicate(m)
+        ]
+
+    def index_of(self, kind: type) -> CatalogIndex:
+        for index in self.indexes:
+            if isinstance(index, kind):
+                return index
+        raise LookupError(f"Catalog has no {kind.__name__} attached")
+
+    def filter_refs(
+        self,
+        refs: Iterable[ModelRef],
+        equipment_type: Optional[str] = None,
+        use_online: Optional[bool] = None,
+        use_analytics: Optional[bool] = None,
+        use_proxy: Optional[bool] = None,
+    ) -> List[ModelRef]:
+        """
+        Отбор ссылок по типу и флагам (None = не важно).
+        Результат отсортирован по (тип, позиция) — как в дереве, где типы идут по алфавиту;
+        порядок refs (например, по значению spec) не сохраняется.
+        """
+        wanted = [(name, bool(value)) for name, value in (
+            ("use_online", use_online), ("use_analytics", use_analytics), ("use_proxy", use_proxy),
+        ) if value is not None]
+        if equipment_type is not None:
+            refs = [ref for ref in refs if ref[0] == equipment_type]
+        if wanted:
+            flags = attrgetter(*(name for name, _ in wanted))
+            expected = tuple(value for _, value in wanted)
+            if len(wanted) == 1:
+                expected = expected[0]
+            refs = [ref for ref in refs if flags(self[ref[0]][ref[1]]) == expected]
+        return sorted(refs)
+
+    def spec_range(
+        self,
+        key: str,
+        lo: Optional[float] = None,
+        hi: Optional[float] = None,
+        equipment_type: Optional[str] = None,
+        **flags: Optional[bool],
+    ) -> List[ModelRef]:
+        """
+        Модели с lo <= specs[key] <= hi по SpecRangeIndex (должен быть подключён),
+        дополнительно отфильтрованные по типу и флагам use_online/use_analytics/use_proxy.
+        """
+        from patterns.composite.ranges import SpecRangeIndex
+
+        refs = self.index_of(SpecRangeIndex).range(key, lo, hi)
+        return self.filter_refs(refs, equipment_type, **flags)
+
+
+def build_software(eq: EquipmentModel) -> ISoftware:
+    """BaseSoftware -> Decorators -> Proxy (по флагам модели)."""
+    software: ISoftware = BaseSoftware(eq.base_software_title)
+
+    if eq.use_online:
+        software = OnlineSoftwareDecorator(software)
+    if eq.use_analytics:
+        software = AnalyticsDecorator(software)
+
+    if eq.use_proxy:
+        from patterns.proxy import SoftwareProxy
+
+        proxy = SoftwareProxy(title=software.name(), required_license="VALID-KEY")
+        proxy.set_license(eq.license_key)
+        software = proxy
+
+    return software
+
+
+def _apply_one(
+    eq: EquipmentModel,
+    online: Optional[bool],
+    analytics: Optional[bool],
+    use_proxy: Optional[bool],
+    license_key: Optional[str],
+) -> bool:
+    before = (eq.use_online, eq.use_analytics, eq.use_proxy, eq.license_key)
+    if online is not None:
+        eq.use_online = bool(online)
+    if analytics is not None:
+        eq.use_analytics = bool(analytics)
+    if use_proxy is not None:
+        eq.use_proxy = bool(use_proxy)
+    if license_key is not None:
+        eq.license_key = license_key.strip()
+
+    if (eq.use_online, eq.use_analytics, eq.use_proxy, eq.license_key) == before:
+        return False
+    # у LazyModel цепочки ещё нет — она соберётся при материализации
+    if isinstance(eq, EquipmentModel):
+        eq.software = build_software(eq)
+    return True
+
+
+def apply_config(
+    models: List[EquipmentModel],
+    online: Optional[bool] = None,
+    analytics: Optional[bool] = None,
+    use_proxy: Optional[bool] = None,
+    license_key: Optional[str] = None,
+) -> int:
+    """
+    Массово меняет флаги (None = не трогать) и пересобирает цепочки ПО
+    только у реально изменённых моделей. Возвращает число изменённых.
+    """
+    return sum(_apply_one(eq, online, analytics, use_proxy, license_key) for eq in models)
+
+
+def apply_config_refs(
+    catalog: Catalog,
+    refs: Iterable[ModelRef],
+    online: Optional[bool] = None,
+    analytics: Optional[bool] = None,
+    use_proxy: Optional[bool] = None,
+    license_key: Optional[str] = None,
+) -> List[ModelRef]:
+    """То же, что apply_config(), но по ссылкам; возвращает ссылки реально изменённых моделей."""
+    return [
+        ref for ref in refs
+        if _apply_one(catalog[ref[0]][ref[1]], online, analytics, use_proxy, license_key)
+    ]
@@ -0,0 +1,169 @@
+from __future__ import annotations
+from dataclasses import replace
+from typing import Callable, Union
+
+from domain.equipment import EquipmentModel, format_summary
+from patterns.factory import FactoryRegistry
+from patterns.memento import ModelMemento, freeze_specs, thaw_specs
+from patterns.composite.catalog import build_software
+
+
+def model_to_memento(m: Union[EquipmentModel, "LazyModel"], default_factory_key: str = "") -> ModelMemento:
+    if isinstance(m, LazyModel):
+        # memento неизменяем — переиспользуем без копирования
+        return m.memento
+    return ModelMemento(
+        factory_key=getattr(m, "factory_key", default_factory_key),
+        equipment_type=m.equipment_type,
+        name=getattr(m, "name", "Model"),
+        specs=freeze_specs(m.specs),
+        functions=tuple(m.functions),
+        base_software_title=m.base_software_title,
+        use_online=bool(getattr(m, "use_online", False)),
+        use_analytics=bool(getattr(m, "use_analytics", False)),
+        use_proxy=bool(getattr(m, "use_proxy", False)),
+        license_key=str(getattr(m, "license_key", "")),
+        software_state_name=str(getattr(m, "software_state_name", "IDLE")),
+        is_clone=bool(getattr(m, "is_clone", False)),
+    )
+
+
+def model_from_memento(s: ModelMemento, registry: FactoryRegistry) -> EquipmentModel:
+    """Пересоздать модель через фабрику и собрать цепочку ПО по флагам."""
+    eq = registry.get(s.factory_key).create()
+    # одним update, а не десятком присваиваний: каждое из них двигает version
+    eq.__dict__.update(
+        factory_key=s.factory_key,
+        equipment_type=s.equipment_type,
+        name=s.name,
+        specs=thaw_specs(s.specs),
+        functions=list(s.functions),
+        base_software_title=s.base_software_title,
+        use_online=s.use_online,
+        use_analytics=s.use_analytics,
+        use_proxy=s.use_proxy,
+        license_key=s.license_key,
+        software_state_name=s.software_state_name,
+        is_clone=s.is_clone,
+    )
+    eq.software = build_software(eq)
+    return eq
+
+
+def memento_software_label(s: ModelMemento) -> str:
+    """Подпись цепочки ПО по флагам memento — без сборки самой цепочки."""
+    label = s.base_software_title
+    if s.use_online:
+        label += " + Online"
+    if s.use_analytics:
+        label += " + Analytics"
+    if s.use_proxy:
+        label += " (via proxy)"
+    return label
+
+
+def software_label(m: Union[EquipmentModel, "LazyModel"]) -> str:
+    if isinstance(m, LazyModel):
+        return m.software_label
+    return m.software.name()
+
+
+class LazyModel:
+    """
+    Лёгкая запись каталога поверх ModelMemento.
+    Дешёвые поля (имя, тип, флаги, подпись ПО) читаются прямо из memento,
+    полноценный EquipmentModel строится фабрикой только в materialize().
+    """
+    __slots__ = ("memento", "_build")
+
+    def __init__(self, memento: ModelMemento, build: Callable[[ModelMemento], EquipmentModel]) -> None:
+        self.memento = memento
+        self._build = build
+
+    def materialize(self) -> EquipmentModel:
+        return self._build(self.memento)
+
+    def summary(self) -> str:
+        # из memento, без временной модели: её Proxy в operation() грузил бы защищённый
+        # модуль (секунды или HTTP) на каждой странице отчёта. Цепочка без Proxy дешёвая
+        # и строится по тем же флагам — её вывод тот же, что у собранной модели
+        s = self.memento
+        if s.use_proxy:
+            done = "(защищённое ПО загружается через Proxy по Run operation())"
+        else:
+            done = build_software(self).operation()
+        return format_summary(
+            s.equipment_type, s.name, memento_software_label(s), thaw_specs(s.specs), s.functions, done
+        )
+
+    # --- дешёвые поля ---
+    @property
+    def name(self) -> str:
+        return self.memento.name
+
+    @property
+    def equipment_type(self) -> str:
+        return self.memento.equipment_type
+
+    @property
+    def factory_key(self) -> str:
+        return self.memento.factory_key
+
+    @property
+    def specs(self) -> dict:
+        # в memento specs — кортеж пар; наружу, как у EquipmentModel, dict (копия)
+        return thaw_specs(self.memento.specs)
+
+    @property
+    def functions(self) -> list:
+        return list(self.memento.functions)
+
+    @property
+    def base_software_title(self) -> str:
+        return self.memento.base_software_title
+
+    @property
+    def software_state_name(self) -> str:
+        return self.memento.software_state_name
+
+    @property
+    def is_clone(self) -> bool:
+        return self.memento.is_clone
+
+    @property
+    def software_label(self) -> str:
+        """То же, что вернул бы software.name() собранной цепочки."""
+        return memento_software_label(self.memento)
+
+    # --- флаги: меняются без материализации (новый memento) ---
+    @property
+    def use_online(self) -> bool:
+        return self.memento.use_online
+
+    @use_online.setter
+    def use_online(self, value: bool) -> None:
+        self.memento = replace(self.memento, use_online=bool(value))
+
+    @property
+    def use_analytics(self) -> bool:
+        return self.memento.use_analytics
+
+    @use_analytics.setter
+    def use_analytics(self, value: bool) -> None:
+        self.memento = replace(self.memento, use_analytics=bool(value))
+
+    @property
+    def use_proxy(self) -> bool:
+        return self.memento.use_proxy
+
+    @use_proxy.setter
+    def use_proxy(self, value: bool) -> None:
+        self.memento = replace(self.memento, use_proxy=bool(value))
+
+    @property
+    def license_key(self) -> str:
+        return self.memento.license_key
+
+    @license_key.setter
+    def license_key(self, value: str) -> None:
+        self.memento = replace(self.memento, license_key=value)
@@ -0,0 +1,90 @@
+from __future__ import annotations
+import gc
+import os
+import pickle
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional, Sequence
+
+from domain.equipment import EquipmentModel
+from patterns.factory import FactoryRegistry, RecipeFactory
+from patterns.builder import default_recipes
+from patterns.memento import ModelMemento
+from patterns.composite.materialize import model_from_memento
+
+
+# меньше — быстрее последовательно: старт процессов и пересылка дороже самой сборки
+PARALLEL_THRESHOLD = 20_000
+CHUNK_SIZE = 5_000
+
+RegistryFactory = Callable[[], FactoryRegistry]
+
+
+def default_registry(with_log: bool = False) -> FactoryRegistry:
+    """
+    Реестр как в приложении: фабрика на каждый рецепт (воспроизводим в worker-процессе).
+    with_log=True — модели с логом сборки, как в реестре окна; в worker передаётся
+    через functools.partial(default_registry, with_log=True).
+    """
+    registry = FactoryRegistry()
+    for key in default_recipes().keys():
+        registry.register(key, RecipeFactory(key, with_log=with_log))
+    return registry
+
+
+@contextmanager
+def _gc_paused() -> Iterator[None]:
+    """
+    Циклический GC на время массового создания объектов: иначе он запускается
+    на каждые ~700 аллокаций и обходит весь растущий граф (около половины времени).
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+_worker_registry: Optional[FactoryRegistry] = None
+
+
+def _materialize_chunk(snaps: List[ModelMemento], make_registry: RegistryFactory) -> bytes:
+    # выполняется в worker-процессе: реестр создаётся один раз на процесс
+    global _worker_registry
+    if _worker_registry is None:
+        _worker_registry = make_registry()
+    with _gc_paused():
+        models = [model_from_memento(s, _worker_registry) for s in snaps]
+    return pickle.dumps(models, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def materialize_many(
+    snaps: Sequence[ModelMemento],
+    registry: FactoryRegistry,
+    workers: Optional[int] = None,
+    threshold: int = PARALLEL_THRESHOLD,
+    chunk_size: int = CHUNK_SIZE,
+    make_registry: RegistryFactory = default_registry,
+) -> List[EquipmentModel]:
+    """
+    Материализует memento в EquipmentModel.
+    До threshold (или при одном ядре) — последовательно через registry;
+    иначе блоки по chunk_size собираются в ProcessPoolExecutor, возвращаются
+    одним pickle-буфером на блок и распаковываются здесь, в порядке исходного списка.
+    make_registry должен быть функцией уровня модуля (её получает worker).
+    """
+    workers = workers or os.cpu_count() or 1
+    if len(snaps) < threshold or workers <= 1:
+        with _gc_paused():
+            return [model_from_memento(s, registry) for s in snaps]
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    chunks = [list(snaps[i:i + chunk_size]) for i in range(0, len(snaps), chunk_size)]
+    models: List[EquipmentModel] = []
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+        for blob in pool.map(_materialize_chunk, chunks, [make_registry] * len(chunks)):
+            with _gc_paused():
+                models.extend(pickle.loads(blob))
+    return models
@@ -0,0 +1,178 @@
+from __future__ import annotations
+import re
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional, Tuple
+
+from patterns.composite.catalog import ModelRef, shift_map, shifted_pending
+
+
+Number = float  # int тоже подходит: сравниваются как числа
+
+
+def _numeric(value) -> bool:
+    # bool — подкласс int, но has_pulse_sensor=True не число
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class _SortedColumn:
+    """Значения одного spec-ключа по возрастанию + параллельный список ссылок."""
+    __slots__ = ("values", "refs")
+
+    def __init__(self) -> None:
+        self.values: List[Number] = []
+        self.refs: List[ModelRef] = []
+
+    def insert(self, value: Number, ref: ModelRef) -> None:
+        i = bisect_right(self.values, value)
+        self.values.insert(i, value)
+        self.refs.insert(i, ref)
+
+    def delete(self, value: Number, ref: ModelRef) -> None:
+        lo = bisect_left(self.values, value)
+        hi = bisect_right(self.values, value, lo)
+        i = self.refs.index(ref, lo, hi)
+        del self.values[i]
+        del self.refs[i]
+
+    def rename(self, value: Number, old: ModelRef, new: ModelRef) -> None:
+        lo = bisect_left(self.values, value)
+        hi = bisect_right(self.values, value, lo)
+        self.refs[self.refs.index(old, lo, hi)] = new
+
+    def extend_sorted(self, pairs: List[Tuple[Number, ModelRef]]) -> None:
+        merged = list(zip(self.values, self.refs))
+        merged.extend(pairs)
+        merged.sort(key=lambda p: p[0])
+        self.values = [v for v, _ in merged]
+        self.refs = [r for _, r in merged]
+
+    def between(self, lo: Optional[Number], hi: Optional[Number]) -> List[ModelRef]:
+        start = 0 if lo is None else bisect_left(self.values, lo)
+        stop = len(self.values) if hi is None else bisect_right(self.values, hi)
+        return self.refs[start:stop]
+
+
+class SpecRangeIndex:
+    """
+    Отсортированные индексы по числовым specs: spec-ключ -> значения по возрастанию.
+    Запрос диапазона [lo, hi] — два bisect и срез, без обхода моделей.
+    Как и поисковый индекс, обновляется через Catalog (add/remove/reindex);
+    пакет добавлений (restore) вливается одной сортировкой перед первым запросом.
+    """
+    def __init__(self) -> None:
+        self._columns: Dict[str, _SortedColumn] = {}
+        self._doc_values: Dict[ModelRef, List[Tuple[str, Number]]] = {}
+        self._pending: List[Tuple[ModelRef, object]] = []
+
+    def clear(self) -> None:
+        self._columns.clear()
+        self._doc_values.clear()
+        self._pending.clear()
+
+    def add(self, ref: ModelRef, model) -> None:
+        self._pending.append((ref, model))
+
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        batch: Dict[str, List[Tuple[Number, ModelRef]]] = {}
+        for ref, model in pending:
+            values = [(k, v) for k, v in getattr(model, "specs", {}).items() if _numeric(v)]
+            self._doc_values[ref] = values
+            for key, value in values:
+                batch.setdefault(key, []).append((value, ref))
+        for key, pairs in batch.items():
+            column = self._columns.get(key)
+            if column is None:
+                column = self._columns[key] = _SortedColumn()
+            if len(pairs) < 64:
+                for value, ref in pairs:
+                    column.insert(value, ref)
+            else:
+                column.extend_sorted(pairs)
+
+    def remove(self, ref: ModelRef, model=None) -> None:
+        self._flush()
+        self._unindex(ref)
+
+    def _unindex(self, ref: ModelRef) -> None:
+        for key, value in self._doc_values.pop(ref, ()):
+            column = self._columns[key]
+            column.delete(value, ref)
+            if not column.values:
+                del self._columns[key]
+
+    def shift(self, ref: ModelRef, model, count: int) -> None:
+        """Как CatalogSearchIndex.shift: значения сдвинутых моделей остаются на местах, меняются ссылки."""
+        self._unindex(ref)
+        moved = shift_map(ref, count)
+        doc_values, columns = self._doc_values, self._columns
+        olds = [old for old in moved if old in doc_values]
+        if len(olds) > 256:
+            # длинный хвост: один проход map по каждой колонке (на уровне C) дешевле поиска каждой ссылки
+            get = moved.get
+            for column in columns.values():
+                column.refs = list(map(get, column.refs, column.refs))
+        else:
+            for old in olds:
+                for key, value in doc_values[old]:
+                    columns[key].rename(value, old, moved[old])
+        if olds:
+            values = list(map(doc_values.pop, olds))
+            doc_values.update(zip(map(moved.__getitem__, olds), values))
+        if self._pending:
+            self._pending = shifted_pending(self._pending, ref)
+
+    def replace(self, ref: ModelRef, old, new) -> None:
+        if getattr(old, "specs", {}) == getattr(new, "specs", {}):
+            return
+        self.remove(ref, old)
+        self.add(ref, new)
+
+    def keys(self) -> List[str]:
+        self._flush()
+        return sorted(self._columns)
+
+    def range(self, key: str, lo: Optional[Number] = None, hi: Optional[Number] = None) -> List[ModelRef]:
+        """Модели с lo <= specs[key] <= hi (None — без границы), по возрастанию значения."""
+        self._flush()
+        column = self._columns.get(key)
+        if column is None:
+            return []
+        return column.between(lo, hi)
+
+
+SpecRange = Tuple[str, Optional[Number], Optional[Number]]
+
+_FILTER = re.compile(
+    r"(?P<key>[A-Za-z_]\w*)\s*(?:(?P<op>>=|<=|=)\s*(?P<num>-?\d+(?:\.\d+)?)(?:\.\.(?P<num2>-?\d+(?:\.\d+)?))?)"
+)
+
+
+def parse_spec_ranges(query: str) -> Tuple[str, List[SpecRange]]:
+    """
+    Выделяет из строки поиска фильтры по specs:
+    "max_speed_kmh>=16", "max_power_watts=400..600", "incline_levels<=10", "max_resistance=20".
+    Возвращает (остаток строки для текстового поиска, [(key, lo, hi)]).
+    """
+    ranges: List[SpecRange] = []
+
+    def take(m: re.Match) -> str:
+        key, op = m.group("key"), m.group("op")
+        a = float(m.group("num"))
+        b = m.group("num2")
+        if b is not None:
+            if op != "=":
+                return m.group(0)
+            ranges.append((key, a, float(b)))
+        elif op == ">=":
+            ranges.append((key, a, None))
+        elif op == "<=":
+            ranges.append((key, None, a))
+        else:
+            ranges.append((key, a, a))
+        return " "
+
+    rest = _FILTER.sub(take, query)
+    return " ".join(rest.split()), ranges
@@ -0,0 +1,39 @@
+from __future__ import annotations
+from typing import Iterator, Mapping, Optional, Sequence, TextIO
+
+from domain.equipment import EquipmentType
+
+
+def iter_catalog_report(
+    catalog: Mapping[str, Sequence],
+    offset: int = 0,
+    limit: Optional[int] = None,
+) -> Iterator[str]:
+    """
+    Отчёт по всему каталогу кусками (EquipmentType.iter_summary по каждому типу).
+    offset/limit считаются в моделях сквозь все типы (в порядке сортировки типов);
+    типы, целиком попавшие до offset или после limit, пропускаются.
+    """
+    remaining = limit
+    for eq_type in sorted(catalog.keys()):
+        models = catalog[eq_type]
+        if offset and offset >= len(models):
+            # тип целиком до offset (пустой — тоже: его заголовок не на этой странице)
+            offset -= len(models)
+            continue
+        if remaining is not None and remaining <= 0:
+            return
+        take = None if remaining is None else max(0, min(remaining, len(models) - offset))
+        yield from EquipmentType(name=eq_type, models=models).iter_summary(offset, take)
+        if remaining is not None:
+            remaining -= take
+        offset = 0
+
+
+def write_catalog_report(catalog: Mapping[str, Sequence], fp: TextIO, offset: int = 0, limit: Optional[int] = None) -> int:
+    """Пишет отчёт в поток по кускам (память не растёт с размером каталога). Возвращает число символов."""
+    written = 0
+    for chunk in iter_catalog_report(catalog, offset, limit):
+        fp.write(chunk)
+        written += len(chunk)
+    return written
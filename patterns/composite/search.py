@@ -0,0 +1,179 @@
+from __future__ import annotations
+import heapq
+import re
+from bisect import bisect_left, insort
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from patterns.composite.catalog import ModelRef, shift_map, shifted_pending
+
+
+_TOKEN = re.compile(r"[^\W_]+")  # snake_case ключи specs делятся на слова
+
+
+@lru_cache(maxsize=65536)
+def tokenize(text: str) -> Tuple[str, ...]:
+    # functions/ключи specs/названия ПО повторяются у тысяч моделей — кэшируем
+    return tuple(_TOKEN.findall(text.casefold()))
+
+
+def model_terms(model) -> Set[str]:
+    """Термы модели: токены имени, functions, ключи specs, название ПО (LazyModel не материализуется)."""
+    terms: Set[str] = set(tokenize(getattr(model, "name", "")))
+    for f in getattr(model, "functions", ()):
+        terms.update(tokenize(f))
+    for key in getattr(model, "specs", {}):
+        terms.update(tokenize(key))
+    terms.update(tokenize(getattr(model, "base_software_title", "")))
+    return terms
+
+
+class CatalogSearchIndex:
+    """
+    Инвертированный индекс каталога: терм -> множество ссылок (type, idx).
+    Термы дополнительно лежат в отсортированном списке — префиксный запрос
+    это bisect до первого терма с префиксом и проход, пока префикс совпадает.
+    Обновляется инкрементально через Catalog (add/remove/reindex).
+
+    add() только ставит модель в очередь: postings строятся перед первым
+    запросом, а новые термы вливаются в список одной сортировкой — restore
+    на 100k моделей не платит за индекс, пока никто не ищет.
+    """
+    def __init__(self) -> None:
+        self._postings: Dict[str, Set[ModelRef]] = {}
+        self._terms: List[str] = []
+        self._new_terms: List[str] = []
+        self._doc_terms: Dict[ModelRef, Set[str]] = {}
+        self._pending: List[Tuple[ModelRef, object]] = []
+
+    def __len__(self) -> int:
+        self._flush()
+        return len(self._doc_terms)
+
+    def clear(self) -> None:
+        self._postings.clear()
+        self._terms.clear()
+        self._new_terms.clear()
+        self._doc_terms.clear()
+        self._pending.clear()
+
+    def _flush(self) -> None:
+        if self._pending:
+            pending, self._pending = self._pending, []
+            for ref, model in pending:
+                self._index(ref, model)
+        if self._new_terms:
+            if len(self._new_terms) < 64:
+                # create/clone: пара новых термов — insort дешевле пересортировки
+                for term in self._new_terms:
+                    insort(self._terms, term)
+            else:
+                self._terms.extend(self._new_terms)
+                self._terms.sort()
+            self._new_terms.clear()
+
+    def _sorted_terms(self) -> List[str]:
+        self._flush()
+        return self._terms
+
+    def add(self, ref: ModelRef, model) -> None:
+        self._pending.append((ref, model))
+
+    def _index(self, ref: ModelRef, model) -> None:
+        terms = model_terms(model)
+        self._doc_terms[ref] = terms
+        postings = self._postings
+        for term in terms:
+            docs = postings.get(term)
+            if docs is None:
+                postings[term] = {ref}
+                self._new_terms.append(term)
+            else:
+                docs.add(ref)
+
+    def remove(self, ref: ModelRef, model=None) -> None:
+        self._flush()
+        self._unindex(ref)
+
+    def _unindex(self, ref: ModelRef) -> None:
+        # вне _flush() _terms согласован с _postings: у каждого терма из _doc_terms он есть в списке
+        terms = self._terms
+        for term in self._doc_terms.pop(ref, ()):
+            docs = self._postings[term]
+            docs.discard(ref)
+            if not docs:
+                del self._postings[term]
+                del terms[bisect_left(terms, term)]
+
+    def shift(self, ref: ModelRef, model, count: int) -> None:
+        """
+        Удаление ref со сдвигом следующих count ссылок типа на позицию ниже:
+        термы сдвинутых моделей не пересчитываются, меняются только ссылки в postings.
+        Очередь add() не сбрасывается — её ссылки сдвигаются на месте.
+        """
+        self._unindex(ref)
+        moved = shift_map(ref, count)
+        doc_terms, postings = self._doc_terms, self._postings
+        olds = [old for old in moved if old in doc_terms]
+        if olds:
+            terms = list(map(doc_terms.pop, olds))
+            doc_terms.update(zip(map(moved.__getitem__, olds), terms))
+            # по каждому терму — операции над множествами на уровне C, без цикла Python по ссылкам
+            old_refs = set(olds)
+            for term in set().union(*terms):
+                docs = postings[term]
+                hits = docs & old_refs
+                docs -= hits
+                docs.update(map(moved.__getitem__, hits))
+        if self._pending:
+            self._pending = shifted_pending(self._pending, ref)
+
+    def replace(self, ref: ModelRef, old, new) -> None:
+        # правки флагов (Decorator/Proxy) термов не меняют — индекс не трогаем
+        if model_terms(old) == model_terms(new):
+            return
+        self.remove(ref, old)
+        self.add(ref, new)
+
+    def _prefix_docs(self, prefix: str) -> Set[ModelRef]:
+        terms = self._sorted_terms()
+        i = bisect_left(terms, prefix)
+        docs: Optional[Set[ModelRef]] = None
+        union = False
+        while i < len(terms) and terms[i].startswith(prefix):
+            posting = self._postings[terms[i]]
+            if docs is None:
+                docs = posting
+            else:
+                if not union:
+                    docs = set(docs)  # не портим posting первого терма
+                    union = True
+                docs |= posting
+            i += 1
+        return docs if docs is not None else set()
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[ModelRef]:
+        """
+        Каждое слово запроса — префикс; результат — модели, где нашлись все слова,
+        в порядке дерева (тип, позиция). Пустой запрос — пустой результат.
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        sets = sorted((self._prefix_docs(t) for t in tokens), key=len)
+        result: Iterable[ModelRef] = sets[0]
+        if len(sets) > 1:
+            result = sets[0].intersection(*sets[1:])
+        if limit is None:
+            return sorted(result)
+        return heapq.nsmallest(limit, result)
+
+    def terms(self, prefix: str = "", limit: int = 20) -> List[str]:
+        """Подсказки для автодополнения: термы с данным префиксом."""
+        terms = self._sorted_terms()
+        i = bisect_left(terms, prefix)
+        out: List[str] = []
+        while i < len(terms) and len(out) < limit and terms[i].startswith(prefix):
+            out.append(terms[i])
+            i += 1
+        return out
@@ -0,0 +1,249 @@
+from __future__ import annotations
+import json
+import sqlite3
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from patterns.memento import EquipmentMemento, ModelMemento, thaw_specs
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS models (
+    id                  INTEGER PRIMARY KEY,
+    equipment_type      TEXT    NOT NULL,
+    pos                 INTEGER NOT NULL,
+    name                TEXT    NOT NULL,
+    factory_key         TEXT    NOT NULL,
+    base_software_title TEXT    NOT NULL,
+    use_online          INTEGER NOT NULL,
+    use_analytics       INTEGER NOT NULL,
+    use_proxy           INTEGER NOT NULL,
+    license_key         TEXT    NOT NULL,
+    software_state_name TEXT    NOT NULL,
+    specs               TEXT    NOT NULL,
+    functions           TEXT    NOT NULL,
+    is_clone            INTEGER NOT NULL DEFAULT 0
+);
+CREATE UNIQUE INDEX IF NOT EXISTS ix_models_type_pos ON models(equipment_type, pos);
+CREATE INDEX IF NOT EXISTS ix_models_name ON models(name);
+CREATE INDEX IF NOT EXISTS ix_models_factory_key ON models(factory_key);
+CREATE INDEX IF NOT EXISTS ix_models_flags ON models(use_online, use_analytics, use_proxy);
+CREATE INDEX IF NOT EXISTS ix_models_type_flags ON models(equipment_type, use_proxy, use_online, use_analytics);
+"""
+
+_COLUMNS = (
+    "equipment_type, pos, name, factory_key, base_software_title, use_online, use_analytics, "
+    "use_proxy, license_key, software_state_name, specs, functions, is_clone"
+)
+_INSERT = f"INSERT INTO models ({_COLUMNS}) VALUES ({', '.join('?' * len(_COLUMNS.split(',')))})"
+
+# поля, по которым разрешено фильтровать (защита от подстановки имён колонок)
+_FILTERS = ("equipment_type", "factory_key", "use_online", "use_analytics", "use_proxy")
+_FLAGS = ("use_online", "use_analytics", "use_proxy", "license_key")
+# всё, кроме ключа (equipment_type, pos) — для UPDATE строки на месте
+_UPDATE = ", ".join(f"{c.strip()} = ?" for c in _COLUMNS.split(",")[2:])
+
+
+def _row(eq_type: str, pos: int, s: ModelMemento) -> tuple:
+    return (
+        eq_type,
+        pos,
+        s.name,
+        s.factory_key,
+        s.base_software_title,
+        int(s.use_online),
+        int(s.use_analytics),
+        int(s.use_proxy),
+        s.license_key,
+        s.software_state_name,
+        json.dumps(thaw_specs(s.specs), ensure_ascii=False),
+        json.dumps(list(s.functions), ensure_ascii=False),
+        int(s.is_clone),
+    )
+
+
+def _memento(row: tuple) -> ModelMemento:
+    (eq_type, _pos, name, factory_key, base_title, online, analytics, proxy, lic, state, specs, funcs, clone) = row
+    return ModelMemento(
+        factory_key=factory_key,
+        equipment_type=eq_type,
+        name=name,
+        specs=json.loads(specs),
+        functions=json.loads(funcs),
+        base_software_title=base_title,
+        use_online=bool(online),
+        use_analytics=bool(analytics),
+        use_proxy=bool(proxy),
+        license_key=lic,
+        software_state_name=state,
+        is_clone=bool(clone),
+    )
+
+
+def _where(filters: Dict[str, object]) -> Tuple[str, list]:
+    parts, args = [], []
+    for key, value in filters.items():
+        if key not in _FILTERS:
+            raise ValueError(f"Unsupported filter: {key}")
+        parts.append(f"{key} = ?")
+        args.append(int(value) if isinstance(value, bool) else value)
+    return (" WHERE " + " AND ".join(parts)) if parts else "", args
+
+
+class SqliteCatalogStore:
+    """
+    Опциональное хранилище каталога на стандартном sqlite3.
+    Хранит модели как ModelMemento-строки: индексы по типу, имени, factory_key и флагам,
+    specs/functions — JSON. Пейджинг, поиск и массовые обновления — индексные запросы
+    (для инструментов и отчётов поверх файла БД).
+
+    В GUI это постоянная копия каталога: при старте он загружается из БД (to_memento),
+    каждый snapshot дописывается через sync() — только изменённые строки. Дерево, поиск
+    и массовые правки GUI работают с живым каталогом в памяти (модели с Decorator/Proxy),
+    а не с этими запросами.
+
+    Порядок моделей внутри типа задаёт колонка pos (как индекс в списке каталога).
+    """
+    def __init__(self, path: str = ":memory:", wal: bool = True) -> None:
+        self._conn = sqlite3.connect(path)
+        if wal and path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        # БД прежних версий — без колонки is_clone
+        if "is_clone" not in {r[1] for r in self._conn.execute("PRAGMA table_info(models)")}:
+            with self._conn:
+                self._conn.execute("ALTER TABLE models ADD COLUMN is_clone INTEGER NOT NULL DEFAULT 0")
+        # что сейчас лежит в БД, по типам: база для sync(); None — неизвестно (нужна полная запись)
+        self._written: Optional[Dict[str, Sequence[ModelMemento]]] = None
+
+    def close(self) -> None:
+        self._conn.close()
+
+    # -----------------------------
+    # Запись
+    # -----------------------------
+    def add(self, s: ModelMemento) -> None:
+        self.add_many([s])
+
+    def add_many(self, snaps: Iterable[ModelMemento]) -> int:
+        """Пакетная вставка в одной транзакции; pos продолжает существующий список типа."""
+        conn = self._conn
+        next_pos: Dict[str, int] = {}
+        rows = []
+        for s in snaps:
+            pos = next_pos.get(s.equipment_type)
+            if pos is None:
+                pos = self.count(equipment_type=s.equipment_type)
+            rows.append(_row(s.equipment_type, pos, s))
+            next_pos[s.equipment_type] = pos + 1
+        with conn:
+            conn.executemany(_INSERT, rows)
+        self._written = None
+        return len(rows)
+
+    def replace_all(self, mem: EquipmentMemento) -> None:
+        """Заменить содержимое snapshot'ом (одна транзакция)."""
+        rows = (
+            _row(eq_type, pos, s)
+            for eq_type, snaps in mem.catalog.items()
+            for pos, s in enumerate(snaps)
+        )
+        with self._conn:
+            self._conn.execute("DELETE FROM models")
+            self._conn.executemany(_INSERT, rows)
+        self._written = dict(mem.catalog)
+
+    def sync(self, mem: EquipmentMemento) -> int:
+        """
+        Привести содержимое к snapshot'у, записав только изменения с прошлого sync()/replace_all()/
+        to_memento(): соседние snapshot'ы делят кортежи неизменённых типов и объекты моделей,
+        поэтому сравнение идёт по ссылке, а по содержимому — только у разошедшихся.
+        Без известной базы — полная замена. Возвращает число записанных/удалённых строк.
+        """
+        written = self._written
+        if written is None:
+            self.replace_all(mem)
+            return sum(len(snaps) for snaps in mem.catalog.values())
+        changed = 0
+        with self._conn as conn:
+            for eq_type in written.keys() - mem.catalog.keys():
+                changed += conn.execute("DELETE FROM models WHERE equipment_type = ?", (eq_type,)).rowcount
+            for eq_type, snaps in mem.catalog.items():
+                old = written.get(eq_type, ())
+                if snaps is old:
+                    continue
+                common = min(len(old), len(snaps))
+                updates = [
+                    _row(eq_type, pos, snaps[pos])[2:] + (eq_type, pos)
+                    for pos in range(common)
+                    if snaps[pos] is not old[pos] and snaps[pos] != old[pos]
+                ]
+                if updates:
+                    conn.executemany(f"UPDATE models SET {_UPDATE} WHERE equipment_type = ? AND pos = ?", updates)
+                if len(old) > common:
+                    conn.execute("DELETE FROM models WHERE equipment_type = ? AND pos >= ?", (eq_type, common))
+                inserts = [_row(eq_type, pos, snaps[pos]) for pos in range(common, len(snaps))]
+                if inserts:
+                    conn.executemany(_INSERT, inserts)
+                changed += len(updates) + len(inserts) + len(old) - common
+        self._written = dict(mem.catalog)
+        return changed
+
+    def bulk_update(
+        self,
+        online: Optional[bool] = None,
+        analytics: Optional[bool] = None,
+        use_proxy: Optional[bool] = None,
+        license_key: Optional[str] = None,
+        **filters: object,
+    ) -> int:
+        """UPDATE ... WHERE по индексированным фильтрам. None = не менять."""
+        values = dict(zip(_FLAGS, (online, analytics, use_proxy, license_key)))
+        sets = [(k, int(v) if isinstance(v, bool) else v) for k, v in values.items() if v is not None]
+        if not sets:
+            return 0
+        where, args = _where(filters)
+        sql = f"UPDATE models SET {', '.join(f'{k} = ?' for k, _ in sets)}{where}"
+        with self._conn:
+            cur = self._conn.execute(sql, [v for _, v in sets] + args)
+        self._written = None
+        return cur.rowcount
+
+    # -----------------------------
+    # Чтение
+    # -----------------------------
+    def types(self) -> List[str]:
+        return [r[0] for r in self._conn.execute("SELECT DISTINCT equipment_type FROM models ORDER BY equipment_type")]
+
+    def count(self, **filters: object) -> int:
+        where, args = _where(filters)
+        return self._conn.execute(f"SELECT COUNT(*) FROM models{where}", args).fetchone()[0]
+
+    def page(self, equipment_type: str, offset: int = 0, limit: int = 100) -> List[ModelMemento]:
+        """Страница моделей типа в порядке каталога (для постраничного дерева)."""
+        rows = self._conn.execute(
+            f"SELECT {_COLUMNS} FROM models WHERE equipment_type = ? AND pos >= ? ORDER BY pos LIMIT ?",
+            (equipment_type, offset, limit),
+        )
+        return [_memento(r) for r in rows]
+
+    def find(self, **filters: object) -> Iterator[ModelMemento]:
+        where, args = _where(filters)
+        for r in self._conn.execute(f"SELECT {_COLUMNS} FROM models{where} ORDER BY equipment_type, pos", args):
+            yield _memento(r)
+
+    def search_name(self, prefix: str, limit: int = 100) -> List[ModelMemento]:
+        """Поиск по префиксу имени: диапазон по индексу ix_models_name."""
+        rows = self._conn.execute(
+            f"SELECT {_COLUMNS} FROM models WHERE name >= ? AND name < ? ORDER BY name LIMIT ?",
+            (prefix, prefix + "\U0010ffff", limit),
+        )
+        return [_memento(r) for r in rows]
+
+    def to_memento(self, current_ref: Optional[Tuple[str, int]] = None) -> EquipmentMemento:
+        catalog: Dict[str, List[ModelMemento]] = {}
+        for s in self.find():
+            catalog.setdefault(s.equipment_type, []).append(s)
+        mem = EquipmentMemento(catalog=catalog, current_ref=current_ref)
+        self._written = dict(mem.catalog)
+        return mem
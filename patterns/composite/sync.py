@@ -0,0 +1,165 @@
+from __future__ import annotations
+import threading
+from contextlib import ExitStack, contextmanager
+from typing import Callable, Dict, Iterator, List, Mapping, Optional, Sequence
+
+from domain.equipment import EquipmentModel
+from patterns.memento import EquipmentMemento, ModelMemento
+from patterns.rwlock import RWLock
+from patterns.composite.catalog import Catalog, ModelPredicate, ModelRef
+from patterns.composite.search import CatalogSearchIndex
+from patterns.composite.versions import CatalogVersions, CatalogView, patch_catalog
+
+
+class SyncCatalog:
+    """
+    Потокобезопасный доступ к Catalog для фоновых читателей и писателей.
+
+    Два уровня RW-блокировок:
+    - на набор типов: её read берёт любая операция над одним типом,
+      write — операции, меняющие набор типов или весь каталог (exclusive(), replace());
+    - по одной на тип: читатели одного типа идут параллельно, а запись в «Bike»
+      не мешает читателям «Treadmill».
+    Индексы поиска общие для всех типов, поэтому их обновление и запросы
+    идут под отдельным mutex.
+
+    Порядок захвата (во избежание взаимных блокировок): набор типов -> типы по
+    алфавиту -> индексы. Правки полей самой модели (флаги текущей модели в UI)
+    блокировками не покрываются — целостное чтение даёт CatalogView (publish()).
+    """
+    def __init__(self, catalog: Optional[Catalog] = None, per_type: bool = True) -> None:
+        self._catalog = catalog if catalog is not None else Catalog()
+        self._types = RWLock()
+        self._per_type = per_type
+        self._shared = RWLock()
+        self._type_locks: Dict[str, RWLock] = {}
+        self._guard = threading.Lock()
+        self._index_lock = threading.Lock()
+
+    @property
+    def catalog(self) -> Catalog:
+        """Сам каталог — без блокировок, для потока-владельца (UI), который и есть писатель."""
+        return self._catalog
+
+    def lock_for(self, eq_type: str) -> RWLock:
+        if not self._per_type:
+            return self._shared
+        with self._guard:
+            lock = self._type_locks.get(eq_type)
+            if lock is None:
+                lock = self._type_locks[eq_type] = RWLock()
+            return lock
+
+    def locks(self) -> List[RWLock]:
+        """Все блокировки (для статистики ожидания)."""
+        with self._guard:
+            return [self._types, self._shared, *self._type_locks.values()]
+
+    # -----------------------------
+    # Блокировки
+    # -----------------------------
+    @contextmanager
+    def reading(self, eq_type: str) -> Iterator[Sequence]:
+        """Список моделей типа для чтения (не менять и не уносить за пределы with)."""
+        with self._types.read(), self.lock_for(eq_type).read():
+            yield self._catalog.get(eq_type, ())
+
+    @contextmanager
+    def writing(self, eq_type: str) -> Iterator[list]:
+        """Список моделей существующего типа для правки на месте (без добавления/удаления)."""
+        with self._types.read(), self.lock_for(eq_type).write():
+            yield self._catalog[eq_type]
+
+    @contextmanager
+    def exclusive(self) -> Iterator[Catalog]:
+        """Весь каталог в одни руки: каждая операция над типом держит read набора типов."""
+        with self._types.write(), self._index_lock:
+            yield self._catalog
+
+    @contextmanager
+    def snapshot(self) -> Iterator[Catalog]:
+        """Согласованный срез всего каталога: read по всем типам сразу."""
+        with ExitStack() as stack:
+            stack.enter_context(self._types.read())
+            locks = {id(lock): lock for lock in (self.lock_for(t) for t in sorted(self._catalog))}
+            for lock in locks.values():
+                stack.enter_context(lock.read())
+            yield self._catalog
+
+    # -----------------------------
+    # Операции
+    # -----------------------------
+    def types(self) -> List[str]:
+        with self._types.read():
+            return list(self._catalog)
+
+    def get(self, eq_type: str, idx: int):
+        with self.reading(eq_type) as models:
+            return models[idx]
+
+    def models_of(self, eq_type: str) -> list:
+        with self.reading(eq_type) as models:
+            return list(models)
+
+    def add(self, model: EquipmentModel) -> ModelRef:
+        eq_type = model.equipment_type
+        with self._types.read():
+            if eq_type in self._catalog:
+                with self.lock_for(eq_type).write(), self._index_lock:
+                    return self._catalog.add(model)
+        # новый тип меняет сам словарь
+        with self._types.write(), self._index_lock:
+            return self._catalog.add(model)
+
+    def remove(self, eq_type: str, idx: int) -> EquipmentModel:
+        # удаление сдвигает ссылки в индексах и может убрать тип целиком — эксклюзивно
+        with self.exclusive() as catalog:
+            return catalog.remove(eq_type, idx)
+
+    def materialize(self, eq_type: str, idx: int) -> EquipmentModel:
+        with self.writing(eq_type):
+            return self._catalog.materialize(eq_type, idx)
+
+    def select(self, predicate: Optional[ModelPredicate] = None) -> List[EquipmentModel]:
+        """Тип за типом: писатели других типов в это время не ждут."""
+        out: List[EquipmentModel] = []
+        for eq_type in self.types():
+            with self.reading(eq_type) as models:
+                out.extend(m for m in models if predicate is None or predicate(m))
+        return out
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[ModelRef]:
+        with self._types.read(), self._index_lock:
+            return self._catalog.index_of(CatalogSearchIndex).search(query, limit)
+
+    def spec_range(self, key: str, lo: Optional[float] = None, hi: Optional[float] = None, **kwargs) -> List[ModelRef]:
+        # диапазон берётся из индекса, а фильтры по флагам читают модели всех типов
+        with self.snapshot() as catalog, self._index_lock:
+            return catalog.spec_range(key, lo, hi, **kwargs)
+
+    def publish(self, versions: CatalogVersions, current: Optional[EquipmentModel] = None) -> CatalogView:
+        with self.snapshot() as catalog:
+            return versions.publish(catalog, current)
+
+    def patch(
+        self,
+        have: Mapping[str, Sequence[ModelMemento]],
+        want: EquipmentMemento,
+        build: Callable[[ModelMemento], EquipmentModel],
+    ) -> int:
+        """Восстановить snapshot правкой на месте (см. patch_catalog): цена — по размеру разницы."""
+        with self.exclusive() as catalog:
+            return patch_catalog(catalog, have, want, build)
+
+    def replace(self, catalog: Catalog, reindex: bool = True) -> Catalog:
+        """
+        Подменить каталог целиком (восстановление snapshot'а); возвращает прежний.
+        Индексы обычно общие у старого и нового каталога, поэтому reindex — под той же блокировкой.
+        """
+        with self._types.write(), self._index_lock:
+            if reindex:
+                catalog.reindex()
+            prev, self._catalog = self._catalog, catalog
+            with self._guard:
+                self._type_locks.clear()
+        return prev
@@ -0,0 +1,223 @@
+from __future__ import annotations
+import threading
+import weakref
+from collections.abc import Mapping
+from itertools import compress
+from operator import and_, is_, is_not, not_
+from types import MappingProxyType
+from typing import Callable, Dict, Iterable, Iterator, List, Mapping as MappingType, Optional, Sequence, Tuple
+
+from domain.equipment import EquipmentModel
+from patterns.memento import EquipmentMemento, ModelMemento
+from patterns.composite.catalog import Catalog, ModelRef
+from patterns.composite.materialize import LazyModel
+
+
+class CatalogView(Mapping):
+    """
+    Неизменяемая версия каталога: тип -> кортеж ModelMemento.
+    Её можно держать сколько угодно долго и читать из любого потока без блокировок:
+    редактор публикует новые версии, а эта остаётся такой, какой была.
+    Кортежи неизменённых типов общие у соседних версий.
+    """
+    def __init__(self, version: int, types: Dict[str, Tuple[ModelMemento, ...]], current_ref: Optional[ModelRef]) -> None:
+        self.version = version
+        self.current_ref = current_ref
+        self._types = MappingProxyType(types)
+        self._count = sum(len(snaps) for snaps in types.values())
+
+    def __getitem__(self, eq_type: str) -> Tuple[ModelMemento, ...]:
+        return self._types[eq_type]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._types)
+
+    def __len__(self) -> int:
+        return len(self._types)
+
+    def count(self) -> int:
+        """Число моделей во всех типах."""
+        return self._count
+
+    def models(self) -> Iterator[ModelMemento]:
+        for snaps in self._types.values():
+            yield from snaps
+
+    def to_memento(self) -> EquipmentMemento:
+        # кортежи уже заморожены: EquipmentMemento берёт их как есть
+        return EquipmentMemento(catalog=dict(self._types), current_ref=self.current_ref)
+
+    def lazy_catalog(self, build: Callable[[ModelMemento], EquipmentModel]) -> Catalog:
+        """
+        Отдельный каталог из LazyModel поверх этой версии (для отчётов/экспорта в фоне).
+        Живой каталог он не трогает: материализация создаёт временные модели.
+        """
+        catalog = Catalog()
+        for eq_type, snaps in self._types.items():
+            catalog[eq_type] = [LazyModel(s, build) for s in snaps]
+        return catalog
+
+    def __repr__(self) -> str:
+        return f"CatalogView(version={self.version}, types={len(self)}, models={self._count})"
+
+
+def patch_catalog(
+    catalog: Catalog,
+    have: MappingType[str, Sequence[ModelMemento]],
+    want: EquipmentMemento,
+    build: Callable[[ModelMemento], EquipmentModel],
+) -> int:
+    """
+    Привести каталог к snapshot'у want правкой на месте, а не пересборкой.
+    have — memento текущего содержимого по тем же позициям (CatalogView из publish()).
+
+    Тип, у которого кортеж в have и want — один объект, пропускается целиком;
+    в остальных позиции с общими memento отсеиваются map/compress, на место
+    отличающихся кладётся LazyModel (replace_at — индексы обновляются точечно),
+    лишний хвост удаляется с конца, недостающий — добавляется.
+    Возвращает число затронутых позиций.
+    """
+    touched = 0
+    for eq_type in [*have.keys(), *(t for t in want.catalog if t not in have)]:
+        cur = have.get(eq_type, ())
+        target = want.catalog.get(eq_type, ())
+        if cur is target:
+            continue
+        n = min(len(cur), len(target))
+        for i in compress(range(n), map(is_not, cur, target)):
+            if cur[i] != target[i]:
+                catalog.replace_at(eq_type, i, LazyModel(target[i], build))
+                touched += 1
+        for i in range(len(cur) - 1, n - 1, -1):
+            catalog.remove(eq_type, i)
+            touched += 1
+        for s in target[n:]:
+            catalog.add(LazyModel(s, build))
+            touched += 1
+    return touched
+
+
+def _token(m) -> object:
+    # признак «запись не менялась»: у LazyModel — её memento (новый при любой правке),
+    # у EquipmentModel — счётчик version (растёт при присваивании и touch())
+    return m.memento if isinstance(m, LazyModel) else m.version
+
+
+class CatalogVersions:
+    """
+    Публикует версии живого каталога (MVCC для читателей).
+
+    publish() вызывается писателем (UI-поток) и возвращает CatalogView:
+    - тип, в котором ни одна запись не поменялась, переходит в новую версию тем же кортежем;
+    - в изменённом типе memento пересобирается только для изменённых записей;
+    - если не поменялось ничего, возвращается прежняя версия (номер не растёт).
+
+    Как и RenderCache, правки «на месте» (specs[key] = ...) должны сопровождаться touch().
+    Старые версии не удаляются явно: их освобождает сборщик, когда ни один читатель
+    их больше не держит; live_versions() показывает, какие ещё живы.
+    """
+    def __init__(self, to_memento: Callable[[EquipmentModel], ModelMemento]) -> None:
+        self._to_memento = to_memento
+        self._lock = threading.Lock()
+        self._head: Optional[CatalogView] = None
+        self._version = 0
+        # тип -> (записи, токены) на момент последней публикации
+        self._seen: Dict[str, Tuple[List[object], List[object]]] = {}
+        self._live: "weakref.WeakValueDictionary[int, CatalogView]" = weakref.WeakValueDictionary()
+        self.rebuilt_models = 0
+        self.reused_types = 0
+
+    def current(self) -> Optional[CatalogView]:
+        """Последняя опубликованная версия (чтение без блокировки)."""
+        return self._head
+
+    def live_versions(self) -> List[int]:
+        return sorted(self._live.keys())
+
+    def publish(self, catalog: Catalog, current: Optional[EquipmentModel] = None) -> CatalogView:
+        with self._lock:
+            prev = self._head
+            prev_types = prev._types if prev is not None else {}
+            types: Dict[str, Tuple[ModelMemento, ...]] = {}
+            seen: Dict[str, Tuple[List[object], List[object]]] = {}
+            changed = prev is None or len(prev_types) != len(catalog)
+
+            for eq_type, models in catalog.items():
+                entries = list(models)
+                tokens = [_token(m) for m in entries]
+                old = self._seen.get(eq_type)
+                snaps = prev_types.get(eq_type)
+                if (
+                    snaps is not None
+                    and old is not None
+                    and len(old[0]) == len(entries)
+                    and all(map(is_, old[0], entries))
+                    and old[1] == tokens
+                ):
+                    self.reused_types += 1
+                else:
+                    snaps = self._rebuild(entries, tokens, old, snaps)
+                    changed = True
+                types[eq_type] = snaps
+                seen[eq_type] = (entries, tokens)
+
+            current_ref = self._find(catalog, current)
+            if not changed and prev is not None and current_ref == prev.current_ref:
+                return prev
+
+            self._version += 1
+            view = CatalogView(self._version, types, current_ref)
+            self._seen = seen
+            self._live[view.version] = view
+            self._head = view
+            return view
+
+    def _rebuild(self, entries, tokens, old, old_snaps) -> Tuple[ModelMemento, ...]:
+        # memento неизменённых записей берём из прошлой версии: сначала по той же позиции
+        # (map/compress на уровне C — правка на месте, restore через patch), затем по identity
+        # записи (сдвиг после удаления); словарь по id строится, только если он понадобился
+        out = []
+        positions: Iterable[int] = range(len(entries))
+        if old is not None and old_snaps is not None:
+            old_entries, old_tokens = old
+            n = min(len(entries), len(old_entries))
+            same = map(and_, map(is_, old_entries, entries), map(is_, old_tokens, tokens))
+            out = list(old_snaps[:n])
+            positions = [*compress(range(n), map(not_, same)), *range(n, len(entries))]
+        reuse: Optional[Dict[int, Tuple[object, ModelMemento]]] = None
+        for i in positions:
+            m, tok = entries[i], tokens[i]
+            if isinstance(m, LazyModel):
+                snap = m.memento
+            else:
+                if reuse is None:
+                    reuse = {}
+                    if old is not None and old_snaps is not None:
+                        reuse = {id(e): (t, s) for e, t, s in zip(old[0], old[1], old_snaps)}
+                hit = reuse.get(id(m))
+                if hit is not None and hit[0] == tok:
+                    snap = hit[1]
+                else:
+                    snap = self._to_memento(m)
+                    self.rebuilt_models += 1
+            if i < len(out):
+                out[i] = snap
+            else:
+                out.append(snap)
+        return tuple(out)
+
+    @staticmethod
+    def _find(catalog: Catalog, current: Optional[EquipmentModel]) -> Optional[ModelRef]:
+        if current is None:
+            return None
+        models = catalog.get(current.equipment_type)
+        if models is not None:
+            for i, m in enumerate(models):
+                if m is current:
+                    return (current.equipment_type, i)
+        # тип модели могли поменять после добавления — ищем по всему каталогу
+        for eq_type, models in catalog.items():
+            for i, m in enumerate(models):
+                if m is current:
+                    return (eq_type, i)
+        return None
@@ -1,5 +1,6 @@
 from .equipment_factory import (
     EquipmentFactory,
+    RecipeFactory,
     BikeFactory,
     TreadmillFactory,
     RowingMachineFactory,
@@ -9,6 +10,7 @@ from .equipment_factory import (
 
 __all__ = [
     "EquipmentFactory",
+    "RecipeFactory",
     "BikeFactory",
     "TreadmillFactory",
     "RowingMachineFactory",
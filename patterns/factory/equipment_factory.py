@@ -2,7 +2,7 @@ from __future__ import annotations
 from abc import ABC, abstractmethod
 
 from domain.equipment import EquipmentModel
-from patterns.builder import ConcreteEquipmentBuilder, Director
+from patterns.builder import ConcreteEquipmentBuilder, Director, RecipeRegistry, default_recipes
 
 
 class EquipmentFactory(ABC):
@@ -11,27 +11,48 @@ class EquipmentFactory(ABC):
         raise NotImplementedError
 
 
-class BikeFactory(EquipmentFactory):
+class RecipeFactory(EquipmentFactory):
+    """
+    Фабрика по рецепту: по умолчанию — скомпилированный конструктор (один шаг),
+    via_builder=True — пошагово через Director/Builder. with_log=True — модели
+    получают лог сборки (EquipmentModel.build_log), иначе он пуст.
+    """
+    def __init__(
+        self,
+        recipe_key: str,
+        recipes: RecipeRegistry | None = None,
+        via_builder: bool = False,
+        with_log: bool = False,
+    ) -> None:
+        self._key = recipe_key
+        self._recipes = recipes
+        self._via_builder = via_builder
+        self._with_log = with_log
+
     def create(self) -> EquipmentModel:
-        director = Director(ConcreteEquipmentBuilder())
-        return director.make_bike()
+        recipes = self._recipes or default_recipes()
+        if self._via_builder:
+            return Director(ConcreteEquipmentBuilder(record_log=self._with_log), recipes).make(self._key)
+        return recipes.constructor(self._key, self._with_log)()
 
 
-class TreadmillFactory(EquipmentFactory):
-    def create(self) -> EquipmentModel:
-        director = Director(ConcreteEquipmentBuilder())
-        return director.make_treadmill()
+class BikeFactory(RecipeFactory):
+    def __init__(self, via_builder: bool = False, with_log: bool = False) -> None:
+        super().__init__("bike", via_builder=via_builder, with_log=with_log)
 
 
-class RowingMachineFactory(EquipmentFactory):
-    def create(self) -> EquipmentModel:
-        director = Director(ConcreteEquipmentBuilder())
-        return director.make_rowing()
+class TreadmillFactory(RecipeFactory):
+    def __init__(self, via_builder: bool = False, with_log: bool = False) -> None:
+        super().__init__("treadmill", via_builder=via_builder, with_log=with_log)
 
-class GyriFactory(EquipmentFactory):
-    def create(self) -> EquipmentModel:
-        director = Director(ConcreteEquipmentBuilder())
-        return director.make_gyri()
+
+class RowingMachineFactory(RecipeFactory):
+    def __init__(self, via_builder: bool = False, with_log: bool = False) -> None:
+        super().__init__("rowing", via_builder=via_builder, with_log=with_log)
+
+class GyriFactory(RecipeFactory):
+    def __init__(self, via_builder: bool = False, with_log: bool = False) -> None:
+        super().__init__("gyri", via_builder=via_builder, with_log=with_log)
 
 
 class FactoryRegistry:
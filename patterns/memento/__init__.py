@@ -1,3 +1,65 @@
-from .equipment_memento import EquipmentMemento, Caretaker,ModelMemento
+from .equipment_memento import (
+    EquipmentMemento,
+    Caretaker,
+    HistoryState,
+    ModelMemento,
+    MementoPool,
+    SnapshotInfo,
+    freeze_specs,
+    specs_key,
+    thaw_specs,
+)
 
-__all__ = ["EquipmentMemento", "Caretaker"]
+__all__ = [
+    "EquipmentMemento",
+    "Caretaker",
+    "HistoryState",
+    "ModelMemento",
+    "MementoPool",
+    "SnapshotInfo",
+    "freeze_specs",
+    "specs_key",
+    "thaw_specs",
+    "StoredCatalog",
+    "CatalogReader",
+    "save_catalog",
+    "load_catalog",
+    "iter_catalog_chunks",
+    "dump_snapshot",
+    "load_snapshot",
+    "SnapshotCodec",
+    "CompressedSnapshot",
+    "CompressionStats",
+    "diff_snapshots",
+    "SnapshotDiff",
+    "ModelChange",
+    "FLAG_FIELDS",
+]
+
+_STORAGE = {
+    "StoredCatalog",
+    "CatalogReader",
+    "save_catalog",
+    "load_catalog",
+    "iter_catalog_chunks",
+    "dump_snapshot",
+    "load_snapshot",
+}
+
+_COMPRESSION = {"SnapshotCodec", "CompressedSnapshot", "CompressionStats"}
+
+_DIFF = {"diff_snapshots", "SnapshotDiff", "ModelChange", "FLAG_FIELDS"}
+
+
+def __getattr__(name: str):
+    # файловый формат и сжатие нужны не всегда — импортируем по требованию
+    if name in _STORAGE:
+        from . import storage
+        return getattr(storage, name)
+    if name in _COMPRESSION:
+        from . import compression
+        return getattr(compression, name)
+    if name in _DIFF:
+        from . import diff
+        return getattr(diff, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
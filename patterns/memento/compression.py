@@ -0,0 +1,83 @@
+from __future__ import annotations
+import time
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from patterns.memento.equipment_memento import EquipmentMemento
+
+CODECS = ("zlib", "lzma")
+
+
+@dataclass(frozen=True, eq=False)
+class CompressedSnapshot:
+    """
+    Холодный snapshot: .mpcat-байты, сжатые zlib/lzma.
+    Сводка (типы, модели, current_ref) хранится рядом — список истории
+    в UI строится без распаковки.
+    """
+    data: bytes
+    raw_size: int
+    types_count: int
+    models_count: int
+    current_ref: Optional[Tuple[str, int]]
+
+
+@dataclass(frozen=True)
+class CompressionStats:
+    compressed: int = 0
+    raw_bytes: int = 0
+    stored_bytes: int = 0
+    compress_seconds: float = 0.0
+    decompressions: int = 0
+    decompress_seconds: float = 0.0
+    cache_hits: int = 0
+
+    @property
+    def ratio(self) -> float:
+        return self.raw_bytes / self.stored_bytes if self.stored_bytes else 0.0
+
+    @property
+    def avg_decompress_ms(self) -> float:
+        """Добавка к undo/redo, когда snapshot приходится распаковывать."""
+        return self.decompress_seconds * 1000 / self.decompressions if self.decompressions else 0.0
+
+
+class SnapshotCodec:
+    """Компактная сериализация (формат .mpcat) + zlib/lzma; модули грузятся при первом сжатии."""
+    def __init__(self, codec: str = "zlib", level: int = 6) -> None:
+        if codec not in CODECS:
+            raise ValueError(f"Unknown codec: {codec} (expected one of {', '.join(CODECS)})")
+        self.codec = codec
+        self.level = level
+
+    def _module(self):
+        if self.codec == "zlib":
+            import zlib
+            return zlib
+        import lzma
+        return lzma
+
+    def compress(self, mem: EquipmentMemento) -> Tuple[CompressedSnapshot, float]:
+        from patterns.memento.storage import dump_snapshot
+
+        t0 = time.perf_counter()
+        raw = dump_snapshot(mem)
+        if self.codec == "zlib":
+            data = self._module().compress(raw, self.level)
+        else:
+            data = self._module().compress(raw, preset=self.level)
+        snap = CompressedSnapshot(
+            data=data,
+            raw_size=len(raw),
+            types_count=len(mem.catalog),
+            models_count=sum(len(v) for v in mem.catalog.values()),
+            current_ref=mem.current_ref,
+        )
+        return snap, time.perf_counter() - t0
+
+    def decompress(self, snap: CompressedSnapshot) -> Tuple[EquipmentMemento, float]:
+        from patterns.memento.storage import load_snapshot
+
+        t0 = time.perf_counter()
+        mem = load_snapshot(self._module().decompress(snap.data))
+        return mem, time.perf_counter() - t0
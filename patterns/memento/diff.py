@@ -0,0 +1,180 @@
+from __future__ import annotations
+from collections import Counter
+from dataclasses import dataclass, field
+from itertools import compress
+from operator import is_not
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from patterns.memento.equipment_memento import EquipmentMemento, ModelMemento, _MODEL_FIELDS, specs_key
+
+
+Ref = Tuple[str, int]
+
+# поля, которые меняют Decorator/Proxy/State; остальное — «кто это» (по нему модели сопоставляются)
+FLAG_FIELDS: Tuple[str, ...] = ("use_online", "use_analytics", "use_proxy", "license_key", "software_state_name")
+_IDENTITY_FIELDS: Tuple[str, ...] = tuple(f for f in _MODEL_FIELDS if f not in FLAG_FIELDS)
+
+
+def _identity(m: ModelMemento) -> tuple:
+    d = m.__dict__
+    # specs — через specs_key: правка 1 -> 1.0 не та же модель с другими флагами
+    return tuple(specs_key(d[f]) if f == "specs" else d[f] for f in _IDENTITY_FIELDS)
+
+
+@dataclass(frozen=True)
+class ModelChange:
+    """Одна и та же модель (совпали фабрика, имя, specs, functions, ПО) с другими флагами."""
+    old_ref: Ref
+    new_ref: Ref
+    old: ModelMemento
+    new: ModelMemento
+
+    def fields(self) -> Dict[str, Tuple[Any, Any]]:
+        """Изменившиеся поля: имя -> (было, стало)."""
+        a, b = self.old.__dict__, self.new.__dict__
+        return {f: (a[f], b[f]) for f in FLAG_FIELDS if a[f] != b[f]}
+
+
+@dataclass(frozen=True)
+class SnapshotDiff:
+    added: Tuple[Tuple[Ref, ModelMemento], ...] = ()
+    removed: Tuple[Tuple[Ref, ModelMemento], ...] = ()
+    changed: Tuple[ModelChange, ...] = ()
+    current_ref: Optional[Tuple[Optional[Ref], Optional[Ref]]] = None  # (было, стало), если поменялся
+    # статистика: типы, пропущенные по identity кортежа, и сколько моделей реально сравнивалось
+    types_shared: int = 0
+    models_compared: int = field(default=0, compare=False)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed or self.current_ref)
+
+    def flag_changes(self) -> Dict[str, int]:
+        """Сколько моделей поменяли каждый флаг."""
+        counts: Counter = Counter()
+        for c in self.changed:
+            counts.update(c.fields().keys())
+        return dict(counts)
+
+    def summary(self) -> str:
+        flags = ", ".join(f"{k}={v}" for k, v in sorted(self.flag_changes().items())) or "—"
+        return (
+            f"added: {len(self.added)}, removed: {len(self.removed)}, changed: {len(self.changed)} "
+            f"(flags: {flags})"
+        )
+
+    def to_text(self, limit: int = 200) -> str:
+        """Текст для панели Memento; строк по моделям не больше limit."""
+        lines = [self.summary()]
+        if self.current_ref:
+            lines.append(f"current_ref: {self.current_ref[0]} -> {self.current_ref[1]}")
+        lines.append(f"(types skipped as shared: {self.types_shared}, models compared: {self.models_compared})")
+        lines.append("")
+        shown = 0
+        for (t, i), m in self.added:
+            if shown >= limit:
+                break
+            lines.append(f"+ [{t}] {i}: {m.name}")
+            shown += 1
+        for (t, i), m in self.removed:
+            if shown >= limit:
+                break
+            lines.append(f"- [{t}] {i}: {m.name}")
+            shown += 1
+        for c in self.changed:
+            if shown >= limit:
+                break
+            what = ", ".join(f"{k}: {a!r}->{b!r}" for k, (a, b) in c.fields().items())
+            lines.append(f"~ [{c.new_ref[0]}] {c.old_ref[1]}->{c.new_ref[1]}: {c.new.name} | {what}")
+            shown += 1
+        total = len(self.added) + len(self.removed) + len(self.changed)
+        if total > shown:
+            lines.append(f"… ещё {total - shown}")
+        if not self:
+            lines.append("Snapshot'ы совпадают.")
+        return "\n".join(lines)
+
+
+def _equal(a: ModelMemento, b: ModelMemento) -> bool:
+    # хеш содержимого кешируется в ModelMemento; при совпадении — сравнение содержимого
+    # с типами значений specs (dict == счёл бы 1 и 1.0 одним и тем же)
+    return a == b
+
+
+def _diff_type(
+    eq_type: str,
+    old: Sequence[ModelMemento],
+    new: Sequence[ModelMemento],
+    added: List[Tuple[Ref, ModelMemento]],
+    removed: List[Tuple[Ref, ModelMemento]],
+    changed: List[ModelChange],
+) -> int:
+    """Возвращает число сравненных моделей."""
+    # позиции, где лежат разные объекты: map/compress без цикла Python по общим моделям
+    n = min(len(old), len(new))
+    suspect = list(compress(range(n), map(is_not, old, new)))
+    differ = [i for i in suspect if not _equal(old[i], new[i])]
+    rest_old = differ + list(range(n, len(old)))
+    rest_new = differ + list(range(n, len(new)))
+    compared = len(suspect) + len(old) - n + len(new) - n
+    if not rest_old and not rest_new:
+        return compared
+
+    # несовпавшие позиции: сначала модели с тем же содержимым (сдвинулись после удаления),
+    # затем пары с той же «личностью», но другими флагами
+    by_content: Dict[ModelMemento, List[int]] = {}
+    for i in rest_old:
+        by_content.setdefault(old[i], []).append(i)
+    unmatched_new: List[int] = []
+    for j in rest_new:
+        slots = by_content.get(new[j])
+        if slots:
+            slots.pop(0)
+        else:
+            unmatched_new.append(j)
+    unmatched_old = [i for slots in by_content.values() for i in slots]
+    unmatched_old.sort()
+
+    by_identity: Dict[tuple, List[int]] = {}
+    for i in unmatched_old:
+        by_identity.setdefault(_identity(old[i]), []).append(i)
+    for j in unmatched_new:
+        slots = by_identity.get(_identity(new[j]))
+        if slots:
+            i = slots.pop(0)
+            changed.append(ModelChange((eq_type, i), (eq_type, j), old[i], new[j]))
+        else:
+            added.append(((eq_type, j), new[j]))
+    for slots in by_identity.values():
+        removed.extend(((eq_type, i), old[i]) for i in slots)
+    return compared
+
+
+def diff_snapshots(old: EquipmentMemento, new: EquipmentMemento) -> SnapshotDiff:
+    """
+    Структурная разница двух snapshot'ов (old -> new).
+
+    - тип, у которого кортеж моделей — тот же объект (общий у соседних версий
+      CatalogVersions/MementoPool), пропускается без обхода;
+    - в остальных типах позиции с общими объектами отсеиваются на уровне C (map/compress),
+      разные объекты сравниваются по кешированному хешу содержимого, и только
+      несовпавшие позиции сопоставляются словарями (сдвиг после удаления, правки флагов);
+    - «изменённая» модель — та же фабрика/имя/specs/functions/ПО, но другие флаги
+      (FLAG_FIELDS); переименование даёт пару removed + added.
+    """
+    added: List[Tuple[Ref, ModelMemento]] = []
+    removed: List[Tuple[Ref, ModelMemento]] = []
+    changed: List[ModelChange] = []
+    shared = 0
+    compared = 0
+    if old is not new:
+        for eq_type in sorted(old.catalog.keys() | new.catalog.keys()):
+            a = old.catalog.get(eq_type, ())
+            b = new.catalog.get(eq_type, ())
+            if a is b:
+                shared += 1
+                continue
+            compared += _diff_type(eq_type, a, b, added, removed, changed)
+    else:
+        shared = len(old.catalog)
+    current = None if old.current_ref == new.current_ref else (old.current_ref, new.current_ref)
+    return SnapshotDiff(tuple(added), tuple(removed), tuple(changed), current, shared, compared)
@@ -1,18 +1,136 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Tuple
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, fields
+from itertools import compress
+from operator import is_, is_not, itemgetter
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Mapping, Optional, Set, Tuple, Union
 
+from patterns.rwlock import RWLock, read_locked, write_locked
 
-@dataclass(frozen=True)
-class ModelMemento:
+if TYPE_CHECKING:
+    from patterns.memento.compression import CompressedSnapshot, CompressionStats, SnapshotCodec
+    from patterns.memento.diff import SnapshotDiff
+
+
+Specs = Tuple[Tuple[str, Any], ...]
+
+
+class _FrozenList(tuple):
+    """list из specs после freeze_specs(): thaw_specs() вернёт его списком."""
+    __slots__ = ()
+
+
+class _FrozenDict(tuple):
+    """dict из specs после freeze_specs(): кортеж пар, thaw_specs() вернёт его словарём."""
+    __slots__ = ()
+
+
+def _freeze(value: Any) -> Any:
+    # вложенные списки/словари в specs становятся кортежами — иначе memento не хешируется;
+    # подкласс кортежа помнит, чем значение было, чтобы thaw_specs() вернул то же самое
+    if isinstance(value, (_FrozenList, _FrozenDict)):
+        return value
+    if isinstance(value, list):
+        return _FrozenList(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return _FrozenDict((k, _freeze(v)) for k, v in value.items())
+    return value
+
+
+_NESTED = frozenset((tuple, _FrozenList, _FrozenDict))
+_second = itemgetter(1)
+
+
+def _thaw(value: Any) -> Any:
+    if type(value) is _FrozenList:
+        return [_thaw(v) for v in value]
+    if type(value) is _FrozenDict:
+        return {k: _thaw(v) for k, v in value}
+    return value
+
+
+def _typed(value: Any) -> Any:
+    # True, 1 и 1.0 равны для == и hash(): рядом со значением идёт его тип
+    if isinstance(value, tuple):
+        return type(value), tuple(map(_typed, value))
+    return type(value), value
+
+
+def freeze_specs(specs: Any) -> Specs:
+    """dict, последовательность пар или уже готовый кортеж пар -> кортеж пар."""
+    if isinstance(specs, tuple):
+        return specs
+    items = specs.items() if isinstance(specs, Mapping) else specs
+    return tuple((k, _freeze(v)) for k, v in items)
+
+
+def thaw_specs(specs: Specs) -> Dict[str, Any]:
+    """Обратное к freeze_specs(): dict с вложенными list/dict, как в EquipmentModel.specs."""
+    return {k: _thaw(v) for k, v in specs}
+
+
+def specs_key(specs: Specs) -> tuple:
+    """Ключ specs для сравнения и кешей: различает True/1/1.0 и вид вложенных значений."""
+    types = tuple(map(type, map(_second, specs)))
+    if _NESTED.isdisjoint(types):
+        # плоские specs (почти всегда) — типы значений собираются на уровне C
+        return specs, types
+    return tuple((k, _typed(v)) for k, v in specs)
+
+
+class _ContentHashed:
+    """
+    Общая часть неизменяемых memento: хеш содержимого считается один раз
+    и кешируется в экземпляре; сравнение сначала по identity и хешу.
+    Кеш не сериализуется: hash() строк различается между процессами.
+    """
+    def _content(self) -> tuple:
+        raise NotImplementedError
+
+    def __hash__(self) -> int:
+        h = self.__dict__.get("_hash")
+        if h is None:
+            h = hash(self._content())
+            object.__setattr__(self, "_hash", h)
+        return h
+
+    def __eq__(self, other: object) -> bool:
+        if self is other:
+            return True
+        if type(other) is not type(self):
+            return NotImplemented
+        return hash(self) == hash(other) and self._content() == other._content()
+
+    def __ne__(self, other: object) -> bool:
+        eq = self.__eq__(other)
+        return eq if eq is NotImplemented else not eq
+
+    def __getstate__(self) -> dict:
+        state = dict(self.__dict__)
+        state.pop("_hash", None)
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+
+
+@dataclass(frozen=True, eq=False)
+class ModelMemento(_ContentHashed):
+    """
+    Неизменяемый и хешируемый snapshot модели.
+    specs — кортеж пар (ключ, значение), functions — кортеж строк;
+    dict/list на входе приводятся к ним автоматически (обратно — thaw_specs()).
+    Содержимое сравнивается с учётом типов значений specs: {"x": 1} и {"x": True} — разные.
+    """
     # чтобы уметь пересоздать объект через фабрику
     factory_key: str
 
     equipment_type: str
     name: str
-    specs: Dict[str, Any]
-    functions: List[str]
+    specs: Specs
+    functions: Tuple[str, ...]
 
     base_software_title: str
     use_online: bool
@@ -22,46 +140,645 @@ class ModelMemento:
 
     # ✅ поле для паттерна State (как у тебя было)
     software_state_name: str = "IDLE"
+    is_clone: bool = False
 
+    def __post_init__(self) -> None:
+        if type(self.specs) is not tuple:
+            object.__setattr__(self, "specs", freeze_specs(self.specs))
+        if type(self.functions) is not tuple:
+            object.__setattr__(self, "functions", tuple(self.functions))
 
-@dataclass(frozen=True)
-class EquipmentMemento:
+    @classmethod
+    def from_fields(cls, *values: Any) -> ModelMemento:
+        """
+        Быстрый конструктор для загрузчиков: значения в порядке полей,
+        specs/functions уже кортежи. Без покомпонентного object.__setattr__
+        frozen-__init__ — заметно быстрее на сотнях тысяч моделей.
+        """
+        obj = object.__new__(cls)
+        d = obj.__dict__
+        d.update(zip(_MODEL_FIELDS, values))
+        # записи старых версий (журнал) короче: недостающие хвостовые поля — по умолчанию
+        for f in _MODEL_FIELDS[len(values):]:
+            d[f] = getattr(cls, f)
+        return obj
+
+    def _content(self) -> tuple:
+        return (
+            self.factory_key, self.equipment_type, self.name, specs_key(self.specs), self.functions,
+            self.base_software_title, self.use_online, self.use_analytics, self.use_proxy,
+            self.license_key, self.software_state_name, self.is_clone,
+        )
+
+
+_MODEL_FIELDS = tuple(f.name for f in fields(ModelMemento))
+
+
+@dataclass(frozen=True, eq=False)
+class EquipmentMemento(_ContentHashed):
     """
     Теперь это Memento уровня приложения:
     хранит ВСЕ дерево catalog: type -> models.
+    Списки моделей замораживаются в кортежи — snapshot хешируется по содержимому.
     """
-    catalog: Dict[str, List[ModelMemento]]
+    catalog: Dict[str, Tuple[ModelMemento, ...]]
     current_ref: Optional[Tuple[str, int]] = None  # (equipment_type, index in catalog[type])
 
+    def __post_init__(self) -> None:
+        if any(type(v) is not tuple for v in self.catalog.values()):
+            object.__setattr__(self, "catalog", {t: tuple(v) for t, v in self.catalog.items()})
 
-class Caretaker:
+    def _content(self) -> tuple:
+        return (tuple(self.catalog.items()), self.current_ref)
+
+
+def _same_snapshot(a: EquipmentMemento, b: EquipmentMemento) -> bool:
+    # как a == b, но общие кортежи типов сравниваются по identity, а разные —
+    # tuple == (длина, затем identity элементов на уровне C), без хеша всего snapshot'а
+    if a is b:
+        return True
+    if a.current_ref != b.current_ref or a.catalog.keys() != b.catalog.keys():
+        return False
+    other = b.catalog
+    return all(snaps is other[t] or snaps == other[t] for t, snaps in a.catalog.items())
+
+
+class MementoPool:
+    """
+    Пул по содержимому: одинаковые ModelMemento во всей истории —
+    один объект. Ключ — хеш содержимого; при коллизии хешей (разное
+    содержимое) memento просто не пулится. Когда Caretaker выбрасывает
+    snapshot'ы, пул пересобирается по оставшимся (retain).
+
+    Так же пулятся и кортежи моделей типа: неизменённый тип во всех snapshot'ах —
+    один и тот же кортеж, и diff_snapshots() пропускает его по identity.
+    """
     def __init__(self) -> None:
-        self._history: list[EquipmentMemento] = []
+        self._models: Dict[int, ModelMemento] = {}
+        self._lists: Dict[tuple, Tuple[ModelMemento, ...]] = {}
+        # последний результат intern() и его исходный каталог (до замен из пула)
+        self._last: Optional[EquipmentMemento] = None
+        self._last_raw: Dict[str, Tuple[ModelMemento, ...]] = {}
+        self.hits = 0
+
+    def __len__(self) -> int:
+        return len(self._models)
+
+    def intern_model(self, m: ModelMemento) -> ModelMemento:
+        h = hash(m)
+        found = self._models.get(h)
+        if found is None:
+            self._models[h] = m
+            return m
+        if found is m or found._content() != m._content():
+            return m
+        self.hits += 1
+        return found
+
+    @staticmethod
+    def _list_key(eq_type: str, snaps: Tuple[ModelMemento, ...]) -> tuple:
+        # модели уже из пула: одинаковые кортежи состоят из тех же объектов,
+        # поэтому хватает id крайних элементов (полная проверка — is по всем)
+        if not snaps:
+            return (eq_type, 0)
+        return (eq_type, len(snaps), id(snaps[0]), id(snaps[-1]))
+
+    def _intern_list(self, eq_type: str, snaps: Tuple[ModelMemento, ...]) -> Tuple[ModelMemento, ...]:
+        key = self._list_key(eq_type, snaps)
+        found = self._lists.get(key)
+        if found is None:
+            self._lists[key] = snaps
+            return snaps
+        if found is snaps or not all(map(is_, found, snaps)):
+            return snaps
+        return found
+
+    def retain(self, snapshots: Iterable[EquipmentMemento]) -> None:
+        """Оставить в пуле только модели (и кортежи типов) из данных snapshot'ов."""
+        models: Dict[int, ModelMemento] = {}
+        lists: Dict[tuple, Tuple[ModelMemento, ...]] = {}
+        prev_by_type: Dict[str, Tuple[ModelMemento, ...]] = {}
+        for mem in snapshots:
+            for eq_type, snaps in mem.catalog.items():
+                key = self._list_key(eq_type, snaps)
+                prev = prev_by_type.get(eq_type)
+                prev_by_type[eq_type] = snaps
+                if lists.get(key) is snaps:
+                    continue  # общий кортеж: его модели уже учтены
+                lists.setdefault(key, snaps)
+                if prev:
+                    # соседние snapshot'ы делят объекты моделей — учитываются только отличающиеся позиции
+                    n = min(len(prev), len(snaps))
+                    for i in [*compress(range(n), map(is_not, prev, snaps)), *range(n, len(snaps))]:
+                        models.setdefault(hash(snaps[i]), snaps[i])
+                else:
+                    for m in snaps:
+                        models.setdefault(hash(m), m)
+        self._models = models
+        self._lists = lists
+
+    def intern(self, mem: EquipmentMemento, base: Optional[EquipmentMemento] = None) -> EquipmentMemento:
+        """
+        Тот же snapshot, но модели взяты из пула (исходный объект, если замен не было).
+        base — уже интернированный snapshot (обычно head истории): позиции, где лежит
+        тот же объект, что в base, повторно через пул не прогоняются.
+        """
+        intern_model = self.intern_model
+        catalog: Dict[str, Tuple[ModelMemento, ...]] = {}
+        replaced = False
+        lists = self._lists
+        # base — прошлый результат intern(): сравнивать с его исходным каталогом. Пул мог
+        # заменить в base объекты на равные старые, и по самому base такие позиции
+        # выглядели бы изменёнными в каждом следующем snapshot'е
+        raw = self._last_raw if base is not None and base is self._last else {}
+        for eq_type, snaps in mem.catalog.items():
+            if lists.get(self._list_key(eq_type, snaps)) is snaps:
+                # кортеж уже в пуле (тип не менялся с прошлого snapshot'а) — его модели тоже
+                catalog[eq_type] = snaps
+                continue
+            prev = base.catalog.get(eq_type) if base is not None else None
+            if prev:
+                src = raw.get(eq_type, prev)
+                n = min(len(src), len(snaps))
+                # неизменённые позиции — объекты из base, остальные — через пул
+                pooled = [*prev[:n], *snaps[n:]]
+                for i in [*compress(range(n), map(is_not, src, snaps)), *range(n, len(snaps))]:
+                    pooled[i] = intern_model(snaps[i])
+                pooled = tuple(pooled)
+            else:
+                pooled = tuple(intern_model(s) for s in snaps)
+            if all(map(is_, pooled, snaps)):
+                pooled = snaps
+            pooled = self._intern_list(eq_type, pooled)
+            replaced = replaced or pooled is not snaps
+            catalog[eq_type] = pooled
+        result = EquipmentMemento(catalog=catalog, current_ref=mem.current_ref) if replaced else mem
+        self._last, self._last_raw = result, mem.catalog
+        return result
+
+
+@dataclass(frozen=True)
+class SnapshotInfo:
+    """Сводка snapshot'а для списка истории (без распаковки сжатых)."""
+    types_count: int
+    models_count: int
+    current_ref: Optional[Tuple[str, int]]
+    compressed: bool
+    # положение в дереве истории: родитель (None у корня), номер ветки среди братьев,
+    # сколько их всего и сколько веток растёт из самого snapshot'а
+    parent: Optional[int] = None
+    branch: int = 0
+    branches: int = 1
+    children: int = 0
+
+
+@dataclass(frozen=True)
+class HistoryState:
+    """
+    Неизменяемый срез истории Caretaker: записи как есть (сжатые не распаковываются),
+    курсор и дерево (parents/active пусты у линейной истории, branching — режим Caretaker).
+    Снимается за O(число snapshot'ов) под read-блокировкой — распаковку и запись
+    на диск (checkpoint журнала) можно делать в фоне.
+    """
+    entries: Tuple[Union[EquipmentMemento, CompressedSnapshot], ...]
+    index: int
+    parents: Tuple[int, ...] = ()
+    active: Tuple[int, ...] = ()
+    codec: Optional[SnapshotCodec] = None
+    branching: bool = False
+
+    def snapshots(self) -> List[EquipmentMemento]:
+        return [e if isinstance(e, EquipmentMemento) else self.codec.decompress(e)[0] for e in self.entries]
+
+
+class Caretaker:
+    """
+    История snapshot'ов с курсором.
+    compress_after=K: snapshot'ы дальше K шагов от курсора сжимаются
+    (формат .mpcat + zlib/lzma) и распаковываются при обращении в небольшой кеш.
+    Сжатие идёт в backup(), а не в undo/redo: к undo добавляется только распаковка;
+    snapshot, к которому курсор вернулся ближе чем на K, снова хранится целиком.
+
+    Потокобезопасен: чтение (get, describe, info, ...) — под общей read-блокировкой,
+    изменение истории (backup, undo/redo, replace_history) — под эксклюзивной.
+    Кеш распаковки и пул, которые меняются и при чтении, защищены отдельным mutex.
+
+    branching=True — дерево вместо списка: backup() после undo не отрезает redo-хвост,
+    а открывает новую ветку. Номер snapshot'а — его позиция в _history (не меняется),
+    у каждого узла — родитель, дети и «активный» ребёнок, по которому идёт redo.
+    switch_branch() переходит к соседней ветке за O(1), jump() — к любому узлу.
+    Модели и кортежи типов общие у всех веток через тот же MementoPool,
+    а «далеко от курсора» для сжатия — расстояние по дереву.
+    """
+    def __init__(
+        self,
+        compress_after: Optional[int] = None,
+        codec: str = "zlib",
+        level: int = 6,
+        cache_size: int = 4,
+        branching: bool = False,
+    ) -> None:
+        self._history: list[Union[EquipmentMemento, CompressedSnapshot]] = []
         self._index: int = -1
+        self.branching = branching
+        # дерево (только при branching): -1 — «нет»
+        self._parent: List[int] = []
+        self._children: List[List[int]] = []
+        self._active: List[int] = []
+        self._slot: List[int] = []  # позиция узла среди братьев
+        self._roots: List[int] = []
+        self._lock = RWLock()
+        self._cache_lock = threading.Lock()
+        self._pool = MementoPool()
+        self._dropped = 0  # отрезано redo-хвостов с последней пересборки пула
+        self.skipped = 0  # сколько snapshot'ов отброшено как копии head
+
+        self._compress_after = compress_after
+        self._codec: Optional[SnapshotCodec] = None
+        if compress_after is not None:
+            from patterns.memento.compression import SnapshotCodec
+
+            self._codec = SnapshotCodec(codec, level)
+        self._cache: "OrderedDict[CompressedSnapshot, EquipmentMemento]" = OrderedDict()
+        self._cache_size = cache_size
+        self._stats: Dict[str, float] = dict.fromkeys(
+            ("compressed", "raw_bytes", "stored_bytes", "compress_seconds",
+             "decompressions", "decompress_seconds", "cache_hits"), 0
+        )
+
+    # -----------------------------
+    # Сжатие
+    # -----------------------------
+    def _get(self, i: int) -> EquipmentMemento:
+        entry = self._history[i]
+        if isinstance(entry, EquipmentMemento):
+            return entry
+        with self._cache_lock:
+            mem = self._cache.get(entry)
+            if mem is not None:
+                self._cache.move_to_end(entry)
+                self._stats["cache_hits"] += 1
+        if mem is None:
+            # распаковка — вне mutex: параллельные читатели разных snapshot'ов не ждут друг друга
+            mem, seconds = self._codec.decompress(entry)
+            with self._cache_lock:
+                self._stats["decompressions"] += 1
+                self._stats["decompress_seconds"] += seconds
+                self._cache[entry] = mem
+                while len(self._cache) > self._cache_size:
+                    self._cache.popitem(last=False)
+        if self._near(i):
+            # курсор вернулся к snapshot'у — он снова горячий
+            with self._cache_lock:
+                if self._history[i] is entry:
+                    self._cache.pop(entry, None)
+                    self._history[i] = self._pool.intern(mem)
+                mem = self._history[i]
+        return mem
+
+    def _near(self, i: int) -> bool:
+        """Не дальше compress_after шагов от курсора (в дереве — по рёбрам)."""
+        k = self._compress_after
+        if not self.branching:
+            return abs(i - self._index) <= k
+        # предки курсора на глубину k, затем подъём от i до первого общего
+        up: Dict[int, int] = {}
+        node, d = self._index, 0
+        while node >= 0 and d <= k:
+            up[node] = d
+            node, d = self._parent[node], d + 1
+        node, d = i, 0
+        while node >= 0 and d <= k:
+            if node in up:
+                return up[node] + d <= k
+            node, d = self._parent[node], d + 1
+        return False
+
+    def _neighbourhood(self) -> Set[int]:
+        """Все узлы не дальше compress_after от курсора."""
+        k = self._compress_after
+        if not self.branching:
+            return set(range(max(0, self._index - k), self._index + k + 1))
+        near = {self._index}
+        frontier = [self._index] if self._index >= 0 else []
+        for _ in range(k):
+            step = []
+            for node in frontier:
+                parent = self._parent[node]
+                for nb in (self._children[node] + [parent]) if parent >= 0 else self._children[node]:
+                    if nb not in near:
+                        near.add(nb)
+                        step.append(nb)
+            frontier = step
+        return near
 
-    def backup(self, memento: EquipmentMemento) -> None:
+    def _compress_cold(self) -> None:
+        k = self._compress_after
+        if k is None:
+            return
+        near = self._neighbourhood()
+        compressed_any = False
+        for i, entry in enumerate(self._history):
+            if i not in near and isinstance(entry, EquipmentMemento):
+                snap, seconds = self._codec.compress(entry)
+                self._history[i] = snap
+                self._stats["compressed"] += 1
+                self._stats["raw_bytes"] += snap.raw_size
+                self._stats["stored_bytes"] += len(snap.data)
+                self._stats["compress_seconds"] += seconds
+                compressed_any = True
+        if compressed_any:
+            # модели, оставшиеся только в сжатых snapshot'ах, пул больше не держит
+            self._pool.retain(e for e in self._history if isinstance(e, EquipmentMemento))
+
+    @read_locked
+    def compression_stats(self) -> CompressionStats:
+        return self._compression_stats()
+
+    def _compression_stats(self) -> CompressionStats:
+        from patterns.memento.compression import CompressionStats
+
+        st = self._stats
+        return CompressionStats(
+            compressed=int(st["compressed"]),
+            raw_bytes=int(st["raw_bytes"]),
+            stored_bytes=int(st["stored_bytes"]),
+            compress_seconds=st["compress_seconds"],
+            decompressions=int(st["decompressions"]),
+            decompress_seconds=st["decompress_seconds"],
+            cache_hits=int(st["cache_hits"]),
+        )
+
+    # -----------------------------
+    # История
+    # -----------------------------
+    def _attach(self, node: int, parent: int) -> None:
+        siblings = self._children[parent] if parent >= 0 else self._roots
+        self._parent.append(parent)
+        self._children.append([])
+        self._active.append(-1)
+        self._slot.append(len(siblings))
+        siblings.append(node)
+        if parent >= 0:
+            self._active[parent] = node
+
+    def _move(self, node: int) -> EquipmentMemento:
+        """Курсор на узел; redo у предков ведёт по пути к нему."""
+        self._index = node
+        child, parent = node, self._parent[node]
+        while parent >= 0 and self._active[parent] != child:
+            self._active[parent] = child
+            child, parent = parent, self._parent[parent]
+        return self._get(node)
+
+    @write_locked
+    def backup(self, memento: EquipmentMemento) -> bool:
+        """Сохраняет snapshot; если он совпадает с текущим head — не сохраняет и возвращает False."""
+        head = self._get(self._index) if self._index >= 0 else None
+        if head is not None and _same_snapshot(head, memento):
+            self.skipped += 1
+            return False
+        if self.branching:
+            # после undo — новая ветка рядом со старыми, ничего не отрезается
+            self._history.append(self._pool.intern(memento, head))
+            self._attach(len(self._history) - 1, self._index)
+            self._index = len(self._history) - 1
+            self._compress_cold()
+            return True
         if self._index < len(self._history) - 1:
+            self._dropped += len(self._history) - self._index - 1
             self._history = self._history[: self._index + 1]
-        self._history.append(memento)
+            # пул пересобирается по всей истории — раз в len/4 выброшенных snapshot'ов, а не
+            # на каждый backup после undo; до того в нём лишь живут модели отрезанного хвоста
+            if self._dropped * 4 >= len(self._history):
+                self._pool.retain(e for e in self._history if isinstance(e, EquipmentMemento))
+                self._dropped = 0
+        self._history.append(self._pool.intern(memento, head))
         self._index += 1
+        self._compress_cold()
+        return True
 
+    @read_locked
     def can_undo(self) -> bool:
+        if self.branching:
+            return self._index >= 0 and self._parent[self._index] >= 0
         return self._index > 0
 
+    @read_locked
     def can_redo(self) -> bool:
+        if self.branching:
+            return self._index >= 0 and self._active[self._index] >= 0
         return self._index < len(self._history) - 1
 
+    @write_locked
     def undo(self) -> Optional[EquipmentMemento]:
-        if not self.can_undo():
+        if self.branching:
+            parent = self._parent[self._index] if self._index >= 0 else -1
+            if parent < 0:
+                return None
+            self._active[parent] = self._index
+            self._index = parent
+            return self._get(parent)
+        if self._index <= 0:
             return None
         self._index -= 1
-        return self._history[self._index]
+        return self._get(self._index)
 
+    @write_locked
     def redo(self) -> Optional[EquipmentMemento]:
-        if not self.can_redo():
+        if self.branching:
+            child = self._active[self._index] if self._index >= 0 else -1
+            if child < 0:
+                return None
+            self._index = child
+            return self._get(child)
+        if self._index >= len(self._history) - 1:
             return None
         self._index += 1
-        return self._history[self._index]
+        return self._get(self._index)
+
+    @write_locked
+    def switch_branch(self, step: int = 1) -> Optional[EquipmentMemento]:
+        """
+        К соседней ветке того же родителя (step=-1 — к предыдущей) за O(1).
+        None — в линейном режиме или если ветки в эту сторону нет.
+        """
+        if not self.branching or self._index < 0:
+            return None
+        parent = self._parent[self._index]
+        siblings = self._children[parent] if parent >= 0 else self._roots
+        slot = self._slot[self._index] + step
+        if not 0 <= slot < len(siblings):
+            return None
+        node = siblings[slot]
+        self._index = node
+        if parent >= 0:
+            self._active[parent] = node
+        return self._get(node)
+
+    @write_locked
+    def jump(self, node: int) -> EquipmentMemento:
+        """Курсор на любой snapshot (в дереве — и на другую ветку)."""
+        if not 0 <= node < len(self._history):
+            raise IndexError(node)
+        if not self.branching:
+            self._index = node
+            return self._get(node)
+        return self._move(node)
+
+    def __len__(self) -> int:
+        return len(self._history)
+
+    @read_locked
+    def get(self, i: int) -> EquipmentMemento:
+        """Snapshot по номеру (сжатый распаковывается через кеш)."""
+        return self._get(i)
+
+    @read_locked
+    def describe(self, i: int) -> SnapshotInfo:
+        entry = self._history[i]
+        if self.branching:
+            parent = self._parent[i]
+            siblings = self._children[parent] if parent >= 0 else self._roots
+            tree = dict(
+                parent=parent if parent >= 0 else None,
+                branch=self._slot[i],
+                branches=len(siblings),
+                children=len(self._children[i]),
+            )
+        else:
+            tree = dict(parent=i - 1 if i > 0 else None, children=int(i < len(self._history) - 1))
+        if isinstance(entry, EquipmentMemento):
+            return SnapshotInfo(
+                types_count=len(entry.catalog),
+                models_count=sum(len(v) for v in entry.catalog.values()),
+                current_ref=entry.current_ref,
+                compressed=False,
+                **tree,
+            )
+        return SnapshotInfo(entry.types_count, entry.models_count, entry.current_ref, compressed=True, **tree)
+
+    @read_locked
+    def branch_path(self) -> list[int]:
+        """Узлы текущей ветки: от корня через курсор и дальше по redo."""
+        return self._branch_path()
+
+    def _branch_path(self) -> list[int]:
+        # без блокировки: RWLock не реентерабельна, вызывающий уже держит read
+        if not self.branching:
+            return list(range(len(self._history)))
+        path: list[int] = []
+        node = self._index
+        while node >= 0:
+            path.append(node)
+            node = self._parent[node]
+        path.reverse()
+        node = self._active[self._index] if self._index >= 0 else -1
+        while node >= 0:
+            path.append(node)
+            node = self._active[node]
+        return path
+
+    @read_locked
+    def tree_rows(self) -> list[Tuple[int, int]]:
+        """
+        Узлы в порядке обхода (первая ветка раньше остальных) с «дорожкой»:
+        первый ребёнок продолжает дорожку родителя, остальные сдвигаются на одну вправо.
+        Глубина дерева на отступ не влияет — длинная линейная история остаётся плоской.
+        """
+        if not self.branching:
+            return [(i, 0) for i in range(len(self._history))]
+        rows: list[Tuple[int, int]] = []
+        stack = [(node, int(slot > 0)) for slot, node in reversed(list(enumerate(self._roots)))]
+        while stack:
+            node, lane = stack.pop()
+            rows.append((node, lane))
+            children = self._children[node]
+            for slot in range(len(children) - 1, -1, -1):
+                stack.append((children[slot], lane + (slot > 0)))
+        return rows
+
+    @read_locked
+    def snapshots(self) -> list[EquipmentMemento]:
+        return [self._get(i) for i in range(len(self._history))]
+
+    @read_locked
+    def linear_history(self) -> Tuple[list[EquipmentMemento], int]:
+        """
+        Текущая ветка как линейная история и позиция курсора в ней —
+        для форматов, которые хранят историю списком (.mpcat).
+        """
+        path = self._branch_path()
+        index = path.index(self._index) if self._index >= 0 else -1
+        return [self._get(i) for i in path], index
+
+    def current_index(self) -> int:
+        return self._index
+
+    @read_locked
+    def diff(self, i: int, j: int) -> SnapshotDiff:
+        """Что изменилось от snapshot'а i к snapshot'у j (см. diff_snapshots)."""
+        from patterns.memento.diff import diff_snapshots
+
+        return diff_snapshots(self._get(i), self._get(j))
+
+    @write_locked
+    def replace_history(
+        self,
+        history: list[EquipmentMemento],
+        index: int,
+        parents: Optional[Iterable[int]] = None,
+        active: Optional[Iterable[int]] = None,
+    ) -> None:
+        """
+        Подменить историю целиком (например, после загрузки из файла).
+        parents/active — дерево из export_state(); без них история — одна ветка.
+        """
+        self._pool = MementoPool()
+        self._dropped = 0
+        self._cache.clear()
+        prev = None
+        self._history = []
+        for m in history:
+            prev = self._pool.intern(m, prev)
+            self._history.append(prev)
+        self._index = max(-1, min(index, len(self._history) - 1))
+        if self.branching:
+            self._parent, self._children, self._active, self._slot, self._roots = [], [], [], [], []
+            parents = list(parents) if parents is not None else [i - 1 for i in range(len(self._history))]
+            # родитель всегда раньше ребёнка — узлы подвешиваются по порядку
+            for i, parent in enumerate(parents):
+                self._attach(i, parent)
+            if active is not None:
+                self._active = list(active)
+            elif self._index >= 0:
+                self._active[self._index] = self._index + 1 if self._index + 1 < len(self._history) else -1
+        self._compress_cold()
+
+    @read_locked
+    def export_state(self) -> HistoryState:
+        """Срез истории для записи в фоне (checkpoint): без распаковки и копирования snapshot'ов."""
+        if self.branching:
+            return HistoryState(
+                tuple(self._history), self._index, tuple(self._parent), tuple(self._active), self._codec, True
+            )
+        return HistoryState(tuple(self._history), self._index, codec=self._codec)
+
+    def pool_size(self) -> int:
+        return len(self._pool)
 
+    @read_locked
     def info(self) -> str:
-        return f"History: {len(self._history)} snapshots, current index: {self._index}"
+        text = (
+            f"History: {len(self._history)} snapshots, current index: {self._index}, "
+            f"pooled models: {len(self._pool)}, duplicates skipped: {self.skipped}"
+        )
+        if self.branching:
+            forks = sum(1 for c in self._children if len(c) > 1) + (len(self._roots) > 1)
+            leaves = sum(1 for c in self._children if not c)
+            text += f", branches: {leaves} (forks: {forks})"
+        if self._compress_after is not None:
+            st = self._compression_stats()
+            cold = sum(1 for e in self._history if not isinstance(e, EquipmentMemento))
+            text += f", compressed: {cold} (x{st.ratio:.1f}, +{st.avg_decompress_ms:.1f} ms/undo)"
+        return text
@@ -0,0 +1,407 @@
+"""
+Бинарный колоночный формат каталога (.mpcat).
+
+Файл — поток записей, каждая начинается с 1 байта-тега:
+  S  новые строки для таблицы интернирования (дописываются по мере надобности)
+  H  заголовок snapshot: номер, current_ref
+  C  блок моделей одного типа: колонки uint32 id строк + колонка флагов
+  D  тип как правка его последнего записанного блока: новая длина, позиции
+     изменённых моделей и их строки (те же колонки, что в C)
+  E  конец файла: индекс Caretaker
+
+Snapshot 0 — текущее состояние каталога, 1..N — история Caretaker.
+specs/functions кодируются в JSON и интернируются как строки:
+одинаковые рецепты в файле хранятся один раз.
+Соседние snapshot'ы истории почти совпадают, поэтому тип, который поменялся
+меньше чем наполовину, пишется блоком D — размер файла растёт с числом правок,
+а не с (snapshot'ы x модели).
+Блоки читаются по одному, поэтому загрузку можно вести потоково.
+"""
+from __future__ import annotations
+
+import io
+import json
+import struct
+import sys
+from array import array
+from itertools import compress
+from operator import is_, is_not
+from dataclasses import dataclass
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from patterns.memento.equipment_memento import EquipmentMemento, ModelMemento, freeze_specs, specs_key, thaw_specs
+
+MAGIC = b"MPCAT\x01\n"
+CHUNK_SIZE = 65536
+
+_U32 = struct.Struct("<I")
+_HEADER = struct.Struct("<IiI")  # snapshot no, current type id (-1 = нет), current index
+_CHUNK = struct.Struct("<III")  # snapshot no, type id, count
+_DELTA = struct.Struct("<IIII")  # snapshot no, type id, count, изменённых позиций
+
+# порядок колонок-строк в блоке C
+_STR_COLUMNS = (
+    "factory_key",
+    "equipment_type",
+    "name",
+    "specs",
+    "functions",
+    "base_software_title",
+    "license_key",
+    "software_state_name",
+)
+
+_FLAG_ONLINE = 1
+_FLAG_ANALYTICS = 2
+_FLAG_PROXY = 4
+_FLAG_CLONE = 8
+
+
+@dataclass(frozen=True)
+class StoredCatalog:
+    current: EquipmentMemento
+    history: List[EquipmentMemento]
+    index: int
+
+
+def _u32_array(values) -> array:
+    arr = array("I", values)
+    if sys.byteorder != "little":
+        arr.byteswap()
+    return arr
+
+
+def _read_u32_array(data: bytes) -> array:
+    arr = array("I")
+    arr.frombytes(data)
+    if sys.byteorder != "little":
+        arr.byteswap()
+    return arr
+
+
+class _StringTableWriter:
+    def __init__(self, fp: BinaryIO) -> None:
+        self._fp = fp
+        self._ids: Dict[str, int] = {}
+        self._pending: List[str] = []
+
+    def intern(self, s: str) -> int:
+        sid = self._ids.get(s)
+        if sid is None:
+            sid = len(self._ids)
+            self._ids[s] = sid
+            self._pending.append(s)
+        return sid
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+        raws = [s.encode("utf-8") for s in self._pending]
+        fp = self._fp
+        fp.write(b"S")
+        fp.write(_U32.pack(len(raws)))
+        fp.write(_u32_array(len(r) for r in raws).tobytes())
+        fp.write(b"".join(raws))
+        self._pending.clear()
+
+
+class _JsonEncoder:
+    """JSON-кодирование specs/functions с кешем: у моделей одного рецепта они совпадают."""
+    def __init__(self) -> None:
+        self._specs: Dict[tuple, str] = {}
+        self._functions: Dict[tuple, str] = {}
+
+    def specs(self, specs: tuple) -> str:
+        # ключ — specs_key, а не сам кортеж: для == и hash() True, 1 и 1.0 одно и то же
+        key = specs_key(specs)
+        text = self._specs.get(key)
+        if text is None:
+            text = self._specs[key] = json.dumps(thaw_specs(specs), ensure_ascii=False, separators=(",", ":"))
+        return text
+
+    def functions(self, functions: tuple) -> str:
+        text = self._functions.get(functions)
+        if text is None:
+            text = self._functions[functions] = json.dumps(list(functions), ensure_ascii=False, separators=(",", ":"))
+        return text
+
+
+def _write_snapshot(
+    fp: BinaryIO,
+    strings: _StringTableWriter,
+    encoder: _JsonEncoder,
+    last: Dict[str, Tuple[ModelMemento, ...]],
+    no: int,
+    mem: EquipmentMemento,
+) -> None:
+    cur_type, cur_idx = -1, 0
+    if mem.current_ref is not None:
+        cur_type, cur_idx = strings.intern(mem.current_ref[0]), mem.current_ref[1]
+    strings.flush()
+    fp.write(b"H")
+    fp.write(_HEADER.pack(no, cur_type, cur_idx))
+
+    for eq_type, snaps in mem.catalog.items():
+        type_id = strings.intern(eq_type)
+        prev = last.get(eq_type)
+        last[eq_type] = snaps
+        if prev is not None:
+            n = min(len(prev), len(snaps))
+            changed = [*compress(range(n), map(is_not, prev, snaps)), *range(n, len(snaps))]
+            if len(changed) * 2 <= len(snaps):
+                columns, flags = _encode_columns(strings, encoder, [snaps[i] for i in changed])
+                strings.flush()
+                fp.write(b"D")
+                fp.write(_DELTA.pack(no, type_id, len(snaps), len(changed)))
+                fp.write(_u32_array(changed).tobytes())
+                for col in columns:
+                    fp.write(col.tobytes())
+                fp.write(flags)
+                continue
+        # пустой тип тоже сохраняем (блок с count=0)
+        starts = range(0, len(snaps), CHUNK_SIZE) if snaps else [0]
+        for start in starts:
+            part = snaps[start:start + CHUNK_SIZE]
+            columns, flags = _encode_columns(strings, encoder, part)
+            strings.flush()
+            fp.write(b"C")
+            fp.write(_CHUNK.pack(no, type_id, len(part)))
+            for col in columns:
+                fp.write(col.tobytes())
+            fp.write(flags)
+
+
+def _encode_columns(
+    strings: _StringTableWriter, encoder: _JsonEncoder, part: Sequence[ModelMemento]
+) -> Tuple[List[array], bytes]:
+    intern = strings.intern
+    columns = [
+        _u32_array([intern(s.factory_key) for s in part]),
+        _u32_array([intern(s.equipment_type) for s in part]),
+        _u32_array([intern(s.name) for s in part]),
+        _u32_array([intern(encoder.specs(s.specs)) for s in part]),
+        _u32_array([intern(encoder.functions(s.functions)) for s in part]),
+        _u32_array([intern(s.base_software_title) for s in part]),
+        _u32_array([intern(s.license_key) for s in part]),
+        _u32_array([intern(s.software_state_name) for s in part]),
+    ]
+    flags = bytes(
+        (_FLAG_ONLINE if s.use_online else 0)
+        | (_FLAG_ANALYTICS if s.use_analytics else 0)
+        | (_FLAG_PROXY if s.use_proxy else 0)
+        | (_FLAG_CLONE if s.is_clone else 0)
+        for s in part
+    )
+    return columns, flags
+
+
+def _write_all(fp: BinaryIO, mementos: List[EquipmentMemento], index: int) -> None:
+    fp.write(MAGIC)
+    strings = _StringTableWriter(fp)
+    encoder = _JsonEncoder()
+    last: Dict[str, Tuple[ModelMemento, ...]] = {}  # тип -> его последний записанный кортеж (база D)
+    for no, mem in enumerate(mementos):
+        _write_snapshot(fp, strings, encoder, last, no, mem)
+    strings.flush()
+    fp.write(b"E")
+    fp.write(struct.pack("<i", index))
+
+
+def save_catalog(path: str, current: EquipmentMemento, history: List[EquipmentMemento], index: int) -> None:
+    with open(path, "wb") as fp:
+        _write_all(fp, [current, *history], index)
+
+
+def dump_snapshot(mem: EquipmentMemento) -> bytes:
+    """Один snapshot в формате .mpcat в памяти (для сжатия в Caretaker)."""
+    buf = io.BytesIO()
+    _write_all(buf, [mem], -1)
+    return buf.getvalue()
+
+
+# -----------------------------
+# Reading
+# -----------------------------
+class CatalogReader:
+    """
+    Потоковое чтение .mpcat: iter_chunks() отдаёт блоки моделей по одному,
+    не держа в памяти весь файл и не создавая EquipmentModel.
+    Блок D отдаётся уже собранным (все модели типа): неизменённые позиции — те же
+    объекты, что в базовом блоке, так что snapshot'ы истории делят их, как в Caretaker.
+    """
+    def __init__(self, fp: BinaryIO) -> None:
+        if fp.read(len(MAGIC)) != MAGIC:
+            raise ValueError("Not a Mega-Patterns catalog file")
+        self._fp = fp
+        # конец файла: битый счётчик не должен превращаться в read() на гигабайты
+        self._end = fp.seek(0, io.SEEK_END) if fp.seekable() else None
+        if self._end is not None:
+            fp.seek(len(MAGIC))
+        self._strings: List[str] = []
+        # декодированные specs/functions тоже кешируются по id строки;
+        # они неизменяемые кортежи, поэтому один объект на все модели
+        self._specs_cache: Dict[int, tuple] = {}
+        self._funcs_cache: Dict[int, tuple] = {}
+        # тип -> (номер snapshot'а, его модели целиком) — база для блоков D
+        self._blocks: Dict[str, Tuple[int, List[ModelMemento]]] = {}
+        self.headers: Dict[int, Optional[Tuple[str, int]]] = {}
+        self.index: int = -1
+
+    def _read(self, n: int) -> bytes:
+        if self._end is not None and n > self._end - self._fp.tell():
+            raise ValueError("Unexpected end of catalog file")
+        data = self._fp.read(n)
+        if len(data) != n:
+            raise ValueError("Unexpected end of catalog file")
+        return data
+
+    def _read_strings(self) -> None:
+        (count,) = _U32.unpack(self._read(4))
+        sizes = _read_u32_array(self._read(4 * count))
+        blob = self._read(sum(sizes))
+        pos = 0
+        append = self._strings.append
+        try:
+            for size in sizes:
+                append(blob[pos:pos + size].decode("utf-8"))
+                pos += size
+        except UnicodeDecodeError as e:
+            raise ValueError("Corrupted catalog file (bad string table)") from e
+
+    def _string(self, sid: int) -> str:
+        if not 0 <= sid < len(self._strings):
+            raise ValueError(f"Corrupted catalog file (string id {sid} out of range)")
+        return self._strings[sid]
+
+    def _decoded(self, cache: Dict[int, Any], ids: array, freeze: Callable[[Any], tuple]) -> List[Any]:
+        strings = self._strings
+        out = []
+        for sid in ids:
+            val = cache.get(sid)
+            if val is None:
+                try:
+                    val = cache[sid] = freeze(json.loads(strings[sid]))
+                except (ValueError, TypeError, AttributeError) as e:
+                    raise ValueError(f"Corrupted catalog file (bad specs/functions: {e})") from e
+            out.append(val)
+        return out
+
+    def _read_rows(self, count: int) -> List[ModelMemento]:
+        strings = self._strings
+        cols = [_read_u32_array(self._read(4 * count)) for _ in _STR_COLUMNS]
+        flags = self._read(count)
+        # одна проверка на блок вместо проверки каждого индекса в цикле ниже
+        if count and max(map(max, cols)) >= len(strings):
+            raise ValueError("Corrupted catalog file (string id out of range)")
+        fk, et, nm, sp, fn, base, lic, st = cols
+        specs = self._decoded(self._specs_cache, sp, freeze_specs)
+        funcs = self._decoded(self._funcs_cache, fn, tuple)
+        from_fields = ModelMemento.from_fields
+        return [
+            from_fields(
+                strings[fk[i]],
+                strings[et[i]],
+                strings[nm[i]],
+                specs[i],
+                funcs[i],
+                strings[base[i]],
+                bool(flags[i] & _FLAG_ONLINE),
+                bool(flags[i] & _FLAG_ANALYTICS),
+                bool(flags[i] & _FLAG_PROXY),
+                strings[lic[i]],
+                strings[st[i]],
+                bool(flags[i] & _FLAG_CLONE),
+            )
+            for i in range(count)
+        ]
+
+    def iter_chunks(self) -> Iterator[Tuple[int, str, List[ModelMemento]]]:
+        """(номер snapshot, тип, модели блока)"""
+        string = self._string
+        while True:
+            tag = self._fp.read(1)
+            if not tag:
+                # файл оборван между блоками: без E нет индекса Caretaker
+                raise ValueError("Unexpected end of catalog file")
+            if tag == b"S":
+                self._read_strings()
+            elif tag == b"H":
+                no, cur_type, cur_idx = _HEADER.unpack(self._read(_HEADER.size))
+                self.headers[no] = (string(cur_type), cur_idx) if cur_type >= 0 else None
+            elif tag == b"C":
+                no, type_id, count = _CHUNK.unpack(self._read(_CHUNK.size))
+                eq_type = string(type_id)
+                models = self._read_rows(count)
+                block = self._blocks.get(eq_type)
+                if block is None or block[0] != no:
+                    self._blocks[eq_type] = (no, list(models))
+                else:
+                    block[1].extend(models)
+                yield no, eq_type, models
+            elif tag == b"D":
+                no, type_id, count, changed = _DELTA.unpack(self._read(_DELTA.size))
+                eq_type = string(type_id)
+                block = self._blocks.get(eq_type)
+                if block is None:
+                    raise ValueError("Corrupted catalog file (delta without base block)")
+                base = block[1]
+                # новый хвост типа целиком перечислен в изменённых позициях
+                if count > len(base) + changed:
+                    raise ValueError("Corrupted catalog file (delta length out of range)")
+                positions = _read_u32_array(self._read(4 * changed))
+                if positions and max(positions) >= count:
+                    raise ValueError("Corrupted catalog file (delta position out of range)")
+                models = base[:count]
+                if count > len(models):
+                    models.extend([None] * (count - len(models)))
+                for i, m in zip(positions, self._read_rows(changed)):
+                    models[i] = m
+                if count > len(base) and any(m is None for m in models[len(base):]):
+                    raise ValueError("Corrupted catalog file (delta leaves gaps)")
+                self._blocks[eq_type] = (no, models)
+                yield no, eq_type, list(models)
+            elif tag == b"E":
+                (self.index,) = struct.unpack("<i", self._read(4))
+                return
+            else:
+                raise ValueError(f"Corrupted catalog file (tag={tag!r})")
+
+
+def iter_catalog_chunks(path: str) -> Iterator[Tuple[int, str, List[ModelMemento]]]:
+    with open(path, "rb") as fp:
+        yield from CatalogReader(fp).iter_chunks()
+
+
+def _read_all(fp: BinaryIO) -> Tuple[List[EquipmentMemento], int]:
+    reader = CatalogReader(fp)
+    catalogs: Dict[int, Dict[str, List[ModelMemento]]] = {}
+    for no, eq_type, models in reader.iter_chunks():
+        catalogs.setdefault(no, {}).setdefault(eq_type, []).extend(models)
+
+    # тип, не изменённый блоком D, состоит из тех же объектов, что в прошлом snapshot'е, —
+    # ему отдаётся тот же кортеж: пул Caretaker пропускает такие типы по identity
+    last: Dict[str, Tuple[ModelMemento, ...]] = {}
+    mementos = []
+    for no in sorted(reader.headers):
+        catalog = {}
+        for eq_type, models in catalogs.pop(no, {}).items():
+            prev = last.get(eq_type)
+            if prev is None or len(prev) != len(models) or not all(map(is_, prev, models)):
+                prev = last[eq_type] = tuple(models)
+            catalog[eq_type] = prev
+        mementos.append(EquipmentMemento(catalog=catalog, current_ref=reader.headers.get(no)))
+    if not mementos:
+        raise ValueError("Catalog file has no snapshots")
+    return mementos, reader.index
+
+
+def load_catalog(path: str) -> StoredCatalog:
+    with open(path, "rb") as fp:
+        mementos, index = _read_all(fp)
+    return StoredCatalog(current=mementos[0], history=mementos[1:], index=index)
+
+
+def load_snapshot(data: bytes) -> EquipmentMemento:
+    """Обратное к dump_snapshot()."""
+    mementos, _ = _read_all(io.BytesIO(data))
+    return mementos[0]
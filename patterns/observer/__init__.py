@@ -0,0 +1,29 @@
+from .events import (
+    ModelAdded,
+    ModelRemoved,
+    ModelChanged,
+    CatalogReset,
+    CurrentChanged,
+    HistoryChanged,
+    CatalogEvent,
+    EventBatch,
+    MODEL_EVENTS,
+    ALL_EVENTS,
+)
+from .bus import EventBus, BusMetrics, CatalogEventSource
+
+__all__ = [
+    "ModelAdded",
+    "ModelRemoved",
+    "ModelChanged",
+    "CatalogReset",
+    "CurrentChanged",
+    "HistoryChanged",
+    "CatalogEvent",
+    "EventBatch",
+    "MODEL_EVENTS",
+    "ALL_EVENTS",
+    "EventBus",
+    "BusMetrics",
+    "CatalogEventSource",
+]
@@ -0,0 +1,225 @@
+from __future__ import annotations
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
+
+from patterns.composite.catalog import ModelRef
+from patterns.observer.events import (
+    ALL_EVENTS,
+    CatalogEvent,
+    CatalogReset,
+    EventBatch,
+    EventKind,
+    ModelAdded,
+    ModelChanged,
+    ModelRemoved,
+)
+
+
+# after_idle(callback) — как у tk.Tk.after_idle
+IdleScheduler = Callable[[Callable[[], None]], Any]
+Handler = Callable[[EventBatch], None]
+
+
+@dataclass(frozen=True)
+class BusMetrics:
+    emitted: int
+    coalesced: int
+    batches: int
+    deliveries: int
+    last_batch: int
+    last_flush_ms: float
+    max_flush_ms: float
+
+
+@dataclass
+class _Subscriber:
+    name: str
+    handler: Handler
+    kinds: Tuple[EventKind, ...]
+    deliveries: int = 0
+    events: int = 0
+    seconds: float = 0.0
+
+
+class EventBus:
+    """
+    Шина изменений каталога (Observer) с пакетной доставкой.
+
+    emit() не вызывает подписчиков сразу: события копятся в EventBatch и сливаются.
+    Пачка доставляется:
+    - в конце внешней transaction();
+    - иначе — в ближайший idle-тик (schedule, например tk.Tk.after_idle);
+      без schedule — сразу после emit();
+    - или явным flush().
+    Каждый подписчик получает только те виды событий, на которые подписан,
+    и не вызывается, если их в пачке нет.
+
+    emit() можно звать из любого потока, но schedule и подписчики работают
+    в потоке, который вызывает flush() (в приложении — UI-поток).
+    """
+    def __init__(self, schedule: Optional[IdleScheduler] = None, on_error: Optional[Callable[[str, BaseException], None]] = None) -> None:
+        self._schedule = schedule
+        self._on_error = on_error
+        self._lock = threading.Lock()
+        self._pending = EventBatch()
+        self._scheduled = False
+        self._depth = 0
+        self._flushing = False
+        self._subscribers: List[_Subscriber] = []
+        self._emitted = 0
+        self._coalesced = 0
+        self._batches = 0
+        self._deliveries = 0
+        self._last_batch = 0
+        self._last_flush = 0.0
+        self._max_flush = 0.0
+
+    # -----------------------------
+    # Подписка
+    # -----------------------------
+    def subscribe(self, handler: Handler, kinds: Iterable[EventKind] = ALL_EVENTS, name: Optional[str] = None) -> Callable[[], None]:
+        """Возвращает функцию отписки."""
+        sub = _Subscriber(name or getattr(handler, "__name__", "handler"), handler, tuple(kinds))
+        self._subscribers.append(sub)
+
+        def unsubscribe() -> None:
+            if sub in self._subscribers:
+                self._subscribers.remove(sub)
+
+        return unsubscribe
+
+    # -----------------------------
+    # События
+    # -----------------------------
+    def emit(self, event: CatalogEvent) -> None:
+        with self._lock:
+            self._emitted += 1
+            self._pending.add(event)
+            if self._depth or self._flushing:
+                return
+            if self._schedule is not None:
+                if self._scheduled:
+                    return
+                self._scheduled = True
+        if self._schedule is not None:
+            self._schedule(self._on_idle)
+        else:
+            self.flush()
+
+    @contextmanager
+    def transaction(self) -> Iterator[EventBus]:
+        """События внутри with уходят подписчикам одной пачкой при выходе из внешнего with."""
+        with self._lock:
+            self._depth += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._depth -= 1
+                outer = self._depth == 0
+            if outer:
+                self.flush()
+
+    def _on_idle(self) -> None:
+        with self._lock:
+            self._scheduled = False
+            if self._depth:
+                return
+        self.flush()
+
+    def flush(self) -> None:
+        # подписчик может сам что-то emit(): такие события уходят следующей пачкой в этом же flush()
+        with self._lock:
+            if self._flushing or self._depth:
+                return
+            self._flushing = True
+        try:
+            while True:
+                with self._lock:
+                    batch, self._pending = self._pending, EventBatch()
+                if not batch:
+                    return
+                self._deliver(batch)
+        finally:
+            with self._lock:
+                self._flushing = False
+
+    def _deliver(self, batch: EventBatch) -> None:
+        t0 = time.perf_counter()
+        errors: List[BaseException] = []
+        for sub in list(self._subscribers):
+            part = batch.only(sub.kinds)
+            if not part:
+                continue
+            s0 = time.perf_counter()
+            try:
+                sub.handler(part)
+            except Exception as e:
+                # один сломанный подписчик не должен лишать событий остальных
+                if self._on_error is None:
+                    errors.append(e)
+                else:
+                    self._on_error(sub.name, e)
+            sub.deliveries += 1
+            sub.events += len(part)
+            sub.seconds += time.perf_counter() - s0
+            self._deliveries += 1
+        elapsed = time.perf_counter() - t0
+        self._batches += 1
+        self._coalesced += batch.coalesced
+        self._last_batch = len(batch)
+        self._last_flush = elapsed
+        self._max_flush = max(self._max_flush, elapsed)
+        if errors:
+            raise errors[0]
+
+    # -----------------------------
+    # Метрики
+    # -----------------------------
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def metrics(self) -> BusMetrics:
+        return BusMetrics(
+            emitted=self._emitted,
+            coalesced=self._coalesced,
+            batches=self._batches,
+            deliveries=self._deliveries,
+            last_batch=self._last_batch,
+            last_flush_ms=self._last_flush * 1000,
+            max_flush_ms=self._max_flush * 1000,
+        )
+
+    def subscriber_stats(self) -> List[Tuple[str, int, int, float]]:
+        """(имя, доставок, событий, суммарно мс) по каждому подписчику."""
+        return [(s.name, s.deliveries, s.events, s.seconds * 1000) for s in self._subscribers]
+
+
+class CatalogEventSource:
+    """
+    Подключается к Catalog как обычный индекс (CatalogIndex) и переводит его
+    add/remove/replace/clear в ModelAdded/ModelRemoved/ModelChanged/CatalogReset на шине.
+    reindex() после restore даёт CatalogReset, а последующие add() поглощаются им в EventBatch.
+    """
+    def __init__(self, bus: EventBus) -> None:
+        self.bus = bus
+
+    def add(self, ref: ModelRef, model) -> None:
+        self.bus.emit(ModelAdded(ref))
+
+    def remove(self, ref: ModelRef, model) -> None:
+        self.bus.emit(ModelRemoved(ref))
+
+    def shift(self, ref: ModelRef, model, count: int) -> None:
+        # удаление не с конца подписчики и так понимают как сдвиг хвоста типа (дерево перестроит тип)
+        self.bus.emit(ModelRemoved(ref))
+
+    def replace(self, ref: ModelRef, old, new) -> None:
+        self.bus.emit(ModelChanged(ref))
+
+    def clear(self) -> None:
+        self.bus.emit(CatalogReset())
@@ -0,0 +1,124 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Type, Union
+
+from patterns.composite.catalog import ModelRef
+
+
+@dataclass(frozen=True)
+class ModelAdded:
+    ref: ModelRef
+
+
+@dataclass(frozen=True)
+class ModelRemoved:
+    """Модель убрана; позиции следующих моделей типа сдвинулись."""
+    ref: ModelRef
+
+
+@dataclass(frozen=True)
+class ModelChanged:
+    """Поменялись флаги/ПО модели (позиция та же)."""
+    ref: ModelRef
+
+
+@dataclass(frozen=True)
+class CatalogReset:
+    """Каталог подменён целиком (restore, load): прежние ссылки недействительны."""
+
+
+@dataclass(frozen=True)
+class CurrentChanged:
+    ref: Optional[ModelRef]
+
+
+@dataclass(frozen=True)
+class HistoryChanged:
+    """Поменялась история snapshot'ов (backup, undo/redo, загрузка)."""
+
+
+CatalogEvent = Union[ModelAdded, ModelRemoved, ModelChanged, CatalogReset, CurrentChanged, HistoryChanged]
+EventKind = Type[CatalogEvent]
+
+MODEL_EVENTS: Tuple[EventKind, ...] = (ModelAdded, ModelRemoved, ModelChanged)
+ALL_EVENTS: Tuple[EventKind, ...] = (*MODEL_EVENTS, CatalogReset, CurrentChanged, HistoryChanged)
+
+
+class EventBatch:
+    """
+    События одной пачки (транзакции или idle-тика) после слияния:
+    - одинаковые события хранятся один раз;
+    - CatalogReset поглощает все события моделей — и до, и после себя;
+    - ModelChanged для только что добавленной модели ничего не добавляет;
+    - из CurrentChanged остаётся последнее.
+    Внутри — словарь «вид события -> {ключ: событие}» в порядке поступления,
+    поэтому only() и refs() не проходят по чужим событиям.
+    """
+    def __init__(self) -> None:
+        self._events: Dict[EventKind, Dict[object, CatalogEvent]] = {}
+        self.received = 0
+
+    def add(self, event: CatalogEvent) -> bool:
+        """False — событие поглощено уже накопленными."""
+        self.received += 1
+        kind = type(event)
+        events = self._events
+        if kind in MODEL_EVENTS:
+            if CatalogReset in events:
+                return False
+            if kind is ModelChanged and event.ref in events.get(ModelAdded, ()):
+                return False
+        elif kind is CatalogReset:
+            for model_kind in MODEL_EVENTS:
+                events.pop(model_kind, None)
+        bucket = events.setdefault(kind, {})
+        if kind is CurrentChanged:
+            absorbed = bool(bucket)
+            bucket[None] = event
+            return not absorbed
+        key = getattr(event, "ref", None)
+        if key in bucket:
+            return False
+        bucket[key] = event
+        return True
+
+    def __len__(self) -> int:
+        return sum(len(bucket) for bucket in self._events.values())
+
+    def __bool__(self) -> bool:
+        return bool(self._events)
+
+    def __contains__(self, kind: EventKind) -> bool:
+        return kind in self._events
+
+    def __iter__(self) -> Iterator[CatalogEvent]:
+        for bucket in self._events.values():
+            yield from bucket.values()
+
+    def __repr__(self) -> str:
+        kinds = ", ".join(f"{k.__name__}={len(v)}" for k, v in self._events.items())
+        return f"EventBatch({kinds})"
+
+    @property
+    def coalesced(self) -> int:
+        return self.received - len(self)
+
+    def has(self, kind: EventKind, ref: ModelRef) -> bool:
+        return ref in self._events.get(kind, ())
+
+    def of(self, kind: EventKind) -> List[CatalogEvent]:
+        return list(self._events.get(kind, {}).values())
+
+    def refs(self, kind: EventKind) -> List[ModelRef]:
+        """Ссылки событий моделей данного вида (в порядке поступления)."""
+        return [e.ref for e in self._events.get(kind, {}).values()]
+
+    def only(self, kinds: Iterable[EventKind]) -> EventBatch:
+        """Срез пачки по видам событий (словари событий общие, не копируются)."""
+        out = EventBatch()
+        for kind in kinds:
+            bucket = self._events.get(kind)
+            if bucket:
+                out._events[kind] = bucket
+        out.received = len(out)
+        return out
@@ -1,3 +1,42 @@
-from .software_proxy import SoftwareProxy, ProtectedRemoteSoftware
+from .software_proxy import SoftwareProxy, preload
 
-__all__ = ["SoftwareProxy", "ProtectedRemoteSoftware"]
+__all__ = [
+    "SoftwareProxy",
+    "preload",
+    "ProtectedRemoteSoftware",
+    "Transport",
+    "HttpTransport",
+    "SimulatedTransport",
+    "RemoteModule",
+    "RemoteLoadError",
+    "TransportMetrics",
+    "default_transport",
+    "set_default_transport",
+    "LicenseServer",
+]
+
+_TRANSPORT = (
+    "Transport",
+    "HttpTransport",
+    "SimulatedTransport",
+    "RemoteModule",
+    "RemoteLoadError",
+    "TransportMetrics",
+    "default_transport",
+    "set_default_transport",
+)
+
+
+def __getattr__(name: str):
+    # RealSubject (time, удалённая загрузка) не нужен, пока proxy не включён
+    if name == "ProtectedRemoteSoftware":
+        from .remote import ProtectedRemoteSoftware
+        return ProtectedRemoteSoftware
+    # транспорт (http.client) и стенд-сервер (http.server) — тоже по требованию
+    if name in _TRANSPORT:
+        from . import transport
+        return getattr(transport, name)
+    if name == "LicenseServer":
+        from .server import LicenseServer
+        return LicenseServer
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
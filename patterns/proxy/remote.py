@@ -0,0 +1,39 @@
+from __future__ import annotations
+import time
+from typing import Optional
+
+from patterns.proxy.transport import RemoteModule, Transport, default_transport
+
+
+class ProtectedRemoteSoftware:
+    """
+    Это "реальный объект" (RealSubject).
+    Представь, что он тяжёлый, грузится/инициализируется долго и работает с сетью.
+
+    Модуль получается через transport (см. patterns.proxy.transport); без транспорта
+    и без MEGA_PATTERNS_LICENSE_SERVER загрузка по-прежнему имитируется time.sleep.
+    """
+    def __init__(
+        self,
+        title: str,
+        load_seconds: float = 1.2,
+        transport: Optional[Transport] = None,
+        module: Optional[RemoteModule] = None,
+    ) -> None:
+        self._title = title
+        self._load_seconds = load_seconds
+        if module is None:
+            transport = transport or default_transport()
+            if transport is None:
+                # имитация тяжёлой инициализации
+                time.sleep(self._load_seconds)
+                module = RemoteModule(title)
+            else:
+                module = transport.fetch(title)
+        self._module = module
+
+    def name(self) -> str:
+        return self._title
+
+    def operation(self) -> str:
+        return self._module.result
@@ -0,0 +1,142 @@
+"""
+Локальный стенд сервера модулей ПО для HttpTransport.
+
+    python -m patterns.proxy.server [port]
+
+GET  /modules/<title>  -> {"title", "result", "version"}
+POST /modules/batch    {"titles": [...]} -> {"modules": [...]}
+"""
+from __future__ import annotations
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import unquote
+
+from patterns.proxy.transport import DEFAULT_RESULT
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # HTTP/1.1: соединение остаётся открытым между запросами (keep-alive)
+    protocol_version = "HTTP/1.1"
+    # заголовки и тело уходят разными write(): без TCP_NODELAY Nagle + delayed ACK дают ~40 ms на ответ
+    disable_nagle_algorithm = True
+    server: "LicenseServer"
+
+    def setup(self) -> None:
+        super().setup()
+        # цена нового соединения (TCP/TLS handshake, авторизация) — один раз на соединение
+        self.server.count("connections")
+        if self.server.setup_seconds:
+            time.sleep(self.server.setup_seconds)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+    def _send(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _flaky(self) -> bool:
+        n = self.server.count("requests")
+        every = self.server.fail_every
+        if every and n % every == 0:
+            self._send(503, {"error": "temporarily unavailable"})
+            return True
+        return False
+
+    def do_GET(self) -> None:
+        if self._flaky():
+            return
+        if not self.path.startswith("/modules/"):
+            self._send(404, {"error": "not found"})
+            return
+        title = unquote(self.path[len("/modules/"):])
+        time.sleep(self.server.work_seconds)
+        self._send(200, self.server.module(title))
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length)
+        if self._flaky():
+            return
+        if self.path != "/modules/batch":
+            self._send(404, {"error": "not found"})
+            return
+        try:
+            titles = json.loads(raw)["titles"]
+        except (ValueError, KeyError, TypeError):
+            self._send(400, {"error": "expected {\"titles\": [...]}"})
+            return
+        # пакет: одна «загрузка» на запрос, а не на каждое название
+        time.sleep(self.server.work_seconds)
+        self._send(200, {"modules": [self.server.module(t) for t in titles]})
+
+
+class LicenseServer(ThreadingHTTPServer):
+    """
+    Стенд сервера лицензий/модулей на http.server (поток на соединение).
+    setup_seconds — задержка на новое соединение, work_seconds — на запрос,
+    fail_every — каждый N-й запрос отвечает 503 (проверка повторов клиента).
+    """
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        setup_seconds: float = 0.05,
+        work_seconds: float = 0.005,
+        fail_every: int = 0,
+    ) -> None:
+        super().__init__((host, port), _Handler)
+        self.setup_seconds = setup_seconds
+        self.work_seconds = work_seconds
+        self.fail_every = fail_every
+        self.stats = {"connections": 0, "requests": 0}
+        self._stats_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self) -> str:
+        host, port = self.server_address[:2]
+        return f"{host}:{port}"
+
+    def count(self, name: str) -> int:
+        with self._stats_lock:
+            self.stats[name] += 1
+            return self.stats[name]
+
+    def module(self, title: str) -> dict:
+        return {"title": title, "result": DEFAULT_RESULT, "version": "1"}
+
+    def start(self) -> LicenseServer:
+        self._thread = threading.Thread(target=self.serve_forever, name="license-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self) -> LicenseServer:
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+if __name__ == "__main__":
+    srv = LicenseServer(port=int(sys.argv[1]) if len(sys.argv) > 1 else 8765)
+    print(f"license server on {srv.address} (set MEGA_PATTERNS_LICENSE_SERVER={srv.address})")
+    try:
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        srv.server_close()
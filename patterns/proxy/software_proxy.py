@@ -1,27 +1,8 @@
 from __future__ import annotations
-import time
-from typing import Optional, List
+from typing import Iterable, Optional, List
 from domain.equipment import ISoftware
 
 
-class ProtectedRemoteSoftware:
-    """
-    Это "реальный объект" (RealSubject).
-    Представь, что он тяжёлый, грузится/инициализируется долго и работает с сетью.
-    """
-    def __init__(self, title: str, load_seconds: float = 1.2) -> None:
-        self._title = title
-        self._load_seconds = load_seconds
-        # имитация тяжёлой инициализации
-        time.sleep(self._load_seconds)
-
-    def name(self) -> str:
-        return self._title
-
-    def operation(self) -> str:
-        return "Реальный модуль ПО выполнен."
-
-
 class SoftwareProxy:
     """
     proxy: контролирует доступ и лениво создаёт реальный объект.
@@ -47,6 +28,9 @@ class SoftwareProxy:
 
     def _ensure_real_loaded(self) -> None:
         if self._real is None:
+            # модуль реального объекта импортируется только при первой загрузке
+            from patterns.proxy.remote import ProtectedRemoteSoftware
+
             self.log.append("lazy_load() -> начинаю загрузку реального ПО")
             self._real = ProtectedRemoteSoftware(self._title)
             self.log.append("lazy_load() -> реальное ПО загружено")
@@ -58,3 +42,23 @@ class SoftwareProxy:
         assert self._real is not None
         self.log.append("delegate.operation() -> передаю управление реальному объекту")
         return self._real.operation()
+
+
+def preload(proxies: Iterable[SoftwareProxy], transport=None) -> int:
+    """
+    Загружает реальные модули для всех proxy с валидной лицензией одним пакетным
+    запросом (transport.fetch_many) вместо отдельной загрузки на каждый operation().
+    Возвращает число загруженных proxy.
+    """
+    from patterns.proxy.remote import ProtectedRemoteSoftware
+    from patterns.proxy.transport import default_transport
+
+    pending = [p for p in proxies if p._real is None and p._check_access()]
+    transport = transport or default_transport()
+    if not pending or transport is None:
+        return 0
+    modules = transport.fetch_many(p._title for p in pending)
+    for p in pending:
+        p._real = ProtectedRemoteSoftware(p._title, module=modules[p._title])
+        p.log.append("preload() -> реальное ПО получено пакетом")
+    return len(pending)
@@ -0,0 +1,264 @@
+from __future__ import annotations
+import http.client
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, Iterable, List, Optional, Protocol, Sequence
+from urllib.parse import quote
+
+
+# адрес сервера лицензий/модулей: host:port; без него загрузка имитируется time.sleep
+SERVER_ENV = "MEGA_PATTERNS_LICENSE_SERVER"
+
+DEFAULT_RESULT = "Реальный модуль ПО выполнен."
+
+
+class RemoteLoadError(RuntimeError):
+    """Модуль не удалось получить (сервер ответил ошибкой или недоступен после повторов)."""
+
+
+@dataclass(frozen=True)
+class RemoteModule:
+    title: str
+    result: str = DEFAULT_RESULT
+    version: str = "1"
+
+
+@dataclass(frozen=True)
+class TransportMetrics:
+    requests: int
+    modules: int
+    retries: int
+    failures: int
+    connections_opened: int
+    avg_latency_ms: float
+    p95_latency_ms: float
+    max_latency_ms: float
+
+
+class Transport(Protocol):
+    def fetch(self, title: str) -> RemoteModule: ...
+    def fetch_many(self, titles: Iterable[str]) -> Dict[str, RemoteModule]: ...
+    def metrics(self) -> TransportMetrics: ...
+    def close(self) -> None: ...
+
+
+class _Meter:
+    """Счётчики и latency последних запросов (потокобезопасно)."""
+    def __init__(self, window: int = 1000) -> None:
+        self._lock = threading.Lock()
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self.requests = 0
+        self.modules = 0
+        self.retries = 0
+        self.failures = 0
+        self.connections_opened = 0
+
+    def record(self, seconds: float, modules: int) -> None:
+        with self._lock:
+            self.requests += 1
+            self.modules += modules
+            self._latencies.append(seconds)
+
+    def bump(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def snapshot(self) -> TransportMetrics:
+        with self._lock:
+            lat = sorted(self._latencies)
+            n = len(lat)
+            return TransportMetrics(
+                requests=self.requests,
+                modules=self.modules,
+                retries=self.retries,
+                failures=self.failures,
+                connections_opened=self.connections_opened,
+                avg_latency_ms=(sum(lat) / n * 1000) if n else 0.0,
+                p95_latency_ms=(lat[min(n - 1, int(0.95 * n))] * 1000) if n else 0.0,
+                max_latency_ms=(lat[-1] * 1000) if n else 0.0,
+            )
+
+
+class SimulatedTransport:
+    """Прежнее поведение: «загрузка» — это time.sleep(load_seconds) на каждый модуль."""
+    def __init__(self, load_seconds: float = 1.2) -> None:
+        self._load_seconds = load_seconds
+        self._meter = _Meter()
+
+    def fetch(self, title: str) -> RemoteModule:
+        t0 = time.perf_counter()
+        time.sleep(self._load_seconds)
+        self._meter.record(time.perf_counter() - t0, 1)
+        return RemoteModule(title)
+
+    def fetch_many(self, titles: Iterable[str]) -> Dict[str, RemoteModule]:
+        return {t: self.fetch(t) for t in dict.fromkeys(titles)}
+
+    def metrics(self) -> TransportMetrics:
+        return self._meter.snapshot()
+
+    def close(self) -> None:
+        pass
+
+
+# ошибки соединения, после которых запрос можно повторить на новом соединении
+_RETRYABLE = (OSError, http.client.HTTPException)
+
+
+class HttpTransport:
+    """
+    Клиент сервера модулей (см. patterns.proxy.server) поверх http.client.
+
+    - keep-alive: до pool_size соединений переиспользуются между запросами и потоками;
+    - fetch_many: несколько названий — один POST /modules/batch (по batch_size за запрос);
+    - timeout на соединение/чтение; при обрыве или 5xx — до retries повторов
+      с backoff, каждый раз на свежем соединении;
+    - metrics(): число запросов, повторов, открытых соединений и latency.
+    """
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        pool_size: int = 4,
+        timeout: float = 5.0,
+        retries: int = 2,
+        backoff: float = 0.05,
+        batch_size: int = 64,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self._timeout = timeout
+        self._retries = retries
+        self._backoff = backoff
+        self._batch_size = batch_size
+        self._idle: "queue.LifoQueue[http.client.HTTPConnection]" = queue.LifoQueue()
+        # семафор ограничивает число соединений (занятых + свободных)
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._meter = _Meter()
+        self._closed = False
+
+    @classmethod
+    def from_address(cls, address: str, **kwargs) -> HttpTransport:
+        host, _, port = address.rpartition(":")
+        return cls(host or "127.0.0.1", int(port), **kwargs)
+
+    # -----------------------------
+    # Пул соединений
+    # -----------------------------
+    def _acquire(self) -> http.client.HTTPConnection:
+        if not self._slots.acquire(timeout=self._timeout):
+            raise RemoteLoadError(f"no free connection to {self.host}:{self.port} within {self._timeout} s")
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            self._meter.bump("connections_opened")
+            return http.client.HTTPConnection(self.host, self.port, timeout=self._timeout)
+
+    def _release(self, conn: Optional[http.client.HTTPConnection]) -> None:
+        if conn is not None:
+            if self._closed:
+                conn.close()
+            else:
+                self._idle.put(conn)
+        self._slots.release()
+
+    def _request(self, method: str, path: str, body: Optional[bytes] = None) -> dict:
+        headers = {"Connection": "keep-alive"}
+        if body is not None:
+            headers["Content-Type"] = "application/json"
+        last_error: Optional[BaseException] = None
+        for attempt in range(self._retries + 1):
+            if attempt:
+                self._meter.bump("retries")
+                time.sleep(self._backoff * (2 ** (attempt - 1)))
+            conn = self._acquire()
+            t0 = time.perf_counter()
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                resp = conn.getresponse()
+                data = resp.read()
+            except _RETRYABLE as e:
+                # соединение в неизвестном состоянии — не возвращаем его в пул
+                conn.close()
+                self._release(None)
+                last_error = e
+                continue
+            if resp.will_close:
+                conn.close()
+                self._release(None)
+            else:
+                self._release(conn)
+
+            if resp.status >= 500:
+                last_error = RemoteLoadError(f"{method} {path}: HTTP {resp.status}")
+                continue
+            if resp.status != 200:
+                self._meter.bump("failures")
+                raise RemoteLoadError(f"{method} {path}: HTTP {resp.status} {data[:200].decode('utf-8', 'replace')}")
+            payload = json.loads(data)
+            self._meter.record(time.perf_counter() - t0, len(payload.get("modules", ())) or 1)
+            return payload
+
+        self._meter.bump("failures")
+        raise RemoteLoadError(f"{method} {path} failed after {self._retries + 1} attempt(s): {last_error}")
+
+    # -----------------------------
+    # Transport API
+    # -----------------------------
+    def fetch(self, title: str) -> RemoteModule:
+        data = self._request("GET", "/modules/" + quote(title, safe=""))
+        return RemoteModule(**data)
+
+    def fetch_many(self, titles: Iterable[str]) -> Dict[str, RemoteModule]:
+        unique: List[str] = list(dict.fromkeys(titles))
+        out: Dict[str, RemoteModule] = {}
+        for i in range(0, len(unique), self._batch_size):
+            chunk: Sequence[str] = unique[i:i + self._batch_size]
+            body = json.dumps({"titles": list(chunk)}, ensure_ascii=False).encode("utf-8")
+            data = self._request("POST", "/modules/batch", body)
+            for item in data["modules"]:
+                out[item["title"]] = RemoteModule(**item)
+        return out
+
+    def metrics(self) -> TransportMetrics:
+        return self._meter.snapshot()
+
+    def close(self) -> None:
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+_default: Optional[Transport] = None
+_default_lock = threading.Lock()
+
+
+def default_transport() -> Optional[Transport]:
+    """
+    Транспорт, заданный set_default_transport() или переменной MEGA_PATTERNS_LICENSE_SERVER.
+    None — сервера нет, ProtectedRemoteSoftware имитирует загрузку.
+    """
+    global _default
+    if _default is None:
+        address = os.environ.get(SERVER_ENV)
+        if address:
+            with _default_lock:
+                if _default is None:
+                    _default = HttpTransport.from_address(address)
+    return _default
+
+
+def set_default_transport(transport: Optional[Transport]) -> Optional[Transport]:
+    """Подменяет общий транспорт (например, на локальный стенд); возвращает прежний."""
+    global _default
+    with _default_lock:
+        prev, _default = _default, transport
+    return prev
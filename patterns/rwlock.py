@@ -0,0 +1,104 @@
+from __future__ import annotations
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Iterator, TypeVar
+
+
+F = TypeVar("F", bound=Callable)
+
+
+class RWLock:
+    """
+    Блокировка «много читателей / один писатель».
+
+    - читатели не мешают друг другу;
+    - писатель ждёт, пока выйдут читатели, и держит блокировку один;
+    - ждущий писатель не пускает новых читателей (поток записей не голодает),
+      а после каждой записи сначала входят уже ждущие читатели (не голодают и они).
+
+    Не реентерабельна: поток, держащий read(), не должен снова брать read()/write()
+    того же объекта — при ждущем писателе это взаимная блокировка.
+    """
+    def __init__(self) -> None:
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._readers_waiting = 0
+        self._writers_waiting = 0
+        self._read_turn = False
+        # суммарное ожидание (для бенчмарков и диагностики)
+        self.read_wait = 0.0
+        self.write_wait = 0.0
+
+    def acquire_read(self) -> None:
+        with self._cond:
+            if self._writer or (self._writers_waiting and not self._read_turn):
+                t0 = time.perf_counter()
+                self._readers_waiting += 1
+                while self._writer or (self._writers_waiting and not self._read_turn):
+                    self._cond.wait()
+                self._readers_waiting -= 1
+                if not self._readers_waiting:
+                    self._read_turn = False
+                self.read_wait += time.perf_counter() - t0
+            self._readers += 1
+
+    def release_read(self) -> None:
+        with self._cond:
+            self._readers -= 1
+            if not self._readers:
+                self._cond.notify_all()
+
+    def acquire_write(self) -> None:
+        with self._cond:
+            if self._writer or self._readers or self._read_turn:
+                t0 = time.perf_counter()
+                self._writers_waiting += 1
+                while self._writer or self._readers or self._read_turn:
+                    self._cond.wait()
+                self._writers_waiting -= 1
+                self.write_wait += time.perf_counter() - t0
+            self._writer = True
+
+    def release_write(self) -> None:
+        with self._cond:
+            self._writer = False
+            # очередь читателей, накопившихся за время записи
+            self._read_turn = self._readers_waiting > 0
+            self._cond.notify_all()
+
+    @contextmanager
+    def read(self) -> Iterator[None]:
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+
+def read_locked(method: F) -> F:
+    """Метод выполняется под self._lock.read()."""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock.read():
+            return method(self, *args, **kwargs)
+    return wrapper  # type: ignore[return-value]
+
+
+def write_locked(method: F) -> F:
+    """Метод выполняется под self._lock.write()."""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock.write():
+            return method(self, *args, **kwargs)
+    return wrapper  # type: ignore[return-value]
@@ -0,0 +1,11 @@
+from .engine import CatalogEngine, model_json
+
+__all__ = ["CatalogEngine", "model_json", "CatalogHTTPServer", "ResponseCache"]
+
+
+def __getattr__(name: str):
+    # http.server нужен только самому сервису
+    if name in ("CatalogHTTPServer", "ResponseCache"):
+        from . import server
+        return getattr(server, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,230 @@
+from __future__ import annotations
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from domain.equipment import EquipmentModel
+from patterns.factory import FactoryRegistry
+from patterns.composite import (
+    Catalog,
+    CatalogSearchIndex,
+    CatalogVersions,
+    CatalogView,
+    LazyModel,
+    ModelRef,
+    SyncCatalog,
+    apply_config,
+    build_software,
+    memento_software_label,
+    model_from_memento,
+    model_to_memento,
+)
+from patterns.composite.search import model_terms, tokenize
+from patterns.composite.parallel import default_registry
+from patterns.memento import Caretaker, EquipmentMemento, ModelMemento, thaw_specs
+
+
+def model_json(ref: ModelRef, s: ModelMemento) -> dict:
+    return {
+        "type": ref[0],
+        "index": ref[1],
+        "name": s.name,
+        "factory_key": s.factory_key,
+        "software": memento_software_label(s),
+        "use_online": s.use_online,
+        "use_analytics": s.use_analytics,
+        "use_proxy": s.use_proxy,
+        "license_key": s.license_key,
+        "specs": thaw_specs(s.specs),
+        "functions": list(s.functions),
+    }
+
+
+def _scan(view: CatalogView, query: str, limit: Optional[int]) -> List[ModelRef]:
+    # как CatalogSearchIndex.search: каждое слово — префикс одного из термов, порядок дерева
+    tokens = tokenize(query)
+    out: List[ModelRef] = []
+    if not tokens:
+        return out
+    for eq_type in sorted(view):
+        for i, s in enumerate(view[eq_type]):
+            terms = model_terms(LazyModel(s, None))
+            if all(any(term.startswith(t) for term in terms) for t in tokens):
+                out.append((eq_type, i))
+                if limit is not None and len(out) >= limit:
+                    return out
+    return out
+
+
+class CatalogEngine:
+    """
+    Каталог без UI: то же, что делает панель (Factory, Decorator/Proxy, Memento),
+    для HTTP-сервиса и других фоновых клиентов.
+
+    - записи (create, configure, snapshot, undo/redo) выполняются по одной под _write;
+    - чтение идёт по опубликованной неизменяемой версии (CatalogView) без блокировок:
+      новая версия публикуется только после записи, при первом чтении.
+    """
+    def __init__(
+        self,
+        registry: Optional[FactoryRegistry] = None,
+        compress_after: Optional[int] = 8,
+    ) -> None:
+        self.registry = registry or default_registry()
+        self._search = CatalogSearchIndex()
+        self._sync = SyncCatalog(Catalog(indexes=[self._search]))
+        self._versions = CatalogVersions(model_to_memento)
+        self.caretaker = Caretaker(compress_after=compress_after)
+        self._write = threading.Lock()
+        self._view: Optional[CatalogView] = None
+        self._dirty = True
+
+    # -----------------------------
+    # Версии
+    # -----------------------------
+    def view(self) -> CatalogView:
+        view = self._view
+        if view is not None and not self._dirty:
+            return view
+        with self._write:
+            return self._publish()
+
+    def _publish(self) -> CatalogView:
+        # вызывается под _write
+        if self._view is None or self._dirty:
+            self._view = self._sync.publish(self._versions)
+            self._dirty = False
+        return self._view
+
+    def _build(self, s: ModelMemento) -> EquipmentModel:
+        return model_from_memento(s, self.registry)
+
+    def _restore(self, mem: EquipmentMemento) -> None:
+        catalog = Catalog(indexes=[self._search])
+        for eq_type, snaps in mem.catalog.items():
+            catalog[eq_type] = [LazyModel(s, self._build) for s in snaps]
+        self._sync.replace(catalog)
+        self._dirty = True
+
+    # -----------------------------
+    # Запись
+    # -----------------------------
+    def load(self, mem: EquipmentMemento, history: Sequence[EquipmentMemento] = (), index: int = -1) -> None:
+        with self._write:
+            self._restore(mem)
+            self.caretaker.replace_history(list(history), index)
+
+    def create(self, factory_key: str, name: Optional[str] = None) -> ModelRef:
+        """KeyError — неизвестный ключ фабрики."""
+        factory = self.registry.get(factory_key)
+        eq = factory.create()
+        eq.factory_key = factory_key
+        if name:
+            eq.name = name
+        eq.use_online = False
+        eq.use_analytics = False
+        eq.use_proxy = False
+        eq.license_key = ""
+        eq.base_software_title = eq.software.name()
+        eq.software = build_software(eq)
+        with self._write:
+            ref = self._sync.add(eq)
+            self._dirty = True
+        return ref
+
+    def configure(
+        self,
+        equipment_type: Optional[str] = None,
+        factory_key: Optional[str] = None,
+        refs: Optional[Sequence[ModelRef]] = None,
+        online: Optional[bool] = None,
+        analytics: Optional[bool] = None,
+        use_proxy: Optional[bool] = None,
+        license_key: Optional[str] = None,
+    ) -> int:
+        """Флаги Decorator/Proxy для моделей по типу, ключу фабрики или списку ссылок."""
+        wanted = {tuple(r) for r in refs} if refs is not None else None
+        with self._write:
+            with self._sync.exclusive() as catalog:
+                models = []
+                for eq_type, entries in catalog.items():
+                    if equipment_type is not None and eq_type != equipment_type:
+                        continue
+                    for i, m in enumerate(entries):
+                        if wanted is not None and (eq_type, i) not in wanted:
+                            continue
+                        if factory_key is not None and getattr(m, "factory_key", None) != factory_key:
+                            continue
+                        models.append(m)
+                changed = apply_config(models, online, analytics, use_proxy, license_key)
+            if changed:
+                self._dirty = True
+        return changed
+
+    def snapshot(self) -> bool:
+        with self._write:
+            return self.caretaker.backup(self._publish().to_memento())
+
+    def undo(self) -> bool:
+        with self._write:
+            mem = self.caretaker.undo()
+            if mem is None:
+                return False
+            self._restore(mem)
+            return True
+
+    def redo(self) -> bool:
+        with self._write:
+            mem = self.caretaker.redo()
+            if mem is None:
+                return False
+            self._restore(mem)
+            return True
+
+    # -----------------------------
+    # Чтение
+    # -----------------------------
+    def page(
+        self, offset: int = 0, limit: int = 50, equipment_type: Optional[str] = None, view: Optional[CatalogView] = None
+    ) -> Tuple[int, List[Tuple[ModelRef, ModelMemento]]]:
+        """(всего, страница) в порядке дерева: типы по алфавиту, внутри — по позиции."""
+        view = view or self.view()
+        types = [equipment_type] if equipment_type is not None else sorted(view)
+        total = sum(len(view.get(t, ())) for t in types)
+        out: List[Tuple[ModelRef, ModelMemento]] = []
+        skip = max(0, offset)
+        for t in types:
+            snaps = view.get(t, ())
+            if skip >= len(snaps):
+                skip -= len(snaps)
+                continue
+            for i in range(skip, min(len(snaps), skip + limit - len(out))):
+                out.append(((t, i), snaps[i]))
+            skip = 0
+            if len(out) >= limit:
+                break
+        return total, out
+
+    def get(self, eq_type: str, idx: int, view: Optional[CatalogView] = None) -> ModelMemento:
+        """KeyError/IndexError — нет такой модели."""
+        return (view or self.view())[eq_type][idx]
+
+    def search(self, query: str, limit: int = 50, view: Optional[CatalogView] = None) -> List[ModelRef]:
+        """
+        Ссылки по версии view (по умолчанию — текущей). Индекс отражает живой каталог,
+        поэтому запрос к нему идёт под _write и только если view — последняя публикация:
+        тогда живой каталог с ней совпадает и запись не вклинится. Для устаревшей версии
+        (undo/redo заменяют каталог целиком) — перебор её моделей теми же правилами.
+        """
+        with self._write:
+            current = self._publish()
+            if view is None or view is current:
+                return self._sync.search(query, limit)
+        return _scan(view, query, limit)
+
+    def history(self) -> Dict[str, object]:
+        return {
+            "size": len(self.caretaker),
+            "index": self.caretaker.current_index(),
+            "can_undo": self.caretaker.can_undo(),
+            "can_redo": self.caretaker.can_redo(),
+        }
@@ -0,0 +1,368 @@
+"""
+Локальный HTTP/JSON-сервис поверх CatalogEngine (для киосков).
+
+    python -m service.server [port] [catalog.mpcat]
+
+GET  /health, /factories, /history, /stats
+GET  /models?offset=0&limit=50&type=Bike     — страница каталога
+GET  /models/<type>/<index>                  — одна модель
+GET  /search?q=...&limit=50
+POST /models     {"factory": "bike", "name": "..."}
+POST /configure  {"type"|"factory"|"refs", "online", "analytics", "use_proxy", "license_key"}
+POST /snapshot, /undo, /redo
+"""
+from __future__ import annotations
+import json
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from service.engine import CatalogEngine, model_json
+
+
+class ResponseCache:
+    """
+    LRU готовых ответов GET по (путь с query, версия каталога).
+    Версия входит в ключ, поэтому запись в каталог инвалидирует кеш сама собой.
+    """
+    def __init__(self, capacity: int = 1024) -> None:
+        self.capacity = capacity
+        self._items: "OrderedDict[Tuple[str, int], bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple[str, int]) -> Optional[bytes]:
+        with self._lock:
+            body = self._items.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, key: Tuple[str, int], body: bytes) -> None:
+        if not self.capacity:
+            return
+        with self._lock:
+            self._items[key] = body
+            self._items.move_to_end(key)
+            while len(self._items) > self.capacity:
+                self._items.popitem(last=False)
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+def _flag(data: dict, key: str) -> Optional[bool]:
+    value = data.get(key)
+    # "false"/0.0 не должны включать флаг — только настоящий JSON bool
+    if value is not None and not isinstance(value, bool):
+        raise HttpError(400, f"'{key}' must be a boolean")
+    return value
+
+
+def _str(data: dict, key: str) -> Optional[str]:
+    value = data.get(key)
+    if value is not None and not isinstance(value, str):
+        raise HttpError(400, f"'{key}' must be a string")
+    return value
+
+
+def _ref(r: object) -> bool:
+    # [type, index]: bool — тоже int в Python, но индексом не считается
+    return (
+        isinstance(r, list) and len(r) == 2 and isinstance(r[0], str)
+        and isinstance(r[1], int) and not isinstance(r[1], bool)
+    )
+
+
+def _int(query: Dict[str, list], key: str, default: int, limit: int = 10_000) -> int:
+    try:
+        return max(0, min(limit, int(query.get(key, [default])[0])))
+    except ValueError:
+        raise HttpError(400, f"'{key}' must be an integer") from None
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    # простаивающее keep-alive соединение освобождает worker через timeout секунд
+    timeout = 15
+    server: "CatalogHTTPServer"
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+    # -----------------------------
+    # Ответы
+    # -----------------------------
+    def _send_body(self, status: int, body: bytes, etag: Optional[str] = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if etag is not None:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: int, payload: object) -> None:
+        self._send_body(status, json.dumps(payload, ensure_ascii=False).encode("utf-8"))
+
+    def _dispatch(self, routes: Dict[str, Callable]) -> None:
+        url = urlsplit(self.path)
+        parts = [unquote(p) for p in url.path.strip("/").split("/") if p]
+        handler = routes.get(parts[0] if parts else "")
+        self.server.count()
+        try:
+            if handler is None:
+                raise HttpError(404, f"no route for {url.path}")
+            handler(self, parts[1:], parse_qs(url.query))
+        except HttpError as e:
+            self._send_json(e.status, {"error": str(e)})
+        except (KeyError, IndexError) as e:
+            self._send_json(404, {"error": f"not found: {e}"})
+        except Exception as e:
+            # ошибка движка — ответ 500, а не оборванное соединение
+            self.server.handle_error(self.request, self.client_address)
+            self._send_json(500, {"error": f"{type(e).__name__}: {e}"})
+
+    def do_GET(self) -> None:
+        self._dispatch(_GET)
+
+    def do_POST(self) -> None:
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            # тело непонятной длины не дочитать — соединение закрывается после ответа
+            self.close_connection = True
+            self._send_json(400, {"error": "malformed Content-Length"})
+            return
+        raw = self.rfile.read(length) if length else b""
+        try:
+            self._data = json.loads(raw) if raw else {}
+        except ValueError:
+            self._send_json(400, {"error": "body must be JSON"})
+            return
+        if not isinstance(self._data, dict):
+            self._send_json(400, {"error": "body must be a JSON object"})
+            return
+        self._dispatch(_POST)
+
+    # -----------------------------
+    # GET (кешируются по версии каталога)
+    # -----------------------------
+    def _cached(self, build: Callable[[object], object]) -> None:
+        view = self.server.engine.view()
+        etag = f'"v{view.version}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        key = (self.path, view.version)
+        body = self.server.cache.get(key)
+        if body is None:
+            body = json.dumps(build(view), ensure_ascii=False).encode("utf-8")
+            self.server.cache.put(key, body)
+        self._send_body(200, body, etag)
+
+    def get_models(self, parts: list, query: Dict[str, list]) -> None:
+        engine = self.server.engine
+        if len(parts) == 2:
+            eq_type, idx = parts[0], _int({"i": [parts[1]]}, "i", 0, limit=1 << 31)
+            self._cached(lambda view: model_json((eq_type, idx), engine.get(eq_type, idx, view)))
+            return
+        offset = _int(query, "offset", 0, limit=1 << 31)
+        limit = _int(query, "limit", 50, limit=500)
+        eq_type = query.get("type", [None])[0]
+
+        def build(view) -> dict:
+            total, page = engine.page(offset, limit, eq_type, view)
+            return {
+                "version": view.version,
+                "total": total,
+                "offset": offset,
+                "items": [model_json(ref, s) for ref, s in page],
+            }
+
+        self._cached(build)
+
+    def get_search(self, parts: list, query: Dict[str, list]) -> None:
+        engine = self.server.engine
+        q = query.get("q", [""])[0]
+        limit = _int(query, "limit", 50, limit=500)
+
+        def build(view) -> dict:
+            refs = engine.search(q, limit, view)
+            return {"version": view.version, "items": [model_json(ref, view[ref[0]][ref[1]]) for ref in refs]}
+
+        self._cached(build)
+
+    def get_factories(self, parts: list, query: Dict[str, list]) -> None:
+        self._send_json(200, {"factories": self.server.engine.registry.keys()})
+
+    def get_history(self, parts: list, query: Dict[str, list]) -> None:
+        self._send_json(200, self.server.engine.history())
+
+    def get_stats(self, parts: list, query: Dict[str, list]) -> None:
+        srv = self.server
+        self._send_json(200, {
+            "requests": srv.requests,
+            "cache_hits": srv.cache.hits,
+            "cache_misses": srv.cache.misses,
+            "workers": srv.workers,
+            "version": srv.engine.view().version,
+        })
+
+    def get_health(self, parts: list, query: Dict[str, list]) -> None:
+        self._send_json(200, {"ok": True})
+
+    # -----------------------------
+    # POST (записи)
+    # -----------------------------
+    def post_models(self, parts: list, query: Dict[str, list]) -> None:
+        key = self._data.get("factory")
+        if not key:
+            raise HttpError(400, "'factory' is required")
+        try:
+            ref = self.server.engine.create(str(key), _str(self._data, "name"))
+        except KeyError:
+            raise HttpError(400, f"unknown factory: {key}") from None
+        self._send_json(201, {"type": ref[0], "index": ref[1]})
+
+    def post_configure(self, parts: list, query: Dict[str, list]) -> None:
+        d = self._data
+        refs = d.get("refs")
+        if refs is not None and not (isinstance(refs, list) and all(map(_ref, refs))):
+            raise HttpError(400, "'refs' must be a list of [type, index]")
+        changed = self.server.engine.configure(
+            equipment_type=_str(d, "type"),
+            factory_key=_str(d, "factory"),
+            refs=refs,
+            online=_flag(d, "online"),
+            analytics=_flag(d, "analytics"),
+            use_proxy=_flag(d, "use_proxy"),
+            license_key=_str(d, "license_key"),
+        )
+        self._send_json(200, {"changed": changed})
+
+    def post_snapshot(self, parts: list, query: Dict[str, list]) -> None:
+        saved = self.server.engine.snapshot()
+        self._send_json(200, {"saved": saved, **self.server.engine.history()})
+
+    def post_undo(self, parts: list, query: Dict[str, list]) -> None:
+        restored = self.server.engine.undo()
+        self._send_json(200, {"restored": restored, **self.server.engine.history()})
+
+    def post_redo(self, parts: list, query: Dict[str, list]) -> None:
+        restored = self.server.engine.redo()
+        self._send_json(200, {"restored": restored, **self.server.engine.history()})
+
+
+_GET = {
+    "models": _Handler.get_models,
+    "search": _Handler.get_search,
+    "factories": _Handler.get_factories,
+    "history": _Handler.get_history,
+    "stats": _Handler.get_stats,
+    "health": _Handler.get_health,
+}
+_POST = {
+    "models": _Handler.post_models,
+    "configure": _Handler.post_configure,
+    "snapshot": _Handler.post_snapshot,
+    "undo": _Handler.post_undo,
+    "redo": _Handler.post_redo,
+}
+
+
+class CatalogHTTPServer(HTTPServer):
+    """
+    HTTPServer, где соединения обслуживает пул из workers потоков (а не поток на соединение).
+    Keep-alive соединение занимает worker, пока активно; простаивающее закрывается по timeout.
+    """
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(
+        self,
+        engine: CatalogEngine,
+        host: str = "127.0.0.1",
+        port: int = 8080,
+        workers: int = 16,
+        cache_size: int = 1024,
+    ) -> None:
+        super().__init__((host, port), _Handler)
+        self.engine = engine
+        self.workers = workers
+        self.cache = ResponseCache(cache_size)
+        self.requests = 0
+        self._count_lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="catalog-http")
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self) -> str:
+        host, port = self.server_address[:2]
+        return f"{host}:{port}"
+
+    def count(self) -> None:
+        with self._count_lock:
+            self.requests += 1
+
+    def process_request(self, request, client_address) -> None:
+        self._pool.submit(self._process, request, client_address)
+
+    def _process(self, request, client_address) -> None:
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def start(self) -> CatalogHTTPServer:
+        self._thread = threading.Thread(target=self.serve_forever, name="catalog-http-accept", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def server_close(self) -> None:
+        super().server_close()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def __enter__(self) -> CatalogHTTPServer:
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+if __name__ == "__main__":
+    engine = CatalogEngine()
+    if len(sys.argv) > 2:
+        from patterns.memento import load_catalog
+
+        stored = load_catalog(sys.argv[2])
+        engine.load(stored.current, stored.history, stored.index)
+    srv = CatalogHTTPServer(engine, port=int(sys.argv[1]) if len(sys.argv) > 1 else 8080)
+    print(f"catalog service on http://{srv.address} ({engine.view().count()} models)")
+    try:
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        srv.server_close()
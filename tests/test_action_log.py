@@ -0,0 +1,49 @@
+"""ActionLog: spill в ротируемый файл — запись на строку, ротация между строками."""
+from __future__ import annotations
+
+import logging
+import re
+
+from ui.action_log import ActionLog
+
+_STAMP = re.compile(r"^\d{4}-\d\d-\d\d \d\d:\d\d:\d\d,\d{3} ")
+
+
+def test_spill_writes_one_timestamped_record_per_entry(tmp_path):
+    path = tmp_path / "action.log"
+    log = ActionLog(spill_path=str(path))
+    for i in range(5):
+        log.append(f"event {i}", "STATE")
+    log.drain()
+    log.append("после flush", "INFO")
+    log.close()
+
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 6
+    assert all(_STAMP.match(line) for line in lines)
+    assert [_STAMP.sub("", line) for line in lines] == [f"STATE event {i}" for i in range(5)] + ["INFO после flush"]
+
+
+def test_spill_rotates_between_entries(tmp_path):
+    path = tmp_path / "action.log"
+    log = ActionLog(spill_path=str(path), spill_max_bytes=400, spill_backups=50)
+    for i in range(100):
+        log.append(f"event {i:03d}", "STATE")
+    log.drain()  # одна пачка, но ротация — по записям
+    log.close()
+
+    files = sorted(tmp_path.iterdir(), key=lambda p: -int(p.suffix[1:]) if p.suffix != ".log" else 0)
+    assert len(files) > 1
+    entries = []
+    for p in files:
+        data = p.read_bytes()
+        assert len(data) < 400
+        entries += [_STAMP.sub("", line) for line in data.decode("utf-8").splitlines()]
+    assert entries == [f"STATE event {i:03d}" for i in range(100)]
+
+
+def test_spill_registers_no_loggers(tmp_path):
+    before = set(logging.Logger.manager.loggerDict)
+    for i in range(3):
+        ActionLog(spill_path=str(tmp_path / f"{i}.log")).close()
+    assert set(logging.Logger.manager.loggerDict) == before
@@ -0,0 +1,80 @@
+"""BatchOperationRunner: пакет operation() в фоне, UI-часть через after()."""
+from __future__ import annotations
+
+import threading
+import time
+
+from patterns.command import BatchOperationRunner
+
+TIMEOUT = 10.0
+
+
+class _Software:
+    def __init__(self, n: int) -> None:
+        self.n = n
+
+    def name(self) -> str:
+        return f"sw{self.n}"
+
+    def operation(self) -> str:
+        if self.n == 2:
+            raise ValueError("boom")
+        return f"ok{self.n}"
+
+
+class _After:
+    """after() без Tk: run() выполняет запланированное, пока очередь не опустеет."""
+    def __init__(self) -> None:
+        self.calls = []
+
+    def __call__(self, ms, fn, *args):
+        self.calls.append((fn, args))
+        return str(len(self.calls))
+
+    def run(self) -> None:
+        deadline = time.monotonic() + TIMEOUT
+        while self.calls:
+            assert time.monotonic() < deadline, "timeout"
+            fn, args = self.calls.pop(0)
+            fn(*args)
+            time.sleep(0.005)
+
+
+def test_items_are_built_off_the_ui_thread():
+    after = _After()
+    runner = BatchOperationRunner(after, poll_ms=1)
+    ui_thread = threading.get_ident()
+    built_on = []
+    reports = []
+
+    def load():
+        built_on.append(threading.get_ident())
+        return [(f"m{i}", _Software(i)) for i in range(4)]
+
+    runner.start(load, concurrency=2, on_done=reports.append)
+    assert runner.running
+    after.run()
+
+    assert built_on and built_on[0] != ui_thread
+    (report,) = reports
+    assert [r.label for r in report.results] == ["m0", "m1", "m2", "m3"]
+    assert [r.result for r in report.results if r.ok] == ["ok0", "ok1", "ok3"]
+    assert report.failed == 1 and "ValueError: boom" in report.results[2].error
+    assert not runner.running
+
+
+def test_error_while_building_items_reaches_the_ui_thread():
+    after = _After()
+    runner = BatchOperationRunner(after, poll_ms=1)
+
+    def load():
+        raise RuntimeError("no models")
+
+    runner.start(load)
+    try:
+        after.run()
+    except RuntimeError as e:
+        assert str(e) == "no models"
+    else:
+        raise AssertionError("error was swallowed")
+    assert not runner.running
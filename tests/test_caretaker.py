@@ -0,0 +1,77 @@
+"""Caretaker: ветки истории, линейный вид текущей ветки, блокировки."""
+from __future__ import annotations
+
+import threading
+
+from patterns.memento import Caretaker, EquipmentMemento
+
+TIMEOUT = 20.0
+
+
+def _snap(i: int) -> EquipmentMemento:
+    return EquipmentMemento(catalog={f"T{i}": ()})
+
+
+def _types(history):
+    return [next(iter(m.catalog)) for m in history]
+
+
+def test_branch_path_and_linear_history_follow_undo_redo():
+    c = Caretaker(branching=True)
+    for i in range(3):
+        c.backup(_snap(i))
+    c.undo()
+    c.backup(_snap(3))  # новая ветка от узла 1: 0 -> 1 -> {2, 3}
+    assert c.branch_path() == [0, 1, 3]
+    history, index = c.linear_history()
+    assert _types(history) == ["T0", "T1", "T3"] and index == 2
+
+    c.undo()
+    assert c.branch_path() == [0, 1, 3]  # redo-хвост — последняя активная ветка
+    assert c.linear_history()[1] == 1
+
+    c.redo()
+    c.switch_branch(-1)
+    assert c.branch_path() == [0, 1, 2]
+    history, index = c.linear_history()
+    assert _types(history) == ["T0", "T1", "T2"] and index == 2
+
+    c.undo()
+    c.undo()
+    assert c.branch_path() == [0, 1, 2] and c.linear_history()[1] == 0
+    assert c.redo() is not None and c.linear_history()[1] == 1
+
+
+def test_linear_history_with_concurrent_writer():
+    # linear_history берёт read один раз: ждущий писатель не может вклиниться и заблокировать поток
+    c = Caretaker(branching=True)
+    c.backup(_snap(0))
+    stop = threading.Event()
+    errors = []
+
+    def reader():
+        try:
+            while not stop.is_set():
+                history, index = c.linear_history()
+                assert 0 <= index < len(history)
+                c.branch_path()
+        except BaseException as e:  # noqa: BLE001 - ошибку потока проверяет тест
+            errors.append(e)
+
+    def writer():
+        for i in range(1, 300):
+            c.backup(_snap(i))
+            if i % 3 == 0:
+                c.undo()
+
+    readers = [threading.Thread(target=reader, daemon=True) for _ in range(3)]
+    for t in readers:
+        t.start()
+    w = threading.Thread(target=writer, daemon=True)
+    w.start()
+    w.join(TIMEOUT)
+    stop.set()
+    for t in readers:
+        t.join(TIMEOUT)
+    assert not w.is_alive() and not any(t.is_alive() for t in readers), "deadlock"
+    assert errors == []
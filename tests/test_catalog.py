@@ -0,0 +1,85 @@
+"""Catalog: удаление сдвигает ссылки в индексах без reindex(); порядок filter_refs."""
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from domain.equipment import EquipmentModel
+from patterns.composite import Catalog
+from patterns.composite.ranges import SpecRangeIndex
+from patterns.composite.search import CatalogSearchIndex
+
+
+class _Recording:
+    """Индекс без shift(): Catalog переносит сдвинутые модели через remove + add."""
+    def __init__(self) -> None:
+        self.refs = {}
+        self.clears = 0
+
+    def add(self, ref, model) -> None:
+        assert ref not in self.refs
+        self.refs[ref] = model
+
+    def remove(self, ref, model) -> None:
+        assert self.refs.pop(ref) is model
+
+    def clear(self) -> None:
+        self.clears += 1
+        self.refs.clear()
+
+
+def _model(t: str, i: int) -> EquipmentModel:
+    return EquipmentModel(
+        name=f"{t} model{i} w{i % 7}", equipment_type=t, functions=[f"fn{i % 3}"],
+        specs={"power": i % 11, f"k{i % 4}": i * 0.5, "flag": True},
+    )
+
+
+def _state(search: CatalogSearchIndex, ranges: SpecRangeIndex):
+    search._flush()
+    ranges._flush()
+    postings = {term: set(refs) for term, refs in search._postings.items()}
+    columns = {key: sorted(zip(c.values, c.refs)) for key, c in ranges._columns.items()}
+    return search._doc_terms, postings, sorted(search._terms), ranges._doc_values, columns
+
+
+@pytest.mark.parametrize("flush_every", [1, 7, 0])
+def test_remove_shifts_index_entries(flush_every):
+    rnd = random.Random(flush_every)
+    search, ranges, rec = CatalogSearchIndex(), SpecRangeIndex(), _Recording()
+    catalog = Catalog(indexes=[search, ranges, rec])
+    for t, n in (("Bike", 600), ("Rowing", 40), ("Treadmill", 3)):
+        for i in range(n):
+            catalog.add(_model(t, i))
+
+    for step in range(120):
+        # flush_every=0 — очередь add() так и не сбрасывается: сдвигаются её ссылки
+        if flush_every and step % flush_every == 0:
+            search.search("model")
+            ranges.range("power")
+        eq_type = rnd.choice(sorted(catalog))
+        models = catalog[eq_type]
+        idx = rnd.choice([0, len(models) - 1, rnd.randrange(len(models))])
+        assert catalog.remove(eq_type, idx) is not None
+        if step % 10 == 0:
+            catalog.add(_model(eq_type, 1000 + step))
+
+    fresh_search, fresh_ranges = CatalogSearchIndex(), SpecRangeIndex()
+    Catalog(catalog, indexes=[fresh_search, fresh_ranges]).reindex()
+    assert _state(search, ranges) == _state(fresh_search, fresh_ranges)
+    assert rec.clears == 0
+    assert rec.refs == {(t, i): m for t, models in catalog.items() for i, m in enumerate(models)}
+
+
+def test_filter_refs_returns_tree_order():
+    catalog = Catalog()
+    for t in ("Treadmill", "Bike"):
+        for i in range(3):
+            m = _model(t, i)
+            m.use_online = i != 1
+            catalog.add(m)
+    refs = [("Treadmill", 2), ("Bike", 2), ("Treadmill", 0), ("Bike", 0), ("Bike", 1)]
+    assert catalog.filter_refs(refs) == [("Bike", 0), ("Bike", 1), ("Bike", 2), ("Treadmill", 0), ("Treadmill", 2)]
+    assert catalog.filter_refs(refs, use_online=True) == [("Bike", 0), ("Bike", 2), ("Treadmill", 0), ("Treadmill", 2)]
+    assert catalog.filter_refs(refs, equipment_type="Treadmill", use_online=False) == []
@@ -0,0 +1,68 @@
+"""Prototype: клон помечен is_clone и сохраняет отметку через memento, .mpcat, SQLite и журнал."""
+from __future__ import annotations
+
+import sqlite3
+
+from patterns.command.journal import model_fields, model_from_fields
+from patterns.composite import LazyModel, SqliteCatalogStore, model_from_memento, model_to_memento
+from patterns.composite.parallel import default_registry
+from patterns.memento import EquipmentMemento, load_catalog, save_catalog
+
+_REGISTRY = default_registry()
+
+
+def _pair():
+    original = _REGISTRY.get("bike").create()
+    clone = original.clone()
+    clone.name = "Переименованный"  # отметка не зависит от имени
+    return original, clone
+
+
+def test_clone_is_marked_and_memento_keeps_it():
+    original, clone = _pair()
+    assert not original.is_clone and clone.is_clone
+    a, b = model_to_memento(original, "bike"), model_to_memento(clone, "bike")
+    assert not a.is_clone and b.is_clone and a != b
+    assert model_from_memento(b, _REGISTRY).is_clone
+    assert LazyModel(b, lambda s: model_from_memento(s, _REGISTRY)).is_clone
+
+
+def test_mpcat_round_trip_keeps_clone_flag(tmp_path):
+    snaps = [model_to_memento(m, "bike") for m in _pair()]
+    mem = EquipmentMemento(catalog={"Bike": snaps})
+    path = str(tmp_path / "c.mpcat")
+    save_catalog(path, mem, [mem], 0)
+    assert [s.is_clone for s in load_catalog(path).current.catalog["Bike"]] == [False, True]
+
+
+def test_sqlite_store_keeps_clone_flag_and_migrates_old_db(tmp_path):
+    path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(path)
+    # схема прежней версии: без колонки is_clone
+    conn.executescript(
+        "CREATE TABLE models (id INTEGER PRIMARY KEY, equipment_type TEXT NOT NULL, pos INTEGER NOT NULL,"
+        " name TEXT NOT NULL, factory_key TEXT NOT NULL, base_software_title TEXT NOT NULL,"
+        " use_online INTEGER NOT NULL, use_analytics INTEGER NOT NULL, use_proxy INTEGER NOT NULL,"
+        " license_key TEXT NOT NULL, software_state_name TEXT NOT NULL, specs TEXT NOT NULL, functions TEXT NOT NULL);"
+        "INSERT INTO models VALUES (1, 'Bike', 0, 'old', 'bike', 'BikeOS', 0, 0, 0, '', 'IDLE', '{}', '[]');"
+    )
+    conn.commit()
+    conn.close()
+
+    store = SqliteCatalogStore(path)
+    try:
+        (old,) = store.to_memento().catalog["Bike"]
+        assert not old.is_clone
+        snaps = [model_to_memento(m, "bike") for m in _pair()]
+        store.add_many(snaps)
+        assert [s.is_clone for s in store.to_memento().catalog[snaps[0].equipment_type]] == [False, True]
+    finally:
+        store.close()
+
+
+def test_journal_fields_keep_flag_and_accept_old_records():
+    _, clone = _pair()
+    s = model_to_memento(clone, "bike")
+    assert model_from_fields(model_fields(s)) == s
+    old = model_from_fields(model_fields(s)[:-1])  # запись журнала прежней версии
+    assert not old.is_clone and old.__dict__["is_clone"] is False
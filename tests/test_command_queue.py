@@ -0,0 +1,154 @@
+"""CommandQueue и команды Decorator/Proxy: порядок, отмена по key, ошибки, snapshot только после правки."""
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+from patterns.command import ApplyDecoratorsCommand, ApplyProxyCommand, Command, CommandQueue
+
+TIMEOUT = 10.0
+
+
+class _After:
+    """after() без Tk: колбэки копятся и выполняются в run_until()."""
+    def __init__(self) -> None:
+        self.calls = []
+
+    def __call__(self, ms, fn):
+        self.calls.append(fn)
+
+    def tick(self) -> None:
+        calls, self.calls = self.calls, []
+        for fn in calls:
+            fn()
+
+    def run_until(self, done) -> None:
+        deadline = time.monotonic() + TIMEOUT
+        while not done():
+            assert time.monotonic() < deadline, "timeout"
+            self.tick()
+            time.sleep(0.002)
+
+
+class _Cmd(Command):
+    def __init__(self, log, name, gate=None, fail_prepare=False, fail_execute=False) -> None:
+        self.log, self.name, self.gate = log, name, gate
+        self.fail_prepare, self.fail_execute = fail_prepare, fail_execute
+
+    def prepare(self) -> None:
+        if self.gate is not None:
+            assert self.gate.wait(TIMEOUT)
+        self.log.append(("prepare", self.name, threading.current_thread().name))
+        if self.fail_prepare:
+            raise ValueError(f"prepare {self.name}")
+
+    def execute(self) -> None:
+        self.log.append(("execute", self.name, threading.current_thread().name))
+        if self.fail_execute:
+            raise RuntimeError(f"execute {self.name}")
+
+
+@pytest.fixture()
+def queue_():
+    after = _After()
+    q = CommandQueue(after, poll_ms=1)
+    yield q, after
+    q.close()
+
+
+def test_commands_run_in_submit_order(queue_):
+    q, after = queue_
+    log = []
+    for i in range(20):
+        q.submit(_Cmd(log, i))
+    after.run_until(lambda: q.metrics().completed == 20)
+
+    main = threading.current_thread().name
+    assert [n for kind, n, _ in log if kind == "execute"] == list(range(20))
+    assert {t for kind, _, t in log if kind == "execute"} == {main}
+    assert {t for kind, _, t in log if kind == "prepare"} == {"command-queue"}
+    assert q.depth() == 0
+
+
+def test_newer_command_with_same_key_cancels_older(queue_):
+    q, after = queue_
+    log = []
+    gate = threading.Event()
+    q.submit(_Cmd(log, "blocker", gate=gate))
+    q.submit(_Cmd(log, "old"), key="flags")
+    q.submit(_Cmd(log, "other"), key="proxy")
+    q.submit(_Cmd(log, "new"), key="flags")
+    gate.set()
+    after.run_until(lambda: q.depth() == 0)
+
+    assert [n for kind, n, _ in log if kind == "execute"] == ["blocker", "other", "new"]
+    assert ("prepare", "old") not in [(k, n) for k, n, _ in log]
+    m = q.metrics()
+    assert m.cancelled == 1 and m.completed == 3 and m.submitted == 4
+
+
+def test_errors_go_to_on_done(queue_):
+    q, after = queue_
+    log, errors = [], []
+    q.submit(_Cmd(log, "p", fail_prepare=True), on_done=errors.append)
+    q.submit(_Cmd(log, "e", fail_execute=True), on_done=errors.append)
+    q.submit(_Cmd(log, "ok"), on_done=errors.append)
+    after.run_until(lambda: len(errors) == 3)
+
+    assert [type(e) for e in errors] == [ValueError, RuntimeError, type(None)]
+    assert ("execute", "p") not in [(k, n) for k, n, _ in log]  # prepare упал — execute не вызывается
+    assert q.metrics().failed == 2 and q.metrics().completed == 1
+
+
+def test_error_without_on_done_is_raised_from_poll(queue_):
+    q, after = queue_
+    log = []
+    q.submit(_Cmd(log, "e", fail_execute=True))
+    deadline = time.monotonic() + TIMEOUT
+    with pytest.raises(RuntimeError, match="execute e"):
+        while time.monotonic() < deadline:
+            after.tick()
+            time.sleep(0.002)
+    # poll перепланирован и после ошибки: следующие команды выполняются
+    q.submit(_Cmd(log, "next"))
+    after.run_until(lambda: q.metrics().completed == 1)
+
+
+class _Ctx:
+    def __init__(self, applied: bool) -> None:
+        self.applied = applied
+        self.pushed = 0
+        self.target = ("Bike", 0)
+
+    def current_target(self):
+        return self.target
+
+    def get_snapshot(self):
+        return object()
+
+    def set_decorators_state(self, online, analytics, target=None) -> bool:
+        return self.applied
+
+    def set_proxy_state(self, enabled, license_key, target=None) -> bool:
+        return self.applied
+
+    def push_snapshot(self, snapshot) -> None:
+        self.pushed += 1
+
+    def refresh_all(self) -> None:
+        pass
+
+
+@pytest.mark.parametrize("make", [
+    lambda ctx: ApplyDecoratorsCommand(ctx, online=True, analytics=False),
+    lambda ctx: ApplyProxyCommand(ctx, enabled=True, license_key="K"),
+])
+@pytest.mark.parametrize("applied", [True, False])
+def test_snapshot_only_for_applied_edit(make, applied):
+    ctx = _Ctx(applied)
+    cmd = make(ctx)
+    cmd.execute()
+    assert ctx.pushed == int(applied)
+    assert (cmd._before is not None) == applied  # undo без правки ничего не откатывает
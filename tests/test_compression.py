@@ -0,0 +1,58 @@
+"""Сжатие холодных snapshot'ов Caretaker: распакованный snapshot равен исходному."""
+from __future__ import annotations
+
+import pytest
+
+from patterns.memento import Caretaker, EquipmentMemento, ModelMemento
+from patterns.memento.compression import CODECS, CompressedSnapshot
+
+N = 8
+
+
+def _snap(i: int) -> EquipmentMemento:
+    # у каждого snapshot'а своя правка: имя, флаги, вложенные specs, Unicode
+    models = [
+        ModelMemento(
+            factory_key="bike", equipment_type="Bike", name=f"Велосипед #{j}" + ("*" if j == i else ""),
+            specs={"max_speed": 40 + i, "zones": [1, 2, i], "display": {"size": 7.5, "on": j % 2 == 0}},
+            functions=["hr", f"f{i}"], base_software_title="BikeOS",
+            use_online=j == i, use_analytics=i % 2 == 0, use_proxy=j == 1, license_key="VALID-KEY" if j == 1 else "",
+            software_state_name="RUNNING" if j == i else "IDLE",
+        )
+        for j in range(5)
+    ]
+    return EquipmentMemento(catalog={"Bike": models, "Empty": []}, current_ref=("Bike", i % 5))
+
+
+@pytest.fixture(params=CODECS)
+def caretaker(request):
+    c = Caretaker(compress_after=1, codec=request.param, cache_size=2)
+    for i in range(N):
+        c.backup(_snap(i))
+    return c
+
+
+def test_cold_snapshots_are_compressed(caretaker):
+    cold = [i for i, e in enumerate(caretaker._history) if isinstance(e, CompressedSnapshot)]
+    assert cold == list(range(N - 2))
+    st = caretaker.compression_stats()
+    assert st.compressed == N - 2 and st.stored_bytes < st.raw_bytes
+
+
+def test_get_of_compressed_entry_returns_original(caretaker):
+    for i in range(N):
+        mem = caretaker._get(i)
+        assert isinstance(mem, EquipmentMemento)
+        assert mem == _snap(i) and mem.current_ref == _snap(i).current_ref
+        assert [m.specs for m in mem.catalog["Bike"]] == [m.specs for m in _snap(i).catalog["Bike"]]
+    assert caretaker.compression_stats().decompressions == N - 2
+    caretaker._get(N - 3)  # последний распакованный — ещё в LRU-кеше (cache_size=2)
+    assert caretaker.compression_stats().cache_hits == 1
+
+
+def test_undo_restores_compressed_snapshot_and_makes_it_hot(caretaker):
+    for i in reversed(range(N - 1)):
+        assert caretaker.undo() == _snap(i)
+        assert isinstance(caretaker._history[i], EquipmentMemento)
+    history, index = caretaker.linear_history()
+    assert history == [_snap(i) for i in range(N)] and index == 0
@@ -0,0 +1,62 @@
+"""Caretaker.diff(i, j): ровно те модели, что изменились между snapshot'ами."""
+from __future__ import annotations
+
+from dataclasses import replace
+
+from patterns.memento import Caretaker, EquipmentMemento, ModelMemento
+
+
+def _m(t: str, i: int) -> ModelMemento:
+    return ModelMemento(
+        factory_key=t.lower(), equipment_type=t, name=f"{t} #{i}", specs={"level": i}, functions=["hr"],
+        base_software_title=f"{t}OS", use_online=False, use_analytics=False, use_proxy=False, license_key="",
+    )
+
+
+def _base() -> dict:
+    return {t: [_m(t, i) for i in range(6)] for t in ("Bike", "Rowing", "Treadmill")}
+
+
+def _history() -> Caretaker:
+    c = Caretaker()
+    cat = _base()
+    c.backup(EquipmentMemento(catalog=cat, current_ref=("Bike", 0)))
+
+    cat = {t: list(v) for t, v in cat.items()}
+    cat["Bike"][2] = replace(cat["Bike"][2], use_online=True, license_key="K")  # флаги
+    del cat["Rowing"][1]  # удаление: хвост сдвигается, но не «меняется»
+    cat["Treadmill"].append(_m("Treadmill", 99))  # добавление
+    c.backup(EquipmentMemento(catalog=cat, current_ref=("Bike", 2)))
+
+    cat = {t: list(v) for t, v in cat.items()}
+    cat["Bike"][4] = replace(cat["Bike"][4], name="Bike renamed")  # переименование = removed + added
+    c.backup(EquipmentMemento(catalog=cat, current_ref=("Bike", 2)))
+    return c
+
+
+def test_diff_reports_exactly_the_changed_models():
+    d = _history().diff(0, 1)
+    assert [(c.old_ref, c.new_ref) for c in d.changed] == [(("Bike", 2), ("Bike", 2))]
+    assert d.changed[0].fields() == {"use_online": (False, True), "license_key": ("", "K")}
+    assert [(ref, m.name) for ref, m in d.removed] == [(("Rowing", 1), "Rowing #1")]
+    assert [(ref, m.name) for ref, m in d.added] == [(("Treadmill", 6), "Treadmill #99")]
+    assert d.current_ref == (("Bike", 0), ("Bike", 2))
+    assert d.flag_changes() == {"use_online": 1, "license_key": 1}
+
+
+def test_rename_is_removed_plus_added_and_untouched_types_are_skipped():
+    d = _history().diff(1, 2)
+    assert d.changed == () and d.current_ref is None
+    assert [(ref, m.name) for ref, m in d.removed] == [(("Bike", 4), "Bike #4")]
+    assert [(ref, m.name) for ref, m in d.added] == [(("Bike", 4), "Bike renamed")]
+    # Rowing и Treadmill — те же кортежи из пула: сравнивать нечего
+    assert d.types_shared == 2 and d.models_compared == 1
+
+
+def test_diff_is_symmetric_and_empty_for_same_snapshot():
+    c = _history()
+    assert not c.diff(2, 2) and c.diff(2, 2).summary().startswith("added: 0, removed: 0, changed: 0")
+    back = c.diff(1, 0)
+    assert [(ref, m.name) for ref, m in back.added] == [(("Rowing", 1), "Rowing #1")]
+    assert [(ref, m.name) for ref, m in back.removed] == [(("Treadmill", 6), "Treadmill #99")]
+    assert back.changed[0].fields() == {"use_online": (True, False), "license_key": ("K", "")}
@@ -0,0 +1,118 @@
+"""Журнал команд: запись/чтение, оборванный хвост, разрыв lsn, checkpoint и восстановление."""
+from __future__ import annotations
+
+import os
+
+from patterns.command import CommandJournal, recover, scan_journal
+from patterns.command.journal import _CHECKPOINT, _WAL, _numbered, model_fields
+from patterns.composite.materialize import model_to_memento
+from patterns.factory import RecipeFactory
+from patterns.memento import Caretaker, EquipmentMemento
+
+
+def _journal(directory, last_lsn=0) -> CommandJournal:
+    return CommandJournal(str(directory), last_lsn=last_lsn, window_ms=0, fsync=False)
+
+
+def _write(directory, ops, last_lsn=0) -> None:
+    j = _journal(directory, last_lsn)
+    for op in ops:
+        j.append(op)
+    j.close()
+
+
+def _segments(directory):
+    return [path for _, path in _numbered(str(directory), _WAL, ".log")]
+
+
+def _memento(key="bike"):
+    return model_to_memento(RecipeFactory(key).create(), key)
+
+
+def test_round_trip(tmp_path):
+    m = _memento()
+    j = _journal(tmp_path)
+    assert j.append("add", m=model_fields(m)) == 1
+    assert j.append("select", ref=[m.equipment_type, 0]) == 2
+    j.append("snapshot")
+    j.close()
+
+    scan = scan_journal(str(tmp_path))
+    assert [(r.lsn, r.op) for r in scan.records] == [(1, "add"), (2, "select"), (3, "snapshot")]
+    assert scan.last_lsn == 3 and scan.torn_bytes == 0
+
+    caretaker = Caretaker()
+    rec = recover(str(tmp_path), caretaker)
+    assert not rec.empty
+    assert rec.state.models(m.equipment_type) == [m]
+    assert rec.state.current_ref == (m.equipment_type, 0)
+    assert caretaker.can_undo() is False and len(caretaker.export_state().snapshots()) == 1
+
+
+def test_torn_tail_is_cut(tmp_path):
+    _write(tmp_path, ["undo"] * 10)
+    path = _segments(tmp_path)[0]
+    size = os.path.getsize(path)
+    with open(path, "rb+") as fp:
+        fp.truncate(size - 5)  # сбой посреди записи lsn=10
+
+    scan = scan_journal(str(tmp_path))
+    assert scan.last_lsn == 9
+    assert scan.torn_bytes > 0
+    # после отрезания новые записи идут сразу за последней целой
+    _write(tmp_path, ["redo"], last_lsn=scan.last_lsn)
+    scan = scan_journal(str(tmp_path))
+    assert scan.last_lsn == 10 and scan.records[-1].op == "redo" and scan.torn_bytes == 0
+
+
+def test_lsn_gap_truncates_the_rest(tmp_path):
+    _write(tmp_path, ["undo"] * 5)
+    _write(tmp_path, ["redo"] * 5, last_lsn=7)  # lsn 6..7 потеряны
+    assert len(_segments(tmp_path)) == 2
+
+    scan = scan_journal(str(tmp_path), truncate=False)
+    assert scan.last_lsn == 5 and [r.op for r in scan.records] == ["undo"] * 5
+    assert len(_segments(tmp_path)) == 2
+
+    scan = scan_journal(str(tmp_path))
+    assert scan.last_lsn == 5 and scan.torn_bytes > 0
+    assert len(_segments(tmp_path)) == 1
+
+
+def test_checkpoint_prunes_old_segments(tmp_path):
+    m = _memento()
+    j = _journal(tmp_path)
+    j.append("add", m=model_fields(m))
+    j.append("snapshot")
+    current = EquipmentMemento(catalog={m.equipment_type: (m,)}, current_ref=(m.equipment_type, 0))
+    caretaker = Caretaker()
+    caretaker.backup(current)
+    assert j.checkpoint(current, caretaker.export_state(), background=False) == 2
+    j.append("select", ref=None)
+    j.close()
+
+    checkpoints = _numbered(str(tmp_path), _CHECKPOINT, ".mpcat")
+    assert [lsn for lsn, _ in checkpoints] == [2]
+    # сегмент с lsn 1..2 уже в checkpoint'е и удалён
+    assert [first for first, _ in _numbered(str(tmp_path), _WAL, ".log")] == [3]
+
+    scan = scan_journal(str(tmp_path))
+    assert scan.checkpoint_lsn == 2 and [r.op for r in scan.records] == ["select"]
+    rec = recover(str(tmp_path), Caretaker())
+    assert rec.state.models(m.equipment_type) == [m] and rec.state.current_ref is None
+
+
+def test_checkpoint_at_lsn_zero_is_not_empty(tmp_path):
+    # Load catalog на пустом журнале: checkpoint-0 без записей — это загруженный каталог
+    m = _memento()
+    current = EquipmentMemento(catalog={m.equipment_type: (m,)}, current_ref=None)
+    j = _journal(tmp_path)
+    j.checkpoint(current, Caretaker().export_state(), background=False)
+    j.close()
+
+    rec = recover(str(tmp_path), Caretaker())
+    assert rec.checkpoint_lsn == 0 and rec.replayed == 0
+    assert not rec.empty
+    assert rec.state.models(m.equipment_type) == [m]
+
+    assert recover(str(tmp_path / "none"), Caretaker()).empty
@@ -0,0 +1,69 @@
+"""MementoPool и хеш содержимого: одинаковые snapshot'ы и модели хранятся один раз."""
+from __future__ import annotations
+
+from dataclasses import replace
+
+from patterns.memento import Caretaker, EquipmentMemento, ModelMemento
+from patterns.memento.equipment_memento import MementoPool
+
+
+def _m(i: int, **kw) -> ModelMemento:
+    fields = dict(
+        factory_key="bike", equipment_type="Bike", name=f"Bike #{i}",
+        specs={"max_speed": 40, "zones": [1, 2]}, functions=["hr"], base_software_title="BikeOS",
+        use_online=False, use_analytics=False, use_proxy=False, license_key="",
+    )
+    fields.update(kw)
+    return ModelMemento(**fields)
+
+
+def _snap(n: int = 5, **kw) -> EquipmentMemento:
+    # каждый вызов — новые объекты с тем же содержимым
+    return EquipmentMemento(catalog={"Bike": [_m(i, **kw) for i in range(n)]}, current_ref=("Bike", 0))
+
+
+def test_equal_content_means_equal_hash():
+    a, b = _m(1), _m(1)
+    assert a is not b and a == b and hash(a) == hash(b)
+    assert _snap() == _snap() and hash(_snap()) == hash(_snap())
+    # типы значений specs различаются: 1 и True — разные модели
+    assert _m(1, specs={"x": 1}) != _m(1, specs={"x": True})
+    assert _snap() != _snap(use_online=True)
+
+
+def test_pool_returns_one_object_per_content():
+    pool = MementoPool()
+    first = pool.intern(_snap())
+    second = pool.intern(_snap(), first)
+    assert second.catalog["Bike"] is first.catalog["Bike"]
+    assert len(pool) == 5 and pool.hits == 5
+
+    # поменялась одна модель: остальные — те же объекты
+    bikes = list(_snap().catalog["Bike"])
+    bikes[2] = replace(bikes[2], use_online=True)
+    third = pool.intern(EquipmentMemento(catalog={"Bike": bikes}), second)
+    assert [x is y for x, y in zip(third.catalog["Bike"], first.catalog["Bike"])] == [True, True, False, True, True]
+    assert third.catalog["Bike"][2].use_online
+
+
+def test_hash_collision_with_other_content_is_not_pooled():
+    pool = MementoPool()
+    a = pool.intern_model(_m(1))
+    b = _m(2)
+    object.__setattr__(b, "_hash", hash(a))  # тот же хеш, другое содержимое
+    assert pool.intern_model(b) is b and pool.hits == 0
+
+
+def test_caretaker_skips_duplicate_head_and_shares_models():
+    c = Caretaker()
+    assert c.backup(_snap()) is True
+    assert c.backup(_snap()) is False and c.skipped == 1
+    assert c.backup(_snap(use_analytics=True)) is True
+    assert c.backup(_snap()) is True  # равен не head, а более старому — сохраняется
+
+    history, _ = c.linear_history()
+    assert len(history) == 3
+    assert history[0] == history[2] and history[0] is not history[2]
+    assert history[2].catalog["Bike"] is history[0].catalog["Bike"]
+    ids = {id(m) for mem in history for m in mem.catalog["Bike"]}
+    assert len(ids) == 10  # две версии по 5 моделей на три snapshot'а
@@ -0,0 +1,57 @@
+"""materialize_many: пул процессов собирает те же модели, что и последовательная сборка."""
+from __future__ import annotations
+
+from functools import partial
+
+import pytest
+
+from patterns.builder import default_recipes
+from patterns.composite import model_to_memento, software_label
+from patterns.composite.parallel import default_registry, materialize_many
+from patterns.factory import FactoryRegistry, RecipeFactory
+
+
+def _app_registry() -> FactoryRegistry:
+    # как в App.__init__
+    registry = FactoryRegistry()
+    for key in default_recipes().keys():
+        registry.register(key, RecipeFactory(key, with_log=True))
+    return registry
+
+
+def _snaps(registry: FactoryRegistry, n: int) -> list:
+    keys = default_recipes().keys()
+    snaps = []
+    for i in range(n):
+        key = keys[i % len(keys)]
+        m = registry.get(key).create()
+        m.name = f"{m.name} #{i}"
+        m.use_online, m.use_analytics = i % 2 == 0, i % 3 == 0
+        snaps.append(model_to_memento(m, key))
+    return snaps
+
+
+def _view(m) -> tuple:
+    return (model_to_memento(m), m.build_log, software_label(m), m.software.operation())
+
+
+@pytest.mark.parametrize("with_log", [False, True])
+def test_parallel_matches_serial(with_log):
+    registry = default_registry(with_log=with_log)
+    snaps = _snaps(registry, 24)
+    serial = materialize_many(snaps, registry, workers=1)
+    parallel = materialize_many(
+        snaps, registry, workers=2, threshold=0, chunk_size=5,
+        make_registry=partial(default_registry, with_log=with_log),
+    )
+    assert [_view(m) for m in parallel] == [_view(m) for m in serial]
+    assert all(bool(m.build_log) == with_log for m in parallel)
+
+
+def test_default_registry_matches_app_registry():
+    registry = _app_registry()
+    snaps = _snaps(registry, 8)
+    expected = [_view(m) for m in materialize_many(snaps, registry, workers=1)]
+    got = materialize_many(snaps, registry, workers=2, threshold=0, chunk_size=3,
+                           make_registry=partial(default_registry, with_log=True))
+    assert [_view(m) for m in got] == expected
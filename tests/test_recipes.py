@@ -0,0 +1,46 @@
+"""Рецепты: скомпилированный конструктор и Director дают независимые модели."""
+from __future__ import annotations
+
+from copy import deepcopy
+
+import pytest
+
+from patterns.builder import ConcreteEquipmentBuilder, Director, EquipmentRecipe, RecipeRegistry
+
+_DATA = {
+    "equipment_type": "Bike",
+    "software": "BikeOS",
+    "specs": {"max_speed": 40, "zones": [1, 2, 3], "display": {"size": 7, "modes": ["hr"]}},
+    "functions": ["hr"],
+}
+
+
+@pytest.fixture()
+def recipes() -> RecipeRegistry:
+    registry = RecipeRegistry()
+    # рецепт не делит вложенные значения с _DATA: с ним сверяются модели
+    registry.register(EquipmentRecipe.from_dict("nested", deepcopy(_DATA)))
+    return registry
+
+
+@pytest.mark.parametrize("via_builder", [False, True])
+def test_nested_specs_are_not_shared(recipes, via_builder):
+    if via_builder:
+        director = Director(ConcreteEquipmentBuilder(), recipes)
+        a, b = director.make("nested"), director.make("nested")
+    else:
+        a, b = recipes.create("nested"), recipes.create("nested")
+
+    a.specs["zones"].append(4)
+    a.specs["display"]["modes"].append("power")
+    a.functions.append("extra")
+    assert b.specs == _DATA["specs"] and b.functions == ["hr"]
+    # и сам рецепт не изменился
+    assert dict(recipes.get("nested").specs) == _DATA["specs"]
+    assert recipes.create("nested").specs == _DATA["specs"]
+
+
+def test_build_log_only_when_requested(recipes):
+    assert recipes.create("nested").build_log == []
+    log = recipes.create("nested", with_log=True).build_log
+    assert log and any("zones" in line for line in log)
@@ -0,0 +1,128 @@
+"""RWLock: читатели параллельно, писатель один, никто не голодает."""
+from __future__ import annotations
+
+import threading
+import time
+
+from patterns.rwlock import RWLock
+
+TIMEOUT = 5.0
+
+
+def _start(target, *args) -> threading.Thread:
+    t = threading.Thread(target=target, args=args, daemon=True)
+    t.start()
+    return t
+
+
+def _wait_until(predicate) -> None:
+    deadline = time.monotonic() + TIMEOUT
+    while not predicate():
+        assert time.monotonic() < deadline, "timeout"
+        time.sleep(0.001)
+
+
+def _waiting(lock: RWLock, readers: int = 0, writers: int = 0):
+    # внутреннее состояние — единственный способ знать, что поток уже встал в очередь
+    return lambda: lock._readers_waiting == readers and lock._writers_waiting == writers
+
+
+def test_readers_share_the_lock():
+    lock = RWLock()
+    inside = threading.Barrier(3, timeout=TIMEOUT)
+
+    def reader():
+        with lock.read():
+            inside.wait()  # все три читателя внутри одновременно
+
+    threads = [_start(reader) for _ in range(3)]
+    for t in threads:
+        t.join(TIMEOUT)
+        assert not t.is_alive()
+
+
+def test_writer_excludes_readers_and_writers():
+    lock = RWLock()
+    active = {"readers": 0, "writers": 0}
+    violations = []
+    guard = threading.Lock()
+
+    def enter(kind):
+        with guard:
+            active[kind] += 1
+            if active["writers"] > 1 or (active["writers"] and active["readers"]):
+                violations.append(dict(active))
+
+    def leave(kind):
+        with guard:
+            active[kind] -= 1
+
+    def reader():
+        for _ in range(300):
+            with lock.read():
+                enter("readers")
+                time.sleep(0)
+                leave("readers")
+
+    def writer():
+        for _ in range(100):
+            with lock.write():
+                enter("writers")
+                time.sleep(0)
+                leave("writers")
+
+    threads = [_start(reader) for _ in range(4)] + [_start(writer) for _ in range(2)]
+    for t in threads:
+        t.join(TIMEOUT * 4)
+        assert not t.is_alive()
+    assert violations == []
+
+
+def test_waiting_writer_is_not_starved_by_new_readers():
+    lock = RWLock()
+    order = []
+    lock.acquire_read()
+
+    def writer():
+        with lock.write():
+            order.append("writer")
+
+    def late_reader():
+        with lock.read():
+            order.append("reader")
+
+    w = _start(writer)
+    _wait_until(_waiting(lock, writers=1))
+    # ждущий писатель не пускает новых читателей, хотя блокировка сейчас у читателя
+    r = _start(late_reader)
+    _wait_until(_waiting(lock, readers=1, writers=1))
+    assert order == []
+    lock.release_read()
+    for t in (w, r):
+        t.join(TIMEOUT)
+        assert not t.is_alive()
+    assert order == ["writer", "reader"]
+
+
+def test_waiting_readers_go_before_the_next_writer():
+    lock = RWLock()
+    order = []
+    lock.acquire_write()
+
+    def reader():
+        with lock.read():
+            order.append("reader")
+
+    def writer():
+        with lock.write():
+            order.append("writer")
+
+    readers = [_start(reader) for _ in range(2)]
+    _wait_until(_waiting(lock, readers=2))
+    w = _start(writer)
+    _wait_until(_waiting(lock, readers=2, writers=1))
+    lock.release_write()
+    for t in readers + [w]:
+        t.join(TIMEOUT)
+        assert not t.is_alive()
+    assert order == ["reader", "reader", "writer"]
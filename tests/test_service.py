@@ -0,0 +1,56 @@
+"""HTTP-сервис каталога: проверка тел запросов и заголовков."""
+from __future__ import annotations
+
+import http.client
+import json
+import socket
+
+import pytest
+
+from service.engine import CatalogEngine
+from service.server import CatalogHTTPServer
+
+
+@pytest.fixture()
+def server():
+    engine = CatalogEngine()
+    for key in engine.registry.keys()[:2]:
+        engine.create(key)
+    srv = CatalogHTTPServer(engine, port=0, workers=2).start()
+    yield srv
+    srv.stop()
+
+
+def _post(srv, path, body):
+    host, port = srv.server_address
+    conn = http.client.HTTPConnection(host, port, timeout=5)
+    conn.request("POST", path, body=json.dumps(body))
+    resp = conn.getresponse()
+    out = resp.status, json.loads(resp.read() or b"null")
+    conn.close()
+    return out
+
+
+@pytest.mark.parametrize("value", ["false", 0.0, 1, "yes"])
+def test_configure_rejects_non_boolean_flags(server, value):
+    status, body = _post(server, "/configure", {"online": value})
+    assert status == 400 and "online" in body["error"]
+    assert not any(m.use_online for models in server.engine.view().values() for m in models)
+
+
+def test_configure_accepts_booleans(server):
+    status, _ = _post(server, "/configure", {"online": True, "analytics": False})
+    assert status == 200
+    assert all(m.use_online for models in server.engine.view().values() for m in models)
+
+
+@pytest.mark.parametrize("length", ["abc", "-5"])
+def test_malformed_content_length_is_400(server, length):
+    host, port = server.server_address
+    with socket.create_connection((host, port), timeout=5) as sock:
+        sock.sendall(f"POST /configure HTTP/1.1\r\nHost: x\r\nContent-Length: {length}\r\n\r\n{{}}".encode())
+        data = b""
+        while chunk := sock.recv(4096):
+            data += chunk
+    assert data.startswith(b"HTTP/1.0 400") or data.startswith(b"HTTP/1.1 400")
+    assert b"Content-Length" in data.split(b"\r\n\r\n", 1)[1]
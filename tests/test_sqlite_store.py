@@ -0,0 +1,47 @@
+"""SqliteCatalogStore: инкрементальная запись snapshot'ов."""
+from __future__ import annotations
+
+from dataclasses import replace
+
+from benchmarks.common import make_memento
+from patterns.composite.sqlite_store import SqliteCatalogStore
+
+
+def _catalog(store: SqliteCatalogStore):
+    return {t: tuple(snaps) for t, snaps in store.to_memento().catalog.items()}
+
+
+def test_sync_writes_only_changes():
+    mem = make_memento(60)
+    store = SqliteCatalogStore()
+    assert store.sync(mem) == 60  # база неизвестна — полная запись
+    assert store.sync(mem) == 0
+
+    types = sorted(mem.catalog)
+    edited = dict(mem.catalog)
+    first, second = types[0], types[1]
+    edited[first] = (replace(edited[first][0], use_proxy=True, license_key="KEY"),) + edited[first][1:-1]
+    edited[second] = edited[second] + (replace(edited[second][0], name="appended"),)
+    del edited[types[2]]
+    removed = len(mem.catalog[types[2]])
+    edited_mem = replace(mem, catalog=edited)
+
+    assert store.sync(edited_mem) == 1 + 1 + 1 + removed  # правка, удалённый хвост, добавленная, тип
+    assert _catalog(store) == edited
+    assert store.count(use_proxy=True, equipment_type=first) == 1 + sum(s.use_proxy for s in mem.catalog[first][1:-1])
+    store.close()
+
+
+def test_sync_after_load_and_bulk_update():
+    mem = make_memento(30)
+    store = SqliteCatalogStore()
+    store.replace_all(mem)
+    loaded = store.to_memento()
+    # загруженное из БД равно записанному — sync ничего не пишет
+    assert store.sync(loaded) == 0
+
+    store.bulk_update(online=True)
+    # после запроса в обход sync база неизвестна — следующий sync пишет всё
+    assert store.sync(mem) == 30
+    assert _catalog(store) == mem.catalog
+    store.close()
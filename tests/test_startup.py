@@ -0,0 +1,33 @@
+"""Старт: import app не тянет индексы, версии и Observer — они грузятся в App()."""
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_DEFERRED = (
+    "patterns.observer",
+    "patterns.composite.search",
+    "patterns.composite.ranges",
+    "patterns.composite.versions",
+    "patterns.composite.sync",
+    "patterns.composite.report",
+)
+
+
+def test_import_app_defers_window_only_modules():
+    code = "import sys, app; print(' '.join(m for m in %r if m in sys.modules))" % (_DEFERRED,)
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, timeout=60)
+    assert out.returncode == 0, out.stderr
+    assert out.stdout.split() == []
+
+
+def test_deferred_names_still_resolve_from_the_package():
+    import patterns.composite as composite
+
+    for name in composite.__all__:
+        assert getattr(composite, name) is not None, name
+    assert composite.SyncCatalog.__name__ == "SyncCatalog"
+    assert composite.write_catalog_report.__name__ == "write_catalog_report"
@@ -0,0 +1,123 @@
+""".mpcat: сохранение и загрузка каталога с историей, ошибки битых файлов."""
+from __future__ import annotations
+
+from dataclasses import replace
+
+import pytest
+
+from patterns.composite import LazyModel, model_from_memento, model_to_memento
+from patterns.composite.parallel import default_registry
+from patterns.memento import EquipmentMemento, load_catalog, save_catalog
+from patterns.memento.storage import MAGIC
+
+_REGISTRY = default_registry()
+
+
+def _model(key: str, name: str, **flags):
+    m = _REGISTRY.get(key).create()
+    m.name = name
+    m.__dict__.update(flags)
+    return m
+
+
+def _history() -> list:
+    keys = ("bike", "treadmill")
+    base = {
+        key: tuple(model_to_memento(_model(key, f"{key} #{i}", use_online=i % 2 == 0), key) for i in range(10))
+        for key in keys
+    }
+    h = [EquipmentMemento(catalog=base, current_ref=("bike", 0))]
+    # правки по одной модели — типы пишутся блоками D
+    bikes = list(base["bike"])
+    bikes[3] = replace(bikes[3], name="Велотренажёр ✓ 日本", use_proxy=True, license_key="VALID-KEY")
+    h.append(EquipmentMemento(catalog={**base, "bike": tuple(bikes)}, current_ref=("bike", 3)))
+    bikes.append(model_to_memento(_model("bike", "Новая модель 🚲"), "bike"))
+    h.append(EquipmentMemento(catalog={**h[-1].catalog, "bike": tuple(bikes)}, current_ref=None))
+    treadmills = h[-1].catalog["treadmill"][:-1]
+    h.append(EquipmentMemento(catalog={**h[-1].catalog, "treadmill": treadmills}))
+    return h
+
+
+def _current(history) -> EquipmentMemento:
+    # текущий каталог окна: часть записей ленивые, как после restore
+    last = history[-1]
+    catalog = {}
+    for eq_type, snaps in last.catalog.items():
+        entries = [LazyModel(s, lambda s: model_from_memento(s, _REGISTRY)) for s in snaps]
+        entries[0] = entries[0].materialize()
+        catalog[eq_type] = [model_to_memento(e, eq_type) for e in entries]
+    return EquipmentMemento(catalog=catalog, current_ref=("treadmill", 1))
+
+
+@pytest.fixture()
+def saved(tmp_path):
+    history = _history()
+    current = _current(history)
+    path = tmp_path / "catalog.mpcat"
+    save_catalog(str(path), current, history, 2)
+    return path, current, history
+
+
+def test_round_trip_keeps_catalog_history_and_index(saved):
+    path, current, history = saved
+    stored = load_catalog(str(path))
+
+    assert stored.current == current and stored.current.current_ref == ("treadmill", 1)
+    assert stored.history == history and stored.index == 2
+    assert [m.current_ref for m in stored.history] == [m.current_ref for m in history]
+    names = [s.name for s in stored.history[-1].catalog["bike"]]
+    assert "Велотренажёр ✓ 日本" in names and names[-1] == "Новая модель 🚲"
+    assert stored.history[1].catalog["bike"][3].use_proxy
+    # тип без правок — тот же кортеж, что в прошлом snapshot'е
+    assert stored.history[1].catalog["treadmill"] is stored.history[2].catalog["treadmill"]
+
+
+def test_save_of_loaded_catalog_is_unchanged(saved, tmp_path):
+    path, _, _ = saved
+    stored = load_catalog(str(path))
+    again = tmp_path / "again.mpcat"
+    save_catalog(str(again), stored.current, stored.history, stored.index)
+    assert again.read_bytes() == path.read_bytes()
+    assert load_catalog(str(again)) == stored
+
+
+@pytest.mark.parametrize("cut", [len(MAGIC) + 3, 0.5, -1, -5])
+def test_truncated_file_raises_clear_error(saved, cut):
+    path, _, _ = saved
+    data = path.read_bytes()
+    path.write_bytes(data[:int(len(data) * cut) if isinstance(cut, float) else cut])
+    with pytest.raises(ValueError, match="Unexpected end of catalog file"):
+        load_catalog(str(path))
+
+
+def test_file_without_end_marker_is_truncated(saved):
+    path, _, _ = saved
+    data = path.read_bytes()
+    path.write_bytes(data[:-5])  # ровно до тега E
+    with pytest.raises(ValueError, match="Unexpected end of catalog file"):
+        load_catalog(str(path))
+
+
+def test_not_a_catalog_file(tmp_path):
+    path = tmp_path / "x.mpcat"
+    path.write_bytes(b"PK\x03\x04 definitely not a catalog")
+    with pytest.raises(ValueError, match="Not a Mega-Patterns catalog file"):
+        load_catalog(str(path))
+
+
+def test_corrupt_blocks_raise_value_error(saved):
+    path, _, _ = saved
+    data = bytearray(path.read_bytes())
+    # портим байты по одному: таблицы строк, заголовки, колонки блоков C и D
+    errors = set()
+    for pos in range(len(MAGIC), len(data)):
+        broken = bytearray(data)
+        broken[pos] ^= 0xFF
+        path.write_bytes(bytes(broken))
+        try:
+            load_catalog(str(path))
+        except ValueError as e:
+            errors.add(str(e).split(" (")[0])
+        # любые другие исключения — ошибка теста
+    assert errors <= {"Unexpected end of catalog file", "Corrupted catalog file", "Catalog file has no snapshots"}
+    assert "Corrupted catalog file" in errors
@@ -0,0 +1,64 @@
+"""SyncCatalog: добавление/удаление моделей параллельно с поиском по индексу."""
+from __future__ import annotations
+
+import threading
+
+from patterns.composite import Catalog, SyncCatalog
+from patterns.composite.search import CatalogSearchIndex
+from patterns.factory import RecipeFactory
+
+TIMEOUT = 20.0
+
+
+def _model(name: str):
+    m = RecipeFactory("bike").create()
+    m.name = name
+    return m
+
+
+def test_add_remove_while_searching():
+    index = CatalogSearchIndex()
+    sync = SyncCatalog(Catalog(indexes=[index]))
+    stable = [sync.add(_model(f"Stable {i}")) for i in range(20)]
+    eq_type = stable[0][0]
+    stop = threading.Event()
+    errors = []
+
+    def searcher():
+        try:
+            while not stop.is_set():
+                # временные модели идут после стабильных: их ссылки не сдвигаются
+                assert sorted(sync.search("stable")) == stable
+                for t, idx in sync.search("temp"):
+                    assert t == eq_type and idx >= len(stable)
+        except BaseException as e:  # noqa: BLE001 - ошибку потока проверяет тест
+            errors.append(e)
+
+    def editor():
+        try:
+            for i in range(200):
+                sync.add(_model(f"Temp {i}"))
+                if i % 2:
+                    # удаление из середины хвоста сдвигает ссылки следующих временных моделей
+                    sync.remove(eq_type, len(stable) + (i % 3))
+        except BaseException as e:  # noqa: BLE001
+            errors.append(e)
+
+    searchers = [threading.Thread(target=searcher, daemon=True) for _ in range(3)]
+    for t in searchers:
+        t.start()
+    edit = threading.Thread(target=editor, daemon=True)
+    edit.start()
+    edit.join(TIMEOUT)
+    stop.set()
+    for t in searchers:
+        t.join(TIMEOUT)
+    assert not edit.is_alive() and errors == []
+
+    # индекс сходится с каталогом
+    models = sync.models_of(eq_type)
+    assert len(models) == len(stable) + 100
+    temp = sorted(sync.search("temp"))
+    assert temp == [(eq_type, i) for i in range(len(stable), len(models))]
+    for ref in temp:
+        assert sync.get(*ref).name.startswith("Temp")
@@ -0,0 +1,103 @@
+from __future__ import annotations
+import time
+from collections import deque
+from typing import Deque, List, Optional, Tuple
+
+LogLine = Tuple[str, str]  # (text, tag)
+
+
+class ActionLog:
+    """
+    Буфер Action Log без зависимости от tkinter.
+
+    - кольцевой буфер последних capacity строк (остальное вытесняется);
+    - append() только копит строки; виджет забирает их пачкой через drain()
+      раз в idle-тик, поэтому стоимость вставки в Text не растёт с числом событий;
+    - опционально все строки дописываются в ротируемый файл (spill_path):
+      каждая — отдельной записью со временем append(), ротация проверяется
+      на каждой записи, а flush файла — один на пачку.
+    """
+    def __init__(
+        self,
+        capacity: int = 2000,
+        spill_path: Optional[str] = None,
+        spill_max_bytes: int = 1_000_000,
+        spill_backups: int = 3,
+    ) -> None:
+        self.capacity = capacity
+        self._lines: Deque[LogLine] = deque(maxlen=capacity)
+        self._pending: Deque[LogLine] = deque(maxlen=capacity)
+        self._flush_scheduled = False
+        self.total = 0
+
+        # только handler, без Logger: логгеры из logging.getLogger() живут до конца процесса
+        self._spill: Optional["RotatingFileHandler"] = None
+        self._spill_pending: List[Tuple[float, LogLine]] = []
+        self._stamp_second = -1
+        self._stamp = ""
+        if spill_path:
+            # logging тянет за собой много модулей — только если spill включён
+            from logging.handlers import RotatingFileHandler
+
+            self._spill = RotatingFileHandler(
+                spill_path, maxBytes=spill_max_bytes, backupCount=spill_backups, encoding="utf-8"
+            )
+
+    def append(self, text: str, tag: str) -> bool:
+        """Добавить строку. True — если нужно запланировать flush (первая строка после flush)."""
+        line = (text, tag)
+        self._lines.append(line)
+        self._pending.append(line)
+        if self._spill is not None:
+            self._spill_pending.append((time.time(), line))
+        self.total += 1
+        if self._flush_scheduled:
+            return False
+        self._flush_scheduled = True
+        return True
+
+    def drain(self) -> List[LogLine]:
+        """Забрать накопленные строки (не больше capacity — старшие всё равно были бы обрезаны)."""
+        self._flush_scheduled = False
+        lines = list(self._pending)
+        self._pending.clear()
+        if self._spill is not None and self._spill_pending:
+            self._write_spill()
+        return lines
+
+    def _write_spill(self) -> None:
+        # формат как "%(asctime)s %(message)s"; RotatingFileHandler.emit сбрасывал бы файл на каждой строке
+        handler = self._spill
+        limit = handler.maxBytes
+        handler.acquire()
+        try:
+            size = handler.stream.seek(0, 2)
+            chunk: List[str] = []
+            for created, (text, tag) in self._spill_pending:
+                second = int(created)
+                if second != self._stamp_second:
+                    self._stamp_second = second
+                    self._stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(second))
+                entry = f"{self._stamp},{int((created - second) * 1000):03d} {tag} {text}\n"
+                n = len(entry) if entry.isascii() else len(entry.encode("utf-8"))
+                if limit > 0 and size and size + n >= limit:
+                    handler.stream.write("".join(chunk))
+                    chunk.clear()
+                    handler.doRollover()
+                    size = 0
+                chunk.append(entry)
+                size += n
+            handler.stream.write("".join(chunk))
+            handler.stream.flush()
+        finally:
+            handler.release()
+            self._spill_pending.clear()
+
+    def lines(self) -> List[LogLine]:
+        return list(self._lines)
+
+    def close(self) -> None:
+        self.drain()
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
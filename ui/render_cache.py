@@ -0,0 +1,40 @@
+from __future__ import annotations
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, Tuple
+
+
+class RenderCache:
+    """
+    Кеш отрисованного текста по (модель, model.version).
+    Ключ — id(model); weakref защищает от совпадения id у нового объекта
+    после сборки мусора старого. Хранится не больше max_entries моделей (LRU).
+    """
+    def __init__(self, render: Callable[[Any], str], max_entries: int = 256) -> None:
+        self._render = render
+        self._max = max_entries
+        self._entries: "OrderedDict[int, Tuple[weakref.ref, int, str]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, model: Any) -> str:
+        key = id(model)
+        version = getattr(model, "version", None)
+        entry = self._entries.get(key)
+        if entry is not None:
+            ref, cached_version, text = entry
+            if ref() is model and cached_version == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return text
+
+        self.misses += 1
+        text = self._render(model)
+        self._entries[key] = (weakref.ref(model), version, text)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self._max:
+            self._entries.popitem(last=False)
+        return text
+
+    def clear(self) -> None:
+        self._entries.clear()